@@ -0,0 +1,49 @@
+-- =====================================================
+-- Add archon_embedding_cache table for content-addressed embedding reuse
+-- =====================================================
+-- Recrawls, knowledge item refreshes and repeated RAG queries re-embed text
+-- that has not changed. This table is the durable tier of the embedding cache:
+-- vectors are keyed on provider, model, dimensions and a hash of the
+-- normalized text, so unchanged content becomes a lookup instead of an API call.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS archon_embedding_cache (
+    cache_key TEXT PRIMARY KEY,          -- sha256(provider, model, dimensions, sha256(normalized text))
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_embedding_cache_model ON archon_embedding_cache(provider, model, dimensions);
+CREATE INDEX IF NOT EXISTS idx_archon_embedding_cache_created_at ON archon_embedding_cache(created_at);
+
+COMMENT ON TABLE archon_embedding_cache IS 'Content-addressed cache of embedding vectors reused across recrawls and queries';
+COMMENT ON COLUMN archon_embedding_cache.cache_key IS 'Hash of provider, model, dimensions and normalized text hash';
+
+ALTER TABLE archon_embedding_cache ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow service role full access to archon_embedding_cache" ON archon_embedding_cache;
+CREATE POLICY "Allow service role full access to archon_embedding_cache" ON archon_embedding_cache
+    FOR ALL USING (auth.role() = 'service_role');
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE archon_embedding_cache TO authenticator, anon, authenticated;
+
+-- Cache settings (disabled by default for existing installs)
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('USE_EMBEDDING_CACHE', 'false', false, 'rag_strategy', 'Reuse embeddings for unchanged text (in-process LRU plus archon_embedding_cache table)'),
+('EMBEDDING_CACHE_MAX_ENTRIES', '50000', false, 'rag_strategy', 'Maximum embeddings kept in the in-process cache tier'),
+('EMBEDDING_CACHE_MAX_MB', '256', false, 'rag_strategy', 'Memory budget of the in-process cache tier in MB (float32 vectors, ~6 KB per 1536-d embedding)'),
+('EMBEDDING_CACHE_PERSISTENT', 'true', false, 'rag_strategy', 'Also store cached embeddings in the database so they survive restarts'),
+('EMBEDDING_CACHE_RETENTION_DAYS', '30', false, 'rag_strategy', 'Delete archon_embedding_cache rows older than this many days (0 keeps them forever)')
+ON CONFLICT (key) DO NOTHING;
+
+-- Record migration application for tracking
+INSERT INTO archon_migrations (version, migration_name)
+VALUES ('0.1.0', '012_add_embedding_cache_table')
+ON CONFLICT (version, migration_name) DO NOTHING;
+
+-- =====================================================
+-- MIGRATION COMPLETE
+-- =====================================================
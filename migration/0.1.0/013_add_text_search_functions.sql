@@ -0,0 +1,97 @@
+-- =====================================================
+-- Add ranked full-text search functions for application-side hybrid fusion
+-- =====================================================
+-- Hybrid search now runs the vector RPC and a keyword RPC concurrently and
+-- fuses the two ranked lists in the application (reciprocal rank fusion or
+-- weighted score fusion). These functions are the keyword leg: ts_vector
+-- matches ordered by ts_rank_cd, with the same filters as the vector search.
+-- =====================================================
+
+-- Full-text search leg for archon_crawled_pages (fused with vector results in the application)
+CREATE OR REPLACE FUNCTION text_search_archon_crawled_pages(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    filter JSONB DEFAULT '{}'::jsonb,
+    source_filter TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    url VARCHAR,
+    chunk_number INTEGER,
+    content TEXT,
+    metadata JSONB,
+    source_id TEXT,
+    rank FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        cp.id,
+        cp.url,
+        cp.chunk_number,
+        cp.content,
+        cp.metadata,
+        cp.source_id,
+        ts_rank_cd(cp.content_search_vector, plainto_tsquery('english', query_text))::float8 AS rank
+    FROM archon_crawled_pages cp
+    WHERE cp.metadata @> filter
+        AND (source_filter IS NULL OR cp.source_id = source_filter)
+        AND cp.content_search_vector @@ plainto_tsquery('english', query_text)
+    ORDER BY rank DESC
+    LIMIT match_count;
+$$;
+
+-- Full-text search leg for archon_code_examples (fused with vector results in the application)
+CREATE OR REPLACE FUNCTION text_search_archon_code_examples(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    filter JSONB DEFAULT '{}'::jsonb,
+    source_filter TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    url VARCHAR,
+    chunk_number INTEGER,
+    content TEXT,
+    summary TEXT,
+    metadata JSONB,
+    source_id TEXT,
+    rank FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        ce.id,
+        ce.url,
+        ce.chunk_number,
+        ce.content,
+        ce.summary,
+        ce.metadata,
+        ce.source_id,
+        ts_rank_cd(ce.content_search_vector, plainto_tsquery('english', query_text))::float8 AS rank
+    FROM archon_code_examples ce
+    WHERE ce.metadata @> filter
+        AND (source_filter IS NULL OR ce.source_id = source_filter)
+        AND ce.content_search_vector @@ plainto_tsquery('english', query_text)
+    ORDER BY rank DESC
+    LIMIT match_count;
+$$;
+
+COMMENT ON FUNCTION text_search_archon_crawled_pages IS 'Ranked full-text search on crawled pages; the keyword leg of application-side hybrid fusion';
+COMMENT ON FUNCTION text_search_archon_code_examples IS 'Ranked full-text search on code examples; the keyword leg of application-side hybrid fusion';
+
+-- Fusion settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('HYBRID_FUSION_METHOD', 'rrf', false, 'rag_strategy', 'How hybrid search merges vector and keyword results: rrf (reciprocal rank fusion) or weighted (normalized score fusion)'),
+('HYBRID_RRF_K', '60', false, 'rag_strategy', 'Rank offset k for reciprocal rank fusion; larger values flatten the advantage of top ranks'),
+('HYBRID_VECTOR_WEIGHT', '0.5', false, 'rag_strategy', 'Weight of the vector leg in hybrid fusion (0-1); the keyword leg gets the remainder')
+ON CONFLICT (key) DO NOTHING;
+
+-- Record migration application for tracking
+INSERT INTO archon_migrations (version, migration_name)
+VALUES ('0.1.0', '013_add_text_search_functions')
+ON CONFLICT (version, migration_name) DO NOTHING;
+
+-- =====================================================
+-- MIGRATION COMPLETE
+-- =====================================================
@@ -0,0 +1,143 @@
+-- =====================================================
+-- Vector index tuning support
+-- =====================================================
+-- The vector index management API (/api/vector-indexes) reports rows and
+-- indexes per embedding column, rebuilds indexes (HNSW, or ivfflat with lists
+-- scaled to the table) and attaches ivfflat.probes / hnsw.ef_search to the
+-- search functions.
+--
+-- pgvector cannot index vector columns above 2000 dimensions, so embedding_3072
+-- is indexed as a halfvec expression (pgvector >= 0.7). The multi-dimensional
+-- search functions below order by that same expression so the index is used;
+-- similarity is still computed on the full-precision column.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION match_archon_crawled_pages_multi (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  order_expression TEXT;
+BEGIN
+  -- Determine which embedding column to use based on dimension
+  CASE embedding_dimension
+    WHEN 384 THEN embedding_column := 'embedding_384';
+    WHEN 768 THEN embedding_column := 'embedding_768';
+    WHEN 1024 THEN embedding_column := 'embedding_1024';
+    WHEN 1536 THEN embedding_column := 'embedding_1536';
+    WHEN 3072 THEN embedding_column := 'embedding_3072';
+    ELSE RAISE EXCEPTION 'Unsupported embedding dimension: %', embedding_dimension;
+  END CASE;
+
+  -- vector indexes stop at 2000 dimensions; wider columns are indexed (and ordered) as halfvec
+  IF embedding_dimension > 2000 AND EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    order_expression := format('(%I::halfvec(%s)) <=> ($1::halfvec(%s))', embedding_column, embedding_dimension, embedding_dimension);
+  ELSE
+    order_expression := format('%I <=> $1', embedding_column);
+  END IF;
+
+  -- Build dynamic query
+  sql_query := format('
+    SELECT id, url, chunk_number, content, metadata, source_id,
+           1 - (%I <=> $1) AS similarity
+    FROM archon_crawled_pages
+    WHERE (%I IS NOT NULL)
+      AND metadata @> $3
+      AND ($4 IS NULL OR source_id = $4)
+    ORDER BY %s
+    LIMIT $2',
+    embedding_column, embedding_column, order_expression);
+
+  -- Execute dynamic query
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_archon_code_examples_multi (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  summary TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  order_expression TEXT;
+BEGIN
+  -- Determine which embedding column to use based on dimension
+  CASE embedding_dimension
+    WHEN 384 THEN embedding_column := 'embedding_384';
+    WHEN 768 THEN embedding_column := 'embedding_768';
+    WHEN 1024 THEN embedding_column := 'embedding_1024';
+    WHEN 1536 THEN embedding_column := 'embedding_1536';
+    WHEN 3072 THEN embedding_column := 'embedding_3072';
+    ELSE RAISE EXCEPTION 'Unsupported embedding dimension: %', embedding_dimension;
+  END CASE;
+
+  -- vector indexes stop at 2000 dimensions; wider columns are indexed (and ordered) as halfvec
+  IF embedding_dimension > 2000 AND EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    order_expression := format('(%I::halfvec(%s)) <=> ($1::halfvec(%s))', embedding_column, embedding_dimension, embedding_dimension);
+  ELSE
+    order_expression := format('%I <=> $1', embedding_column);
+  END IF;
+
+  -- Build dynamic query
+  sql_query := format('
+    SELECT id, url, chunk_number, content, summary, metadata, source_id,
+           1 - (%I <=> $1) AS similarity
+    FROM archon_code_examples
+    WHERE (%I IS NOT NULL)
+      AND metadata @> $3
+      AND ($4 IS NULL OR source_id = $4)
+    ORDER BY %s
+    LIMIT $2',
+    embedding_column, embedding_column, order_expression);
+
+  -- Execute dynamic query
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter;
+END;
+$$;
+
+-- Search parameter settings (applied with POST /api/vector-indexes/search-params)
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('VECTOR_IVFFLAT_PROBES', '10', false, 'rag_strategy', 'ivfflat lists scanned per vector search; higher values raise recall and latency'),
+('VECTOR_HNSW_EF_SEARCH', '40', false, 'rag_strategy', 'HNSW candidate list size per vector search; higher values raise recall and latency')
+ON CONFLICT (key) DO NOTHING;
+
+-- Record migration application for tracking
+INSERT INTO archon_migrations (version, migration_name)
+VALUES ('0.1.0', '014_add_vector_index_tuning')
+ON CONFLICT (version, migration_name) DO NOTHING;
+
+-- =====================================================
+-- MIGRATION COMPLETE
+-- =====================================================
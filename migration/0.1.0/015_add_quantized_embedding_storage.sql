@@ -0,0 +1,214 @@
+-- =====================================================
+-- Quantized embedding storage
+-- =====================================================
+-- EMBEDDING_STORAGE_MODE selects a compact copy of each embedding that is
+-- written next to the full-precision column and carries the ANN index:
+--   halfvec: embedding_<dim>_half HALFVEC(<dim>)  (2x smaller index)
+--   binary:  embedding_<dim>_bin  BIT(<dim>)      (32x smaller index)
+-- The match_*_quantized functions scan the compact column for
+-- match_count * rescore_factor candidates and re-score them with the
+-- full-precision vectors, so similarity values are unchanged.
+--
+-- Requires pgvector >= 0.7 (halfvec, binary_quantize and HNSW over bit).
+-- The columns are skipped with a notice on older versions.
+--
+-- Existing rows are backfilled from their full-precision embeddings before
+-- the compact indexes are built. Rows written later while the mode is full
+-- have no compact copy; the match_*_quantized functions rank those by their
+-- full-precision vectors, so switching modes never hides a chunk.
+-- =====================================================
+
+DO $$
+DECLARE
+  table_name TEXT;
+  dimension INTEGER;
+  half_column TEXT;
+  bit_column TEXT;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    RAISE NOTICE 'pgvector < 0.7: skipping quantized embedding columns';
+    RETURN;
+  END IF;
+
+  FOREACH table_name IN ARRAY ARRAY['archon_crawled_pages', 'archon_code_examples'] LOOP
+    FOREACH dimension IN ARRAY ARRAY[384, 768, 1024, 1536, 3072] LOOP
+      half_column := format('embedding_%s_half', dimension);
+      bit_column := format('embedding_%s_bin', dimension);
+      EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS %I HALFVEC(%s)', table_name, half_column, dimension);
+      EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS %I BIT(%s)', table_name, bit_column, dimension);
+      -- Backfill existing rows before indexing so every mode can use the compact index
+      EXECUTE format(
+        'UPDATE %1$I SET %3$I = %2$I::halfvec(%5$s), %4$I = binary_quantize(%2$I)::bit(%5$s)
+         WHERE %2$I IS NOT NULL AND (%3$I IS NULL OR %4$I IS NULL)',
+        table_name, format('embedding_%s', dimension), half_column, bit_column, dimension
+      );
+      EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON %I USING hnsw (%I halfvec_cosine_ops)',
+        format('idx_%s_%s', table_name, half_column), table_name, half_column
+      );
+      EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON %I USING hnsw (%I bit_hamming_ops)',
+        format('idx_%s_%s', table_name, bit_column), table_name, bit_column
+      );
+    END LOOP;
+  END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_archon_crawled_pages_quantized (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL,
+  storage_mode TEXT DEFAULT 'halfvec',
+  rescore_factor INT DEFAULT 4
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  compact_column TEXT;
+  compact_order TEXT;
+BEGIN
+  embedding_column := get_embedding_column_name(embedding_dimension);
+
+  -- Candidates come from the compact column's index, similarity from full precision
+  CASE storage_mode
+    WHEN 'halfvec' THEN
+      compact_column := embedding_column || '_half';
+      compact_order := format('%I <=> ($1::halfvec(%s))', compact_column, embedding_dimension);
+    WHEN 'binary' THEN
+      compact_column := embedding_column || '_bin';
+      compact_order := format('%I <~> binary_quantize($1)::bit(%s)', compact_column, embedding_dimension);
+    ELSE RAISE EXCEPTION 'Unsupported storage mode: %', storage_mode;
+  END CASE;
+
+  -- Rows without a compact copy (written while the mode was full, or not yet
+  -- backfilled) are still candidates, ranked by their full-precision vectors
+  sql_query := format('
+    WITH candidates AS (
+      (SELECT id, url, chunk_number, content, metadata, source_id, %1$I AS full_embedding
+       FROM archon_crawled_pages
+       WHERE (%2$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %3$s
+       LIMIT $2 * GREATEST($5, 1))
+      UNION ALL
+      (SELECT id, url, chunk_number, content, metadata, source_id, %1$I AS full_embedding
+       FROM archon_crawled_pages
+       WHERE (%2$I IS NULL) AND (%1$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %1$I <=> $1
+       LIMIT $2)
+    )
+    SELECT id, url, chunk_number, content, metadata, source_id,
+           1 - (full_embedding <=> $1) AS similarity
+    FROM candidates
+    WHERE full_embedding IS NOT NULL
+    ORDER BY full_embedding <=> $1
+    LIMIT $2',
+    embedding_column, compact_column, compact_order);
+
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter, rescore_factor;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_archon_code_examples_quantized (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL,
+  storage_mode TEXT DEFAULT 'halfvec',
+  rescore_factor INT DEFAULT 4
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  summary TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  compact_column TEXT;
+  compact_order TEXT;
+BEGIN
+  embedding_column := get_embedding_column_name(embedding_dimension);
+
+  -- Candidates come from the compact column's index, similarity from full precision
+  CASE storage_mode
+    WHEN 'halfvec' THEN
+      compact_column := embedding_column || '_half';
+      compact_order := format('%I <=> ($1::halfvec(%s))', compact_column, embedding_dimension);
+    WHEN 'binary' THEN
+      compact_column := embedding_column || '_bin';
+      compact_order := format('%I <~> binary_quantize($1)::bit(%s)', compact_column, embedding_dimension);
+    ELSE RAISE EXCEPTION 'Unsupported storage mode: %', storage_mode;
+  END CASE;
+
+  -- Rows without a compact copy (written while the mode was full, or not yet
+  -- backfilled) are still candidates, ranked by their full-precision vectors
+  sql_query := format('
+    WITH candidates AS (
+      (SELECT id, url, chunk_number, content, summary, metadata, source_id, %1$I AS full_embedding
+       FROM archon_code_examples
+       WHERE (%2$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %3$s
+       LIMIT $2 * GREATEST($5, 1))
+      UNION ALL
+      (SELECT id, url, chunk_number, content, summary, metadata, source_id, %1$I AS full_embedding
+       FROM archon_code_examples
+       WHERE (%2$I IS NULL) AND (%1$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %1$I <=> $1
+       LIMIT $2)
+    )
+    SELECT id, url, chunk_number, content, summary, metadata, source_id,
+           1 - (full_embedding <=> $1) AS similarity
+    FROM candidates
+    WHERE full_embedding IS NOT NULL
+    ORDER BY full_embedding <=> $1
+    LIMIT $2',
+    embedding_column, compact_column, compact_order);
+
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter, rescore_factor;
+END;
+$$;
+
+-- Storage mode settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('EMBEDDING_STORAGE_MODE', 'full', false, 'rag_strategy', 'Compact ANN column written next to each embedding: full (none), halfvec (2x smaller index) or binary (32x smaller index); results are re-scored in full precision'),
+('EMBEDDING_RESCORE_FACTOR', '4', false, 'rag_strategy', 'Candidates fetched from the halfvec/binary index per requested result before full-precision re-scoring')
+ON CONFLICT (key) DO NOTHING;
+
+-- Record migration application for tracking
+INSERT INTO archon_migrations (version, migration_name)
+VALUES ('0.1.0', '015_add_quantized_embedding_storage')
+ON CONFLICT (version, migration_name) DO NOTHING;
+
+-- =====================================================
+-- MIGRATION COMPLETE
+-- =====================================================
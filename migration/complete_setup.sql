@@ -80,7 +80,29 @@ INSERT INTO archon_settings (key, value, is_encrypted, category, description) VA
 ('CONTEXTUAL_EMBEDDINGS_MAX_WORKERS', '3', false, 'rag_strategy', 'Maximum parallel workers for contextual embedding generation (1-10)'),
 ('USE_HYBRID_SEARCH', 'true', false, 'rag_strategy', 'Combines vector similarity search with keyword search for better results'),
 ('USE_AGENTIC_RAG', 'true', false, 'rag_strategy', 'Enables code example extraction, storage, and specialized code search functionality'),
-('USE_RERANKING', 'true', false, 'rag_strategy', 'Applies cross-encoder reranking to improve search result relevance');
+('USE_RERANKING', 'true', false, 'rag_strategy', 'Applies cross-encoder reranking to improve search result relevance'),
+('HYBRID_FUSION_METHOD', 'rrf', false, 'rag_strategy', 'How hybrid search merges vector and keyword results: rrf (reciprocal rank fusion) or weighted (normalized score fusion)'),
+('HYBRID_RRF_K', '60', false, 'rag_strategy', 'Rank offset k for reciprocal rank fusion; larger values flatten the advantage of top ranks'),
+('HYBRID_VECTOR_WEIGHT', '0.5', false, 'rag_strategy', 'Weight of the vector leg in hybrid fusion (0-1); the keyword leg gets the remainder'),
+('RERANKING_BACKEND', 'torch', false, 'rag_strategy', 'Cross-encoder inference backend: torch, onnx or openvino (onnx/openvino need optimum installed)'),
+('RERANKING_ONNX_FILE', NULL, false, 'rag_strategy', 'Optional model file for the onnx/openvino backend, e.g. onnx/model_qint8_avx512_vnni.onnx for quantized CPU inference'),
+('RERANKING_WORKERS', '4', false, 'rag_strategy', 'Threads dedicated to cross-encoder inference (applied at startup)'),
+('RERANKING_BATCH_WINDOW_MS', '2', false, 'rag_strategy', 'How long concurrent rerank requests wait to be scored together in one batch'),
+('RERANKING_CACHE_MAX_ENTRIES', '20000', false, 'rag_strategy', 'Maximum cached (query, chunk) rerank scores'),
+('USE_RAG_QUERY_CACHE', 'true', false, 'rag_strategy', 'Serves repeated RAG queries from an in-process cache that is cleared when their source changes'),
+('RAG_QUERY_CACHE_TTL', '300', false, 'rag_strategy', 'Seconds a cached RAG query result stays valid'),
+('RAG_QUERY_CACHE_MAX_ENTRIES', '1000', false, 'rag_strategy', 'Maximum RAG query results kept in the cache'),
+('RAG_BATCH_QUERY_CONCURRENCY', '4', false, 'rag_strategy', 'Searches run concurrently for one batch RAG query request'),
+('RAG_SOURCE_FANOUT_CONCURRENCY', '8', false, 'rag_strategy', 'Per-source searches run concurrently when a RAG query spans several sources or a project'),
+('USE_LOCAL_VECTOR_INDEX', 'false', false, 'rag_strategy', 'Answers vector searches from an in-process ANN index mirrored from the database, falling back to pgvector while it syncs'),
+('LOCAL_VECTOR_INDEX_BACKEND', 'auto', false, 'rag_strategy', 'Local vector index backend: auto, hnsw (needs hnswlib) or numpy (brute force)'),
+('VECTOR_IVFFLAT_PROBES', '10', false, 'rag_strategy', 'ivfflat lists scanned per vector search; higher values raise recall and latency'),
+('VECTOR_HNSW_EF_SEARCH', '40', false, 'rag_strategy', 'HNSW candidate list size per vector search; higher values raise recall and latency'),
+('EMBEDDING_STORAGE_MODE', 'full', false, 'rag_strategy', 'Compact ANN column written next to each embedding: full (none), halfvec (2x smaller index) or binary (32x smaller index); results are re-scored in full precision'),
+('EMBEDDING_RESCORE_FACTOR', '4', false, 'rag_strategy', 'Candidates fetched from the halfvec/binary index per requested result before full-precision re-scoring'),
+('CHUNK_TOKENIZER', 'characters', false, 'rag_strategy', 'Unit for chunk sizes: characters, embedding_model (tokenizer of EMBEDDING_MODEL), tiktoken:<encoding> or hf:<repo id>'),
+('CHUNK_MAX_TOKENS', '256', false, 'rag_strategy', 'Maximum tokens per chunk when CHUNK_TOKENIZER is a real tokenizer'),
+('CHUNK_OVERLAP', '0', false, 'rag_strategy', 'Tokens (or characters) repeated from the end of one chunk at the start of the next');
 
 -- Monitoring Configuration
 INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
@@ -140,15 +162,28 @@ INSERT INTO archon_settings (key, value, is_encrypted, category, description) VA
 ('CRAWL_MAX_CONCURRENT', '10', false, 'rag_strategy', 'Maximum concurrent browser sessions for crawling (1-20)'),
 ('CRAWL_WAIT_STRATEGY', 'domcontentloaded', false, 'rag_strategy', 'When to consider page loaded: domcontentloaded, networkidle, or load'),
 ('CRAWL_PAGE_TIMEOUT', '30000', false, 'rag_strategy', 'Maximum time to wait for page load in milliseconds'),
-('CRAWL_DELAY_BEFORE_HTML', '0.5', false, 'rag_strategy', 'Time to wait for JavaScript rendering in seconds (0.1-5.0)')
+('CRAWL_DELAY_BEFORE_HTML', '0.5', false, 'rag_strategy', 'Time to wait for JavaScript rendering in seconds (0.1-5.0)'),
+('CRAWL_HOST_RATE', '4', false, 'rag_strategy', 'Starting requests per second per host; robots.txt Crawl-delay lowers it and 429/503 responses halve it'),
+('CRAWL_HOST_MAX_RATE', '20', false, 'rag_strategy', 'Highest requests per second per host reached after sustained successful responses')
 ON CONFLICT (key) DO NOTHING;
 
 -- Document Storage Performance Settings (from add_performance_settings.sql and optimize_batch_sizes.sql)
 INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
 ('DOCUMENT_STORAGE_BATCH_SIZE', '100', false, 'rag_strategy', 'Number of document chunks to process per batch (50-200) - increased for better performance'),
 ('EMBEDDING_BATCH_SIZE', '200', false, 'rag_strategy', 'Number of embeddings to create per API call (100-500) - increased for better throughput'),
+('EMBEDDING_CONCURRENCY', '1', false, 'rag_strategy', 'Number of embedding API calls kept in flight at once (1-8); override per provider with <PROVIDER>_EMBEDDING_CONCURRENCY'),
+('USE_EMBEDDING_CACHE', 'false', false, 'rag_strategy', 'Reuse embeddings for unchanged text (in-process LRU plus archon_embedding_cache table)'),
+('EMBEDDING_CACHE_MAX_ENTRIES', '50000', false, 'rag_strategy', 'Maximum embeddings kept in the in-process cache tier'),
+('EMBEDDING_CACHE_MAX_MB', '256', false, 'rag_strategy', 'Memory budget of the in-process cache tier in MB (float32 vectors, ~6 KB per 1536-d embedding)'),
+('EMBEDDING_CACHE_PERSISTENT', 'true', false, 'rag_strategy', 'Also store cached embeddings in the database so they survive restarts'),
+('EMBEDDING_CACHE_RETENTION_DAYS', '30', false, 'rag_strategy', 'Delete archon_embedding_cache rows older than this many days (0 keeps them forever)'),
 ('DELETE_BATCH_SIZE', '100', false, 'rag_strategy', 'Number of URLs to delete in one database operation (50-200) - increased for better performance'),
-('ENABLE_PARALLEL_BATCHES', 'true', false, 'rag_strategy', 'Enable parallel processing of document batches')
+('ENABLE_PARALLEL_BATCHES', 'true', false, 'rag_strategy', 'Enable parallel processing of document batches'),
+('USE_POSTGRES_COPY_INGEST', 'false', false, 'rag_strategy', 'Write crawled chunks and code examples with binary COPY over DATABASE_URI instead of PostgREST inserts'),
+('ENABLE_STREAMING_STORAGE', 'false', false, 'rag_strategy', 'Chunk, embed and store pages while the crawl is still running instead of after it finishes'),
+('STREAMING_QUEUE_SIZE', '50', false, 'rag_strategy', 'Crawled pages buffered for streaming storage before the crawler waits (10-200)'),
+('STREAMING_BATCH_PAGES', '10', false, 'rag_strategy', 'Pages stored together per streaming storage batch (1-50)'),
+('STREAMING_STORAGE_WORKERS', '2', false, 'rag_strategy', 'Concurrent streaming storage workers (1-4)')
 ON CONFLICT (key) DO UPDATE SET
     value = EXCLUDED.value,
     description = EXCLUDED.description;
@@ -232,8 +267,9 @@ CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_embedding_384 ON archon_craw
 CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_embedding_768 ON archon_crawled_pages USING ivfflat (embedding_768 vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_embedding_1024 ON archon_crawled_pages USING ivfflat (embedding_1024 vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_embedding_1536 ON archon_crawled_pages USING ivfflat (embedding_1536 vector_cosine_ops) WITH (lists = 100);
--- Note: 3072-dimensional embeddings cannot have vector indexes due to PostgreSQL vector extension 2000 dimension limit
--- The embedding_3072 column exists but cannot be indexed with current pgvector version
+-- Note: pgvector cannot index vector columns above 2000 dimensions. With pgvector >= 0.7 the
+-- embedding_3072 column can be indexed as halfvec (the search functions order by the matching
+-- expression); build it with the vector index management API (POST /api/vector-indexes/rebuild)
 
 -- Other indexes for archon_crawled_pages
 CREATE INDEX idx_archon_crawled_pages_metadata ON archon_crawled_pages USING GIN (metadata);
@@ -344,8 +380,9 @@ CREATE INDEX IF NOT EXISTS idx_archon_code_examples_embedding_384 ON archon_code
 CREATE INDEX IF NOT EXISTS idx_archon_code_examples_embedding_768 ON archon_code_examples USING ivfflat (embedding_768 vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_archon_code_examples_embedding_1024 ON archon_code_examples USING ivfflat (embedding_1024 vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_archon_code_examples_embedding_1536 ON archon_code_examples USING ivfflat (embedding_1536 vector_cosine_ops) WITH (lists = 100);
--- Note: 3072-dimensional embeddings cannot have vector indexes due to PostgreSQL vector extension 2000 dimension limit
--- The embedding_3072 column exists but cannot be indexed with current pgvector version
+-- Note: pgvector cannot index vector columns above 2000 dimensions. With pgvector >= 0.7 the
+-- embedding_3072 column can be indexed as halfvec (the search functions order by the matching
+-- expression); build it with the vector index management API (POST /api/vector-indexes/rebuild)
 
 -- Other indexes for archon_code_examples
 CREATE INDEX idx_archon_code_examples_metadata ON archon_code_examples USING GIN (metadata);
@@ -359,6 +396,27 @@ CREATE INDEX idx_archon_code_examples_embedding_model ON archon_code_examples (e
 CREATE INDEX idx_archon_code_examples_embedding_dimension ON archon_code_examples (embedding_dimension);
 CREATE INDEX idx_archon_code_examples_llm_chat_model ON archon_code_examples (llm_chat_model);
 
+-- Create the embedding cache table (durable tier of the content-addressed embedding cache)
+CREATE TABLE IF NOT EXISTS archon_embedding_cache (
+    cache_key TEXT PRIMARY KEY,          -- sha256(provider, model, dimensions, sha256(normalized text))
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_embedding_cache_model ON archon_embedding_cache(provider, model, dimensions);
+CREATE INDEX IF NOT EXISTS idx_archon_embedding_cache_created_at ON archon_embedding_cache(created_at);
+
+COMMENT ON TABLE archon_embedding_cache IS 'Content-addressed cache of embedding vectors reused across recrawls and queries';
+COMMENT ON COLUMN archon_embedding_cache.cache_key IS 'Hash of provider, model, dimensions and normalized text hash';
+
+ALTER TABLE archon_embedding_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow service role full access to archon_embedding_cache" ON archon_embedding_cache
+    FOR ALL USING (auth.role() = 'service_role');
+
 -- =====================================================
 -- SECTION 4.5: MULTI-DIMENSIONAL EMBEDDING HELPER FUNCTIONS
 -- =====================================================
@@ -412,6 +470,7 @@ AS $$
 DECLARE
   sql_query TEXT;
   embedding_column TEXT;
+  order_expression TEXT;
 BEGIN
   -- Determine which embedding column to use based on dimension
   CASE embedding_dimension
@@ -423,6 +482,13 @@ BEGIN
     ELSE RAISE EXCEPTION 'Unsupported embedding dimension: %', embedding_dimension;
   END CASE;
 
+  -- vector indexes stop at 2000 dimensions; wider columns are indexed (and ordered) as halfvec
+  IF embedding_dimension > 2000 AND EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    order_expression := format('(%I::halfvec(%s)) <=> ($1::halfvec(%s))', embedding_column, embedding_dimension, embedding_dimension);
+  ELSE
+    order_expression := format('%I <=> $1', embedding_column);
+  END IF;
+
   -- Build dynamic query
   sql_query := format('
     SELECT id, url, chunk_number, content, metadata, source_id,
@@ -431,9 +497,9 @@ BEGIN
     WHERE (%I IS NOT NULL)
       AND metadata @> $3
       AND ($4 IS NULL OR source_id = $4)
-    ORDER BY %I <=> $1
+    ORDER BY %s
     LIMIT $2',
-    embedding_column, embedding_column, embedding_column);
+    embedding_column, embedding_column, order_expression);
 
   -- Execute dynamic query
   RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter;
@@ -485,6 +551,7 @@ AS $$
 DECLARE
   sql_query TEXT;
   embedding_column TEXT;
+  order_expression TEXT;
 BEGIN
   -- Determine which embedding column to use based on dimension
   CASE embedding_dimension
@@ -496,6 +563,13 @@ BEGIN
     ELSE RAISE EXCEPTION 'Unsupported embedding dimension: %', embedding_dimension;
   END CASE;
 
+  -- vector indexes stop at 2000 dimensions; wider columns are indexed (and ordered) as halfvec
+  IF embedding_dimension > 2000 AND EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    order_expression := format('(%I::halfvec(%s)) <=> ($1::halfvec(%s))', embedding_column, embedding_dimension, embedding_dimension);
+  ELSE
+    order_expression := format('%I <=> $1', embedding_column);
+  END IF;
+
   -- Build dynamic query
   sql_query := format('
     SELECT id, url, chunk_number, content, summary, metadata, source_id,
@@ -504,9 +578,9 @@ BEGIN
     WHERE (%I IS NOT NULL)
       AND metadata @> $3
       AND ($4 IS NULL OR source_id = $4)
-    ORDER BY %I <=> $1
+    ORDER BY %s
     LIMIT $2',
-    embedding_column, embedding_column, embedding_column);
+    embedding_column, embedding_column, order_expression);
 
   -- Execute dynamic query
   RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter;
@@ -536,6 +610,189 @@ BEGIN
 END;
 $$;
 
+-- Quantized embedding storage (EMBEDDING_STORAGE_MODE): compact halfvec / bit columns carry
+-- the ANN index and the *_quantized functions re-score their candidates in full precision.
+-- Requires pgvector >= 0.7; the columns are skipped with a notice on older versions.
+DO $$
+DECLARE
+  table_name TEXT;
+  dimension INTEGER;
+  half_column TEXT;
+  bit_column TEXT;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'halfvec') THEN
+    RAISE NOTICE 'pgvector < 0.7: skipping quantized embedding columns';
+    RETURN;
+  END IF;
+
+  FOREACH table_name IN ARRAY ARRAY['archon_crawled_pages', 'archon_code_examples'] LOOP
+    FOREACH dimension IN ARRAY ARRAY[384, 768, 1024, 1536, 3072] LOOP
+      half_column := format('embedding_%s_half', dimension);
+      bit_column := format('embedding_%s_bin', dimension);
+      EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS %I HALFVEC(%s)', table_name, half_column, dimension);
+      EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS %I BIT(%s)', table_name, bit_column, dimension);
+      -- Backfill existing rows before indexing so every mode can use the compact index
+      EXECUTE format(
+        'UPDATE %1$I SET %3$I = %2$I::halfvec(%5$s), %4$I = binary_quantize(%2$I)::bit(%5$s)
+         WHERE %2$I IS NOT NULL AND (%3$I IS NULL OR %4$I IS NULL)',
+        table_name, format('embedding_%s', dimension), half_column, bit_column, dimension
+      );
+      EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON %I USING hnsw (%I halfvec_cosine_ops)',
+        format('idx_%s_%s', table_name, half_column), table_name, half_column
+      );
+      EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON %I USING hnsw (%I bit_hamming_ops)',
+        format('idx_%s_%s', table_name, bit_column), table_name, bit_column
+      );
+    END LOOP;
+  END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_archon_crawled_pages_quantized (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL,
+  storage_mode TEXT DEFAULT 'halfvec',
+  rescore_factor INT DEFAULT 4
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  compact_column TEXT;
+  compact_order TEXT;
+BEGIN
+  embedding_column := get_embedding_column_name(embedding_dimension);
+
+  -- Candidates come from the compact column's index, similarity from full precision
+  CASE storage_mode
+    WHEN 'halfvec' THEN
+      compact_column := embedding_column || '_half';
+      compact_order := format('%I <=> ($1::halfvec(%s))', compact_column, embedding_dimension);
+    WHEN 'binary' THEN
+      compact_column := embedding_column || '_bin';
+      compact_order := format('%I <~> binary_quantize($1)::bit(%s)', compact_column, embedding_dimension);
+    ELSE RAISE EXCEPTION 'Unsupported storage mode: %', storage_mode;
+  END CASE;
+
+  -- Rows without a compact copy (written while the mode was full, or not yet
+  -- backfilled) are still candidates, ranked by their full-precision vectors
+  sql_query := format('
+    WITH candidates AS (
+      (SELECT id, url, chunk_number, content, metadata, source_id, %1$I AS full_embedding
+       FROM archon_crawled_pages
+       WHERE (%2$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %3$s
+       LIMIT $2 * GREATEST($5, 1))
+      UNION ALL
+      (SELECT id, url, chunk_number, content, metadata, source_id, %1$I AS full_embedding
+       FROM archon_crawled_pages
+       WHERE (%2$I IS NULL) AND (%1$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %1$I <=> $1
+       LIMIT $2)
+    )
+    SELECT id, url, chunk_number, content, metadata, source_id,
+           1 - (full_embedding <=> $1) AS similarity
+    FROM candidates
+    WHERE full_embedding IS NOT NULL
+    ORDER BY full_embedding <=> $1
+    LIMIT $2',
+    embedding_column, compact_column, compact_order);
+
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter, rescore_factor;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_archon_code_examples_quantized (
+  query_embedding VECTOR,
+  embedding_dimension INTEGER,
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL,
+  storage_mode TEXT DEFAULT 'halfvec',
+  rescore_factor INT DEFAULT 4
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  summary TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  sql_query TEXT;
+  embedding_column TEXT;
+  compact_column TEXT;
+  compact_order TEXT;
+BEGIN
+  embedding_column := get_embedding_column_name(embedding_dimension);
+
+  -- Candidates come from the compact column's index, similarity from full precision
+  CASE storage_mode
+    WHEN 'halfvec' THEN
+      compact_column := embedding_column || '_half';
+      compact_order := format('%I <=> ($1::halfvec(%s))', compact_column, embedding_dimension);
+    WHEN 'binary' THEN
+      compact_column := embedding_column || '_bin';
+      compact_order := format('%I <~> binary_quantize($1)::bit(%s)', compact_column, embedding_dimension);
+    ELSE RAISE EXCEPTION 'Unsupported storage mode: %', storage_mode;
+  END CASE;
+
+  -- Rows without a compact copy (written while the mode was full, or not yet
+  -- backfilled) are still candidates, ranked by their full-precision vectors
+  sql_query := format('
+    WITH candidates AS (
+      (SELECT id, url, chunk_number, content, summary, metadata, source_id, %1$I AS full_embedding
+       FROM archon_code_examples
+       WHERE (%2$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %3$s
+       LIMIT $2 * GREATEST($5, 1))
+      UNION ALL
+      (SELECT id, url, chunk_number, content, summary, metadata, source_id, %1$I AS full_embedding
+       FROM archon_code_examples
+       WHERE (%2$I IS NULL) AND (%1$I IS NOT NULL)
+         AND metadata @> $3
+         AND ($4 IS NULL OR source_id = $4)
+       ORDER BY %1$I <=> $1
+       LIMIT $2)
+    )
+    SELECT id, url, chunk_number, content, summary, metadata, source_id,
+           1 - (full_embedding <=> $1) AS similarity
+    FROM candidates
+    WHERE full_embedding IS NOT NULL
+    ORDER BY full_embedding <=> $1
+    LIMIT $2',
+    embedding_column, compact_column, compact_order);
+
+  RETURN QUERY EXECUTE sql_query USING query_embedding, match_count, filter, source_filter, rescore_factor;
+END;
+$$;
+
 -- =====================================================
 -- SECTION 5B: HYBRID SEARCH FUNCTIONS WITH TS_VECTOR
 -- =====================================================
@@ -817,6 +1074,79 @@ COMMENT ON FUNCTION hybrid_search_archon_crawled_pages IS 'Legacy hybrid search
 COMMENT ON FUNCTION hybrid_search_archon_code_examples_multi IS 'Multi-dimensional hybrid search on code examples with configurable embedding dimensions';
 COMMENT ON FUNCTION hybrid_search_archon_code_examples IS 'Legacy hybrid search function for code examples (uses 1536D embeddings)';
 
+-- Full-text search leg for archon_crawled_pages (fused with vector results in the application)
+CREATE OR REPLACE FUNCTION text_search_archon_crawled_pages(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    filter JSONB DEFAULT '{}'::jsonb,
+    source_filter TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    url VARCHAR,
+    chunk_number INTEGER,
+    content TEXT,
+    metadata JSONB,
+    source_id TEXT,
+    rank FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        cp.id,
+        cp.url,
+        cp.chunk_number,
+        cp.content,
+        cp.metadata,
+        cp.source_id,
+        ts_rank_cd(cp.content_search_vector, plainto_tsquery('english', query_text))::float8 AS rank
+    FROM archon_crawled_pages cp
+    WHERE cp.metadata @> filter
+        AND (source_filter IS NULL OR cp.source_id = source_filter)
+        AND cp.content_search_vector @@ plainto_tsquery('english', query_text)
+    ORDER BY rank DESC
+    LIMIT match_count;
+$$;
+
+-- Full-text search leg for archon_code_examples (fused with vector results in the application)
+CREATE OR REPLACE FUNCTION text_search_archon_code_examples(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    filter JSONB DEFAULT '{}'::jsonb,
+    source_filter TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    url VARCHAR,
+    chunk_number INTEGER,
+    content TEXT,
+    summary TEXT,
+    metadata JSONB,
+    source_id TEXT,
+    rank FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        ce.id,
+        ce.url,
+        ce.chunk_number,
+        ce.content,
+        ce.summary,
+        ce.metadata,
+        ce.source_id,
+        ts_rank_cd(ce.content_search_vector, plainto_tsquery('english', query_text))::float8 AS rank
+    FROM archon_code_examples ce
+    WHERE ce.metadata @> filter
+        AND (source_filter IS NULL OR ce.source_id = source_filter)
+        AND ce.content_search_vector @@ plainto_tsquery('english', query_text)
+    ORDER BY rank DESC
+    LIMIT match_count;
+$$;
+
+COMMENT ON FUNCTION text_search_archon_crawled_pages IS 'Ranked full-text search on crawled pages; the keyword leg of application-side hybrid fusion';
+COMMENT ON FUNCTION text_search_archon_code_examples IS 'Ranked full-text search on code examples; the keyword leg of application-side hybrid fusion';
+
 -- =====================================================
 -- SECTION 6: RLS POLICIES FOR KNOWLEDGE BASE
 -- =====================================================
@@ -1062,7 +1392,11 @@ VALUES
   ('0.1.0', '008_add_migration_tracking'),
   ('0.1.0', '009_add_cascade_delete_constraints'),
   ('0.1.0', '010_add_provider_placeholders'),
-  ('0.1.0', '011_add_page_metadata_table')
+  ('0.1.0', '011_add_page_metadata_table'),
+  ('0.1.0', '012_add_embedding_cache_table'),
+  ('0.1.0', '013_add_text_search_functions'),
+  ('0.1.0', '014_add_vector_index_tuning'),
+  ('0.1.0', '015_add_quantized_embedding_storage')
 ON CONFLICT (version, migration_name) DO NOTHING;
 
 -- Enable Row Level Security on migrations table
@@ -1378,6 +1712,7 @@ GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE
   archon_crawled_pages,
   archon_code_examples,
   archon_page_metadata,
+  archon_embedding_cache,
   archon_projects,
   archon_tasks,
   archon_project_sources,
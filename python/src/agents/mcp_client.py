@@ -105,6 +105,19 @@ class MCPClient:
         )
         return json.dumps(result) if isinstance(result, dict) else str(result)
 
+    async def perform_batch_rag_query(
+        self, queries: list[str], source: str = None, match_count: int = 5
+    ) -> str:
+        """Perform several RAG queries in one call through MCP."""
+        result = await self.call_tool(
+            "rag_search_knowledge_base_batch",
+            queries=queries,
+            source_id=source,
+            match_count=match_count,
+            return_mode="chunks",
+        )
+        return json.dumps(result) if isinstance(result, dict) else str(result)
+
     async def get_available_sources(self) -> str:
         """Get available sources through MCP."""
         result = await self.call_tool("get_available_sources")
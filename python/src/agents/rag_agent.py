@@ -21,6 +21,30 @@ from .mcp_client import get_mcp_client
 logger = logging.getLogger(__name__)
 
 
+def format_search_results(results: list[dict[str, Any]]) -> str:
+    """Format RAG query results for display to the model."""
+    formatted_results = []
+    for i, res in enumerate(results, 1):
+        similarity = res.get("similarity_score", res.get("similarity", 0))
+        metadata = res.get("metadata", {})
+        source = metadata.get("source", "Unknown")
+        url = metadata.get("url", res.get("url", ""))
+        content = res.get("content", "")
+
+        # Truncate content if too long
+        if len(content) > 500:
+            content = content[:500] + "..."
+
+        formatted_results.append(
+            f"**Result {i}** (Relevance: {similarity:.2%})\n"
+            f"Source: {source}\n"
+            f"URL: {url}\n"
+            f"Content: {content}\n"
+        )
+
+    return f"Found {len(results)} relevant results:\n\n" + "\n---\n".join(formatted_results)
+
+
 @dataclass
 class RagDependencies(ArchonDependencies):
     """Dependencies for RAG operations."""
@@ -94,6 +118,7 @@ class RagAgent(BaseAgent[RagDependencies, str]):
 **Common Queries:**
 - "What resources/sources are available?" → Use list_available_sources tool
 - "Search for X" → Use search_documents tool
+- Several related searches (a query plus refinements) → Use search_documents_batch in one call
 - "Find code examples for Y" → Use search_code_examples tool
 - "What documentation do you have?" → Use list_available_sources tool
 
@@ -157,30 +182,48 @@ class RagAgent(BaseAgent[RagDependencies, str]):
                 if not results:
                     return "No results found for your query. Try using different search terms or removing filters."
 
-                # Format results for display
-                formatted_results = []
-                for i, res in enumerate(results, 1):
-                    similarity = res.get("similarity_score", res.get("similarity", 0))
-                    metadata = res.get("metadata", {})
-                    source = metadata.get("source", "Unknown")
-                    url = metadata.get("url", res.get("url", ""))
-                    content = res.get("content", "")
-
-                    # Truncate content if too long
-                    if len(content) > 500:
-                        content = content[:500] + "..."
-
-                    formatted_results.append(
-                        f"**Result {i}** (Relevance: {similarity:.2%})\n"
-                        f"Source: {source}\n"
-                        f"URL: {url}\n"
-                        f"Content: {content}\n"
-                    )
+                return format_search_results(results)
+
+            except Exception as e:
+                logger.error(f"Error searching documents: {e}")
+                return f"Error performing search: {str(e)}"
+
+        @agent.tool
+        async def search_documents_batch(
+            ctx: RunContext[RagDependencies], queries: list[str], source_filter: str | None = None
+        ) -> str:
+            """Search documents for several queries at once (e.g. a query and its refinements)."""
+            try:
+                # Use source filter from context if not provided
+                if source_filter is None:
+                    source_filter = ctx.deps.source_filter
 
-                return f"Found {len(results)} relevant results:\n\n" + "\n---\n".join(
-                    formatted_results
+                # One MCP call embeds and searches every query
+                mcp_client = await get_mcp_client()
+                result_json = await mcp_client.perform_batch_rag_query(
+                    queries=queries, source=source_filter, match_count=ctx.deps.match_count
                 )
 
+                # Parse the JSON response
+                import json
+
+                result = json.loads(result_json)
+
+                if not result.get("success", False):
+                    return f"Search failed: {result.get('error', 'Unknown error')}"
+
+                sections = []
+                for search in result.get("searches", []):
+                    if not search.get("success", False):
+                        body = f"Search failed: {search.get('error', 'Unknown error')}"
+                    elif not search.get("results"):
+                        body = "No results found for this query."
+                    else:
+                        body = format_search_results(search["results"])
+                    sections.append(f"### Query: {search.get('query')}\n{body}")
+
+                return "\n\n".join(sections) or "No results found for your queries."
+
             except Exception as e:
                 logger.error(f"Error searching documents: {e}")
                 return f"Error performing search: {str(e)}"
@@ -81,7 +81,9 @@ def register_rag_tools(mcp: FastMCP):
         query: str,
         source_id: str | None = None,
         match_count: int = 5,
-        return_mode: str = "pages"
+        return_mode: str = "pages",
+        source_ids: list[str] | None = None,
+        project_id: str | None = None,
     ) -> str:
         """
         Search knowledge base for relevant content using RAG.
@@ -95,6 +97,10 @@ def register_rag_tools(mcp: FastMCP):
                       Example: "src_1234abcd" not "docs.anthropic.com"
             match_count: Max results (default: 5)
             return_mode: "pages" (default, full pages with metadata) or "chunks" (raw text chunks)
+            source_ids: Optional list of source IDs searched together in one call;
+                        each source is searched separately and the hits are merged by score.
+                        Prefer this over one search per source.
+            project_id: Optional project ID - searches every source linked to the project.
 
         Returns:
             JSON string with structure:
@@ -121,6 +127,10 @@ def register_rag_tools(mcp: FastMCP):
                 }
                 if source_id:
                     request_data["source"] = source_id
+                if source_ids:
+                    request_data["source_ids"] = source_ids
+                if project_id:
+                    request_data["project_id"] = project_id
 
                 response = await client.post(urljoin(api_url, "/api/rag/query"), json=request_data)
 
@@ -151,6 +161,78 @@ def register_rag_tools(mcp: FastMCP):
             logger.error(f"Error performing RAG query: {e}")
             return json.dumps({"success": False, "results": [], "error": str(e)}, indent=2)
 
+    @mcp.tool()
+    async def rag_search_knowledge_base_batch(
+        ctx: Context,
+        queries: list[str],
+        source_id: str | None = None,
+        match_count: int = 5,
+        return_mode: str = "pages"
+    ) -> str:
+        """
+        Run several knowledge base searches in one call.
+
+        Cheaper than calling rag_search_knowledge_base once per query: all queries
+        are embedded together and searched concurrently. Use it when one step
+        needs several related searches (e.g. a query and its refinements).
+
+        Args:
+            queries: Search queries (max 20), each SHORT and FOCUSED (2-5 keywords)
+            source_id: Optional source ID filter from rag_get_available_sources()
+            match_count: Max results per query (default: 5)
+            return_mode: "pages" (default) or "chunks"
+
+        Returns:
+            JSON string with structure:
+            - success: bool - Operation success status
+            - searches: list[dict] - One entry per query, in order:
+                        query, success, results, return_mode, reranked, error
+            - error: str|null - Error description if success=false
+        """
+        try:
+            api_url = get_api_url()
+            timeout = httpx.Timeout(60.0, connect=5.0)
+
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                request_data = {
+                    "queries": queries,
+                    "match_count": match_count,
+                    "return_mode": return_mode
+                }
+                if source_id:
+                    request_data["source"] = source_id
+
+                response = await client.post(urljoin(api_url, "/api/rag/query/batch"), json=request_data)
+
+                if response.status_code == 200:
+                    result = response.json()
+                    searches = [
+                        {
+                            "query": item.get("query"),
+                            "success": item.get("success", False),
+                            "results": item.get("results", []),
+                            "return_mode": item.get("return_mode", return_mode),
+                            "reranked": item.get("reranking_applied", False),
+                            "error": item.get("error"),
+                        }
+                        for item in result.get("results", [])
+                    ]
+                    return json.dumps({"success": True, "searches": searches, "error": None}, indent=2)
+                else:
+                    error_detail = response.text
+                    return json.dumps(
+                        {
+                            "success": False,
+                            "searches": [],
+                            "error": f"HTTP {response.status_code}: {error_detail}",
+                        },
+                        indent=2,
+                    )
+
+        except Exception as e:
+            logger.error(f"Error performing batch RAG query: {e}")
+            return json.dumps({"success": False, "searches": [], "error": str(e)}, indent=2)
+
     @mcp.tool()
     async def rag_search_code_examples(
         ctx: Context, query: str, source_id: str | None = None, match_count: int = 5
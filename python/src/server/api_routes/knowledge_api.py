@@ -15,22 +15,24 @@ import uuid
 from datetime import datetime
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Basic validation - simplified inline version
 
 # Import unified logging
 from ..config.logfire_config import get_logger, safe_logfire_error, safe_logfire_info
+from ..services.client_manager import execute_async
 from ..services.crawler_manager import get_crawler
 from ..services.crawling import CrawlingService
 from ..services.credential_service import credential_service
 from ..services.embeddings.provider_error_adapters import ProviderErrorFactory
 from ..services.knowledge import DatabaseMetricsService, KnowledgeItemService, KnowledgeSummaryService
-from ..services.search.rag_service import RAGService
+from ..services.search.rag_service import MAX_QUERY_SOURCES, RAGService
 from ..services.storage import DocumentStorageService
 from ..utils import get_supabase_client
-from ..utils.document_processing import extract_text_from_document
+from ..utils.document_processing import extract_text_from_document_async
 
 # Get logger for this module
 logger = get_logger(__name__)
@@ -195,6 +197,28 @@ class RagQueryRequest(BaseModel):
     source: str | None = None
     match_count: int = 5
     return_mode: str = "chunks"  # "chunks" or "pages"
+    source_ids: list[str] | None = None  # Search these sources together, merged by score
+    project_id: str | None = None  # Search the project's linked sources together
+    per_source_limit: int | None = None  # Max results from one source when searching several
+
+
+def _validate_query_sources(request: RagQueryRequest) -> None:
+    """Reject oversized source lists and non-positive per-source caps."""
+    if request.source_ids and len(request.source_ids) > MAX_QUERY_SOURCES:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_QUERY_SOURCES} sources per query")
+    if request.per_source_limit is not None and request.per_source_limit < 1:
+        raise HTTPException(status_code=422, detail="per_source_limit must be at least 1")
+
+
+# Upper bound on queries per batch request
+MAX_BATCH_QUERIES = 20
+
+
+class RagBatchQueryRequest(BaseModel):
+    queries: list[str]
+    source: str | None = None
+    match_count: int = 5
+    return_mode: str = "chunks"  # "chunks" or "pages"
 
 
 @router.get("/crawl-progress/{progress_id}")
@@ -418,7 +442,7 @@ async def get_knowledge_item_chunks(
         if domain_filter:
             count_query = count_query.ilike("url", f"%{domain_filter}%")
 
-        count_result = count_query.execute()
+        count_result = await execute_async(count_query)
         total = count_result.count if hasattr(count_result, "count") else 0
 
         # Build the main query with pagination
@@ -437,7 +461,7 @@ async def get_knowledge_item_chunks(
         # Apply pagination
         query = query.range(offset, offset + limit - 1)
 
-        result = query.execute()
+        result = await execute_async(query)
         # Check for error more explicitly to work with mocks
         if hasattr(result, "error") and result.error is not None:
             safe_logfire_error(
@@ -566,22 +590,20 @@ async def get_knowledge_item_code_examples(
         supabase = get_supabase_client()
 
         # First get total count
-        count_result = (
+        count_result = await execute_async(
             supabase.from_("archon_code_examples")
             .select("id", count="exact", head=True)
             .eq("source_id", source_id)
-            .execute()
         )
         total = count_result.count if hasattr(count_result, "count") else 0
 
         # Get paginated code examples
-        result = (
+        result = await execute_async(
             supabase.from_("archon_code_examples")
             .select("id, source_id, content, summary, metadata")
             .eq("source_id", source_id)
             .order("id", desc=False)  # Deterministic ordering
             .range(offset, offset + limit - 1)
-            .execute()
         )
 
         # Check for error to match chunks endpoint pattern
@@ -627,8 +649,13 @@ async def get_knowledge_item_code_examples(
 
 
 @router.post("/knowledge-items/{source_id}/refresh")
-async def refresh_knowledge_item(source_id: str):
-    """Refresh a knowledge item by re-crawling its URL with the same metadata."""
+async def refresh_knowledge_item(source_id: str, incremental: bool = False):
+    """
+    Refresh a knowledge item by re-crawling its URL with the same metadata.
+
+    With incremental=true only pages and chunks whose content changed since the
+    last crawl are re-embedded; unchanged chunks keep their stored rows.
+    """
     
     # Validate API key before starting expensive refresh operation
     logger.info("🔍 About to validate API key for refresh...")
@@ -638,7 +665,9 @@ async def refresh_knowledge_item(source_id: str):
     logger.info("✅ API key validation completed successfully for refresh")
     
     try:
-        safe_logfire_info(f"Starting knowledge item refresh | source_id={source_id}")
+        safe_logfire_info(
+            f"Starting knowledge item refresh | source_id={source_id} | incremental={incremental}"
+        )
 
         # Get the existing knowledge item
         service = KnowledgeItemService(get_supabase_client())
@@ -704,6 +733,7 @@ async def refresh_knowledge_item(source_id: str):
             "max_depth": max_depth,
             "extract_code_examples": True,
             "generate_summary": True,
+            "incremental": incremental,
         }
 
         # Create a wrapped task that acquires the semaphore
@@ -1028,8 +1058,18 @@ async def _perform_upload_with_progress(
             log=f"Extracting text from {filename}"
         )
 
+        async def extraction_progress_callback(pages_done: int, page_count: int):
+            """Progress callback for page-by-page PDF extraction"""
+            await tracker.update(
+                status="processing",
+                progress=mapped_progress,
+                log=f"Extracted text from {pages_done}/{page_count} pages of {filename}"
+            )
+
         try:
-            extracted_text = extract_text_from_document(file_content, filename, content_type)
+            extracted_text = await extract_text_from_document_async(
+                file_content, filename, content_type, progress_callback=extraction_progress_callback
+            )
             safe_logfire_info(
                 f"Document text extracted | filename={filename} | extracted_length={len(extracted_text)} | content_type={content_type}"
             )
@@ -1133,6 +1173,8 @@ async def perform_rag_query(request: RagQueryRequest):
     if not request.query.strip():
         raise HTTPException(status_code=422, detail="Query cannot be empty")
 
+    _validate_query_sources(request)
+
     try:
         # Use RAGService for unified RAG query with return_mode support
         search_service = RAGService(get_supabase_client())
@@ -1140,7 +1182,10 @@ async def perform_rag_query(request: RagQueryRequest):
             query=request.query,
             source=request.source,
             match_count=request.match_count,
-            return_mode=request.return_mode
+            return_mode=request.return_mode,
+            source_ids=request.source_ids,
+            project_id=request.project_id,
+            per_source_limit=request.per_source_limit,
         )
 
         if success:
@@ -1160,6 +1205,89 @@ async def perform_rag_query(request: RagQueryRequest):
         raise HTTPException(status_code=500, detail={"error": f"RAG query failed: {str(e)}"})
 
 
+@router.post("/rag/query/stream")
+async def stream_rag_query(request: RagQueryRequest, accept: str | None = Header(None)):
+    """Perform a RAG query, streaming search hits, reranked order and the final response as they complete.
+
+    Responds with NDJSON (one event per line) by default, or Server-Sent Events
+    when the client accepts text/event-stream.
+    """
+    # Validate query
+    if not request.query or not request.query.strip():
+        raise HTTPException(status_code=422, detail="Query cannot be empty")
+
+    _validate_query_sources(request)
+
+    use_sse = "text/event-stream" in (accept or "")
+    search_service = RAGService(get_supabase_client())
+
+    async def generate():
+        async for event in search_service.stream_rag_query(
+            query=request.query,
+            source=request.source,
+            match_count=request.match_count,
+            return_mode=request.return_mode,
+            source_ids=request.source_ids,
+            project_id=request.project_id,
+            per_source_limit=request.per_source_limit,
+        ):
+            if event["type"] == "error":
+                safe_logfire_error(
+                    f"Streaming RAG query failed | error={event['error']} | query={request.query[:50]} | source={request.source}"
+                )
+            payload = json.dumps(event, default=str)
+            yield f"data: {payload}\n\n" if use_sse else f"{payload}\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable Nginx buffering
+        },
+    )
+
+
+@router.post("/rag/query/batch")
+async def perform_batch_rag_query(request: RagBatchQueryRequest):
+    """Perform several RAG queries with one embedding call and concurrent searches."""
+    # Validate queries
+    if not request.queries:
+        raise HTTPException(status_code=422, detail="At least one query is required")
+
+    if any(not query.strip() for query in request.queries):
+        raise HTTPException(status_code=422, detail="Queries cannot be empty")
+
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_BATCH_QUERIES} queries per batch"
+        )
+
+    try:
+        search_service = RAGService(get_supabase_client())
+        success, result = await search_service.perform_batch_rag_query(
+            queries=request.queries,
+            source=request.source,
+            match_count=request.match_count,
+            return_mode=request.return_mode,
+        )
+
+        if success:
+            result["success"] = True
+            return result
+        else:
+            raise HTTPException(
+                status_code=500, detail={"error": result.get("error", "Batch RAG query failed")}
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        safe_logfire_error(
+            f"Batch RAG query failed | error={str(e)} | queries={len(request.queries)} | source={request.source}"
+        )
+        raise HTTPException(status_code=500, detail={"error": f"Batch RAG query failed: {str(e)}"}) from e
+
+
 @router.post("/rag/code-examples")
 async def search_code_examples(request: RagQueryRequest):
     """Search for code examples relevant to the query using dedicated code examples service."""
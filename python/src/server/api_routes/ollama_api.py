@@ -16,6 +16,7 @@ from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from ..config.logfire_config import get_logger
+from ..services.credential_service import credential_service
 from ..services.llm_provider_service import validate_provider_instance
 from ..services.ollama.embedding_router import embedding_router
 from ..services.ollama.model_discovery_service import model_discovery_service
@@ -66,6 +67,9 @@ class EmbeddingRouteRequest(BaseModel):
     model_name: str = Field(..., description="Name of the embedding model")
     instance_url: str = Field(..., description="URL of the Ollama instance")
     text_sample: str | None = Field(None, description="Optional text sample for optimization")
+    storage_mode: str | None = Field(
+        None, description="Embedding storage mode (full, halfvec or binary); defaults to EMBEDDING_STORAGE_MODE"
+    )
 
 
 class EmbeddingRouteResponse(BaseModel):
@@ -265,11 +269,16 @@ async def analyze_embedding_route_endpoint(request: EmbeddingRouteRequest) -> Em
     try:
         logger.info(f"Analyzing embedding route for {request.model_name} on {request.instance_url}")
 
+        storage_mode = request.storage_mode
+        if storage_mode is None:
+            storage_mode = await credential_service.get_credential("EMBEDDING_STORAGE_MODE", "full")
+
         # Get routing decision from the embedding router
         routing_decision = await embedding_router.route_embedding(
             model_name=request.model_name,
             instance_url=request.instance_url,
-            text_content=request.text_sample
+            text_content=request.text_sample,
+            storage_mode=storage_mode
         )
 
         # Calculate performance score
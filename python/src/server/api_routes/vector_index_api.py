@@ -0,0 +1,112 @@
+"""
+Vector Index API Module
+
+This module handles pgvector index management:
+- Index status and recommendations per embedding column
+- Concurrent index rebuilds (HNSW or ivfflat)
+- ivfflat.probes / hnsw.ef_search for the search functions
+- Recall vs latency benchmark against exact search
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from ..config.logfire_config import get_logger, safe_logfire_error
+from ..services.storage.vector_index_management import get_vector_index_management_service
+
+# Get logger for this module
+logger = get_logger(__name__)
+
+# Create router
+router = APIRouter(prefix="/api/vector-indexes", tags=["vector-indexes"])
+
+
+class RebuildIndexRequest(BaseModel):
+    """Request model for rebuilding an embedding column's index"""
+
+    table: Literal["archon_crawled_pages", "archon_code_examples"]
+    dimension: int
+    method: Literal["ivfflat", "hnsw"] | None = None
+    lists: int | None = Field(default=None, ge=1)
+    m: int | None = Field(default=None, ge=2, le=100)
+    ef_construction: int | None = Field(default=None, ge=4, le=1000)
+
+
+class SearchParamsRequest(BaseModel):
+    """Request model for search parameters (omitted values come from settings)"""
+
+    probes: int | None = None
+    ef_search: int | None = None
+
+
+class BenchmarkRequest(BaseModel):
+    """Request model for the recall vs latency benchmark"""
+
+    table: Literal["archon_crawled_pages", "archon_code_examples"]
+    dimension: int
+    sample_size: int = Field(default=20, ge=1, le=500)
+    k: int = Field(default=10, ge=1, le=100)
+    values: list[int] | None = None
+
+
+async def _call(operation: str, coro):
+    """Map service errors to HTTP status codes."""
+    try:
+        return await coro
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)}) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail={"error": str(e)}) from e
+    except Exception as e:
+        safe_logfire_error(f"Failed to {operation} | error={str(e)}")
+        raise HTTPException(status_code=500, detail={"error": str(e)}) from e
+
+
+@router.get("")
+async def get_vector_index_status():
+    """Get rows, indexes, builds in progress and recommendations per embedding column."""
+    return await _call("get vector index status", get_vector_index_management_service().get_status())
+
+
+@router.post("/rebuild", status_code=202)
+async def rebuild_vector_index(request: RebuildIndexRequest):
+    """Start a concurrent rebuild of an embedding column's index; poll the status for progress."""
+    return await _call(
+        "rebuild vector index",
+        get_vector_index_management_service().start_rebuild(
+            request.table,
+            request.dimension,
+            method=request.method,
+            lists=request.lists,
+            m=request.m,
+            ef_construction=request.ef_construction,
+        ),
+    )
+
+
+@router.post("/search-params")
+async def apply_vector_search_params(request: SearchParamsRequest):
+    """Attach ivfflat.probes and hnsw.ef_search to the vector search functions."""
+    return await _call(
+        "apply vector search params",
+        get_vector_index_management_service().apply_search_params(
+            probes=request.probes, ef_search=request.ef_search
+        ),
+    )
+
+
+@router.post("/benchmark")
+async def benchmark_vector_index(request: BenchmarkRequest):
+    """Measure recall@k and latency of a column's index against exact search."""
+    return await _call(
+        "benchmark vector index",
+        get_vector_index_management_service().benchmark(
+            request.table,
+            request.dimension,
+            sample_size=request.sample_size,
+            k=request.k,
+            values=request.values,
+        ),
+    )
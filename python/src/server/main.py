@@ -32,6 +32,7 @@ from .api_routes.pages_api import router as pages_router
 from .api_routes.progress_api import router as progress_router
 from .api_routes.projects_api import router as projects_router
 from .api_routes.providers_api import router as providers_router
+from .api_routes.vector_index_api import router as vector_index_router
 from .api_routes.version_api import router as version_router
 
 # Import modular API routers
@@ -39,10 +40,16 @@ from .api_routes.settings_api import router as settings_router
 
 # Import Logfire configuration
 from .config.logfire_config import api_logger, setup_logfire
+from .services.client_manager import shutdown_db_executors
 from .services.crawler_manager import cleanup_crawler, initialize_crawler
+from .services.crawling.code_extraction_pool import shutdown_extraction_executor
+from .services.search.reranking_service import get_reranking_service
+from .services.storage.text_chunker import shutdown_chunking_executor
+from .utils.document_processing import shutdown_pdf_extraction_executor
 
 # Import utilities and core classes
 from .services.credential_service import initialize_credentials
+from .services.storage.bulk_ingest import get_bulk_ingest_service
 from .utils.migrations import initialize_database_schema
 from .utils.startup_checks import run_all_startup_checks
 
@@ -153,6 +160,22 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             api_logger.warning("Could not cleanup crawling context: %s", e, exc_info=True)
 
+        # Stop database thread pools
+        shutdown_db_executors()
+
+        # Stop the reranking inference pool
+        get_reranking_service().shutdown()
+
+        # Stop the code extraction, chunking and PDF extraction worker processes
+        shutdown_extraction_executor()
+        shutdown_chunking_executor()
+        shutdown_pdf_extraction_executor()
+
+        # Close the direct Postgres ingest pool
+        try:
+            await get_bulk_ingest_service().close()
+        except Exception as e:
+            api_logger.warning("Could not close bulk ingest pool: %s", e, exc_info=True)
 
         api_logger.info("✅ Cleanup completed")
 
@@ -213,6 +236,7 @@ app.include_router(bug_report_router)
 app.include_router(providers_router)
 app.include_router(version_router)
 app.include_router(migration_router)
+app.include_router(vector_index_router)
 
 
 # Root endpoint
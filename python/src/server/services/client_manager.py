@@ -2,10 +2,25 @@
 Client Manager Service
 
 Manages database and API client connections.
+
+supabase-py's query builders are synchronous: every .execute() is a blocking
+HTTP round trip. execute_async() runs them on dedicated thread pools so async
+request handlers never stall the event loop. Reads and writes use separate
+pools, which keeps RAG queries and progress polls responsive while a crawl is
+bulk-inserting chunks.
+
+Direct asyncpg connections (DATABASE_URI) are used where Postgres features
+matter, such as COPY bulk ingest and vector index management. DATABASE_URI is
+optional, so every other query goes through the shared supabase client and
+execute_async().
 """
 
+import asyncio
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 from supabase import Client, create_client
 
@@ -41,3 +56,56 @@ def get_supabase_client() -> Client:
     except Exception as e:
         search_logger.error(f"Failed to create Supabase client: {e}")
         raise
+
+
+# Threads available for database round trips (override via environment)
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "16"))
+DB_WRITE_WORKERS = int(os.getenv("DB_WRITE_WORKERS", "4"))
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_db_executor(write: bool = False) -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool for database reads or writes.
+
+    Args:
+        write: True for the write pool (inserts, updates, deletes)
+
+    Returns:
+        The lazily created executor
+    """
+    kind = "write" if write else "read"
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers = DB_WRITE_WORKERS if write else DB_READ_WORKERS
+                executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"db_{kind}")
+                _executors[kind] = executor
+    return executor
+
+
+async def execute_async(query: Any, write: bool = False) -> Any:
+    """
+    Execute a supabase-py query builder without blocking the event loop.
+
+    Args:
+        query: Any builder with a blocking execute() (table queries, rpc calls)
+        write: True to run on the write pool so bulk writes never queue ahead of reads
+
+    Returns:
+        The builder's APIResponse
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(write), query.execute)
+
+
+def shutdown_db_executors() -> None:
+    """Shut down the database thread pools (called on application shutdown)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
@@ -0,0 +1,90 @@
+"""
+Code Extraction Process Pool
+
+Runs the CPU-bound part of code extraction (regex scans over raw HTML, code
+cleaning and quality validation) in worker processes so a large crawl's code
+phase scales with cores instead of holding the event loop.
+
+Workers receive a snapshot of the extraction settings with every work unit
+and never talk to the credential service themselves.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+# Worker processes for code extraction (override via environment; 0 extracts on the event loop)
+CODE_EXTRACTION_PROCESSES = int(os.getenv("CODE_EXTRACTION_PROCESSES", str(min(os.cpu_count() or 1, 8))))
+# Documents per work unit sent to a worker
+CODE_EXTRACTION_DOCS_PER_TASK = int(os.getenv("CODE_EXTRACTION_DOCS_PER_TASK", "4"))
+
+# Document fields the extractors read; everything else stays in the parent
+DOCUMENT_FIELDS = ("url", "html", "markdown", "content_type")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_extraction_executor() -> ProcessPoolExecutor | None:
+    """
+    Get the shared code extraction process pool.
+
+    Returns:
+        The lazily created executor, or None when process extraction is disabled
+    """
+    global _executor
+    if CODE_EXTRACTION_PROCESSES <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: the server process runs threads (DB pools, asyncio) that fork would copy mid-flight
+                _executor = ProcessPoolExecutor(
+                    max_workers=CODE_EXTRACTION_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def shutdown_extraction_executor() -> None:
+    """Shut down the shared pool (application shutdown, or after a crashed worker broke it)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def chunk_documents(
+    documents: list[dict[str, Any]], docs_per_task: int = CODE_EXTRACTION_DOCS_PER_TASK
+) -> list[list[dict[str, Any]]]:
+    """Split documents into work units carrying only the fields extraction needs."""
+    slim = [{field: doc.get(field) for field in DOCUMENT_FIELDS if field in doc} for doc in documents]
+    size = max(1, docs_per_task)
+    return [slim[start : start + size] for start in range(0, len(slim), size)]
+
+
+def extract_documents(settings: dict[str, Any], documents: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """
+    Extract code blocks from a work unit of documents (runs in a worker process).
+
+    Args:
+        settings: Extraction settings snapshot (setting key -> typed value)
+        documents: Documents with the DOCUMENT_FIELDS keys
+
+    Returns:
+        Code blocks per document, in input order
+    """
+    # Imported here: the service module imports this one
+    from .code_extraction_service import CodeExtractionService
+
+    service = CodeExtractionService(None)
+    service._settings_cache = dict(settings)
+
+    async def run() -> list[list[dict[str, Any]]]:
+        return [await service._extract_document_code_blocks(doc) for doc in documents]
+
+    return asyncio.run(run())
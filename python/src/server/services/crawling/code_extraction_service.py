@@ -7,14 +7,23 @@ Handles extraction, processing, and storage of code examples from documents.
 import asyncio
 import re
 from collections.abc import Callable
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 
 from ...config.logfire_config import safe_logfire_error, safe_logfire_info
 from ...services.credential_service import credential_service
 from ..storage.code_storage_service import (
     add_code_examples_to_supabase,
+    deduplicate_code_blocks,
     generate_code_summaries_batch,
 )
+from .code_extraction_pool import (
+    chunk_documents,
+    extract_documents,
+    get_extraction_executor,
+    shutdown_extraction_executor,
+)
+from .html_code_scanner import PRE_TAG_PATTERN, scan_html_code_blocks
 
 
 class CodeExtractionService:
@@ -56,6 +65,20 @@ class CodeExtractionService:
         },
     }
 
+    # Settings read during extraction, snapshotted once per crawl for the worker processes
+    EXTRACTION_SETTING_DEFAULTS = {
+        "MIN_CODE_BLOCK_LENGTH": 250,
+        "MAX_CODE_BLOCK_LENGTH": 5000,
+        "ENABLE_COMPLETE_BLOCK_DETECTION": True,
+        "ENABLE_LANGUAGE_SPECIFIC_PATTERNS": True,
+        "ENABLE_PROSE_FILTERING": True,
+        "MAX_PROSE_RATIO": 0.15,
+        "MIN_CODE_INDICATORS": 3,
+        "ENABLE_DIAGRAM_FILTERING": True,
+        "ENABLE_CONTEXTUAL_LENGTH": True,
+        "CONTEXT_WINDOW_SIZE": 1000,
+    }
+
     def __init__(self, supabase_client):
         """
         Initialize the code extraction service.
@@ -194,6 +217,15 @@ class CodeExtractionService:
                 })
             return 0
 
+        # Pages of one source often repeat the same snippet (navigation, shared
+        # examples); collapse near-duplicates across documents before summarizing
+        block_count = len(all_code_blocks)
+        all_code_blocks = deduplicate_code_blocks(all_code_blocks, block_key="block")
+        if len(all_code_blocks) < block_count:
+            safe_logfire_info(
+                f"Removed {block_count - len(all_code_blocks)} near-duplicate code blocks across documents"
+            )
+
         # Log what we found
         safe_logfire_info(f"Found {len(all_code_blocks)} total code blocks to process")
         for i, block_data in enumerate(all_code_blocks[:3]):
@@ -265,6 +297,9 @@ class CodeExtractionService:
         """
         Extract code blocks from all documents.
 
+        Documents are split into work units that run on the extraction process
+        pool; results are consumed in document order.
+
         Args:
             crawl_results: List of crawled documents
             source_id: The unique source_id for all documents
@@ -272,171 +307,228 @@ class CodeExtractionService:
         Returns:
             List of code blocks with metadata
         """
-        # Progress will be reported during the loop below
+        # Resolve settings once; workers get the snapshot instead of the credential service
+        settings = await self._snapshot_extraction_settings()
 
         all_code_blocks = []
         total_docs = len(crawl_results)
         completed_docs = 0
 
-        for doc in crawl_results:
-            # Check for cancellation before processing each document
-            if cancellation_check:
-                try:
-                    cancellation_check()
-                except asyncio.CancelledError:
-                    if progress_callback:
+        work_units = chunk_documents(crawl_results)
+        futures = []
+        executor = get_extraction_executor()
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            futures = [loop.run_in_executor(executor, extract_documents, settings, unit) for unit in work_units]
+
+        try:
+            for index, unit in enumerate(work_units):
+                # Check for cancellation before processing each work unit
+                if cancellation_check:
+                    try:
+                        cancellation_check()
+                    except asyncio.CancelledError:
+                        if progress_callback:
+                            await progress_callback({
+                                "status": "cancelled",
+                                "progress": 99,
+                                "message": f"Code extraction cancelled at document {completed_docs + 1}/{total_docs}"
+                            })
+                        raise
+
+                unit_code_blocks = await self._extract_work_unit(unit, futures[index] if futures else None)
+
+                for doc, code_blocks in zip(unit, unit_code_blocks, strict=True):
+                    # Use the provided source_id for all code blocks
+                    for block in code_blocks:
+                        all_code_blocks.append({
+                            "block": block,
+                            "source_url": doc["url"],
+                            "source_id": source_id,
+                        })
+
+                    # Update progress only after completing document extraction
+                    completed_docs += 1
+                    if progress_callback and total_docs > 0:
+                        # Report raw progress (0-100) for this extraction phase
+                        raw_progress = int((completed_docs / total_docs) * 100)
                         await progress_callback({
-                            "status": "cancelled",
-                            "progress": 99,
-                            "message": f"Code extraction cancelled at document {completed_docs + 1}/{total_docs}"
+                            "status": "code_extraction",
+                            "progress": raw_progress,
+                            "log": f"Extracted code from {completed_docs}/{total_docs} documents ({len(all_code_blocks)} code blocks found)",
+                            "completed_documents": completed_docs,
+                            "total_documents": total_docs,
+                            "code_blocks_found": len(all_code_blocks),
                         })
-                    raise
+        finally:
+            # Drop queued work units on cancellation or error
+            for future in futures:
+                future.cancel()
+
+        return all_code_blocks
+
+    async def _snapshot_extraction_settings(self) -> dict[str, Any]:
+        """Resolve every extraction setting once (key -> typed value)."""
+        return {
+            key: await self._get_setting(key, default)
+            for key, default in self.EXTRACTION_SETTING_DEFAULTS.items()
+        }
 
+    async def _extract_work_unit(
+        self, documents: list[dict[str, Any]], future: asyncio.Future | None
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Collect one work unit's code blocks per document.
+
+        Falls back to extracting on the event loop when process extraction is
+        disabled or the worker failed (e.g. it was killed and broke the pool).
+        """
+        if future is not None:
             try:
-                source_url = doc["url"]
-                html_content = doc.get("html", "")
-                md = doc.get("markdown", "")
+                return await future
+            except BrokenProcessPool:
+                safe_logfire_error("Code extraction worker died, extracting remaining documents in-process")
+                shutdown_extraction_executor()
+            except Exception as e:
+                safe_logfire_error(f"Code extraction worker failed, extracting work unit in-process | error={str(e)}")
+        return [await self._extract_document_code_blocks(doc) for doc in documents]
+
+    async def _extract_document_code_blocks(self, doc: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Extract code blocks from a single document.
+
+        Args:
+            doc: Crawled document with url and html/markdown content
+
+        Returns:
+            Code blocks found in the document (empty on error)
+        """
+        try:
+
+            source_url = doc["url"]
+            html_content = doc.get("html", "")
+            md = doc.get("markdown", "")
+
+            # Debug logging
+            safe_logfire_info(
+                f"Document content check | url={source_url} | has_html={bool(html_content)} | has_markdown={bool(md)} | html_len={len(html_content) if html_content else 0} | md_len={len(md) if md else 0}"
+            )
 
-                # Debug logging
+            # Get dynamic minimum length based on document context
+
+            # Check markdown first to see if it has code blocks
+            if md:
+                has_backticks = "```" in md
+                backtick_count = md.count("```")
                 safe_logfire_info(
-                    f"Document content check | url={source_url} | has_html={bool(html_content)} | has_markdown={bool(md)} | html_len={len(html_content) if html_content else 0} | md_len={len(md) if md else 0}"
+                    f"Markdown check | url={source_url} | has_backticks={has_backticks} | backtick_count={backtick_count}"
                 )
 
-                # Get dynamic minimum length based on document context
+                if "getting-started" in source_url and md:
+                    # Log a sample of the markdown
+                    sample = md[:500]
+                    safe_logfire_info(f"Markdown sample for getting-started: {sample}...")
+
+            # Improved extraction logic - check for text files first, then HTML, then markdown
+            code_blocks = []
+
+            # Check if this is a text file (e.g., .txt, .md, .html after cleaning) or PDF
+            is_text_file = source_url.endswith((
+                ".txt",
+                ".text",
+                ".md",
+                ".html",
+                ".htm",
+            )) or "text/plain" in doc.get("content_type", "") or "text/markdown" in doc.get("content_type", "")
+            
+            is_pdf_file = source_url.endswith(".pdf") or "application/pdf" in doc.get("content_type", "")
 
-                # Check markdown first to see if it has code blocks
-                if md:
-                    has_backticks = "```" in md
-                    backtick_count = md.count("```")
+            if is_text_file:
+                # For text files, use specialized text extraction
+                safe_logfire_info(f"🎯 TEXT FILE DETECTED | url={source_url}")
+                safe_logfire_info(
+                    f"📊 Content types - has_html={bool(html_content)}, has_md={bool(md)}"
+                )
+                # For text files, the HTML content should be the raw text (not wrapped in <pre>)
+                text_content = html_content if html_content else md
+                if text_content:
                     safe_logfire_info(
-                        f"Markdown check | url={source_url} | has_backticks={has_backticks} | backtick_count={backtick_count}"
+                        f"📝 Using {'HTML' if html_content else 'MARKDOWN'} content for text extraction"
                     )
-
-                    if "getting-started" in source_url and md:
-                        # Log a sample of the markdown
-                        sample = md[:500]
-                        safe_logfire_info(f"Markdown sample for getting-started: {sample}...")
-
-                # Improved extraction logic - check for text files first, then HTML, then markdown
-                code_blocks = []
-
-                # Check if this is a text file (e.g., .txt, .md, .html after cleaning) or PDF
-                is_text_file = source_url.endswith((
-                    ".txt",
-                    ".text",
-                    ".md",
-                    ".html",
-                    ".htm",
-                )) or "text/plain" in doc.get("content_type", "") or "text/markdown" in doc.get("content_type", "")
-                
-                is_pdf_file = source_url.endswith(".pdf") or "application/pdf" in doc.get("content_type", "")
-
-                if is_text_file:
-                    # For text files, use specialized text extraction
-                    safe_logfire_info(f"🎯 TEXT FILE DETECTED | url={source_url}")
                     safe_logfire_info(
-                        f"📊 Content types - has_html={bool(html_content)}, has_md={bool(md)}"
+                        f"🔍 Content preview (first 500 chars): {repr(text_content[:500])}..."
                     )
-                    # For text files, the HTML content should be the raw text (not wrapped in <pre>)
-                    text_content = html_content if html_content else md
-                    if text_content:
-                        safe_logfire_info(
-                            f"📝 Using {'HTML' if html_content else 'MARKDOWN'} content for text extraction"
-                        )
-                        safe_logfire_info(
-                            f"🔍 Content preview (first 500 chars): {repr(text_content[:500])}..."
-                        )
-                        code_blocks = await self._extract_text_file_code_blocks(
-                            text_content, source_url
-                        )
-                        safe_logfire_info(
-                            f"📦 Text extraction complete | found={len(code_blocks)} blocks | url={source_url}"
-                        )
-                    else:
-                        safe_logfire_info(f"⚠️ NO CONTENT for text file | url={source_url}")
-
-                # If this is a PDF file, use specialized PDF extraction
-                elif is_pdf_file:
-                    safe_logfire_info(f"📄 PDF FILE DETECTED | url={source_url}")
-                    # For PDFs, use the content that should be PDF-extracted text
-                    pdf_content = html_content if html_content else md
-                    if pdf_content:
-                        safe_logfire_info(f"📝 Using {'HTML' if html_content else 'MARKDOWN'} content for PDF extraction")
-                        code_blocks = await self._extract_pdf_code_blocks(pdf_content, source_url)
-                        safe_logfire_info(f"📦 PDF extraction complete | found={len(code_blocks)} blocks | url={source_url}")
-                    else:
-                        safe_logfire_info(f"⚠️ NO CONTENT for PDF file | url={source_url}")
-
-                # If not a text file or PDF, or no code blocks found, try HTML extraction as fallback
-                if len(code_blocks) == 0 and html_content and not is_text_file:
-                    safe_logfire_info(
-                        f"Trying HTML extraction first | url={source_url} | html_length={len(html_content)}"
+                    code_blocks = await self._extract_text_file_code_blocks(
+                        text_content, source_url
                     )
-                    html_code_blocks = await self._extract_html_code_blocks(html_content)
-                    if html_code_blocks:
-                        code_blocks = html_code_blocks
-                        safe_logfire_info(
-                            f"Found {len(code_blocks)} code blocks from HTML | url={source_url}"
-                        )
-
-                # If still no code blocks, try markdown extraction as fallback
-                if len(code_blocks) == 0 and md and "```" in md:
                     safe_logfire_info(
-                        f"No code blocks from HTML, trying markdown extraction | url={source_url}"
+                        f"📦 Text extraction complete | found={len(code_blocks)} blocks | url={source_url}"
                     )
-                    from ..storage.code_storage_service import extract_code_blocks
+                else:
+                    safe_logfire_info(f"⚠️ NO CONTENT for text file | url={source_url}")
+
+            # If this is a PDF file, use specialized PDF extraction
+            elif is_pdf_file:
+                safe_logfire_info(f"📄 PDF FILE DETECTED | url={source_url}")
+                # For PDFs, use the content that should be PDF-extracted text
+                pdf_content = html_content if html_content else md
+                if pdf_content:
+                    safe_logfire_info(f"📝 Using {'HTML' if html_content else 'MARKDOWN'} content for PDF extraction")
+                    code_blocks = await self._extract_pdf_code_blocks(pdf_content, source_url)
+                    safe_logfire_info(f"📦 PDF extraction complete | found={len(code_blocks)} blocks | url={source_url}")
+                else:
+                    safe_logfire_info(f"⚠️ NO CONTENT for PDF file | url={source_url}")
 
-                    # Use dynamic minimum for markdown extraction
-                    base_min_length = 250  # Default for markdown
-                    code_blocks = extract_code_blocks(md, min_length=base_min_length)
+            # If not a text file or PDF, or no code blocks found, try HTML extraction as fallback
+            if len(code_blocks) == 0 and html_content and not is_text_file:
+                safe_logfire_info(
+                    f"Trying HTML extraction first | url={source_url} | html_length={len(html_content)}"
+                )
+                html_code_blocks = await self._extract_html_code_blocks(html_content)
+                if html_code_blocks:
+                    code_blocks = html_code_blocks
                     safe_logfire_info(
-                        f"Found {len(code_blocks)} code blocks from markdown | url={source_url}"
+                        f"Found {len(code_blocks)} code blocks from HTML | url={source_url}"
                     )
 
-                if code_blocks:
-                    # Use the provided source_id for all code blocks
-                    for block in code_blocks:
-                        all_code_blocks.append({
-                            "block": block,
-                            "source_url": source_url,
-                            "source_id": source_id,
-                        })
-
-                # Update progress only after completing document extraction
-                completed_docs += 1
-                if progress_callback and total_docs > 0:
-                    # Report raw progress (0-100) for this extraction phase
-                    raw_progress = int((completed_docs / total_docs) * 100)
-                    await progress_callback({
-                        "status": "code_extraction",
-                        "progress": raw_progress,
-                        "log": f"Extracted code from {completed_docs}/{total_docs} documents ({len(all_code_blocks)} code blocks found)",
-                        "completed_documents": completed_docs,
-                        "total_documents": total_docs,
-                        "code_blocks_found": len(all_code_blocks),
-                    })
+            # If still no code blocks, try markdown extraction as fallback
+            if len(code_blocks) == 0 and md and "```" in md:
+                safe_logfire_info(
+                    f"No code blocks from HTML, trying markdown extraction | url={source_url}"
+                )
+                from ..storage.code_storage_service import extract_code_blocks
 
-            except Exception as e:
-                safe_logfire_error(
-                    f"Error processing code from document | url={doc.get('url')} | error={str(e)}"
+                # Use dynamic minimum for markdown extraction
+                base_min_length = 250  # Default for markdown
+                code_blocks = extract_code_blocks(
+                    md, min_length=base_min_length, settings=self._settings_cache
+                )
+                safe_logfire_info(
+                    f"Found {len(code_blocks)} code blocks from markdown | url={source_url}"
                 )
 
-        return all_code_blocks
+            return code_blocks
+
+        except Exception as e:
+            safe_logfire_error(
+                f"Error processing code from document | url={doc.get('url')} | error={str(e)}"
+            )
+            return []
 
     async def _extract_html_code_blocks(self, content: str) -> list[dict[str, Any]]:
         """
         Extract code blocks from HTML patterns in content.
         This is a fallback when markdown conversion didn't preserve code blocks.
 
+        Code containers are located in a single pass (see html_code_scanner);
+        standalone <code> elements are only used when no block was found.
+
         Args:
             content: The content to search for HTML code patterns
-            min_length: Minimum length for code blocks
 
         Returns:
             List of code blocks with metadata
         """
-        import re
-
         # Add detailed logging
         safe_logfire_info(f"Processing HTML of length {len(content)} for code extraction")
 
@@ -447,298 +539,96 @@ class CodeExtractionService:
             )
 
         # Look for specific indicators of code blocks
-        has_prism = "prism" in content.lower()
-        has_highlight = "highlight" in content.lower()
-        has_shiki = "shiki" in content.lower()
-        has_codemirror = "codemirror" in content.lower() or "cm-" in content
+        lowered = content.lower()
+        has_prism = "prism" in lowered
+        has_highlight = "highlight" in lowered
+        has_shiki = "shiki" in lowered
+        has_codemirror = "codemirror" in lowered or "cm-" in content
         safe_logfire_info(
             f"Code library indicators | prism={has_prism} | highlight={has_highlight} | shiki={has_shiki} | codemirror={has_codemirror}"
         )
 
         # Check for any pre tags with different attributes
-        pre_matches = re.findall(r"<pre[^>]*>", content[:5000], re.IGNORECASE)
+        pre_matches = PRE_TAG_PATTERN.findall(content[:5000])
         if pre_matches:
             safe_logfire_info(f"Found {len(pre_matches)} <pre> tags in first 5000 chars")
             for i, pre_tag in enumerate(pre_matches[:3]):  # Show first 3
                 safe_logfire_info(f"Pre tag {i + 1}: {pre_tag}")
 
+        candidates, inline_candidates = scan_html_code_blocks(content)
+
         code_blocks = []
-        extracted_positions = set()  # Track already extracted code block positions
+        extracted_until = 0  # End of the last extracted block (extension can swallow later candidates)
 
-        # Comprehensive patterns for various code block formats
-        # Order matters - more specific patterns first
-        patterns = [
-            # GitHub/GitLab patterns
-            (
-                r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*(?:language-)?(\w+)[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
-                "github-highlight",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*snippet-clipboard-content[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
-                "github-snippet",
-            ),
-            # Docusaurus patterns
-            (
-                r'<div[^>]*class=["\'][^"\']*codeBlockContainer[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</pre>',
-                "docusaurus",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*["\'][^>]*>(.*?)</pre>',
-                "docusaurus-alt",
-            ),
-            # Milkdown specific patterns - check their actual HTML structure
-            (
-                r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
-                "milkdown-typed",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*code-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "milkdown-wrapper",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*code-block-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
-                "milkdown-wrapper-code",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*milkdown-code-block[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
-                "milkdown-code-block",
-            ),
-            (
-                r'<pre[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
-                "milkdown",
-            ),
-            (r"<div[^>]*data-code-block[^>]*>.*?<pre[^>]*>(.*?)</pre>", "milkdown-alt"),
-            (
-                r'<div[^>]*class=["\'][^"\']*milkdown[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
-                "milkdown-div",
-            ),
-            # Monaco Editor - capture all view-lines content
-            (
-                r'<div[^>]*class=["\'][^"\']*monaco-editor[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*view-lines[^"\']*[^>]*>(.*?)</div>(?=.*?</div>.*?</div>)',
-                "monaco",
-            ),
-            # CodeMirror patterns
-            (
-                r'<div[^>]*class=["\'][^"\']*cm-content[^"\']*["\'][^>]*>((?:<div[^>]*class=["\'][^"\']*cm-line[^"\']*["\'][^>]*>.*?</div>\s*)+)</div>',
-                "codemirror",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*CodeMirror[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*CodeMirror-code[^"\']*["\'][^>]*>(.*?)</div>',
-                "codemirror-legacy",
-            ),
-            # Prism.js with language - must be before generic pre
-            (
-                r'<pre[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
-                "prism",
-            ),
-            (
-                r'<pre[^>]*>\s*<code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code>\s*</pre>',
-                "prism-alt",
-            ),
-            # highlight.js - must be before generic pre/code
-            (
-                r'<pre[^>]*><code[^>]*class=["\'][^"\']*hljs(?:\s+language-(\w+))?[^"\']*["\'][^>]*>(.*?)</code></pre>',
-                "hljs",
-            ),
-            (
-                r'<pre[^>]*class=["\'][^"\']*hljs[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
-                "hljs-pre",
-            ),
-            # Shiki patterns (VitePress, Astro, etc.)
-            (
-                r'<pre[^>]*class=["\'][^"\']*shiki[^"\']*["\'][^>]*(?:.*?style=["\'][^"\']*background-color[^"\']*["\'])?[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
-                "shiki",
-            ),
-            (r'<pre[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>(.*?)</pre>', "astro-shiki"),
-            (
-                r'<div[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "astro-wrapper",
-            ),
-            # VitePress/Vue patterns
-            (
-                r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "vitepress",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*vp-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "vitepress-vp",
-            ),
-            # Nextra patterns
-            (r"<div[^>]*data-nextra-code[^>]*>.*?<pre[^>]*>(.*?)</pre>", "nextra"),
-            (
-                r'<pre[^>]*class=["\'][^"\']*nx-[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
-                "nextra-nx",
-            ),
-            # Standard pre/code patterns - should be near the end
-            (
-                r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
-                "standard-lang",
-            ),
-            (r"<pre[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>", "standard"),
-            # Generic patterns - should be last
-            (
-                r'<div[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "generic-div",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*codeblock[^"\']*["\'][^>]*>(.*?)</div>',
-                "generic-codeblock",
-            ),
-            (
-                r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
-                "highlight",
-            ),
-        ]
+        for candidate in candidates:
+            if candidate.start < extracted_until:
+                continue
 
-        for pattern_tuple in patterns:
-            pattern_str, source_type = pattern_tuple
-            matches = list(re.finditer(pattern_str, content, re.DOTALL | re.IGNORECASE))
-
-            # Log pattern matches for Milkdown patterns and CodeMirror
-            if matches and (
-                "milkdown" in source_type
-                or "codemirror" in source_type
-                or "milkdown" in content[:1000].lower()
-            ):
-                safe_logfire_info(f"Pattern {source_type} found {len(matches)} matches")
-
-            for match in matches:
-                # Extract code content based on pattern type
-                if source_type in ["standard-lang", "prism", "vitepress", "hljs", "milkdown-typed"]:
-                    # These patterns capture language in group 1, code in group 2
-                    if match.lastindex and match.lastindex >= 2:
-                        language = match.group(1)
-                        code_content = match.group(2).strip()
-                    else:
-                        code_content = match.group(1).strip()
-                        language = ""
-                else:
-                    # Most patterns have code in group 1
-                    code_content = match.group(1).strip()
-                    # Try to extract language from the full match
-                    full_match = match.group(0)
-                    lang_match = re.search(r'class=["\'].*?language-(\w+)', full_match)
-                    language = lang_match.group(1) if lang_match else ""
-
-                # Get the start position for complete block extraction
-                code_start_pos = match.start()
-
-                # For CodeMirror, extract text from cm-lines
-                if source_type == "codemirror":
-                    # Extract text from each cm-line div
-                    cm_lines = re.findall(
-                        r'<div[^>]*class=["\'][^"\']*cm-line[^"\']*["\'][^>]*>(.*?)</div>',
-                        code_content,
-                        re.DOTALL,
+            code_content = candidate.code
+            language = candidate.language
+            source_type = candidate.source_type
+            start_pos, end_pos = candidate.start, candidate.end
+
+            # Calculate dynamic minimum length
+            context_for_length = content[max(0, start_pos - 500) : start_pos + 500]
+            min_length = await self._calculate_min_length(language, context_for_length)
+
+            # Skip if initial content is too short
+            if len(code_content) < min_length:
+                # Try to find complete block if we have a language
+                if language and start_pos > 0:
+                    # Look for complete code block
+                    complete_code, block_end_pos = await self._find_complete_code_block(
+                        content, start_pos, min_length, language
                     )
-                    if cm_lines:
-                        # Clean each line and join
-                        cleaned_lines = []
-                        for line in cm_lines:
-                            # Remove span tags but keep content
-                            line = re.sub(r"<span[^>]*>", "", line)
-                            line = re.sub(r"</span>", "", line)
-                            # Remove other HTML tags
-                            line = re.sub(r"<[^>]+>", "", line)
-                            cleaned_lines.append(line)
-                        code_content = "\n".join(cleaned_lines)
-                    else:
-                        # Fallback: just clean HTML
-                        code_content = re.sub(r"<span[^>]*>", "", code_content)
-                        code_content = re.sub(r"</span>", "", code_content)
-                        code_content = re.sub(r"<[^>]+>", "\n", code_content)
-
-                # For Monaco, extract text from nested divs
-                if source_type == "monaco":
-                    # Extract actual code from Monaco's complex structure
-                    code_content = re.sub(r"<div[^>]*>", "\n", code_content)
-                    code_content = re.sub(r"</div>", "", code_content)
-                    code_content = re.sub(r"<span[^>]*>", "", code_content)
-                    code_content = re.sub(r"</span>", "", code_content)
-
-                # Calculate dynamic minimum length
-                context_for_length = content[max(0, code_start_pos - 500) : code_start_pos + 500]
-                min_length = await self._calculate_min_length(language, context_for_length)
-
-                # Skip if initial content is too short
-                if len(code_content) < min_length:
-                    # Try to find complete block if we have a language
-                    if language and code_start_pos > 0:
-                        # Look for complete code block
-                        complete_code, block_end_pos = await self._find_complete_code_block(
-                            content, code_start_pos, min_length, language
-                        )
-                        if len(complete_code) >= min_length:
-                            code_content = complete_code
-                            end_pos = block_end_pos
-                        else:
-                            continue
+                    if len(complete_code) >= min_length:
+                        code_content = complete_code
+                        end_pos = max(end_pos, block_end_pos)
                     else:
                         continue
+                else:
+                    continue
 
-                # Extract position info for deduplication
-                start_pos = match.start()
-                end_pos = (
-                    match.end()
-                    if len(code_content) <= len(match.group(0))
-                    else code_start_pos + len(code_content)
-                )
-
-                # Check if we've already extracted code from this position
-                position_key = (start_pos, end_pos)
-                overlapping = False
-                for existing_start, existing_end in extracted_positions:
-                    # Check if this match overlaps with an existing extraction
-                    if not (end_pos <= existing_start or start_pos >= existing_end):
-                        overlapping = True
-                        break
-
-                if not overlapping:
-                    extracted_positions.add(position_key)
+            extracted_until = end_pos
 
-                    # Extract context
-                    context_before = content[max(0, start_pos - 1000) : start_pos].strip()
-                    context_after = content[end_pos : min(len(content), end_pos + 1000)].strip()
+            # Extract context
+            context_before = content[max(0, start_pos - 1000) : start_pos].strip()
+            context_after = content[end_pos : min(len(content), end_pos + 1000)].strip()
 
-                    # Clean the code content
-                    cleaned_code = self._clean_code_content(code_content, language)
+            # Clean the code content
+            cleaned_code = self._clean_code_content(code_content, language)
 
-                    # Validate code quality
-                    if await self._validate_code_quality(cleaned_code, language):
-                        # Log successful extraction
-                        safe_logfire_info(
-                            f"Extracted code block | source_type={source_type} | language={language} | min_length={min_length} | original_length={len(code_content)} | cleaned_length={len(cleaned_code)}"
-                        )
+            # Validate code quality
+            if await self._validate_code_quality(cleaned_code, language):
+                # Log successful extraction
+                safe_logfire_info(
+                    f"Extracted code block | source_type={source_type} | language={language} | min_length={min_length} | original_length={len(code_content)} | cleaned_length={len(cleaned_code)}"
+                )
 
-                        code_blocks.append({
-                            "code": cleaned_code,
-                            "language": language,
-                            "context_before": context_before,
-                            "context_after": context_after,
-                            "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
-                            "source_type": source_type,  # Track which pattern matched
-                        })
-                    else:
-                        safe_logfire_info(
-                            f"Code block failed validation | source_type={source_type} | language={language} | length={len(cleaned_code)}"
-                        )
+                code_blocks.append({
+                    "code": cleaned_code,
+                    "language": language,
+                    "context_before": context_before,
+                    "context_after": context_after,
+                    "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                    "source_type": source_type,  # Track which container matched
+                })
+            else:
+                safe_logfire_info(
+                    f"Code block failed validation | source_type={source_type} | language={language} | length={len(cleaned_code)}"
+                )
 
-        # Pattern 2: <code>...</code> (standalone)
+        # Standalone <code>...</code>
         if not code_blocks:  # Only if we didn't find pre/code blocks
-            code_pattern = r"<code[^>]*>(.*?)</code>"
-            matches = re.finditer(code_pattern, content, re.DOTALL | re.IGNORECASE)
-
-            for match in matches:
-                code_content = match.group(1).strip()
+            for candidate in inline_candidates:
                 # Clean the code content
-                cleaned_code = self._clean_code_content(code_content, "")
+                cleaned_code = self._clean_code_content(candidate.code, "")
 
                 # Check if it's multiline or substantial enough and validate quality
                 # Use a minimal length for standalone code tags
                 if len(cleaned_code) >= 100 and ("\n" in cleaned_code or len(cleaned_code) > 100):
                     if await self._validate_code_quality(cleaned_code, ""):
-                        start_pos = match.start()
-                        end_pos = match.end()
+                        start_pos, end_pos = candidate.start, candidate.end
                         context_before = content[max(0, start_pos - 1000) : start_pos].strip()
                         context_after = content[end_pos : min(len(content), end_pos + 1000)].strip()
 
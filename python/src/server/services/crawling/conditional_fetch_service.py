@@ -0,0 +1,168 @@
+"""
+Conditional Fetch Service
+
+Lets refreshes skip pages that have not changed since the last crawl. Validators
+(ETag, Last-Modified and sitemap <lastmod>) are stored in each page's metadata;
+on an incremental refresh they are used to issue cheap conditional requests so
+unchanged pages never reach browser rendering, markdown generation or embedding.
+"""
+
+import asyncio
+from typing import Any
+
+import httpx
+
+from ...config.logfire_config import get_logger, safe_logfire_info
+from ..client_manager import execute_async
+
+logger = get_logger(__name__)
+
+# Validator keys shared by crawl results and archon_page_metadata.metadata
+VALIDATOR_KEYS = ("etag", "last_modified", "lastmod")
+
+# URLs per PostgREST IN (...) filter when loading stored validators
+LOOKUP_BATCH_SIZE = 50
+
+CONDITIONAL_REQUEST_TIMEOUT = 15.0
+DEFAULT_MAX_CONCURRENT = 10
+
+
+def extract_http_validators(headers: dict[str, Any] | None) -> dict[str, str]:
+    """
+    Pick cache validators out of HTTP response headers.
+
+    Args:
+        headers: Response headers (any casing), e.g. crawl4ai's result.response_headers
+
+    Returns:
+        Dict with "etag" and/or "last_modified" when the server sent them
+    """
+    if not isinstance(headers, dict) or not headers:
+        return {}
+
+    lowered = {str(key).lower(): value for key, value in headers.items()}
+    validators = {}
+    if lowered.get("etag"):
+        validators["etag"] = str(lowered["etag"])
+    if lowered.get("last-modified"):
+        validators["last_modified"] = str(lowered["last-modified"])
+    return validators
+
+
+class ConditionalFetchService:
+    """Decides which URLs of a refresh can be skipped as not modified."""
+
+    def __init__(self, supabase_client, http_client: httpx.AsyncClient | None = None):
+        """
+        Initialize the conditional fetch service.
+
+        Args:
+            supabase_client: The Supabase client for reading stored validators
+            http_client: Optional HTTP client (one is created per call otherwise)
+        """
+        self.supabase_client = supabase_client
+        self.http_client = http_client
+
+    async def load_validators(self, urls: list[str]) -> dict[str, dict[str, str]]:
+        """
+        Load stored validators for previously crawled pages.
+
+        Args:
+            urls: URLs about to be crawled
+
+        Returns:
+            {url: {"etag", "last_modified", "lastmod"}} with only the validators that are set
+        """
+        validators: dict[str, dict[str, str]] = {}
+        unique_urls = list(dict.fromkeys(urls))
+        columns = ", ".join(f"{key}:metadata->>{key}" for key in VALIDATOR_KEYS)
+
+        for i in range(0, len(unique_urls), LOOKUP_BATCH_SIZE):
+            batch_urls = unique_urls[i : i + LOOKUP_BATCH_SIZE]
+            result = await execute_async(
+                self.supabase_client.table("archon_page_metadata").select(f"url, {columns}").in_("url", batch_urls)
+            )
+            for row in result.data or []:
+                stored = {key: row[key] for key in VALIDATOR_KEYS if row.get(key)}
+                if stored:
+                    validators[row["url"]] = stored
+
+        return validators
+
+    async def partition_unmodified(
+        self,
+        urls: list[str],
+        sitemap_lastmods: dict[str, str | None] | None = None,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Split URLs into those that must be crawled and those that did not change.
+
+        A URL is unmodified when its sitemap <lastmod> equals the stored one, or when a
+        conditional GET with the stored ETag / Last-Modified returns 304. Any lookup or
+        network failure counts as modified so the page is crawled normally.
+
+        Args:
+            urls: URLs about to be crawled
+            sitemap_lastmods: Optional {url: lastmod} from the sitemap being refreshed
+            max_concurrent: Maximum conditional requests in flight
+
+        Returns:
+            Tuple of (urls_to_crawl, unmodified_urls), both in input order
+        """
+        sitemap_lastmods = sitemap_lastmods or {}
+
+        try:
+            stored = await self.load_validators(urls)
+        except Exception as e:
+            logger.warning(f"Failed to load stored validators, crawling all URLs: {e}")
+            return list(urls), []
+
+        if not stored:
+            return list(urls), []
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+        async def check(client: httpx.AsyncClient, url: str) -> bool:
+            validators = stored.get(url)
+            if not validators:
+                return False
+
+            sitemap_lastmod = sitemap_lastmods.get(url)
+            if sitemap_lastmod:
+                # The sitemap is authoritative when it carries lastmod - no request needed
+                return sitemap_lastmod == validators.get("lastmod")
+
+            headers = {}
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+            if not headers:
+                return False
+
+            async with semaphore:
+                try:
+                    # Stream so a 200 response body is never downloaded here
+                    async with client.stream("GET", url, headers=headers) as response:
+                        return response.status_code == 304
+                except httpx.HTTPError as e:
+                    logger.debug(f"Conditional request failed for {url}: {e}")
+                    return False
+
+        client = self.http_client or httpx.AsyncClient(
+            follow_redirects=True, timeout=CONDITIONAL_REQUEST_TIMEOUT
+        )
+        try:
+            unmodified_flags = await asyncio.gather(*(check(client, url) for url in urls))
+        finally:
+            if self.http_client is None:
+                await client.aclose()
+
+        to_crawl = [url for url, unmodified in zip(urls, unmodified_flags, strict=False) if not unmodified]
+        unmodified = [url for url, unmodified in zip(urls, unmodified_flags, strict=False) if unmodified]
+
+        safe_logfire_info(
+            f"Conditional fetch | total={len(urls)} | not_modified={len(unmodified)} | to_crawl={len(to_crawl)}"
+        )
+        return to_crawl, unmodified
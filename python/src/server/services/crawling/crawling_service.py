@@ -20,6 +20,7 @@ from ..credential_service import credential_service
 
 # Import strategies
 # Import operations
+from .conditional_fetch_service import ConditionalFetchService
 from .discovery_service import DiscoveryService
 from .document_storage_operations import DocumentStorageOperations
 from .helpers.site_config import SiteConfig
@@ -32,6 +33,7 @@ from .strategies.batch import BatchCrawlStrategy
 from .strategies.recursive import RecursiveCrawlStrategy
 from .strategies.single_page import SinglePageCrawlStrategy
 from .strategies.sitemap import SitemapCrawlStrategy
+from .streaming_pipeline import StreamingStoragePipeline
 
 logger = get_logger(__name__)
 
@@ -132,6 +134,7 @@ class CrawlingService:
         self.doc_storage_ops = DocumentStorageOperations(self.supabase_client)
         self.discovery_service = DiscoveryService()
         self.page_storage_ops = PageStorageOperations(self.supabase_client)
+        self.conditional_fetch_service = ConditionalFetchService(self.supabase_client)
 
         # Track progress state across all stages to prevent UI resets
         self.progress_state = {"progressId": self.progress_id} if self.progress_id else {}
@@ -139,6 +142,8 @@ class CrawlingService:
         self.progress_mapper = ProgressMapper()
         # Cancellation support
         self._cancelled = False
+        # Set while a crawl streams pages into storage (ENABLE_STREAMING_STORAGE)
+        self._streaming_pipeline: StreamingStoragePipeline | None = None
 
     def set_progress_id(self, progress_id: str):
         """Set the progress ID for HTTP polling updates."""
@@ -240,9 +245,13 @@ class CrawlingService:
             end_progress,
         )
 
-    def parse_sitemap(self, sitemap_url: str) -> list[str]:
-        """Parse a sitemap and extract URLs."""
-        return self.sitemap_strategy.parse_sitemap(sitemap_url, self._check_cancellation)
+    async def parse_sitemap(self, sitemap_url: str) -> list[str]:
+        """Parse a sitemap (following sitemap indexes) and extract URLs."""
+        return await self.sitemap_strategy.parse_sitemap(sitemap_url, self._check_cancellation)
+
+    async def parse_sitemap_entries(self, sitemap_url: str) -> list[tuple[str, str | None]]:
+        """Parse a sitemap (following sitemap indexes) and extract (url, lastmod) entries."""
+        return await self.sitemap_strategy.parse_sitemap_entries(sitemap_url, self._check_cancellation)
 
     async def crawl_batch_with_progress(
         self,
@@ -250,6 +259,7 @@ class CrawlingService:
         max_concurrent: int | None = None,
         progress_callback: Callable[[str, int, str], Awaitable[None]] | None = None,
         link_text_fallbacks: dict[str, str] | None = None,
+        page_sink: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
     ) -> list[dict[str, Any]]:
         """Batch crawl multiple URLs in parallel."""
         return await self.batch_strategy.crawl_batch_with_progress(
@@ -260,6 +270,7 @@ class CrawlingService:
             progress_callback,
             self._check_cancellation,  # Pass cancellation check
             link_text_fallbacks,  # Pass link text fallbacks
+            page_sink,
         )
 
     async def crawl_recursive_with_progress(
@@ -268,6 +279,7 @@ class CrawlingService:
         max_depth: int = 3,
         max_concurrent: int | None = None,
         progress_callback: Callable[[str, int, str], Awaitable[None]] | None = None,
+        page_sink: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
     ) -> list[dict[str, Any]]:
         """Recursively crawl internal links from start URLs."""
         return await self.recursive_strategy.crawl_recursive_with_progress(
@@ -278,6 +290,7 @@ class CrawlingService:
             max_concurrent,
             progress_callback,
             self._check_cancellation,  # Pass cancellation check
+            page_sink,
         )
 
     # Orchestration methods
@@ -449,6 +462,11 @@ class CrawlingService:
                         "discovery", 100, "Discovery phase failed, continuing with regular crawl", current_url=url
                     )
 
+            # Streaming mode: pages are chunked, embedded and stored while the crawl continues
+            self._streaming_pipeline = await self._create_streaming_pipeline(
+                request, original_source_id, url, source_display_name
+            )
+
             # Analyzing stage - determine what to crawl
             if discovered_urls:
                 # Discovery found a file - crawl ONLY the discovered file, not the main URL
@@ -514,6 +532,7 @@ class CrawlingService:
 
             # Process and store documents using document storage operations
             last_logged_progress = 0
+            streamed = self._streaming_pipeline is not None
 
             async def doc_storage_callback(
                 status: str, progress: int, message: str, **kwargs
@@ -548,17 +567,23 @@ class CrawlingService:
                         **kwargs
                     )
 
-            storage_results = await self.doc_storage_ops.process_and_store_documents(
-                crawl_results,
-                request,
-                crawl_type,
-                original_source_id,
-                doc_storage_callback,
-                self._check_cancellation,
-                source_url=url,
-                source_display_name=source_display_name,
-                url_to_page_id=None,  # Will be populated after page storage
-            )
+            if streamed:
+                await update_mapped_progress(
+                    "document_storage", 50, "Finishing storage of streamed pages...", total_pages=total_pages
+                )
+                storage_results = await self._finish_streaming_pipeline(crawl_results, crawl_type)
+            else:
+                storage_results = await self.doc_storage_ops.process_and_store_documents(
+                    crawl_results,
+                    request,
+                    crawl_type,
+                    original_source_id,
+                    doc_storage_callback,
+                    self._check_cancellation,
+                    source_url=url,
+                    source_display_name=source_display_name,
+                    url_to_page_id=None,  # Will be populated after page storage
+                )
 
             # Update progress tracker with source_id now that it's created
             if self.progress_tracker and storage_results.get("source_id"):
@@ -591,9 +616,9 @@ class CrawlingService:
                 safe_logfire_error(error_msg)
                 raise ValueError(error_msg)
 
-            # Extract code examples if requested
-            code_examples_count = 0
-            if request.get("extract_code_examples", True) and actual_chunks_stored > 0:
+            # Extract code examples if requested (streamed batches already did this)
+            code_examples_count = storage_results.get("code_examples_stored", 0)
+            if request.get("extract_code_examples", True) and actual_chunks_stored > 0 and not streamed:
                 # Check for cancellation before starting code extraction
                 self._check_cancellation()
 
@@ -616,31 +641,17 @@ class CrawlingService:
                         )
 
                 try:
-                    # Extract provider from request or use credential service default
-                    provider = request.get("provider")
-                    embedding_provider = None
-
-                    if not provider:
-                        try:
-                            provider_config = await credential_service.get_active_provider("llm")
-                            provider = provider_config.get("provider", "openai")
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to get provider from credential service: {e}, defaulting to openai"
-                            )
-                            provider = "openai"
-
-                    try:
-                        embedding_config = await credential_service.get_active_provider("embedding")
-                        embedding_provider = embedding_config.get("provider")
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to get embedding provider from credential service: {e}. Using configured default."
-                        )
-                        embedding_provider = None
+                    provider, embedding_provider = await self._resolve_code_extraction_providers(request)
+
+                    # Incremental refreshes keep code examples of unchanged pages as they are
+                    unchanged_urls = set(storage_results.get("unchanged_urls", []))
+                    code_crawl_results = [
+                        doc for doc in crawl_results
+                        if (doc.get("url") or "").strip() not in unchanged_urls
+                    ]
 
                     code_examples_count = await self.doc_storage_ops.extract_and_store_code_examples(
-                        crawl_results,
+                        code_crawl_results,
                         storage_results["url_to_full_document"],
                         storage_results["source_id"],
                         code_progress_callback,
@@ -709,6 +720,7 @@ class CrawlingService:
 
         except asyncio.CancelledError:
             safe_logfire_info(f"Crawl operation cancelled | progress_id={self.progress_id}")
+            await self._abort_streaming_pipeline()
             # Use ProgressMapper to get proper progress value for cancelled state
             cancelled_progress = self.progress_mapper.map_progress("cancelled", 0)
             await self._handle_progress_update(
@@ -728,6 +740,7 @@ class CrawlingService:
         except Exception as e:
             # Log full stack trace for debugging
             logger.error("Async crawl orchestration failed", exc_info=True)
+            await self._abort_streaming_pipeline()
             safe_logfire_error(f"Async crawl orchestration failed | error={str(e)}")
             error_message = f"Crawl failed: {str(e)}"
             # Use ProgressMapper to get proper progress value for error state
@@ -750,6 +763,112 @@ class CrawlingService:
                     f"Unregistered orchestration service on error | progress_id={self.progress_id}"
                 )
 
+    async def _resolve_code_extraction_providers(self, request: dict[str, Any]) -> tuple[str, str | None]:
+        """Resolve the LLM and embedding providers used for code example extraction."""
+        # Extract provider from request or use credential service default
+        provider = request.get("provider")
+        embedding_provider = None
+
+        if not provider:
+            try:
+                provider_config = await credential_service.get_active_provider("llm")
+                provider = provider_config.get("provider", "openai")
+            except Exception as e:
+                logger.warning(
+                    f"Failed to get provider from credential service: {e}, defaulting to openai"
+                )
+                provider = "openai"
+
+        try:
+            embedding_config = await credential_service.get_active_provider("embedding")
+            embedding_provider = embedding_config.get("provider")
+        except Exception as e:
+            logger.warning(
+                f"Failed to get embedding provider from credential service: {e}. Using configured default."
+            )
+            embedding_provider = None
+
+        return provider, embedding_provider
+
+    async def _create_streaming_pipeline(
+        self,
+        request: dict[str, Any],
+        source_id: str,
+        source_url: str,
+        source_display_name: str,
+    ) -> StreamingStoragePipeline | None:
+        """Create the crawl-to-storage pipeline when ENABLE_STREAMING_STORAGE is on."""
+        try:
+            settings = await credential_service.get_credentials_by_category("rag_strategy")
+            if settings.get("ENABLE_STREAMING_STORAGE", "false").lower() != "true":
+                return None
+            queue_size = int(settings.get("STREAMING_QUEUE_SIZE", "50"))
+            batch_pages = int(settings.get("STREAMING_BATCH_PAGES", "10"))
+            workers = int(settings.get("STREAMING_STORAGE_WORKERS", "2"))
+        except Exception as e:
+            logger.warning(f"Failed to load streaming storage settings: {e}, storing after the crawl")
+            return None
+
+        extract_code_examples = request.get("extract_code_examples", True)
+        provider, embedding_provider = (None, None)
+        if extract_code_examples:
+            provider, embedding_provider = await self._resolve_code_extraction_providers(request)
+
+        safe_logfire_info(
+            f"Streaming storage enabled | queue_size={queue_size} | batch_pages={batch_pages} | workers={workers}"
+        )
+        return StreamingStoragePipeline(
+            self.doc_storage_ops,
+            request,
+            source_id,
+            source_url=source_url,
+            source_display_name=source_display_name,
+            cancellation_check=self._check_cancellation,
+            queue_size=queue_size,
+            batch_pages=batch_pages,
+            workers=workers,
+            extract_code_examples=extract_code_examples,
+            code_provider=provider,
+            embedding_provider=embedding_provider,
+        )
+
+    def _page_sink(
+        self, crawl_type: str, sitemap_lastmods: dict[str, str | None] | None = None
+    ) -> Callable[[dict[str, Any]], Awaitable[None]] | None:
+        """Return the streaming page callback for a crawl, or None when not streaming."""
+        pipeline = self._streaming_pipeline
+        if pipeline is None:
+            return None
+        if not sitemap_lastmods:
+            return pipeline.page_sink(crawl_type)
+
+        async def sink(page: dict[str, Any]) -> None:
+            lastmod = sitemap_lastmods.get(page.get("url"))
+            if lastmod:
+                page["lastmod"] = lastmod
+            await pipeline.submit(page, crawl_type)
+
+        return sink
+
+    async def _finish_streaming_pipeline(
+        self, crawl_results: list[dict[str, Any]], crawl_type: str
+    ) -> dict[str, Any]:
+        """Feed pages that were not streamed (text files, placeholders) and drain the pipeline."""
+        pipeline = self._streaming_pipeline
+        try:
+            for doc in crawl_results:
+                if not doc.get("streamed"):
+                    await pipeline.submit(doc, crawl_type)
+            return await pipeline.close()
+        finally:
+            self._streaming_pipeline = None
+
+    async def _abort_streaming_pipeline(self) -> None:
+        """Stop streaming storage workers after a failed or cancelled crawl."""
+        if self._streaming_pipeline is not None:
+            await self._streaming_pipeline.abort()
+            self._streaming_pipeline = None
+
     def _is_same_domain(self, url: str, base_domain: str) -> bool:
         """
         Check if a URL belongs to the same domain as the base domain.
@@ -844,6 +963,34 @@ class CrawlingService:
             # Fallback to simple string comparison
             return link.rstrip('/') == base_url.rstrip('/')
 
+    async def _skip_unmodified_urls(
+        self,
+        urls: list[str],
+        request: dict[str, Any],
+        sitemap_lastmods: dict[str, str | None] | None = None,
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        """
+        Drop URLs that did not change since the last crawl (incremental refreshes only).
+
+        Returns:
+            Tuple of (urls still to crawl, placeholder results for the skipped URLs).
+            Placeholders carry not_modified=True so storage keeps the existing page.
+        """
+        if not request.get("incremental") or not urls:
+            return urls, []
+
+        to_crawl, unmodified = await self.conditional_fetch_service.partition_unmodified(
+            urls,
+            sitemap_lastmods=sitemap_lastmods,
+            max_concurrent=request.get("max_concurrent") or 10,
+        )
+        if unmodified:
+            safe_logfire_info(
+                f"Skipping {len(unmodified)}/{len(urls)} unmodified URLs | progress_id={self.progress_id}"
+            )
+        placeholders = [{"url": u, "markdown": "", "not_modified": True} for u in unmodified]
+        return to_crawl, placeholders
+
     async def _crawl_by_url_type(self, url: str, request: dict[str, Any]) -> tuple:
         """
         Detect URL type and perform appropriate crawling.
@@ -920,16 +1067,21 @@ class CrawlingService:
                                 )
 
                                 # Crawl all same-domain links from llms.txt (no recursion, just one level)
+                                crawl_type = "llms_txt_with_linked_pages"
+                                extracted_urls, not_modified_results = await self._skip_unmodified_urls(
+                                    extracted_urls, request
+                                )
                                 batch_results = await self.crawl_batch_with_progress(
                                     extracted_urls,
                                     max_concurrent=request.get('max_concurrent'),
                                     progress_callback=await self._create_crawl_progress_callback("crawling"),
                                     link_text_fallbacks=url_to_link_text,
-                                )
+                                    page_sink=self._page_sink(crawl_type),
+                                ) if extracted_urls else []
+                                batch_results.extend(not_modified_results)
 
                                 # Combine original llms.txt with linked pages
                                 crawl_results.extend(batch_results)
-                                crawl_type = "llms_txt_with_linked_pages"
                                 logger.info(f"llms.txt crawling completed: {len(crawl_results)} total pages (1 llms.txt + {len(batch_results)} linked pages)")
                                 return crawl_results, crawl_type
 
@@ -981,6 +1133,7 @@ class CrawlingService:
 
                         # For discovery targets, respect max_depth for same-domain links
                         max_depth = request.get('max_depth', 2) if request.get("is_discovery_target") else request.get('max_depth', 1)
+                        crawl_type = "link_collection_with_crawled_links"
 
                         if max_depth > 1 and request.get("is_discovery_target"):
                             # Use recursive crawling to respect depth limit for same-domain links
@@ -990,20 +1143,25 @@ class CrawlingService:
                                 max_depth=max_depth - 1,  # Reduce depth since we're already 1 level deep
                                 max_concurrent=request.get('max_concurrent'),
                                 progress_callback=await self._create_crawl_progress_callback("crawling"),
+                                page_sink=self._page_sink(crawl_type),
                             )
                         else:
                             # Use normal batch crawling (with link text fallbacks)
                             logger.info(f"Crawling {len(extracted_links)} extracted links from {url}")
+                            extracted_links, not_modified_results = await self._skip_unmodified_urls(
+                                extracted_links, request
+                            )
                             batch_results = await self.crawl_batch_with_progress(
                                 extracted_links,
                                 max_concurrent=request.get('max_concurrent'),  # None -> use DB settings
                                 progress_callback=await self._create_crawl_progress_callback("crawling"),
                                 link_text_fallbacks=url_to_link_text,  # Pass link text for title fallback
-                            )
+                                page_sink=self._page_sink(crawl_type),
+                            ) if extracted_links else []
+                            batch_results.extend(not_modified_results)
 
                         # Combine original text file results with batch results
                         crawl_results.extend(batch_results)
-                        crawl_type = "link_collection_with_crawled_links"
 
                         logger.info(f"Link collection crawling completed: {len(crawl_results)} total results (1 text file + {len(batch_results)} extracted links)")
                 else:
@@ -1032,9 +1190,15 @@ class CrawlingService:
                 }]
                 return crawl_results, crawl_type
 
-            sitemap_urls = self.parse_sitemap(url)
+            sitemap_entries = await self.parse_sitemap_entries(url)
+            sitemap_urls = [entry_url for entry_url, _ in sitemap_entries]
+            sitemap_lastmods = dict(sitemap_entries)
 
             if sitemap_urls:
+                sitemap_urls, not_modified_results = await self._skip_unmodified_urls(
+                    sitemap_urls, request, sitemap_lastmods
+                )
+
                 # Update progress before starting batch crawl
                 await update_crawl_progress(
                     75,  # 75% of crawling stage
@@ -1045,7 +1209,15 @@ class CrawlingService:
                 crawl_results = await self.crawl_batch_with_progress(
                     sitemap_urls,
                     progress_callback=await self._create_crawl_progress_callback("crawling"),
-                )
+                    page_sink=self._page_sink(crawl_type, sitemap_lastmods),
+                ) if sitemap_urls else []
+
+                # Keep each page's <lastmod> so the next refresh can skip it without a request
+                for result in crawl_results:
+                    lastmod = sitemap_lastmods.get(result.get("url"))
+                    if lastmod:
+                        result["lastmod"] = lastmod
+                crawl_results.extend(not_modified_results)
 
         else:
             # Handle regular webpages with recursive crawling
@@ -1065,6 +1237,7 @@ class CrawlingService:
                 max_depth=max_depth,
                 max_concurrent=None,  # Let strategy use settings
                 progress_callback=await self._create_crawl_progress_callback("crawling"),
+                page_sink=self._page_sink(crawl_type),
             )
 
         return crawl_results, crawl_type
@@ -379,18 +379,16 @@ class DiscoveryService:
             logger.warning(f"Unexpected error checking URL {url}: {e}", exc_info=True)
             return False
 
-    def _parse_robots_txt(self, base_url: str) -> list[str]:
+    def _fetch_robots_txt(self, base_url: str) -> str | None:
         """
-        Extract sitemap URLs from robots.txt.
+        Fetch robots.txt content for a site.
 
         Args:
             base_url: Base URL to check robots.txt for
 
         Returns:
-            List of sitemap URLs found in robots.txt
+            robots.txt content, or None if it is missing or could not be read
         """
-        sitemaps: list[str] = []
-
         try:
             robots_url = urljoin(base_url, "robots.txt")
             logger.info(f"Checking robots.txt at {robots_url}")
@@ -405,33 +403,10 @@ class DiscoveryService:
             try:
                 if resp.status_code != 200:
                     logger.info(f"No robots.txt found: HTTP {resp.status_code}")
-                    return sitemaps
+                    return None
 
                 # Read response with size limit
-                content = self._read_response_with_limit(resp, robots_url)
-
-                # Parse robots.txt content for sitemap directives
-                for raw_line in content.splitlines():
-                    line = raw_line.strip()
-                    if line.lower().startswith("sitemap:"):
-                        sitemap_value = line.split(":", 1)[1].strip()
-                        if sitemap_value:
-                            # Allow absolute and relative sitemap values
-                            if sitemap_value.lower().startswith(("http://", "https://")):
-                                sitemap_url = sitemap_value
-                            else:
-                                # Resolve relative path against base_url
-                                sitemap_url = urljoin(base_url, sitemap_value)
-
-                            # Validate scheme is HTTP/HTTPS only
-                            parsed = urlparse(sitemap_url)
-                            if parsed.scheme not in ("http", "https"):
-                                logger.warning(f"Skipping non-HTTP(S) sitemap in robots.txt: {sitemap_url}")
-                                continue
-
-                            sitemaps.append(sitemap_url)
-                            logger.info(f"Found sitemap in robots.txt: {sitemap_url}")
-
+                return self._read_response_with_limit(resp, robots_url)
             finally:
                 resp.close()
 
@@ -442,8 +417,121 @@ class DiscoveryService:
         except Exception:
             logger.exception(f"Unexpected error parsing robots.txt from {base_url}")
 
+        return None
+
+    def _parse_robots_txt(self, base_url: str) -> list[str]:
+        """
+        Extract sitemap URLs from robots.txt.
+
+        Args:
+            base_url: Base URL to check robots.txt for
+
+        Returns:
+            List of sitemap URLs found in robots.txt
+        """
+        sitemaps: list[str] = []
+
+        content = self._fetch_robots_txt(base_url)
+        if not content:
+            return sitemaps
+
+        # Parse robots.txt content for sitemap directives
+        for raw_line in content.splitlines():
+            line = raw_line.strip()
+            if line.lower().startswith("sitemap:"):
+                sitemap_value = line.split(":", 1)[1].strip()
+                if sitemap_value:
+                    # Allow absolute and relative sitemap values
+                    if sitemap_value.lower().startswith(("http://", "https://")):
+                        sitemap_url = sitemap_value
+                    else:
+                        # Resolve relative path against base_url
+                        sitemap_url = urljoin(base_url, sitemap_value)
+
+                    # Validate scheme is HTTP/HTTPS only
+                    parsed = urlparse(sitemap_url)
+                    if parsed.scheme not in ("http", "https"):
+                        logger.warning(f"Skipping non-HTTP(S) sitemap in robots.txt: {sitemap_url}")
+                        continue
+
+                    sitemaps.append(sitemap_url)
+                    logger.info(f"Found sitemap in robots.txt: {sitemap_url}")
+
         return sitemaps
 
+    def get_crawl_delay(self, base_url: str, user_agent: str = "archon") -> float | None:
+        """
+        Get the delay between requests a site asks for in robots.txt.
+
+        Reads Crawl-delay (seconds) or Request-rate (requests/seconds) from the group
+        matching the user agent, falling back to the "*" group.
+
+        Args:
+            base_url: Base URL of the site
+            user_agent: User agent token to match against User-agent lines
+
+        Returns:
+            Minimum seconds between requests, or None if robots.txt sets no limit
+        """
+        content = self._fetch_robots_txt(base_url)
+        if not content:
+            return None
+        return self.parse_crawl_delay(content, user_agent)
+
+    @staticmethod
+    def parse_crawl_delay(content: str, user_agent: str = "archon") -> float | None:
+        """
+        Parse Crawl-delay / Request-rate for a user agent out of robots.txt content.
+
+        Args:
+            content: robots.txt content
+            user_agent: User agent token to match against User-agent lines
+
+        Returns:
+            Minimum seconds between requests, or None if no group sets a limit
+        """
+        delays: dict[str, float] = {}
+        group_agents: list[str] = []
+        in_agent_lines = False
+
+        for raw_line in content.splitlines():
+            line = raw_line.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            field, value = (part.strip() for part in line.split(":", 1))
+            field = field.lower()
+
+            if field == "user-agent":
+                # Consecutive User-agent lines share one group
+                if not in_agent_lines:
+                    group_agents = []
+                group_agents.append(value.lower())
+                in_agent_lines = True
+                continue
+            in_agent_lines = False
+
+            delay = None
+            try:
+                if field == "crawl-delay":
+                    delay = float(value)
+                elif field == "request-rate" and "/" in value:
+                    requests_count, seconds = value.split("/", 1)
+                    seconds = seconds.strip().rstrip("smh")
+                    delay = float(seconds) / max(float(requests_count), 1.0)
+            except ValueError:
+                logger.debug(f"Ignoring invalid robots.txt directive: {raw_line}")
+                continue
+
+            if delay is not None and delay >= 0:
+                for agent in group_agents:
+                    delays[agent] = max(delays.get(agent, 0.0), delay)
+
+        token = user_agent.lower()
+        for agent, delay in delays.items():
+            if agent != "*" and agent in token:
+                return delay
+        return delays.get("*")
+
     def _parse_html_meta_tags(self, base_url: str) -> list[str]:
         """
         Extract sitemap references from HTML meta tags using proper HTML parsing.
@@ -10,13 +10,20 @@ from collections.abc import Callable
 from typing import Any
 
 from ...config.logfire_config import get_logger, safe_logfire_error, safe_logfire_info
+from ..client_manager import execute_async
+from ..search.query_cache import invalidate_source_queries
 from ..source_management_service import extract_source_summary, update_source_info
 from ..storage.document_storage_service import add_documents_to_supabase
 from ..storage.storage_services import DocumentStorageService
 from .code_extraction_service import CodeExtractionService
+from .conditional_fetch_service import VALIDATOR_KEYS
+from .page_storage_operations import compute_content_hash
 
 logger = get_logger(__name__)
 
+# URLs / chunk ids per PostgREST IN (...) filter during incremental refresh diffing
+INCREMENTAL_LOOKUP_BATCH_SIZE = 50
+
 
 class DocumentStorageOperations:
     """
@@ -45,6 +52,7 @@ class DocumentStorageOperations:
         source_url: str | None = None,
         source_display_name: str | None = None,
         url_to_page_id: dict[str, str] | None = None,
+        create_source_records: bool = True,
     ) -> dict[str, Any]:
         """
         Process crawled documents and store them in the database.
@@ -58,12 +66,19 @@ class DocumentStorageOperations:
             cancellation_check: Optional function to check for cancellation
             source_url: Optional original URL that was crawled
             source_display_name: Optional human-readable name for the source
+            create_source_records: Create/update the source record (summary, word count) first.
+                Streaming storage only does this for its first batch.
+
+        When request["incremental"] is true, existing pages and chunks are diffed by
+        content hash: unchanged pages are skipped entirely, unchanged chunks keep their
+        rows and embeddings, and only changed, added or removed chunks touch the database.
 
         Returns:
             Dict containing storage statistics and document mappings
         """
         # Reuse initialized storage service for chunking
         storage_service = self.doc_storage_service
+        incremental = bool(request.get("incremental", False))
 
         # Prepare data for chunked storage
         all_urls = []
@@ -72,8 +87,25 @@ class DocumentStorageOperations:
         all_metadatas = []
         source_word_counts = {}
         url_to_full_document = {}
+        url_to_validators: dict[str, dict[str, str]] = {}
         processed_docs = 0
 
+        # Incremental refresh state
+        existing_pages: dict[str, dict[str, Any]] = {}
+        existing_chunks: dict[str, dict[int, tuple[Any, str | None]]] = {}
+        unchanged_urls: set[str] = set()
+        unchanged_word_counts: dict[str, int] = {}
+        revalidated_pages: list[dict[str, Any]] = []
+        if incremental:
+            crawled_urls = [(doc.get("url") or "").strip() for doc in crawl_results]
+            crawled_urls = [u for u in crawled_urls if u]
+            try:
+                existing_pages = await self._fetch_existing_pages(crawled_urls)
+                existing_chunks = await self._fetch_existing_chunks(crawled_urls)
+            except Exception as e:
+                logger.warning(f"Failed to load stored hashes, falling back to full refresh: {e}")
+                incremental = False
+
         # Process and chunk each document
         for doc_index, doc in enumerate(crawl_results):
             # Check for cancellation during document processing
@@ -92,6 +124,15 @@ class DocumentStorageOperations:
             doc_url = (doc.get('url') or '').strip()
             markdown_content = (doc.get('markdown') or '').strip()
 
+            # Skipped by a conditional request - the stored page and chunks stay as they are
+            if doc.get("not_modified") and doc_url:
+                unchanged_urls.add(doc_url)
+                unchanged_word_counts[original_source_id] = (
+                    unchanged_word_counts.get(original_source_id, 0)
+                    + (existing_pages.get(doc_url, {}).get("word_count") or 0)
+                )
+                continue
+
             # Skip documents with empty or whitespace-only content or missing URLs
             if not markdown_content or not doc_url:
                 logger.debug(f"Skipping document {doc_index}: empty {'URL' if not doc_url else 'content'}")
@@ -100,8 +141,28 @@ class DocumentStorageOperations:
             # Increment processed document count
             processed_docs += 1
 
+            # Skip pages whose content is identical to what is already stored
+            if incremental:
+                existing_page = existing_pages.get(doc_url)
+                if (
+                    existing_page
+                    and existing_chunks.get(doc_url)
+                    and existing_page.get("content_hash") == compute_content_hash(markdown_content)
+                ):
+                    unchanged_urls.add(doc_url)
+                    unchanged_word_counts[original_source_id] = (
+                        unchanged_word_counts.get(original_source_id, 0)
+                        + (existing_page.get("word_count") or 0)
+                    )
+                    # Re-upsert the page (no chunks) so fresh validators replace stale ones
+                    validators = {key: doc[key] for key in VALIDATOR_KEYS if doc.get(key)}
+                    if validators:
+                        revalidated_pages.append({"url": doc_url, "markdown": markdown_content, **validators})
+                    continue
+
             # Store full document for code extraction context
             url_to_full_document[doc_url] = markdown_content
+            url_to_validators[doc_url] = {key: doc[key] for key in VALIDATOR_KEYS if doc.get(key)}
 
             # CHUNK THE CONTENT
             chunks = await storage_service.smart_chunk_text_async(markdown_content, chunk_size=600)
@@ -143,6 +204,7 @@ class DocumentStorageOperations:
                     "char_count": len(chunk),
                     "chunk_index": i,
                     "tags": request.get("tags", []),
+                    "content_hash": compute_content_hash(chunk),
                 }
                 all_metadatas.append(metadata)
 
@@ -158,10 +220,12 @@ class DocumentStorageOperations:
                 await asyncio.sleep(0)
 
         # Create/update source record FIRST (required for FK constraints on pages and chunks)
-        if all_contents and all_metadatas:
+        if all_contents and all_metadatas and create_source_records:
+            # Pages skipped by an incremental refresh still count towards the source total
+            extra_kwargs = {"extra_word_counts": unchanged_word_counts} if unchanged_word_counts else {}
             await self._create_source_records(
                 all_metadatas, all_contents, source_word_counts, request,
-                source_url, source_display_name
+                source_url, source_display_name, **extra_kwargs
             )
 
         # Store pages AFTER source is created but BEFORE chunks (FK constraint requirement)
@@ -199,13 +263,13 @@ class DocumentStorageOperations:
             all_metadatas.clear()
             url_to_full_document.clear()
 
-            # Chunk each section separately
-            for section in sections:
+            # Chunk each section separately (one batch across the chunking workers)
+            chunks_per_section = await storage_service.smart_chunk_texts_async(
+                [section.content for section in sections], chunk_size=600
+            )
+            for section, section_chunks in zip(sections, chunks_per_section, strict=True):
                 # Update url_to_full_document with section content
                 url_to_full_document[section.url] = section.content
-                section_chunks = await storage_service.smart_chunk_text_async(
-                    section.content, chunk_size=600
-                )
 
                 for i, chunk in enumerate(section_chunks):
                     all_urls.append(section.url)
@@ -225,6 +289,7 @@ class DocumentStorageOperations:
                         "char_count": len(chunk),
                         "chunk_index": i,
                         "tags": request.get("tags", []),
+                        "content_hash": compute_content_hash(chunk),
                     }
                     all_metadatas.append(metadata)
         else:
@@ -234,7 +299,9 @@ class DocumentStorageOperations:
                 reconstructed_crawl_results.append({
                     "url": url,
                     "markdown": markdown,
+                    **url_to_validators.get(url, {}),
                 })
+            reconstructed_crawl_results.extend(revalidated_pages)
 
             if reconstructed_crawl_results:
                 url_to_page_id = await page_storage_ops.store_pages(
@@ -260,6 +327,36 @@ class DocumentStorageOperations:
             f"Document storage | processed={processed_docs}/{len(crawl_results)} | chunks={len(all_contents)} | avg_chunks_per_doc={avg_chunks:.1f}"
         )
 
+        # Keep unchanged chunks, delete stale ones and only store what changed
+        chunks_unchanged = 0
+        chunks_removed = 0
+        if incremental and all_contents:
+            unfetched_urls = [u for u in dict.fromkeys(all_urls) if u not in existing_chunks]
+            try:
+                existing_chunks.update(await self._fetch_existing_chunks(unfetched_urls))
+            except Exception as e:
+                logger.warning(f"Failed to load stored chunk hashes, falling back to full refresh: {e}")
+                incremental = False
+
+        if incremental and all_contents:
+            keep_indices, stale_chunk_ids, chunks_unchanged = self._diff_chunks(
+                all_urls, all_chunk_numbers, all_metadatas, existing_chunks
+            )
+            chunks_removed = await self._delete_chunks_by_id(stale_chunk_ids)
+            if chunks_removed:
+                invalidate_source_queries(original_source_id)
+
+            all_urls = [all_urls[i] for i in keep_indices]
+            all_chunk_numbers = [all_chunk_numbers[i] for i in keep_indices]
+            all_contents = [all_contents[i] for i in keep_indices]
+            all_metadatas = [all_metadatas[i] for i in keep_indices]
+
+        if incremental:
+            safe_logfire_info(
+                f"Incremental refresh | pages_unchanged={len(unchanged_urls)} | chunks_unchanged={chunks_unchanged} | "
+                f"chunks_removed={chunks_removed} | chunks_to_store={len(all_contents)}"
+            )
+
         # Call add_documents_to_supabase with the correct parameters
         storage_stats = await add_documents_to_supabase(
             client=self.supabase_client,
@@ -274,6 +371,7 @@ class DocumentStorageOperations:
             provider=None,  # Use configured provider
             cancellation_check=cancellation_check,  # Pass cancellation check
             url_to_page_id=url_to_page_id,  # Link chunks to pages
+            delete_existing=not incremental,  # Incremental mode already removed stale chunks
         )
 
         # Calculate chunk counts
@@ -283,11 +381,113 @@ class DocumentStorageOperations:
         return {
             'chunk_count': chunk_count,
             'chunks_stored': chunks_stored,
-            'total_word_count': sum(source_word_counts.values()),
+            'total_word_count': sum(source_word_counts.values()) + sum(unchanged_word_counts.values()),
             'url_to_full_document': url_to_full_document,
-            'source_id': original_source_id
+            'source_id': original_source_id,
+            'pages_unchanged': len(unchanged_urls),
+            'chunks_unchanged': chunks_unchanged,
+            'chunks_removed': chunks_removed,
+            'unchanged_urls': sorted(unchanged_urls),
         }
 
+    async def _fetch_existing_pages(self, urls: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Load stored page hashes for an incremental refresh.
+
+        Args:
+            urls: Page URLs from the current crawl
+
+        Returns:
+            {url: {"id", "word_count", "content_hash"}} for pages that already exist
+        """
+        pages: dict[str, dict[str, Any]] = {}
+        unique_urls = list(dict.fromkeys(urls))
+        for i in range(0, len(unique_urls), INCREMENTAL_LOOKUP_BATCH_SIZE):
+            batch_urls = unique_urls[i : i + INCREMENTAL_LOOKUP_BATCH_SIZE]
+            result = await execute_async(
+                self.supabase_client.table("archon_page_metadata")
+                .select("id, url, word_count, content_hash:metadata->>content_hash")
+                .in_("url", batch_urls)
+            )
+            for row in result.data or []:
+                pages[row["url"]] = row
+        return pages
+
+    async def _fetch_existing_chunks(
+        self, urls: list[str]
+    ) -> dict[str, dict[int, tuple[Any, str | None]]]:
+        """
+        Load stored chunk hashes for an incremental refresh.
+
+        Args:
+            urls: Chunk URLs to look up
+
+        Returns:
+            {url: {chunk_number: (chunk_id, content_hash)}} for chunks that already exist
+        """
+        chunks: dict[str, dict[int, tuple[Any, str | None]]] = {}
+        unique_urls = list(dict.fromkeys(urls))
+        for i in range(0, len(unique_urls), INCREMENTAL_LOOKUP_BATCH_SIZE):
+            batch_urls = unique_urls[i : i + INCREMENTAL_LOOKUP_BATCH_SIZE]
+            result = await execute_async(
+                self.supabase_client.table("archon_crawled_pages")
+                .select("id, url, chunk_number, content_hash:metadata->>content_hash")
+                .in_("url", batch_urls)
+            )
+            for row in result.data or []:
+                chunks.setdefault(row["url"], {})[row["chunk_number"]] = (
+                    row["id"],
+                    row.get("content_hash"),
+                )
+        return chunks
+
+    @staticmethod
+    def _diff_chunks(
+        urls: list[str],
+        chunk_numbers: list[int],
+        metadatas: list[dict[str, Any]],
+        existing_chunks: dict[str, dict[int, tuple[Any, str | None]]],
+    ) -> tuple[list[int], list[Any], int]:
+        """
+        Compare freshly chunked content with stored chunks by (url, chunk_number).
+
+        Returns:
+            Tuple of (indices of chunks that must be stored, ids of stored chunks
+            that were changed or removed, number of unchanged chunks)
+        """
+        keep_indices: list[int] = []
+        stale_chunk_ids: list[Any] = []
+        unchanged = 0
+        seen: dict[str, set[int]] = {}
+
+        for i, (url, chunk_number) in enumerate(zip(urls, chunk_numbers, strict=False)):
+            seen.setdefault(url, set()).add(chunk_number)
+            existing = existing_chunks.get(url, {}).get(chunk_number)
+            if existing is None:
+                keep_indices.append(i)
+            elif existing[1] is not None and existing[1] == metadatas[i].get("content_hash"):
+                unchanged += 1
+            else:
+                keep_indices.append(i)
+                stale_chunk_ids.append(existing[0])
+
+        # Chunks past the new end of a page no longer exist
+        for url, chunk_numbers_seen in seen.items():
+            for chunk_number, (chunk_id, _) in existing_chunks.get(url, {}).items():
+                if chunk_number not in chunk_numbers_seen:
+                    stale_chunk_ids.append(chunk_id)
+
+        return keep_indices, stale_chunk_ids, unchanged
+
+    async def _delete_chunks_by_id(self, chunk_ids: list[Any]) -> int:
+        """Delete stale chunks in batches, returning how many were removed."""
+        for i in range(0, len(chunk_ids), INCREMENTAL_LOOKUP_BATCH_SIZE):
+            batch_ids = chunk_ids[i : i + INCREMENTAL_LOOKUP_BATCH_SIZE]
+            await execute_async(
+                self.supabase_client.table("archon_crawled_pages").delete().in_("id", batch_ids), write=True
+            )
+        return len(chunk_ids)
+
     async def _create_source_records(
         self,
         all_metadatas: list[dict],
@@ -296,6 +496,7 @@ class DocumentStorageOperations:
         request: dict[str, Any],
         source_url: str | None = None,
         source_display_name: str | None = None,
+        extra_word_counts: dict[str, int] | None = None,
     ):
         """
         Create or update source records in the database.
@@ -305,6 +506,7 @@ class DocumentStorageOperations:
             all_contents: List of all chunk contents
             source_word_counts: Word counts per source_id
             request: Original crawl request
+            extra_word_counts: Word counts per source_id for pages skipped by an incremental refresh
         """
         # Find ALL unique source_ids in the crawl results
         unique_source_ids = set()
@@ -325,6 +527,10 @@ class DocumentStorageOperations:
                 source_id_word_counts[source_id] = 0
             source_id_word_counts[source_id] += metadata.get('word_count', 0)
 
+        for source_id, word_count in (extra_word_counts or {}).items():
+            if source_id in source_id_word_counts:
+                source_id_word_counts[source_id] += word_count
+
         safe_logfire_info(
             f"Found {len(unique_source_ids)} unique source_ids: {list(unique_source_ids)}"
         )
@@ -400,7 +606,7 @@ class DocumentStorageOperations:
                     if source_display_name:
                         fallback_data["source_display_name"] = source_display_name
 
-                    self.supabase_client.table("archon_sources").upsert(fallback_data).execute()
+                    await execute_async(self.supabase_client.table("archon_sources").upsert(fallback_data), write=True)
                     safe_logfire_info(f"Fallback source creation succeeded for '{source_id}'")
                 except Exception as fallback_error:
                     logger.error(f"Both source creation attempts failed for '{source_id}'", exc_info=True)
@@ -415,11 +621,8 @@ class DocumentStorageOperations:
         if unique_source_ids:
             for source_id in unique_source_ids:
                 try:
-                    source_check = (
-                        self.supabase_client.table("archon_sources")
-                        .select("source_id")
-                        .eq("source_id", source_id)
-                        .execute()
+                    source_check = await execute_async(
+                        self.supabase_client.table("archon_sources").select("source_id").eq("source_id", source_id)
                     )
                     if not source_check.data:
                         raise Exception(
@@ -0,0 +1,204 @@
+"""
+Host Politeness Scheduler
+
+Per-host request pacing for crawls. Each host gets a token bucket whose refill
+rate starts from robots.txt (Crawl-delay / Request-rate) or a default, and is
+adapted with AIMD: every successful response nudges the rate up additively,
+every 429/503 halves it. Many hosts can be crawled at full speed in parallel
+while no single host is hammered.
+
+The scheduler implements crawl4ai's RateLimiter interface, so it plugs into
+arun_many dispatchers directly; strategies that call arun() themselves use the
+same wait_if_needed() / update_delay() pair around each request.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from crawl4ai import RateLimiter
+
+from ...config.logfire_config import get_logger, safe_logfire_info
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST_RATE = 4.0  # Requests per second a host starts at
+DEFAULT_MAX_HOST_RATE = 20.0  # Ceiling when robots.txt sets no limit
+MIN_HOST_RATE = 0.05  # AIMD never backs off below one request every 20 seconds
+MAX_CRAWL_DELAY = 30.0  # Longer robots.txt delays are clamped so a crawl can still finish
+RATE_INCREASE_STEP = 1.0  # Additive increase, spread over ~one second of successes
+RATE_DECREASE_FACTOR = 0.5  # Multiplicative decrease on 429/503
+
+
+@dataclass
+class HostState:
+    """Token bucket and AIMD state for one host."""
+
+    rate: float
+    max_rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+    fail_count: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def min_rate(self) -> float:
+        return min(MIN_HOST_RATE, self.max_rate)
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class HostPolitenessScheduler(RateLimiter):
+    """Paces requests per host with robots.txt-seeded token buckets and AIMD rates."""
+
+    def __init__(
+        self,
+        default_rate: float = DEFAULT_HOST_RATE,
+        max_rate: float = DEFAULT_MAX_HOST_RATE,
+        burst: int = 1,
+        max_retries: int = 3,
+        crawl_delay_loader: Callable[[str], float | None] | None = None,
+        rate_limit_codes: list[int] | None = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            default_rate: Starting requests/second for hosts without a robots.txt limit
+            max_rate: Highest requests/second AIMD may reach for those hosts
+            burst: Requests a host may receive back-to-back before pacing applies
+            max_retries: Consecutive rate-limit responses before update_delay() gives up
+            crawl_delay_loader: Blocking function returning robots.txt seconds-between-requests
+                for a base URL (e.g. DiscoveryService.get_crawl_delay); run in a thread
+            rate_limit_codes: Status codes that trigger backoff (default 429, 503)
+        """
+        super().__init__(max_retries=max_retries, rate_limit_codes=rate_limit_codes)
+        self.default_rate = max(MIN_HOST_RATE, default_rate)
+        self.max_rate = max(self.default_rate, max_rate)
+        self.burst = max(1, burst)
+        self.crawl_delay_loader = crawl_delay_loader
+        self.hosts: dict[str, HostState] = {}
+        self._host_tasks: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    async def wait_if_needed(self, url: str) -> None:
+        """Wait until the URL's host has a token available, then take it."""
+        state = await self._get_state(url)
+        async with state.lock:
+            state.refill(time.monotonic())
+            if state.tokens < 1:
+                await asyncio.sleep((1 - state.tokens) / state.rate)
+                state.refill(time.monotonic())
+            state.tokens -= 1
+
+    def update_delay(self, url: str, status_code: int | None) -> bool:
+        """
+        Adapt the host's rate to a response.
+
+        Returns:
+            False once a host keeps rate limiting past max_retries, True otherwise
+        """
+        state = self.hosts.get(self.get_host(url))
+        if state is None:
+            return True
+
+        if status_code in self.rate_limit_codes:
+            state.fail_count += 1
+            previous = state.rate
+            state.rate = max(state.min_rate, state.rate * RATE_DECREASE_FACTOR)
+            # Drop any saved burst so the next request really waits
+            state.tokens = min(state.tokens, 0.0)
+            safe_logfire_info(
+                f"Backing off host | host={self.get_host(url)} | status={status_code} | "
+                f"rate={previous:.2f}->{state.rate:.2f} req/s"
+            )
+            return state.fail_count <= self.max_retries
+
+        state.fail_count = 0
+        if status_code is not None and status_code < 400:
+            # Additive increase of RATE_INCREASE_STEP per ~rate successes (about one per second)
+            state.rate = min(state.max_rate, state.rate + RATE_INCREASE_STEP / max(state.rate, 1.0))
+        return True
+
+    def record_failure(self, url: str) -> None:
+        """Treat a network error or timeout like a rate-limit response."""
+        state = self.hosts.get(self.get_host(url))
+        if state is not None:
+            state.rate = max(state.min_rate, state.rate * RATE_DECREASE_FACTOR)
+
+    async def _get_state(self, url: str) -> HostState:
+        host = self.get_host(url)
+        state = self.hosts.get(host)
+        if state is not None:
+            return state
+
+        # Concurrent first requests to a host share one robots.txt lookup
+        task = self._host_tasks.get(host)
+        if task is None:
+            task = asyncio.create_task(self._load_host(url, host))
+            self._host_tasks[host] = task
+        return await asyncio.shield(task)
+
+    async def _load_host(self, url: str, host: str) -> HostState:
+        crawl_delay = None
+        if self.crawl_delay_loader:
+            parsed = urlparse(url)
+            try:
+                crawl_delay = await asyncio.to_thread(
+                    self.crawl_delay_loader, f"{parsed.scheme}://{parsed.netloc}/"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load robots.txt crawl delay for {host}: {e}")
+
+        if crawl_delay:
+            if crawl_delay > MAX_CRAWL_DELAY:
+                logger.warning(f"robots.txt crawl delay {crawl_delay}s for {host} clamped to {MAX_CRAWL_DELAY}s")
+                crawl_delay = MAX_CRAWL_DELAY
+            # robots.txt caps the rate; AIMD may slow down further but never exceed it
+            max_rate = 1.0 / crawl_delay
+            rate = min(self.default_rate, max_rate)
+            capacity = 1.0
+            logger.info(f"Honoring robots.txt crawl delay for {host}: {crawl_delay}s")
+        else:
+            max_rate = self.max_rate
+            rate = self.default_rate
+            capacity = float(self.burst)
+
+        state = HostState(
+            rate=rate,
+            max_rate=max_rate,
+            capacity=capacity,
+            tokens=capacity,
+            updated_at=time.monotonic(),
+        )
+        self.hosts[host] = state
+        return state
+
+
+def interleave_by_host(urls: list[str]) -> list[str]:
+    """
+    Reorder URLs round-robin across hosts.
+
+    Dispatchers hand out a fixed number of sessions in queue order; interleaving
+    keeps a slow or rate-limited host from occupying all of them while other
+    hosts sit idle.
+    """
+    by_host: dict[str, list[str]] = {}
+    for url in urls:
+        by_host.setdefault(HostPolitenessScheduler.get_host(url), []).append(url)
+    if len(by_host) <= 1:
+        return list(urls)
+
+    interleaved = []
+    queues = list(by_host.values())
+    for i in range(max(len(queue) for queue in queues)):
+        interleaved.extend(queue[i] for queue in queues if i < len(queue))
+    return interleaved
@@ -0,0 +1,239 @@
+"""
+HTML Code Block Scanner
+
+Finds code containers in raw HTML in a single pass. One precompiled tag
+pattern walks the <pre>, <code> and <div> tags of the document while a stack
+of open <div> elements keeps the wrapper attributes in view, so each <pre> is
+attributed to its highlighter (Prism, Shiki, highlight.js, Docusaurus,
+VitePress, ...) and language without re-scanning the document once per
+highlighter. CodeMirror and Monaco editors, which render lines as <div>s
+instead of a <pre>, are recognized as containers of their own.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+# Opening/closing <pre>, <code> and <div> tags; every other tag is skipped by the regex engine
+TAG_PATTERN = re.compile(r"<(/?)(pre|code|div)\b([^>]*)>", re.IGNORECASE)
+PRE_TAG_PATTERN = re.compile(r"<pre[^>]*>", re.IGNORECASE)
+LANGUAGE_CLASS_PATTERN = re.compile(r"""class\s*=\s*["'][^"']*?\blanguage-(\w+)""", re.IGNORECASE)
+DATA_LANGUAGE_PATTERN = re.compile(r"""data-language\s*=\s*["']?(\w+)""", re.IGNORECASE)
+CODE_WRAPPER_PATTERN = re.compile(r"\s*<code\b([^>]*)>(.*)</code>\s*", re.DOTALL | re.IGNORECASE)
+CM_LINE_PATTERN = re.compile(r"""<div[^>]*class=["'][^"']*cm-line[^"']*["'][^>]*>(.*?)</div>""", re.DOTALL)
+SPAN_TAG_PATTERN = re.compile(r"</?span[^>]*>")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+LINE_OPEN_TAG_PATTERN = re.compile(r"<(?:div|pre)\b[^>]*>", re.IGNORECASE)
+LINE_CLOSE_TAG_PATTERN = re.compile(r"</(?:div|pre)>", re.IGNORECASE)
+
+# Editor containers that hold their lines in <div>s: class token -> source type
+EDITOR_CONTAINERS = {
+    "cm-content": "codemirror",
+    "CodeMirror-code": "codemirror-legacy",
+    "view-lines": "monaco",
+}
+
+_EDITOR_CLASS_ALTERNATION = "|".join(map(re.escape, EDITOR_CONTAINERS))
+EDITOR_CONTAINER_PATTERN = re.compile(rf"""class\s*=\s*["'](?:[^"']*\s)?({_EDITOR_CLASS_ALTERNATION})[\s"']""")
+
+# Source type from the <pre>/<code> attributes, then from the enclosing <div>s (first marker wins)
+OWN_SOURCE_TYPES = (
+    ("prism-code", "docusaurus"),
+    ("hljs", "hljs"),
+    ("astro-code", "astro-shiki"),
+    ("shiki", "shiki"),
+    ("code-block", "milkdown"),
+    ("nx-", "nextra-nx"),
+    ("language-", "prism"),
+)
+WRAPPER_SOURCE_TYPES = (
+    ("snippet-clipboard-content", "github-snippet"),
+    ("highlight", "github-highlight"),
+    ("milkdown", "milkdown-div"),
+    ("code-block-wrapper", "milkdown-wrapper-code"),
+    ("code-wrapper", "milkdown-wrapper"),
+    ("data-code-block", "milkdown-alt"),
+    ("data-nextra-code", "nextra"),
+    ("astro-code", "astro-wrapper"),
+    ("vp-code", "vitepress-vp"),
+    ("language-", "vitepress"),
+    ("code-block", "generic-div"),
+)
+
+# Enclosing <div>s consulted for language and source type (nearest first)
+WRAPPER_LOOKBACK = 3
+
+
+@dataclass
+class HtmlCodeCandidate:
+    """A code container found in HTML; code still carries its inner markup and entities."""
+
+    start: int
+    end: int
+    code: str
+    language: str = ""
+    source_type: str = "standard"
+
+
+@dataclass
+class _OpenDiv:
+    attrs: str
+    # Set for generic "codeblock" divs: block count when opened, to tell whether a <pre> was found inside
+    fallback_blocks_before: int | None = None
+    start: int = 0
+    content_start: int = 0
+
+
+@dataclass
+class _OpenContainer:
+    start: int
+    content_start: int
+    attrs: str
+    source_type: str = "standard"
+    depth: int = 0
+    wrappers: list[str] = field(default_factory=list)
+
+
+def _language(*attr_strings: str) -> str:
+    """First language-* class or data-language attribute among the given attribute strings."""
+    for attrs in attr_strings:
+        match = LANGUAGE_CLASS_PATTERN.search(attrs) or DATA_LANGUAGE_PATTERN.search(attrs)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def _source_type(own_attrs: str, wrappers: list[str]) -> str:
+    own = own_attrs.lower()
+    for marker, source_type in OWN_SOURCE_TYPES:
+        if marker in own:
+            return source_type
+    for wrapper in wrappers:
+        wrapper = wrapper.lower()
+        for marker, source_type in WRAPPER_SOURCE_TYPES:
+            if marker in wrapper:
+                return source_type
+    return "standard"
+
+
+def _editor_container(attrs: str) -> str | None:
+    match = EDITOR_CONTAINER_PATTERN.search(attrs)
+    return EDITOR_CONTAINERS[match.group(1)] if match else None
+
+
+def _editor_code(inner: str, source_type: str) -> str:
+    """Turn an editor container's line markup into newline-separated lines."""
+    if source_type == "codemirror":
+        cm_lines = CM_LINE_PATTERN.findall(inner)
+        if cm_lines:
+            return "\n".join(HTML_TAG_PATTERN.sub("", SPAN_TAG_PATTERN.sub("", line)) for line in cm_lines)
+        return HTML_TAG_PATTERN.sub("\n", SPAN_TAG_PATTERN.sub("", inner))
+    code = LINE_OPEN_TAG_PATTERN.sub("\n", inner)
+    code = LINE_CLOSE_TAG_PATTERN.sub("", code)
+    return SPAN_TAG_PATTERN.sub("", code)
+
+
+def scan_html_code_blocks(html: str) -> tuple[list[HtmlCodeCandidate], list[HtmlCodeCandidate]]:
+    """
+    Locate code containers in one pass over the HTML.
+
+    Args:
+        html: Raw HTML of a page
+
+    Returns:
+        Tuple of (code blocks, standalone <code> elements outside any block), in
+        document order. Offsets span the container's opening through closing tag.
+    """
+    blocks: list[HtmlCodeCandidate] = []
+    inline: list[HtmlCodeCandidate] = []
+    divs: list[_OpenDiv] = []
+    pre: _OpenContainer | None = None
+    editor: _OpenContainer | None = None
+    inline_code: tuple[int, int] | None = None
+
+    for match in TAG_PATTERN.finditer(html):
+        closing, name, attrs = match.group(1), match.group(2).lower(), match.group(3)
+
+        if name == "div":
+            if not closing:
+                if attrs.endswith("/"):
+                    continue
+                div = _OpenDiv(attrs)
+                if editor is None and pre is None:
+                    source_type = _editor_container(attrs)
+                    if source_type:
+                        wrappers = [d.attrs for d in divs[-WRAPPER_LOOKBACK:]][::-1]
+                        editor = _OpenContainer(match.start(), match.end(), attrs, source_type, len(divs) + 1, wrappers)
+                    elif "codeblock" in attrs.lower():
+                        div.fallback_blocks_before = len(blocks)
+                        div.start, div.content_start = match.start(), match.end()
+                divs.append(div)
+                continue
+
+            if editor is not None and len(divs) == editor.depth:
+                blocks.append(
+                    HtmlCodeCandidate(
+                        start=editor.start,
+                        end=match.end(),
+                        code=_editor_code(html[editor.content_start : match.start()], editor.source_type).strip(),
+                        language=_language(editor.attrs, *editor.wrappers),
+                        source_type=editor.source_type,
+                    )
+                )
+                editor = None
+            if divs:
+                div = divs.pop()
+                if div.fallback_blocks_before is not None and div.fallback_blocks_before == len(blocks):
+                    blocks.append(
+                        HtmlCodeCandidate(
+                            start=div.start,
+                            end=match.end(),
+                            code=html[div.content_start : match.start()].strip(),
+                            language=_language(div.attrs),
+                            source_type="generic-codeblock",
+                        )
+                    )
+            continue
+
+        if editor is not None:
+            continue
+
+        if name == "pre":
+            if not closing:
+                if pre is None:
+                    wrappers = [d.attrs for d in divs[-WRAPPER_LOOKBACK:]][::-1]
+                    pre = _OpenContainer(match.start(), match.end(), attrs, wrappers=wrappers)
+            elif pre is not None:
+                inner = html[pre.content_start : match.start()]
+                code_attrs = ""
+                wrapped = CODE_WRAPPER_PATTERN.fullmatch(inner)
+                if wrapped:
+                    code_attrs, inner = wrapped.groups()
+                blocks.append(
+                    HtmlCodeCandidate(
+                        start=pre.start,
+                        end=match.end(),
+                        code=inner.strip(),
+                        language=_language(code_attrs, pre.attrs, *pre.wrappers),
+                        source_type=_source_type(f"{pre.attrs} {code_attrs}", pre.wrappers),
+                    )
+                )
+                pre = None
+            continue
+
+        # Standalone <code> (inline snippets), only outside <pre>
+        if pre is not None:
+            continue
+        if not closing:
+            inline_code = (match.start(), match.end())
+        elif inline_code is not None:
+            inline.append(
+                HtmlCodeCandidate(
+                    start=inline_code[0],
+                    end=match.end(),
+                    code=html[inline_code[1] : match.start()].strip(),
+                    source_type="code",
+                )
+            )
+            inline_code = None
+
+    return blocks, inline
@@ -5,16 +5,25 @@ Handles the storage of complete documentation pages in the archon_page_metadata
 Pages are stored BEFORE chunking to maintain full context for agent retrieval.
 """
 
+import hashlib
 from typing import Any
 
 from postgrest.exceptions import APIError
 
 from ...config.logfire_config import get_logger, safe_logfire_error, safe_logfire_info
+from ..client_manager import execute_async
+from ..search.page_metadata_cache import invalidate_page_metadata
+from .conditional_fetch_service import VALIDATOR_KEYS
 from .helpers.llms_full_parser import parse_llms_full_sections
 
 logger = get_logger(__name__)
 
 
+def compute_content_hash(content: str) -> str:
+    """Hash page or chunk text so incremental refreshes can detect unchanged content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 class PageStorageOperations:
     """
     Handles page storage operations for crawled content.
@@ -84,6 +93,9 @@ class PageStorageOperations:
                     "crawl_type": crawl_type,
                     "page_type": "documentation",
                     "tags": request.get("tags", []),
+                    "content_hash": compute_content_hash(markdown),
+                    # ETag / Last-Modified / sitemap lastmod for conditional refreshes
+                    **{key: doc[key] for key in VALIDATOR_KEYS if doc.get(key)},
                 },
             }
             pages_to_insert.append(page_record)
@@ -94,15 +106,15 @@ class PageStorageOperations:
                 safe_logfire_info(
                     f"Upserting {len(pages_to_insert)} pages into archon_page_metadata table"
                 )
-                result = (
-                    self.supabase_client.table("archon_page_metadata")
-                    .upsert(pages_to_insert, on_conflict="url")
-                    .execute()
+                result = await execute_async(
+                    self.supabase_client.table("archon_page_metadata").upsert(pages_to_insert, on_conflict="url"),
+                    write=True,
                 )
 
                 # Build url → page_id mapping
                 for page in result.data:
                     url_to_page_id[page["url"]] = page["id"]
+                invalidate_page_metadata(urls=[page["url"] for page in pages_to_insert])
 
                 safe_logfire_info(
                     f"Successfully stored {len(url_to_page_id)}/{len(pages_to_insert)} pages in archon_page_metadata"
@@ -178,6 +190,7 @@ class PageStorageOperations:
                     "crawl_type": crawl_type,
                     "page_type": "llms_full_section",
                     "tags": request.get("tags", []),
+                    "content_hash": compute_content_hash(section.content),
                     "section_metadata": {
                         "section_title": section.section_title,
                         "section_order": section.section_order,
@@ -193,15 +206,15 @@ class PageStorageOperations:
                 safe_logfire_info(
                     f"Upserting {len(pages_to_insert)} section pages into archon_page_metadata"
                 )
-                result = (
-                    self.supabase_client.table("archon_page_metadata")
-                    .upsert(pages_to_insert, on_conflict="url")
-                    .execute()
+                result = await execute_async(
+                    self.supabase_client.table("archon_page_metadata").upsert(pages_to_insert, on_conflict="url"),
+                    write=True,
                 )
 
                 # Build url → page_id mapping
                 for page in result.data:
                     url_to_page_id[page["url"]] = page["id"]
+                invalidate_page_metadata(urls=[page["url"] for page in pages_to_insert])
 
                 safe_logfire_info(
                     f"Successfully stored {len(url_to_page_id)}/{len(pages_to_insert)} section pages"
@@ -232,9 +245,13 @@ class PageStorageOperations:
             chunk_count: Number of chunks created from this page
         """
         try:
-            self.supabase_client.table("archon_page_metadata").update(
-                {"chunk_count": chunk_count}
-            ).eq("id", page_id).execute()
+            await execute_async(
+                self.supabase_client.table("archon_page_metadata")
+                .update({"chunk_count": chunk_count})
+                .eq("id", page_id),
+                write=True,
+            )
+            invalidate_page_metadata(page_ids=[page_id])
 
             safe_logfire_info(f"Updated chunk_count={chunk_count} for page_id={page_id}")
 
@@ -12,6 +12,14 @@ from crawl4ai import CacheMode, CrawlerRunConfig, MemoryAdaptiveDispatcher
 
 from ....config.logfire_config import get_logger
 from ...credential_service import credential_service
+from ..conditional_fetch_service import extract_http_validators
+from ..discovery_service import DiscoveryService
+from ..host_scheduler import (
+    DEFAULT_HOST_RATE,
+    DEFAULT_MAX_HOST_RATE,
+    HostPolitenessScheduler,
+    interleave_by_host,
+)
 
 logger = get_logger(__name__)
 
@@ -39,6 +47,7 @@ class BatchCrawlStrategy:
         progress_callback: Callable[..., Awaitable[None]] | None = None,
         cancellation_check: Callable[[], None] | None = None,
         link_text_fallbacks: dict[str, str] | None = None,
+        page_sink: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Batch crawl multiple URLs in parallel with progress reporting.
@@ -51,6 +60,8 @@ class BatchCrawlStrategy:
             progress_callback: Optional callback for progress updates
             cancellation_check: Optional function to check for cancellation
             link_text_fallbacks: Optional dict mapping URLs to link text for title fallback
+            page_sink: Optional async callback receiving each crawled page for streaming storage;
+                when set, only lightweight stubs are returned
 
         Returns:
             List of crawl results
@@ -85,6 +96,10 @@ class BatchCrawlStrategy:
             if memory_threshold != raw_memory_threshold:
                 logger.warning(f"Invalid MEMORY_THRESHOLD_PERCENT={raw_memory_threshold}, clamped to {memory_threshold}")
             check_interval = float(settings.get("DISPATCHER_CHECK_INTERVAL", "0.5"))
+
+            # Per-host pacing: starting and maximum requests/second for hosts without a robots.txt limit
+            host_rate = float(settings.get("CRAWL_HOST_RATE", str(DEFAULT_HOST_RATE)))
+            host_max_rate = float(settings.get("CRAWL_HOST_MAX_RATE", str(DEFAULT_MAX_HOST_RATE)))
         except (ValueError, KeyError, TypeError) as e:
             # Critical configuration errors should fail fast
             logger.error(f"Invalid crawl settings format: {e}", exc_info=True)
@@ -99,6 +114,8 @@ class BatchCrawlStrategy:
                 max_concurrent = 10  # Safe default to prevent memory issues
             memory_threshold = 80.0
             check_interval = 0.5
+            host_rate = DEFAULT_HOST_RATE
+            host_max_rate = DEFAULT_MAX_HOST_RATE
             settings = {}  # Empty dict for defaults
 
         # Check if any URLs are documentation sites
@@ -132,10 +149,18 @@ class BatchCrawlStrategy:
                 scan_full_page=True,
             )
 
+        # Token buckets per host (seeded from robots.txt) with AIMD backoff on 429/503
+        host_scheduler = HostPolitenessScheduler(
+            default_rate=host_rate,
+            max_rate=host_max_rate,
+            burst=max_concurrent,
+            crawl_delay_loader=DiscoveryService().get_crawl_delay,
+        )
         dispatcher = MemoryAdaptiveDispatcher(
             memory_threshold_percent=memory_threshold,
             check_interval=check_interval,
             max_session_permit=max_concurrent,
+            rate_limiter=host_scheduler,
         )
 
         async def report_progress(progress_val: int, message: str, status: str = "crawling", **kwargs):
@@ -167,7 +192,7 @@ class BatchCrawlStrategy:
         # Transform all URLs at the beginning
         url_mapping = {}  # Map transformed URLs back to original
         transformed_urls = []
-        for url in urls:
+        for url in interleave_by_host(urls):
             transformed = transform_url_func(url)
             transformed_urls.append(transformed)
             url_mapping[transformed] = url
@@ -255,12 +280,19 @@ class BatchCrawlStrategy:
                         if fallback_text:
                             title = fallback_text
 
-                    successful_results.append({
+                    page = {
                         "url": original_url,
                         "markdown": result.markdown.fit_markdown,
                         "html": result.html,  # Use raw HTML
                         "title": title,
-                    })
+                        **extract_http_validators(getattr(result, "response_headers", None)),
+                    }
+                    if page_sink:
+                        # Streaming mode: storage takes the page now, only a stub is kept here
+                        await page_sink(page)
+                        successful_results.append({"url": original_url, "title": title, "streamed": True})
+                    else:
+                        successful_results.append(page)
                 else:
                     logger.warning(
                         f"Failed to crawl {result.url}: {getattr(result, 'error_message', 'Unknown error')}"
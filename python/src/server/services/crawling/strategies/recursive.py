@@ -9,11 +9,15 @@ from collections.abc import Awaitable, Callable
 from typing import Any
 from urllib.parse import urldefrag
 
-from crawl4ai import CacheMode, CrawlerRunConfig, MemoryAdaptiveDispatcher
+import psutil
+from crawl4ai import CacheMode, CrawlerRunConfig
 
 from ....config.logfire_config import get_logger
 from ...credential_service import credential_service
+from ..conditional_fetch_service import extract_http_validators
+from ..discovery_service import DiscoveryService
 from ..helpers.url_handler import URLHandler
+from ..host_scheduler import DEFAULT_HOST_RATE, DEFAULT_MAX_HOST_RATE, HostPolitenessScheduler
 
 logger = get_logger(__name__)
 
@@ -42,6 +46,7 @@ class RecursiveCrawlStrategy:
         max_concurrent: int | None = None,
         progress_callback: Callable[..., Awaitable[None]] | None = None,
         cancellation_check: Callable[[], None] | None = None,
+        page_sink: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Recursively crawl internal links from start URLs up to a maximum depth with progress reporting.
@@ -54,6 +59,8 @@ class RecursiveCrawlStrategy:
             max_concurrent: Maximum concurrent crawls
             progress_callback: Optional callback for progress updates
             cancellation_check: Optional function to check for cancellation
+            page_sink: Optional async callback receiving each crawled page for streaming storage;
+                when set, only lightweight stubs are returned
 
         Returns:
             List of crawl results
@@ -68,12 +75,6 @@ class RecursiveCrawlStrategy:
         try:
             settings = await credential_service.get_credentials_by_category("rag_strategy")
 
-            # Clamp batch_size to prevent zero step in range()
-            raw_batch_size = int(settings.get("CRAWL_BATCH_SIZE", "50"))
-            batch_size = max(1, raw_batch_size)
-            if batch_size != raw_batch_size:
-                logger.warning(f"Invalid CRAWL_BATCH_SIZE={raw_batch_size}, clamped to {batch_size}")
-
             if max_concurrent is None:
                 # CRAWL_MAX_CONCURRENT: Pages to crawl in parallel within this single crawl operation
                 # (Different from server-level CONCURRENT_CRAWL_LIMIT which limits total crawl operations)
@@ -82,12 +83,16 @@ class RecursiveCrawlStrategy:
                 if max_concurrent != raw_max_concurrent:
                     logger.warning(f"Invalid CRAWL_MAX_CONCURRENT={raw_max_concurrent}, clamped to {max_concurrent}")
 
-            # Clamp memory threshold to sane bounds for dispatcher
+            # Clamp memory threshold to sane bounds for the worker memory gate
             raw_memory_threshold = float(settings.get("MEMORY_THRESHOLD_PERCENT", "80"))
             memory_threshold = min(99.0, max(10.0, raw_memory_threshold))
             if memory_threshold != raw_memory_threshold:
                 logger.warning(f"Invalid MEMORY_THRESHOLD_PERCENT={raw_memory_threshold}, clamped to {memory_threshold}")
             check_interval = float(settings.get("DISPATCHER_CHECK_INTERVAL", "0.5"))
+
+            # Per-host pacing: starting and maximum requests/second for hosts without a robots.txt limit
+            host_rate = float(settings.get("CRAWL_HOST_RATE", str(DEFAULT_HOST_RATE)))
+            host_max_rate = float(settings.get("CRAWL_HOST_MAX_RATE", str(DEFAULT_MAX_HOST_RATE)))
         except (ValueError, KeyError, TypeError) as e:
             # Critical configuration errors should fail fast
             logger.error(f"Invalid crawl settings format: {e}", exc_info=True)
@@ -97,11 +102,12 @@ class RecursiveCrawlStrategy:
             logger.error(
                 f"Failed to load crawl settings from database: {e}, using defaults", exc_info=True
             )
-            batch_size = 50
             if max_concurrent is None:
                 max_concurrent = 10  # Safe default to prevent memory issues
             memory_threshold = 80.0
             check_interval = 0.5
+            host_rate = DEFAULT_HOST_RATE
+            host_max_rate = DEFAULT_MAX_HOST_RATE
             settings = {}  # Empty dict for defaults
 
         # Check if start URLs include documentation sites
@@ -136,12 +142,6 @@ class RecursiveCrawlStrategy:
                 scan_full_page=True,
             )
 
-        dispatcher = MemoryAdaptiveDispatcher(
-            memory_threshold_percent=memory_threshold,
-            check_interval=check_interval,
-            max_session_permit=max_concurrent,
-        )
-
         async def report_progress(progress_val: int, message: str, status: str = "crawling", **kwargs):
             """Helper to report progress if callback is available"""
             if progress_callback:
@@ -155,185 +155,184 @@ class RecursiveCrawlStrategy:
                     **kwargs
                 )
 
-        visited = set()
-
         def normalize_url(url):
             return urldefrag(url)[0]
 
-        current_urls = {normalize_url(u) for u in start_urls}
+        # Token buckets per host (seeded from robots.txt) with AIMD backoff on 429/503
+        host_scheduler = HostPolitenessScheduler(
+            default_rate=host_rate,
+            max_rate=host_max_rate,
+            burst=max_concurrent,
+            crawl_delay_loader=DiscoveryService().get_crawl_delay,
+        )
+
+        # arun() crawls one page per call; streaming only applies to arun_many
+        page_config = run_config.clone(stream=False)
+
+        # Frontier of (url, depth) pairs. A URL is marked seen when it is queued, so
+        # each page is crawled at most once and at the shallowest depth it was found.
+        frontier: asyncio.Queue[tuple[str, int] | None] = asyncio.Queue()
+        seen: set[str] = set()
+        for start_url in start_urls:
+            normalized = normalize_url(start_url)
+            if normalized not in seen:
+                seen.add(normalized)
+                frontier.put_nowait((normalized, 0))
+
         results_all = []
+        pages_in_flight = 0
         total_processed = 0
-        total_discovered = len(current_urls)  # Track total URLs discovered (normalized & de-duped)
+        total_discovered = len(seen)  # Track total URLs discovered (normalized & de-duped)
         cancelled = False
+        failure: BaseException | None = None
 
-        for depth in range(max_depth):
-            # Check for cancellation at the start of each depth level
+        def check_cancelled() -> bool:
+            nonlocal cancelled
+            if cancelled:
+                return True
             if cancellation_check:
                 try:
                     cancellation_check()
                 except asyncio.CancelledError:
                     cancelled = True
-                    await report_progress(
-                        int(((depth) / max_depth) * 99),  # Cap at 99% for cancellation
-                        f"Crawl cancelled at depth {depth + 1}",
-                        status="cancelled",
-                        total_pages=total_discovered,
-                        processed_pages=total_processed,
-                    )
-                    break
-                except Exception:
-                    logger.exception("Unexpected error from cancellation_check()")
-                    raise
-
-            urls_to_crawl = [
-                normalize_url(url) for url in current_urls if normalize_url(url) not in visited
-            ]
-            if not urls_to_crawl:
-                break
-
-            # Calculate progress for this depth level
-            # Report 0-100 to properly integrate with ProgressMapper architecture
-            depth_progress = int((depth / max(max_depth, 1)) * 100)
-
-            await report_progress(
-                depth_progress,
-                f"Crawling depth {depth + 1}/{max_depth}: {len(urls_to_crawl)} URLs to process",
-                total_pages=total_discovered,
-                processed_pages=total_processed,
-            )
-
-            # Use configured batch size for recursive crawling
-            next_level_urls = set()
-            depth_successful = 0
-
-            for batch_idx in range(0, len(urls_to_crawl), batch_size):
-                # Check for cancellation before processing each batch
-                if cancellation_check:
-                    try:
-                        cancellation_check()
-                    except asyncio.CancelledError:
-                        cancelled = True
-                        break
-                    except Exception:
-                        logger.exception("Unexpected error from cancellation_check()")
-                        raise
-
-                batch_urls = urls_to_crawl[batch_idx : batch_idx + batch_size]
-                batch_end_idx = min(batch_idx + batch_size, len(urls_to_crawl))
-
-                # Transform URLs and create mapping for this batch
-                url_mapping = {}
-                transformed_batch_urls = []
-                for url in batch_urls:
-                    transformed = transform_url_func(url)
-                    transformed_batch_urls.append(transformed)
-                    url_mapping[transformed] = url
-
-                # Calculate overall progress based on URLs actually being crawled at this depth
-                # Use a more accurate progress calculation that accounts for depth
-                urls_at_this_depth = len(urls_to_crawl)
-                progress_within_depth = (batch_idx / urls_at_this_depth) if urls_at_this_depth > 0 else 0
-                # Weight by depth to show overall progress (later depths contribute less)
-                overall_progress = int(((depth + progress_within_depth) / max_depth) * 100)
-                await report_progress(
-                    min(overall_progress, 99),  # Never show 100% until actually complete
-                    f"Crawling URLs {batch_idx + 1}-{batch_end_idx} of {len(urls_to_crawl)} at depth {depth + 1}",
-                    total_pages=total_discovered,
-                    processed_pages=total_processed,
+            return cancelled
+
+        async def crawl_page(url: str, depth: int) -> None:
+            nonlocal total_processed, total_discovered
+
+            transformed = transform_url_func(url)
+            await host_scheduler.wait_if_needed(transformed)
+            try:
+                result = await self.crawler.arun(url=transformed, config=page_config)
+            except Exception as e:
+                logger.warning(f"Failed to crawl {url}: {e}")
+                host_scheduler.record_failure(transformed)
+                total_processed += 1
+                return
+
+            total_processed += 1
+            if not host_scheduler.update_delay(transformed, getattr(result, "status_code", None)):
+                logger.warning(f"Rate limit retry count exceeded for {host_scheduler.get_host(transformed)}")
+            # Redirect targets count as seen so links to them are not crawled again
+            if getattr(result, "url", None):
+                seen.add(normalize_url(result.url))
+
+            if not (result.success and result.markdown and result.markdown.fit_markdown):
+                logger.warning(
+                    f"Failed to crawl {url}: {getattr(result, 'error_message', 'Unknown error')}"
                 )
-
-                # Use arun_many for native parallel crawling with streaming
-                logger.info(f"Starting parallel crawl of {len(batch_urls)} URLs with arun_many")
-                batch_results = await self.crawler.arun_many(
-                    urls=transformed_batch_urls, config=run_config, dispatcher=dispatcher
-                )
-
-                # Handle streaming results from arun_many
-                i = 0
-                async for result in batch_results:
-                    # Check for cancellation during streaming results
-                    if cancellation_check:
+                return
+
+            # Extract title from HTML <title> tag
+            title = "Untitled"
+            if result.html:
+                import re
+                title_match = re.search(r'<title[^>]*>(.*?)</title>', result.html, re.IGNORECASE | re.DOTALL)
+                if title_match:
+                    extracted_title = title_match.group(1).strip()
+                    # Clean up HTML entities
+                    extracted_title = extracted_title.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"')
+                    if extracted_title:
+                        title = extracted_title
+
+            page = {
+                "url": url,
+                "markdown": result.markdown.fit_markdown,
+                "html": result.html,  # Always use raw HTML for code extraction
+                "title": title,
+                **extract_http_validators(getattr(result, "response_headers", None)),
+            }
+            if page_sink:
+                # Streaming mode: storage takes the page now, only a stub is kept here
+                await page_sink(page)
+                results_all.append({"url": url, "title": title, "streamed": True})
+            else:
+                results_all.append(page)
+
+            # Queue internal links for the next depth while other pages are still in flight
+            if depth + 1 >= max_depth:
+                return
+            links = getattr(result, "links", {}) or {}
+            for link in links.get("internal", []):
+                next_url = normalize_url(link["href"])
+                if next_url in seen:
+                    continue
+                # Skip binary files
+                if self.url_handler.is_binary_file(next_url):
+                    logger.debug(f"Skipping binary file from crawl queue: {next_url}")
+                    continue
+                seen.add(next_url)
+                total_discovered += 1  # Increment when we discover a new URL
+                frontier.put_nowait((next_url, depth + 1))
+
+        async def wait_for_memory() -> None:
+            """Memory backpressure: hold a worker back while system memory is above the threshold."""
+            # One page always stays in flight so the crawl cannot stall
+            while pages_in_flight > 0 and psutil.virtual_memory().percent >= memory_threshold:
+                await asyncio.sleep(check_interval)
+
+        async def worker() -> None:
+            nonlocal failure, cancelled, pages_in_flight
+            while True:
+                item = await frontier.get()
+                if item is None:
+                    frontier.task_done()
+                    return
+                url, depth = item
+                try:
+                    if failure is None and not check_cancelled():
+                        await wait_for_memory()
+                        pages_in_flight += 1
                         try:
-                            cancellation_check()
-                        except asyncio.CancelledError:
-                            cancelled = True
+                            await crawl_page(url, depth)
+                        finally:
+                            pages_in_flight -= 1
+                        if total_processed % 5 == 0:
                             await report_progress(
                                 min(int((total_processed / max(total_discovered, 1)) * 100), 99),
-                                "Crawl cancelled during batch processing",
-                                status="cancelled",
+                                f"Crawled {total_processed}/{total_discovered} pages (depth {depth + 1}/{max_depth})",
                                 total_pages=total_discovered,
                                 processed_pages=total_processed,
                             )
-                            break
-                        except Exception:
-                            logger.exception("Unexpected error from cancellation_check()")
-                            raise
-
-                    # Map back to original URL using the mapping dict
-                    original_url = url_mapping.get(result.url, result.url)
-
-                    norm_url = normalize_url(original_url)
-                    visited.add(norm_url)
-                    total_processed += 1
-
-                    if result.success and result.markdown and result.markdown.fit_markdown:
-                        # Extract title from HTML <title> tag
-                        title = "Untitled"
-                        if result.html:
-                            import re
-                            title_match = re.search(r'<title[^>]*>(.*?)</title>', result.html, re.IGNORECASE | re.DOTALL)
-                            if title_match:
-                                extracted_title = title_match.group(1).strip()
-                                # Clean up HTML entities
-                                extracted_title = extracted_title.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"')
-                                if extracted_title:
-                                    title = extracted_title
-
-                        results_all.append({
-                            "url": original_url,
-                            "markdown": result.markdown.fit_markdown,
-                            "html": result.html,  # Always use raw HTML for code extraction
-                            "title": title,
-                        })
-                        depth_successful += 1
-
-                        # Find internal links for next depth
-                        links = getattr(result, "links", {}) or {}
-                        for link in links.get("internal", []):
-                            next_url = normalize_url(link["href"])
-                            # Skip binary files and already visited URLs
-                            is_binary = self.url_handler.is_binary_file(next_url)
-                            if next_url not in visited and not is_binary:
-                                if next_url not in next_level_urls:
-                                    next_level_urls.add(next_url)
-                                    total_discovered += 1  # Increment when we discover a new URL
-                            elif is_binary:
-                                logger.debug(f"Skipping binary file from crawl queue: {next_url}")
-                    else:
-                        logger.warning(
-                            f"Failed to crawl {original_url}: {getattr(result, 'error_message', 'Unknown error')}"
-                        )
-
-                    # Skip the confusing "processed X/Y URLs" updates
-                    # The "crawling URLs" message at the start of each batch is more accurate
-                    i += 1
-                if cancelled:
-                    break
+                except asyncio.CancelledError:
+                    # Raised by the page sink when storage saw the crawl being cancelled
+                    cancelled = True
+                except Exception as e:
+                    # Unexpected errors (e.g. from the page sink) stop the whole crawl
+                    if failure is None:
+                        failure = e
+                finally:
+                    frontier.task_done()
 
-            if cancelled:
-                break
+        await report_progress(
+            0,
+            f"Crawling up to depth {max_depth} with {max_concurrent} concurrent sessions: {total_discovered} start URLs",
+            total_pages=total_discovered,
+            processed_pages=0,
+        )
+
+        # Every worker keeps a session busy as long as the frontier has URLs - no per-depth barrier
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrent)]
+        try:
+            await frontier.join()
+        finally:
+            # Sentinels stop workers that swallowed a cancellation mid-page; cancel stops idle ones
+            for task in workers:
+                frontier.put_nowait(None)
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-            current_urls = next_level_urls
+        if failure is not None:
+            raise failure
 
-            # Report completion of this depth
+        if cancelled:
             await report_progress(
-                int(((depth + 1) / max_depth) * 100),
-                f"Depth {depth + 1} completed: {depth_successful} pages crawled, {len(next_level_urls)} URLs found for next depth",
+                min(int((total_processed / max(total_discovered, 1)) * 100), 99),
+                "Crawl cancelled",
+                status="cancelled",
                 total_pages=total_discovered,
                 processed_pages=total_processed,
             )
-
-        if cancelled:
             return results_all
         await report_progress(
             100,
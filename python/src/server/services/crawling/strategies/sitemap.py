@@ -2,63 +2,284 @@
 Sitemap Crawling Strategy
 
 Handles crawling of URLs from XML sitemaps.
+
+Sitemaps are streamed with httpx and parsed incrementally, so memory stays flat
+for very large files. Sitemap indexes are followed recursively with bounded
+concurrency and gzip-compressed sitemaps (.xml.gz) are decompressed on the fly.
 """
 import asyncio
-from collections.abc import Callable
+import zlib
+from collections.abc import AsyncIterator, Callable
 from xml.etree import ElementTree
 
-import requests
+import httpx
 
 from ....config.logfire_config import get_logger
 
 logger = get_logger(__name__)
 
+SITEMAP_REQUEST_TIMEOUT = 30.0
+DEFAULT_MAX_CONCURRENT_FETCHES = 8
+MAX_INDEX_DEPTH = 5  # Nested <sitemapindex> levels to follow
+MAX_SITEMAPS = 1000  # Child sitemaps fetched per parse
+MAX_SITEMAP_BYTES = 100 * 1024 * 1024  # Decompressed size limit per sitemap (spec allows 50MB)
+STREAM_CHUNK_SIZE = 64 * 1024
+ENTRY_QUEUE_SIZE = 16  # Parsed chunks (lists of entries) buffered ahead of the consumer
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Marks the end of one sitemap fetch in the entry queue
+_SITEMAP_DONE = object()
+
+
+class _SitemapTarget:
+    """
+    Parser target collecting <url>/<sitemap> entries without building a tree.
+
+    expat calls start/data/end directly, so no elements are kept in memory; only
+    <loc>/<lastmod> that are direct children of an entry are read (image and video
+    extensions nest their own <loc> elements deeper).
+    """
+
+    def __init__(self):
+        self.entries: list[tuple[str, str, str | None]] = []
+        self._local_names: dict[str, str] = {}
+        self._depth = 0
+        self._entry_depth: int | None = None
+        self._field: str | None = None
+        self._text: list[str] = []
+        self._loc: str | None = None
+        self._lastmod: str | None = None
+
+    def _local(self, tag: str) -> str:
+        local = self._local_names.get(tag)
+        if local is None:
+            local = self._local_names[tag] = tag.rpartition("}")[2]
+        return local
+
+    def start(self, tag, attrib):
+        self._depth += 1
+        local = self._local(tag)
+        if local in ("url", "sitemap") and self._entry_depth is None:
+            self._entry_depth = self._depth
+            self._loc = self._lastmod = None
+        elif self._entry_depth is not None and self._depth == self._entry_depth + 1 and local in ("loc", "lastmod"):
+            self._field = local
+            self._text = []
+
+    def data(self, data):
+        if self._field:
+            self._text.append(data)
+
+    def end(self, tag):
+        if self._field:
+            value = "".join(self._text).strip() or None
+            if self._field == "loc":
+                self._loc = value
+            else:
+                self._lastmod = value
+            self._field = None
+        elif self._depth == self._entry_depth:
+            if self._loc:
+                self.entries.append((self._local(tag), self._loc, self._lastmod))
+            self._entry_depth = None
+        self._depth -= 1
+
+    def close(self):
+        return None
+
 
 class SitemapCrawlStrategy:
     """Strategy for parsing and crawling sitemaps."""
 
-    def parse_sitemap(self, sitemap_url: str, cancellation_check: Callable[[], None] | None = None) -> list[str]:
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient | None = None,
+        max_concurrent_fetches: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+    ):
+        """
+        Initialize sitemap strategy.
+
+        Args:
+            http_client: Optional HTTP client (one is created per parse otherwise)
+            max_concurrent_fetches: Maximum child sitemaps downloaded at once
+        """
+        self.http_client = http_client
+        self.max_concurrent_fetches = max(1, max_concurrent_fetches)
+
+    async def parse_sitemap(
+        self, sitemap_url: str, cancellation_check: Callable[[], None] | None = None
+    ) -> list[str]:
         """
         Parse a sitemap and extract URLs with comprehensive error handling.
-        
+
         Args:
-            sitemap_url: URL of the sitemap to parse
+            sitemap_url: URL of the sitemap (or sitemap index) to parse
             cancellation_check: Optional function to check for cancellation
-            
+
         Returns:
             List of URLs extracted from the sitemap
         """
-        urls = []
+        return [url for url, _ in await self.parse_sitemap_entries(sitemap_url, cancellation_check)]
 
-        try:
-            # Check for cancellation before making the request
-            if cancellation_check:
-                try:
-                    cancellation_check()
-                except asyncio.CancelledError:
-                    logger.info("Sitemap parsing cancelled by user")
-                    raise  # Re-raise to let the caller handle progress reporting
+    async def parse_sitemap_entries(
+        self, sitemap_url: str, cancellation_check: Callable[[], None] | None = None
+    ) -> list[tuple[str, str | None]]:
+        """
+        Parse a sitemap and extract URLs together with their <lastmod> values.
 
-            logger.info(f"Parsing sitemap: {sitemap_url}")
-            resp = requests.get(sitemap_url, timeout=30)
+        Args:
+            sitemap_url: URL of the sitemap (or sitemap index) to parse
+            cancellation_check: Optional function to check for cancellation
 
-            if resp.status_code != 200:
-                logger.error(f"Failed to fetch sitemap: HTTP {resp.status_code}")
-                return urls
+        Returns:
+            List of (url, lastmod) tuples; lastmod is None when the entry has none
+        """
+        entries = [entry async for entry in self.iter_sitemap_entries(sitemap_url, cancellation_check)]
+        logger.info(f"Successfully extracted {len(entries)} URLs from sitemap {sitemap_url}")
+        return entries
+
+    async def iter_sitemap_entries(
+        self, sitemap_url: str, cancellation_check: Callable[[], None] | None = None
+    ) -> AsyncIterator[tuple[str, str | None]]:
+        """
+        Stream (url, lastmod) entries from a sitemap, following sitemap indexes.
+
+        Child sitemaps are fetched concurrently (up to max_concurrent_fetches), so
+        entries from different files may interleave. Fetch and parse errors are
+        logged and skip only the affected file.
+
+        Args:
+            sitemap_url: URL of the sitemap (or sitemap index) to parse
+            cancellation_check: Optional function to check for cancellation
+
+        Yields:
+            (url, lastmod) tuples; lastmod is None when the entry has none
 
+        Raises:
+            asyncio.CancelledError: If cancellation_check reports a cancelled crawl
+        """
+        if cancellation_check:
             try:
-                tree = ElementTree.fromstring(resp.content)
-                urls = [loc.text for loc in tree.findall('.//{*}loc') if loc.text]
-                logger.info(f"Successfully extracted {len(urls)} URLs from sitemap")
+                cancellation_check()
+            except asyncio.CancelledError:
+                logger.info("Sitemap parsing cancelled by user")
+                raise  # Re-raise to let the caller handle progress reporting
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=ENTRY_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        seen_sitemaps = {sitemap_url}
+        tasks: set[asyncio.Task] = set()
+        client = self.http_client or httpx.AsyncClient(
+            follow_redirects=True, timeout=SITEMAP_REQUEST_TIMEOUT
+        )
 
+        async def fetch(url: str, depth: int) -> None:
+            try:
+                async with semaphore:
+                    logger.info(f"Parsing sitemap: {url}")
+                    async for parsed in self._stream_sitemap(client, url):
+                        url_entries = []
+                        for kind, loc, lastmod in parsed:
+                            if kind == "url":
+                                url_entries.append((loc, lastmod))
+                            elif loc in seen_sitemaps:
+                                continue
+                            elif depth >= MAX_INDEX_DEPTH or len(seen_sitemaps) >= MAX_SITEMAPS:
+                                logger.warning(f"Sitemap index limit reached, skipping child sitemap {loc}")
+                            else:
+                                seen_sitemaps.add(loc)
+                                schedule(loc, depth + 1)
+                        if url_entries:
+                            await queue.put(url_entries)
+            except httpx.HTTPError as e:
+                logger.error(f"Network error fetching sitemap from {url}: {e}")
             except ElementTree.ParseError:
-                logger.exception(f"Error parsing sitemap XML from {sitemap_url}")
+                logger.exception(f"Error parsing sitemap XML from {url}")
             except Exception:
-                logger.exception(f"Unexpected error parsing sitemap from {sitemap_url}")
+                logger.exception(f"Unexpected error in sitemap parsing for {url}")
+            finally:
+                # A cancelled fetch is being cleaned up - nobody waits for its marker
+                current = asyncio.current_task()
+                if not (current and current.cancelling()):
+                    await queue.put(_SITEMAP_DONE)
+
+        scheduled = 0
+
+        def schedule(url: str, depth: int) -> None:
+            nonlocal scheduled
+            # Counted before the parent finishes, so the consumer never stops early
+            scheduled += 1
+            task = asyncio.create_task(fetch(url, depth))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        schedule(sitemap_url, 0)
+        finished = 0
+        try:
+            while finished < scheduled:
+                item = await queue.get()
+                if item is _SITEMAP_DONE:
+                    finished += 1
+                    continue
+                if cancellation_check:
+                    try:
+                        cancellation_check()
+                    except asyncio.CancelledError:
+                        logger.info("Sitemap parsing cancelled by user")
+                        raise
+                for entry in item:
+                    yield entry
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.http_client is None:
+                await client.aclose()
+
+    async def _stream_sitemap(
+        self, client: httpx.AsyncClient, sitemap_url: str
+    ) -> AsyncIterator[list[tuple[str, str, str | None]]]:
+        """
+        Download and incrementally parse one sitemap file.
+
+        Yields:
+            Lists of entries parsed from each downloaded chunk: ("url", loc, lastmod)
+            for <url> entries and ("sitemap", loc, lastmod) for sitemap index children
+        """
+        async with client.stream("GET", sitemap_url) as response:
+            if response.status_code != 200:
+                logger.error(f"Failed to fetch sitemap {sitemap_url}: HTTP {response.status_code}")
+                return
+
+            target = _SitemapTarget()
+            parser = ElementTree.XMLParser(target=target)
+            decompressor = None
+            first_chunk = True
+            total_bytes = 0
+
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                if first_chunk:
+                    first_chunk = False
+                    # .xml.gz files are usually served without Content-Encoding, so httpx
+                    # hands us the compressed bytes; sniff the gzip header instead of the name
+                    if chunk.startswith(GZIP_MAGIC):
+                        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                data = decompressor.decompress(chunk) if decompressor else chunk
+
+                total_bytes += len(data)
+                if total_bytes > MAX_SITEMAP_BYTES:
+                    logger.warning(
+                        f"Sitemap {sitemap_url} exceeds {MAX_SITEMAP_BYTES // (1024 * 1024)}MB, "
+                        "ignoring the rest"
+                    )
+                    return
 
-        except requests.exceptions.RequestException:
-            logger.exception(f"Network error fetching sitemap from {sitemap_url}")
-        except Exception:
-            logger.exception(f"Unexpected error in sitemap parsing for {sitemap_url}")
+                parser.feed(data)
+                if target.entries:
+                    yield target.entries
+                    target.entries = []
 
-        return urls
+            parser.close()
+            if target.entries:
+                yield target.entries
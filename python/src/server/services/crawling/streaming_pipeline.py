@@ -0,0 +1,272 @@
+"""
+Streaming Storage Pipeline
+
+Overlaps crawling with chunking, embedding, storage and code extraction. Crawl
+strategies hand each finished page to the pipeline through a bounded asyncio
+queue; storage workers drain it in small page batches while the crawl keeps
+going. Memory is bounded by queue depth instead of the size of the site, and a
+slow embedding provider applies backpressure to the crawler.
+"""
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from ...config.logfire_config import get_logger, safe_logfire_error, safe_logfire_info
+from ..client_manager import execute_async
+
+logger = get_logger(__name__)
+
+DEFAULT_QUEUE_SIZE = 50
+DEFAULT_BATCH_PAGES = 10
+DEFAULT_WORKERS = 2
+
+# Marks the end of the page stream for a worker
+_STOP = object()
+
+
+class StreamingStoragePipeline:
+    """Stores crawled pages while the crawl is still running."""
+
+    def __init__(
+        self,
+        doc_storage_ops,
+        request: dict[str, Any],
+        source_id: str,
+        source_url: str | None = None,
+        source_display_name: str | None = None,
+        cancellation_check: Callable[[], None] | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_pages: int = DEFAULT_BATCH_PAGES,
+        workers: int = DEFAULT_WORKERS,
+        extract_code_examples: bool = True,
+        code_provider: str | None = None,
+        embedding_provider: str | None = None,
+    ):
+        """
+        Initialize the streaming pipeline.
+
+        Args:
+            doc_storage_ops: DocumentStorageOperations used for each page batch
+            request: The original crawl request
+            source_id: The source ID for all pages
+            source_url: Optional original URL that was crawled
+            source_display_name: Optional human-readable name for the source
+            cancellation_check: Optional function to check for cancellation
+            queue_size: Maximum pages waiting for storage before the crawler blocks
+            batch_pages: Pages stored per process_and_store_documents call
+            workers: Concurrent storage workers
+            extract_code_examples: Whether to extract code examples per batch
+            code_provider: LLM provider for code summaries
+            embedding_provider: Embedding provider override for code examples
+        """
+        self.doc_storage_ops = doc_storage_ops
+        self.request = request
+        self.source_id = source_id
+        self.source_url = source_url
+        self.source_display_name = source_display_name
+        self.cancellation_check = cancellation_check
+        self.batch_pages = max(1, batch_pages)
+        self.worker_count = max(1, workers)
+        self.extract_code_examples = extract_code_examples
+        self.code_provider = code_provider
+        self.embedding_provider = embedding_provider
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._workers: list[asyncio.Task] = []
+        self._source_lock = asyncio.Lock()
+        self._source_created = False
+        self._error: BaseException | None = None
+        self._aborted = False
+
+        self.pages_submitted = 0
+        self.pages_stored = 0
+        self.stats: dict[str, Any] = {
+            "chunk_count": 0,
+            "chunks_stored": 0,
+            "total_word_count": 0,
+            "code_examples_stored": 0,
+            "pages_unchanged": 0,
+            "chunks_unchanged": 0,
+            "chunks_removed": 0,
+            "unchanged_urls": [],
+        }
+
+    def start(self) -> None:
+        """Start the storage workers."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"streaming_storage_{i}")
+                for i in range(self.worker_count)
+            ]
+
+    async def submit(self, page: dict[str, Any], crawl_type: str) -> None:
+        """
+        Queue a crawled page for storage, waiting while the queue is full.
+
+        Raises:
+            asyncio.CancelledError: If storage noticed the crawl was cancelled
+            RuntimeError: If a storage worker already failed
+        """
+        if isinstance(self._error, asyncio.CancelledError):
+            raise asyncio.CancelledError()
+        if self._error is not None:
+            raise RuntimeError(f"Streaming storage failed: {self._error}") from self._error
+        self.start()
+        self.pages_submitted += 1
+        await self._queue.put((page, crawl_type))
+
+    def page_sink(self, crawl_type: str) -> Callable[[dict[str, Any]], Any]:
+        """Return a callback strategies can await for each finished page."""
+
+        async def sink(page: dict[str, Any]) -> None:
+            await self.submit(page, crawl_type)
+
+        return sink
+
+    async def close(self) -> dict[str, Any]:
+        """
+        Wait for every queued page to be stored and return aggregated storage stats.
+
+        Raises:
+            The first storage error, if any worker failed
+        """
+        self.start()
+        for _ in self._workers:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        if self._error is not None:
+            raise self._error
+
+        await self._update_source_word_count()
+
+        safe_logfire_info(
+            f"Streaming storage completed | pages={self.pages_stored}/{self.pages_submitted} | "
+            f"chunks_stored={self.stats['chunks_stored']} | code_examples={self.stats['code_examples_stored']}"
+        )
+        return {**self.stats, "source_id": self.source_id, "url_to_full_document": {}}
+
+    async def abort(self) -> None:
+        """Cancel workers without draining the queue (crawl failed or was cancelled)."""
+        self._aborted = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _worker(self) -> None:
+        batch: list[dict[str, Any]] = []
+        batch_crawl_type: str | None = None
+
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            page, crawl_type = item
+            # Pages of a different crawl type go into their own batch
+            if batch and crawl_type != batch_crawl_type:
+                await self._store_batch_safely(batch, batch_crawl_type)
+                batch = []
+            batch.append(page)
+            batch_crawl_type = crawl_type
+
+            if len(batch) >= self.batch_pages:
+                await self._store_batch_safely(batch, batch_crawl_type)
+                batch = []
+
+        if batch:
+            await self._store_batch_safely(batch, batch_crawl_type)
+
+    async def _store_batch_safely(self, pages: list[dict[str, Any]], crawl_type: str) -> None:
+        # After a failure keep draining so the crawler never blocks on a full queue
+        if self._error is not None:
+            return
+        try:
+            await self._store_batch(pages, crawl_type)
+        except asyncio.CancelledError as e:
+            if self._aborted:
+                raise
+            # Raised by cancellation_check - surfaced to the crawler on its next submit
+            self._error = e
+        except Exception as e:
+            logger.error("Streaming storage batch failed", exc_info=True)
+            safe_logfire_error(f"Streaming storage batch failed | pages={len(pages)} | error={e}")
+            self._error = e
+
+    async def _store_batch(self, pages: list[dict[str, Any]], crawl_type: str) -> None:
+        if self.cancellation_check:
+            self.cancellation_check()
+
+        # The first batch creates the source record (summary, FK target); later batches only add to it
+        if not self._source_created:
+            async with self._source_lock:
+                if not self._source_created:
+                    result = await self._process(pages, crawl_type, create_source_records=True)
+                    # Nothing chunked means no source record yet - let the next batch try
+                    self._source_created = result.get("chunk_count", 0) > 0
+                    await self._after_batch(pages, result)
+                    return
+
+        result = await self._process(pages, crawl_type, create_source_records=False)
+        await self._after_batch(pages, result)
+
+    async def _process(
+        self, pages: list[dict[str, Any]], crawl_type: str, create_source_records: bool
+    ) -> dict[str, Any]:
+        return await self.doc_storage_ops.process_and_store_documents(
+            pages,
+            self.request,
+            crawl_type,
+            self.source_id,
+            None,  # Crawl progress stays authoritative while streaming
+            self.cancellation_check,
+            source_url=self.source_url,
+            source_display_name=self.source_display_name,
+            create_source_records=create_source_records,
+        )
+
+    async def _after_batch(self, pages: list[dict[str, Any]], result: dict[str, Any]) -> None:
+        for key in ("chunk_count", "chunks_stored", "total_word_count", "pages_unchanged",
+                    "chunks_unchanged", "chunks_removed"):
+            self.stats[key] += result.get(key, 0)
+        unchanged_urls = result.get("unchanged_urls", [])
+        self.stats["unchanged_urls"].extend(unchanged_urls)
+        self.pages_stored += len(pages)
+
+        if result.get("chunk_count", 0) > 0 and result.get("chunks_stored", 0) == 0:
+            raise RuntimeError(
+                f"Failed to store documents: {result['chunk_count']} chunks processed but 0 stored"
+            )
+
+        if self.extract_code_examples and result.get("chunks_stored", 0) > 0:
+            skipped = set(unchanged_urls)
+            code_pages = [page for page in pages if (page.get("url") or "").strip() not in skipped]
+            try:
+                self.stats["code_examples_stored"] += await self.doc_storage_ops.extract_and_store_code_examples(
+                    code_pages,
+                    result.get("url_to_full_document", {}),
+                    self.source_id,
+                    None,
+                    self.cancellation_check,
+                    self.code_provider,
+                    self.embedding_provider,
+                )
+            except RuntimeError as e:
+                # Same policy as the non-streaming path: code extraction failures don't fail the crawl
+                logger.error("Code extraction failed for streamed batch", exc_info=True)
+                safe_logfire_error(f"Code extraction failed for streamed batch | error={e}")
+
+    async def _update_source_word_count(self) -> None:
+        """Replace the first batch's word count with the total across all batches."""
+        if not self._source_created:
+            return
+        try:
+            await execute_async(
+                self.doc_storage_ops.supabase_client.table("archon_sources")
+                .update({"total_word_count": self.stats["total_word_count"]})
+                .eq("source_id", self.source_id),
+                write=True,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update word count for source '{self.source_id}': {e}")
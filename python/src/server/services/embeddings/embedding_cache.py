@@ -0,0 +1,292 @@
+"""
+Embedding Cache
+
+Content-addressed cache for embedding vectors. Entries are keyed on provider,
+model, dimensions and a hash of the normalized text, so re-crawled chunks whose
+text did not change and repeated search queries are served from memory or the
+database instead of calling the embedding provider again.
+
+Two tiers are used:
+- an in-process LRU for hot entries (queries, chunks embedded moments ago),
+  holding float32 arrays and bounded by entry count and by bytes
+- the archon_embedding_cache table as the durable tier shared across restarts;
+  rows older than the retention period are pruned periodically
+"""
+
+import asyncio
+import hashlib
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from ...config.logfire_config import get_logger
+from ..client_manager import get_supabase_client
+
+logger = get_logger(__name__)
+
+CACHE_TABLE = "archon_embedding_cache"
+DEFAULT_MAX_ENTRIES = 50_000
+# Memory tier budget; vectors are float32, so 256 MB holds ~43k 1536-d embeddings
+DEFAULT_MAX_MB = 256
+# Durable tier rows older than this are deleted (0 keeps them forever)
+DEFAULT_RETENTION_DAYS = 30
+# Minimum time between two prunes of the durable tier
+PRUNE_INTERVAL_SECONDS = 3600
+
+# Keys per IN (...) lookup - keeps PostgREST query strings well below URL limits
+LOOKUP_CHUNK_SIZE = 50
+
+# How long to stop using the durable tier after it fails (e.g. table not migrated yet)
+PERSISTENT_RETRY_SECONDS = 300
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing so trivially different inputs share a key."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def make_cache_key(provider: str, model: str, dimensions: int | None, text: str) -> str:
+    """Build the content-addressed key for an embedding."""
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    identity = f"{provider.lower()}\x00{model}\x00{dimensions or 0}\x00{text_hash}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Hit/miss counters for the embedding cache."""
+
+    memory_hits: int = 0
+    persistent_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.persistent_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + database) cache of embedding vectors."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        persistent: bool = True,
+        supabase_client: Any | None = None,
+        max_mb: float = DEFAULT_MAX_MB,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, int(max_mb * 1024 * 1024))
+        self.persistent = persistent
+        self.retention_days = retention_days
+        self.stats = EmbeddingCacheStats()
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._memory_bytes = 0
+        self._supabase_client = supabase_client
+        self._persistent_retry_at = 0.0
+        self._prune_due_at = 0.0
+
+    def configure(
+        self,
+        max_entries: int | None = None,
+        persistent: bool | None = None,
+        max_mb: float | None = None,
+        retention_days: float | None = None,
+    ) -> None:
+        """Apply settings loaded at call time without dropping cached entries."""
+        if max_entries is not None:
+            self.max_entries = max(1, max_entries)
+        if max_mb is not None:
+            self.max_bytes = max(1, int(max_mb * 1024 * 1024))
+        self._evict()
+        if persistent is not None:
+            self.persistent = persistent
+        if retention_days is not None:
+            self.retention_days = retention_days
+
+    def _get_client(self) -> Any:
+        if self._supabase_client is None:
+            self._supabase_client = get_supabase_client()
+        return self._supabase_client
+
+    def _persistent_enabled(self) -> bool:
+        return self.persistent and time.monotonic() >= self._persistent_retry_at
+
+    def _disable_persistent(self, error: Exception) -> None:
+        self._persistent_retry_at = time.monotonic() + PERSISTENT_RETRY_SECONDS
+        logger.warning(
+            f"Embedding cache database tier unavailable, using memory only for "
+            f"{PERSISTENT_RETRY_SECONDS}s: {error}"
+        )
+
+    def _remember(self, key: str, embedding: list[float]) -> None:
+        # float32 arrays take 4 bytes per dimension instead of ~32 for a list of floats
+        vector = array("f", embedding)
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.itemsize * len(previous)
+        self._memory[key] = vector
+        self._memory_bytes += vector.itemsize * len(vector)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+            _, vector = self._memory.popitem(last=False)
+            self._memory_bytes -= vector.itemsize * len(vector)
+
+    async def get_many(
+        self,
+        provider: str,
+        model: str,
+        dimensions: int | None,
+        texts: list[str],
+    ) -> dict[int, list[float]]:
+        """
+        Look up cached embeddings for a list of texts.
+
+        Returns:
+            Mapping of text index to cached embedding; indices without an entry are misses
+        """
+        found: dict[int, list[float]] = {}
+        missing: dict[str, list[int]] = {}
+
+        for index, text in enumerate(texts):
+            key = make_cache_key(provider, model, dimensions, text)
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[index] = vector.tolist()
+                self.stats.memory_hits += 1
+            else:
+                missing.setdefault(key, []).append(index)
+
+        if missing and self._persistent_enabled():
+            try:
+                rows = await asyncio.to_thread(self._fetch_rows, list(missing))
+            except Exception as e:
+                self._disable_persistent(e)
+                rows = []
+
+            for row in rows:
+                key = row.get("cache_key")
+                embedding = row.get("embedding")
+                if key not in missing or not embedding:
+                    continue
+                self._remember(key, embedding)
+                for index in missing.pop(key):
+                    found[index] = embedding
+                    self.stats.persistent_hits += 1
+
+        self.stats.misses += sum(len(indices) for indices in missing.values())
+        return found
+
+    def _fetch_rows(self, keys: list[str]) -> list[dict[str, Any]]:
+        client = self._get_client()
+        rows: list[dict[str, Any]] = []
+        for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            response = (
+                client.table(CACHE_TABLE)
+                .select("cache_key, embedding")
+                .in_("cache_key", keys[i : i + LOOKUP_CHUNK_SIZE])
+                .execute()
+            )
+            rows.extend(response.data or [])
+        return rows
+
+    async def put_many(
+        self,
+        provider: str,
+        model: str,
+        dimensions: int | None,
+        texts: list[str],
+        embeddings: list[list[float]],
+    ) -> None:
+        """Store freshly created embeddings in both tiers."""
+        rows: dict[str, dict[str, Any]] = {}
+        for text, embedding in zip(texts, embeddings, strict=False):
+            key = make_cache_key(provider, model, dimensions, text)
+            self._remember(key, embedding)
+            rows[key] = {
+                "cache_key": key,
+                "provider": provider.lower(),
+                "model": model,
+                "dimensions": len(embedding),
+                "embedding": embedding,
+            }
+
+        if rows and self._persistent_enabled():
+            try:
+                await asyncio.to_thread(self._upsert_rows, list(rows.values()))
+                self.stats.writes += len(rows)
+            except Exception as e:
+                self._disable_persistent(e)
+            else:
+                await self._prune_if_due()
+
+    def _upsert_rows(self, rows: list[dict[str, Any]]) -> None:
+        self._get_client().table(CACHE_TABLE).upsert(
+            rows, on_conflict="cache_key", ignore_duplicates=True
+        ).execute()
+
+    async def _prune_if_due(self) -> None:
+        """Delete durable rows past the retention period, at most once per PRUNE_INTERVAL_SECONDS."""
+        if self.retention_days <= 0 or time.monotonic() < self._prune_due_at:
+            return
+        self._prune_due_at = time.monotonic() + PRUNE_INTERVAL_SECONDS
+        cutoff = datetime.now(UTC) - timedelta(days=self.retention_days)
+        try:
+            await asyncio.to_thread(self._delete_rows_before, cutoff)
+        except Exception as e:
+            logger.warning(f"Failed to prune expired embedding cache rows: {e}")
+
+    def _delete_rows_before(self, cutoff: datetime) -> None:
+        self._get_client().table(CACHE_TABLE).delete().lt("created_at", cutoff.isoformat()).execute()
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier (the database tier is left untouched)."""
+        self._memory.clear()
+        self._memory_bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current memory tier size."""
+        return {
+            **self.stats.to_dict(),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "retention_days": self.retention_days,
+            "persistent": self.persistent,
+        }
+
+
+# Global instance
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the global embedding cache instance."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
@@ -18,13 +18,32 @@ import openai
 from ...config.logfire_config import safe_span, search_logger
 from ..credential_service import credential_service
 from ..llm_provider_service import get_embedding_model, get_llm_client
-from ..threading_service import get_threading_service
+from ..threading_service import ConcurrencyLimiter, get_threading_service
+from .embedding_cache import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MB, DEFAULT_RETENTION_DAYS, get_embedding_cache
 from .embedding_exceptions import (
     EmbeddingAPIError,
     EmbeddingError,
     EmbeddingQuotaExhaustedError,
     EmbeddingRateLimitError,
 )
+from .multi_dimensional_embedding_service import multi_dimensional_embedding_service
+
+# In-flight sub-batch budget per embedding provider, shared by every concurrent batch:
+# provider -> (event loop, limiter)
+_provider_slots: dict[str, tuple[asyncio.AbstractEventLoop, ConcurrencyLimiter]] = {}
+
+
+def _get_provider_slots(provider: str, concurrency: int) -> ConcurrencyLimiter:
+    """Shared limiter bounding a provider's in-flight sub-batches (resized in place when the limit changes)."""
+    loop = asyncio.get_running_loop()
+    key = provider.lower()
+    entry = _provider_slots.get(key)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, ConcurrencyLimiter(concurrency))
+        _provider_slots[key] = entry
+    elif entry[1].limit != concurrency:
+        entry[1].resize(concurrency)
+    return entry[1]
 
 
 @dataclass
@@ -224,6 +243,26 @@ def _get_embedding_adapter(provider: str, client: Any) -> EmbeddingProviderAdapt
     return OpenAICompatibleEmbeddingAdapter(client)
 
 
+def _fit_dimensions(
+    embeddings: list[list[float]], model: str, dimensions: int | None
+) -> list[list[float]]:
+    """
+    Truncate Matryoshka embeddings that came back wider than requested.
+
+    Some OpenAI-compatible servers (e.g. Ollama) ignore the dimensions parameter;
+    for models trained with Matryoshka representation learning the renormalized
+    prefix is equivalent to asking for fewer dimensions.
+    """
+    if not dimensions or not multi_dimensional_embedding_service.supports_matryoshka(model):
+        return embeddings
+    return [
+        multi_dimensional_embedding_service.truncate_embedding(vector, dimensions)
+        if len(vector) > dimensions
+        else vector
+        for vector in embeddings
+    ]
+
+
 async def _maybe_await(value: Any) -> Any:
     """Await the value if it is awaitable, otherwise return as-is."""
 
@@ -306,6 +345,18 @@ async def create_embeddings_batch(
     "skip, don't corrupt" principle - failed items are tracked but not stored
     with zero embeddings.
 
+    Sub-batches are sent one after another by default. Setting
+    EMBEDDING_CONCURRENCY (or <PROVIDER>_EMBEDDING_CONCURRENCY) above 1 keeps up
+    to that many sub-batches per provider in flight, shared by concurrent calls and
+    within the global request limit; results are still returned in input order.
+
+    With USE_EMBEDDING_CACHE enabled, texts already embedded with the same
+    provider, model and dimensions are served from the embedding cache and only
+    the misses are sent to the provider.
+
+    Matryoshka models whose provider ignores EMBEDDING_DIMENSIONS are truncated
+    to it client-side.
+
     Args:
         texts: List of texts to create embeddings for
         progress_callback: Optional callback for progress reporting
@@ -380,123 +431,237 @@ async def create_embeddings_batch(
                     search_logger.info(f"Using batch size {batch_size} for provider {embedding_provider}")
 
                     embedding_dimensions = int(rag_settings.get("EMBEDDING_DIMENSIONS", "1536"))
+
+                    # Number of sub-batches kept in flight at once (1 = sequential)
+                    provider_concurrency_key = f"{embedding_provider.upper()}_EMBEDDING_CONCURRENCY"
+                    concurrency = max(1, int(rag_settings.get(
+                        provider_concurrency_key,
+                        rag_settings.get("EMBEDDING_CONCURRENCY", "1")
+                    )))
+
+                    use_cache = str(rag_settings.get("USE_EMBEDDING_CACHE", "false")).lower() == "true"
+                    cache_max_entries = int(
+                        rag_settings.get("EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+                    )
+                    cache_persistent = (
+                        str(rag_settings.get("EMBEDDING_CACHE_PERSISTENT", "true")).lower() == "true"
+                    )
+                    cache_max_mb = float(rag_settings.get("EMBEDDING_CACHE_MAX_MB", DEFAULT_MAX_MB))
+                    cache_retention_days = float(
+                        rag_settings.get("EMBEDDING_CACHE_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+                    )
                 except Exception as e:
                     search_logger.warning(f"Failed to load embedding settings: {e}, using defaults")
                     batch_size = 100
                     embedding_dimensions = 1536
+                    concurrency = 1
+                    use_cache = False
 
                 total_tokens_used = 0
                 adapter = _get_embedding_adapter(embedding_provider, client)
                 dimensions_to_use = embedding_dimensions if embedding_dimensions > 0 else None
 
-                for i in range(0, len(texts), batch_size):
-                    batch = texts[i : i + batch_size]
-                    batch_index = i // batch_size
+                # Serve unchanged texts from the embedding cache and only embed the misses
+                cache = None
+                cache_model = None
+                cached_embeddings: dict[int, list[float]] = {}
+                if use_cache:
+                    try:
+                        cache = get_embedding_cache()
+                        cache.configure(
+                            max_entries=cache_max_entries,
+                            persistent=cache_persistent,
+                            max_mb=cache_max_mb,
+                            retention_days=cache_retention_days,
+                        )
+                        cache_model = await get_embedding_model(provider=embedding_provider)
+                        cached_embeddings = await cache.get_many(
+                            embedding_provider, cache_model, dimensions_to_use, texts
+                        )
+                    except Exception as e:
+                        search_logger.warning(f"Embedding cache lookup failed, embedding all texts: {e}")
+                        cache = None
+                        cached_embeddings = {}
+                    span.set_attribute("cache_hits", len(cached_embeddings))
+                    span.set_attribute("cache_misses", len(texts) - len(cached_embeddings))
+
+                pending_indices = [i for i in range(len(texts)) if i not in cached_embeddings]
+                cached_order = sorted(cached_embeddings)
+                cached_cursor = 0
+
+                def flush_cached(before_index: int) -> None:
+                    """Record cache hits that precede before_index so results keep input order."""
+                    nonlocal cached_cursor
+                    while cached_cursor < len(cached_order) and cached_order[cached_cursor] < before_index:
+                        index = cached_order[cached_cursor]
+                        result.add_success(cached_embeddings[index], texts[index])
+                        cached_cursor += 1
+
+                def sub_batch_texts(start: int) -> list[str]:
+                    return [texts[i] for i in pending_indices[start : start + batch_size]]
+
+                batch_starts = list(range(0, len(pending_indices), batch_size))
+                quota_exhausted = asyncio.Event()
+                # Concurrent mode bounds the provider's in-flight sub-batches across all
+                # batches (the configured budget, not this call's share of it); the global
+                # concurrent-request limit is sized to fit that budget and the rate limits
+                # still apply.
+                dispatch_slots = _get_provider_slots(embedding_provider, concurrency) if concurrency > 1 else None
+                threading_service.rate_limiter.reserve_concurrency(
+                    f"embeddings:{embedding_provider.lower()}", concurrency
+                )
+                span.set_attribute("concurrency", min(concurrency, max(1, len(batch_starts))))
+
+                # Create rate limit progress callback if we have a progress callback
+                rate_limit_callback = None
+                if progress_callback:
+                    async def rate_limit_callback(data: dict):
+                        # Send heartbeat during rate limit wait
+                        processed = result.success_count + result.failure_count
+                        message = f"Rate limited: {data.get('message', 'Waiting...')}"
+                        await progress_callback(message, (processed / len(texts)) * 100)
+
+                async def embed_sub_batch(
+                    start: int,
+                ) -> tuple[list[list[float]] | None, Exception | None]:
+                    """
+                    Embed one sub-batch with rate limiting and retries.
+
+                    Returns (embeddings, None) on success, (None, error) on failure and
+                    (None, None) when the sub-batch was skipped after quota exhaustion.
+                    """
+                    batch = sub_batch_texts(start)
+                    batch_index = start // batch_size
+                    batch_tokens = sum(len(text.split()) for text in batch) * 1.3
+
+                    if quota_exhausted.is_set():
+                        return None, None
 
                     try:
-                        # Estimate tokens for this batch
-                        batch_tokens = sum(len(text.split()) for text in batch) * 1.3
-                        total_tokens_used += batch_tokens
+                        async with threading_service.rate_limited_operation(
+                            batch_tokens, rate_limit_callback, concurrency_limiter=dispatch_slots
+                        ):
+                            # Sub-batches queued behind the quota failure never hit the API
+                            if quota_exhausted.is_set():
+                                return None, None
 
-                        # Create rate limit progress callback if we have a progress callback
-                        rate_limit_callback = None
-                        if progress_callback:
-                            async def rate_limit_callback(data: dict):
-                                # Send heartbeat during rate limit wait
-                                processed = result.success_count + result.failure_count
-                                message = f"Rate limited: {data.get('message', 'Waiting...')}"
-                                await progress_callback(message, (processed / len(texts)) * 100)
-
-                        # Rate limit each batch
-                        async with threading_service.rate_limited_operation(batch_tokens, rate_limit_callback):
                             retry_count = 0
                             max_retries = 3
 
-                            while retry_count < max_retries:
+                            while True:
                                 try:
-                                    # Create embeddings for this batch
                                     embedding_model = await get_embedding_model(provider=embedding_provider)
                                     embeddings = await adapter.create_embeddings(
                                         batch,
                                         embedding_model,
                                         dimensions=dimensions_to_use,
                                     )
-
-                                    for text, vector in zip(batch, embeddings, strict=False):
-                                        result.add_success(vector, text)
-
-                                    break  # Success, exit retry loop
+                                    embeddings = _fit_dimensions(
+                                        embeddings, embedding_model, dimensions_to_use
+                                    )
+                                    break
 
                                 except openai.RateLimitError as e:
-                                    error_message = str(e)
-                                    if "insufficient_quota" in error_message:
-                                        # Quota exhausted is critical - stop everything
-                                        tokens_so_far = total_tokens_used - batch_tokens
-                                        cost_so_far = (tokens_so_far / 1_000_000) * 0.02
-
-                                        search_logger.error(
-                                            f"⚠️ QUOTA EXHAUSTED at batch {batch_index}! "
-                                            f"Processed {result.success_count} texts successfully.",
-                                            exc_info=True,
-                                        )
-
-                                        # Add remaining texts as failures
-                                        for text in texts[i:]:
-                                            result.add_failure(
-                                                text,
-                                                EmbeddingQuotaExhaustedError(
-                                                    "OpenAI quota exhausted",
-                                                    tokens_used=tokens_so_far,
-                                                ),
-                                                batch_index,
-                                            )
-
-                                        # Return what we have so far
-                                        span.set_attribute("quota_exhausted", True)
-                                        span.set_attribute("partial_success", True)
-                                        return result
-
-                                    else:
-                                        # Regular rate limit - retry
-                                        retry_count += 1
-                                        if retry_count < max_retries:
-                                            wait_time = 2**retry_count
-                                            search_logger.warning(
-                                                f"Rate limit hit for batch {batch_index}, "
-                                                f"waiting {wait_time}s before retry {retry_count}/{max_retries}"
-                                            )
-                                            await asyncio.sleep(wait_time)
-                                        else:
-                                            raise  # Will be caught by outer try
+                                    if "insufficient_quota" in str(e):
+                                        # Quota exhausted is critical - stop dispatching
+                                        quota_exhausted.set()
+                                        raise
+
+                                    # Regular rate limit - retry
+                                    retry_count += 1
+                                    if retry_count >= max_retries:
+                                        raise
+                                    wait_time = 2**retry_count
+                                    search_logger.warning(
+                                        f"Rate limit hit for batch {batch_index}, "
+                                        f"waiting {wait_time}s before retry {retry_count}/{max_retries}"
+                                    )
+                                    await asyncio.sleep(wait_time)
                                 except EmbeddingRateLimitError as e:
                                     retry_count += 1
-                                    if retry_count < max_retries:
-                                        wait_time = 2**retry_count
-                                        search_logger.warning(
-                                            f"Embedding rate limit for batch {batch_index}: {e}. "
-                                            f"Waiting {wait_time}s before retry {retry_count}/{max_retries}"
-                                        )
-                                        await asyncio.sleep(wait_time)
-                                    else:
+                                    if retry_count >= max_retries:
                                         raise
+                                    wait_time = 2**retry_count
+                                    search_logger.warning(
+                                        f"Embedding rate limit for batch {batch_index}: {e}. "
+                                        f"Waiting {wait_time}s before retry {retry_count}/{max_retries}"
+                                    )
+                                    await asyncio.sleep(wait_time)
 
                     except Exception as e:
-                        # This batch failed - track failures but continue with next batch
-                        search_logger.error(f"Batch {batch_index} failed: {e}", exc_info=True)
-
-                        for text in batch:
-                            if isinstance(e, EmbeddingError):
-                                result.add_failure(text, e, batch_index)
-                            else:
-                                result.add_failure(
-                                    text,
-                                    EmbeddingAPIError(
-                                        f"Failed to create embedding: {str(e)}", original_error=e
-                                    ),
-                                    batch_index,
-                                )
-
-                    # Progress reporting
+                        return None, e
+
+                    if cache is not None:
+                        await cache.put_many(
+                            embedding_provider, cache_model, dimensions_to_use, batch, embeddings
+                        )
+                    return embeddings, None
+
+                def record_sub_batch(
+                    start: int,
+                    embeddings: list[list[float]] | None,
+                    error: Exception | None,
+                ) -> bool:
+                    """
+                    Fold one sub-batch outcome into the result, in input order.
+
+                    Returns True when the sub-batch hit (or was skipped because of)
+                    quota exhaustion.
+                    """
+                    nonlocal total_tokens_used
+
+                    batch_indices = pending_indices[start : start + batch_size]
+                    batch_index = start // batch_size
+                    batch_tokens = sum(len(texts[i].split()) for i in batch_indices) * 1.3
+
+                    if embeddings is not None:
+                        total_tokens_used += batch_tokens
+                        for index, vector in zip(batch_indices, embeddings, strict=False):
+                            flush_cached(index)
+                            result.add_success(vector, texts[index])
+                        return False
+
+                    if error is None or (
+                        isinstance(error, openai.RateLimitError)
+                        and "insufficient_quota" in str(error)
+                    ):
+                        if error is not None:
+                            search_logger.error(
+                                f"⚠️ QUOTA EXHAUSTED at batch {batch_index}! "
+                                f"Processed {result.success_count} texts successfully.",
+                                exc_info=error,
+                            )
+                        for index in batch_indices:
+                            flush_cached(index)
+                            result.add_failure(
+                                texts[index],
+                                EmbeddingQuotaExhaustedError(
+                                    "OpenAI quota exhausted",
+                                    tokens_used=total_tokens_used,
+                                ),
+                                batch_index,
+                            )
+                        return True
+
+                    # This batch failed - track failures but continue with next batch
+                    total_tokens_used += batch_tokens
+                    search_logger.error(f"Batch {batch_index} failed: {error}", exc_info=error)
+
+                    for index in batch_indices:
+                        flush_cached(index)
+                        if isinstance(error, EmbeddingError):
+                            result.add_failure(texts[index], error, batch_index)
+                        else:
+                            result.add_failure(
+                                texts[index],
+                                EmbeddingAPIError(
+                                    f"Failed to create embedding: {str(error)}", original_error=error
+                                ),
+                                batch_index,
+                            )
+                    return False
+
+                async def report_batch_progress():
                     if progress_callback:
                         processed = result.success_count + result.failure_count
                         progress = (processed / len(texts)) * 100
@@ -507,8 +672,54 @@ async def create_embeddings_batch(
 
                         await progress_callback(message, progress)
 
-                    # Yield control
-                    await asyncio.sleep(0.01)
+                hit_quota = False
+                if dispatch_slots is None:
+                    for start in batch_starts:
+                        embeddings, error = await embed_sub_batch(start)
+                        if record_sub_batch(start, embeddings, error):
+                            # Quota exhausted - fail the remaining texts without calling the API
+                            hit_quota = True
+                            for index in pending_indices[start + batch_size :]:
+                                flush_cached(index)
+                                result.add_failure(
+                                    texts[index],
+                                    EmbeddingQuotaExhaustedError(
+                                        "OpenAI quota exhausted",
+                                        tokens_used=total_tokens_used,
+                                    ),
+                                    start // batch_size,
+                                )
+                            break
+
+                        await report_batch_progress()
+
+                        # Yield control
+                        await asyncio.sleep(0.01)
+                else:
+                    # Keep `concurrency` sub-batches in flight and fold the outcomes back
+                    # in input order, so embeddings line up with texts exactly as in
+                    # sequential mode.
+                    tasks = [asyncio.create_task(embed_sub_batch(start)) for start in batch_starts]
+                    try:
+                        for start, task in zip(batch_starts, tasks, strict=True):
+                            embeddings, error = await task
+                            hit_quota = record_sub_batch(start, embeddings, error) or hit_quota
+                            await report_batch_progress()
+                    finally:
+                        for task in tasks:
+                            if not task.done():
+                                task.cancel()
+
+                flush_cached(len(texts))
+                if not batch_starts:
+                    # Everything was served from the cache
+                    await report_batch_progress()
+
+                if hit_quota:
+                    # Return what we have so far
+                    span.set_attribute("quota_exhausted", True)
+                    span.set_attribute("partial_success", True)
+                    return result
 
                 span.set_attribute("embeddings_created", result.success_count)
                 span.set_attribute("embeddings_failed", result.failure_count)
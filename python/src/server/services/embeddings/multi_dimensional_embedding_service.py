@@ -5,8 +5,15 @@ Manages embeddings with different dimensions (768, 1024, 1536, 3072) to support
 various embedding models from OpenAI, Google, Ollama, and other providers.
 
 This service works with the tested database schema that has been validated.
+
+Embeddings can additionally be stored in a compact form next to the
+full-precision column (EMBEDDING_STORAGE_MODE): "halfvec" keeps a 16-bit copy
+in embedding_<dim>_half, "binary" keeps one sign bit per dimension in
+embedding_<dim>_bin. The compact columns carry the ANN index; search re-scores
+the candidates over the full-precision vectors.
 """
 
+import math
 from typing import Any
 
 from ...config.logfire_config import get_logger
@@ -22,6 +29,24 @@ SUPPORTED_DIMENSIONS = {
     3072: []   # OpenAI large models (text-embedding-3-large)
 }
 
+# Storage modes and the suffix of their compact column (full precision has none)
+STORAGE_MODES = {
+    "full": "",
+    "halfvec": "_half",
+    "binary": "_bin",
+}
+
+# Models trained with Matryoshka representation learning: a prefix of the vector,
+# renormalized, is itself a usable embedding
+MATRYOSHKA_MODEL_PATTERNS = (
+    "text-embedding-3",
+    "nomic-embed-text",
+    "mxbai-embed-large",
+    "snowflake-arctic-embed",
+    "gemini-embedding",
+    "text-embedding-004",
+)
+
 class MultiDimensionalEmbeddingService:
     """Service for managing embeddings with multiple dimensions."""
     
@@ -72,5 +97,46 @@ class MultiDimensionalEmbeddingService:
         """Check if a dimension is supported by the database schema."""
         return dimension in SUPPORTED_DIMENSIONS
 
+    def normalize_storage_mode(self, storage_mode: str | None) -> str:
+        """Validate a storage mode setting, falling back to full precision."""
+        mode = (storage_mode or "full").strip().lower()
+        if mode not in STORAGE_MODES:
+            logger.warning(f"Unknown embedding storage mode {storage_mode!r}, using full precision")
+            return "full"
+        return mode
+
+    def get_quantized_column_name(self, embedding_column: str, storage_mode: str) -> str:
+        """Get the column searched by the ANN index for a full-precision column and storage mode."""
+        return f"{embedding_column}{STORAGE_MODES[storage_mode]}"
+
+    def get_quantized_columns(
+        self, embedding_column: str, embedding: list[float], storage_mode: str
+    ) -> dict[str, Any]:
+        """
+        Get the compact column values stored next to a full-precision embedding.
+
+        halfvec values are sent as floats and narrowed by Postgres; binary values
+        are bit strings with 1 for each positive component (pgvector's binary_quantize).
+        """
+        if storage_mode == "halfvec":
+            return {self.get_quantized_column_name(embedding_column, storage_mode): list(embedding)}
+        if storage_mode == "binary":
+            bits = "".join("1" if value > 0 else "0" for value in embedding)
+            return {self.get_quantized_column_name(embedding_column, storage_mode): bits}
+        return {}
+
+    def supports_matryoshka(self, model_name: str | None) -> bool:
+        """Check if a model's embeddings can be truncated to fewer dimensions."""
+        model_lower = (model_name or "").lower()
+        return any(pattern in model_lower for pattern in MATRYOSHKA_MODEL_PATTERNS)
+
+    def truncate_embedding(self, embedding: list[float], dimensions: int) -> list[float]:
+        """Keep the first dimensions components of a Matryoshka embedding and renormalize."""
+        truncated = list(embedding[:dimensions])
+        norm = math.sqrt(sum(value * value for value in truncated))
+        if norm == 0:
+            return truncated
+        return [value / norm for value in truncated]
+
 # Global instance
 multi_dimensional_embedding_service = MultiDimensionalEmbeddingService()
\ No newline at end of file
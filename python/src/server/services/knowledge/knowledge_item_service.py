@@ -4,9 +4,11 @@ Knowledge Item Service
 Handles all knowledge item CRUD operations and data transformations.
 """
 
+import asyncio
 from typing import Any
 
 from ...config.logfire_config import safe_logfire_error, safe_logfire_info
+from ..client_manager import execute_async
 
 
 class KnowledgeItemService:
@@ -73,15 +75,15 @@ class KnowledgeItemService:
                     f"title.ilike.{search_pattern},summary.ilike.{search_pattern},source_id.ilike.{search_pattern}"
                 )
 
-            count_result = count_query.execute()
-            total = count_result.count if hasattr(count_result, "count") else 0
-
             # Apply pagination at database level
             start_idx = (page - 1) * per_page
             query = query.range(start_idx, start_idx + per_page - 1)
 
-            # Execute query
-            result = query.execute()
+            # Count and page queries are independent - run them concurrently
+            count_result, result = await asyncio.gather(
+                execute_async(count_query), execute_async(query)
+            )
+            total = count_result.count if hasattr(count_result, "count") else 0
             sources = result.data if result.data else []
 
             # Get source IDs for batch queries
@@ -97,11 +99,10 @@ class KnowledgeItemService:
 
             if source_ids:
                 # Batch fetch first URLs
-                urls_result = (
+                urls_result = await execute_async(
                     self.supabase.from_("archon_crawled_pages")
                     .select("source_id, url")
                     .in_("source_id", source_ids)
-                    .execute()
                 )
 
                 # Group URLs by source_id (take first one for each)
@@ -110,14 +111,16 @@ class KnowledgeItemService:
                         first_urls[item["source_id"]] = item["url"]
 
                 # Get code example counts per source - NO CONTENT, just counts!
-                # Fetch counts individually for each source
-                for source_id in source_ids:
-                    count_result = (
+                # Fetch counts individually for each source, concurrently
+                count_results = await asyncio.gather(*(
+                    execute_async(
                         self.supabase.from_("archon_code_examples")
                         .select("id", count="exact", head=True)
                         .eq("source_id", source_id)
-                        .execute()
                     )
+                    for source_id in source_ids
+                ))
+                for source_id, count_result in zip(source_ids, count_results, strict=True):
                     code_example_counts[source_id] = (
                         count_result.count if hasattr(count_result, "count") else 0
                     )
@@ -213,12 +216,11 @@ class KnowledgeItemService:
             safe_logfire_info(f"Getting knowledge item | source_id={source_id}")
 
             # Get the source record
-            result = (
+            result = await execute_async(
                 self.supabase.from_("archon_sources")
                 .select("*")
                 .eq("source_id", source_id)
                 .single()
-                .execute()
             )
 
             if not result.data:
@@ -272,11 +274,10 @@ class KnowledgeItemService:
 
             if metadata_updates:
                 # Get current metadata
-                current_response = (
+                current_response = await execute_async(
                     self.supabase.table("archon_sources")
                     .select("metadata")
                     .eq("source_id", source_id)
-                    .execute()
                 )
                 if current_response.data:
                     current_metadata = current_response.data[0].get("metadata", {})
@@ -286,11 +287,10 @@ class KnowledgeItemService:
                     update_data["metadata"] = metadata_updates
 
             # Perform the update
-            result = (
+            result = await execute_async(
                 self.supabase.table("archon_sources")
                 .update(update_data)
                 .eq("source_id", source_id)
-                .execute()
             )
 
             if result.data:
@@ -319,7 +319,9 @@ class KnowledgeItemService:
         """
         try:
             # Query the sources table
-            result = self.supabase.from_("archon_sources").select("*").order("source_id").execute()
+            result = await execute_async(
+                self.supabase.from_("archon_sources").select("*").order("source_id")
+            )
 
             # Format the sources
             sources = []
@@ -402,12 +404,11 @@ class KnowledgeItemService:
     async def _get_first_page_url(self, source_id: str) -> str:
         """Get the first page URL for a source."""
         try:
-            pages_response = (
+            pages_response = await execute_async(
                 self.supabase.from_("archon_crawled_pages")
                 .select("url")
                 .eq("source_id", source_id)
                 .limit(1)
-                .execute()
             )
 
             if pages_response.data:
@@ -421,11 +422,10 @@ class KnowledgeItemService:
     async def _get_code_examples(self, source_id: str) -> list[dict[str, Any]]:
         """Get code examples for a source."""
         try:
-            code_examples_response = (
+            code_examples_response = await execute_async(
                 self.supabase.from_("archon_code_examples")
                 .select("id, content, summary, metadata")
                 .eq("source_id", source_id)
-                .execute()
             )
 
             return code_examples_response.data if code_examples_response.data else []
@@ -463,11 +463,10 @@ class KnowledgeItemService:
         """Get the actual number of chunks for a source."""
         try:
             # Count the actual rows in crawled_pages for this source
-            result = (
+            result = await execute_async(
                 self.supabase.table("archon_crawled_pages")
                 .select("*", count="exact")
                 .eq("source_id", source_id)
-                .execute()
             )
 
             # Return the count of pages (chunks)
@@ -5,9 +5,11 @@ Provides lightweight summary data for knowledge items to minimize data transfer.
 Optimized for frequent polling and card displays.
 """
 
+import asyncio
 from typing import Any, Optional
 
 from ...config.logfire_config import safe_logfire_info, safe_logfire_error
+from ..client_manager import execute_async
 
 
 class KnowledgeSummaryService:
@@ -81,16 +83,16 @@ class KnowledgeSummaryService:
                     f"title.ilike.{search_pattern},summary.ilike.{search_pattern}"
                 )
             
-            count_result = count_query.execute()
-            total = count_result.count if hasattr(count_result, "count") else 0
-            
             # Apply pagination
             start_idx = (page - 1) * per_page
             query = query.range(start_idx, start_idx + per_page - 1)
             query = query.order("updated_at", desc=True)
             
-            # Execute main query
-            result = query.execute()
+            # Count and main query are independent - run them concurrently
+            count_result, result = await asyncio.gather(
+                execute_async(count_query), execute_async(query)
+            )
+            total = count_result.count if hasattr(count_result, "count") else 0
             sources = result.data if result.data else []
             
             # Get source IDs for batch operations
@@ -100,14 +102,12 @@ class KnowledgeSummaryService:
             summaries = []
             
             if source_ids:
-                # Get document counts in a single query
-                doc_counts = await self._get_document_counts_batch(source_ids)
-                
-                # Get code example counts in a single query
-                code_counts = await self._get_code_example_counts_batch(source_ids)
-                
-                # Get first URLs in a single query
-                first_urls = await self._get_first_urls_batch(source_ids)
+                # Document counts, code example counts and first URLs are fetched concurrently
+                doc_counts, code_counts, first_urls = await asyncio.gather(
+                    self._get_document_counts_batch(source_ids),
+                    self._get_code_example_counts_batch(source_ids),
+                    self._get_first_urls_batch(source_ids),
+                )
                 
                 # Build summaries
                 for source in sources:
@@ -179,14 +179,16 @@ class KnowledgeSummaryService:
             # Group by source_id and count
             counts = {}
             
-            # For now, use individual queries but optimize later with raw SQL
-            for source_id in source_ids:
-                result = (
+            # For now, use individual (concurrent) queries but optimize later with raw SQL
+            results = await asyncio.gather(*(
+                execute_async(
                     self.supabase.from_("archon_crawled_pages")
                     .select("id", count="exact", head=True)
                     .eq("source_id", source_id)
-                    .execute()
                 )
+                for source_id in source_ids
+            ))
+            for source_id, result in zip(source_ids, results, strict=True):
                 counts[source_id] = result.count if hasattr(result, "count") else 0
             
             return counts
@@ -208,14 +210,16 @@ class KnowledgeSummaryService:
         try:
             counts = {}
             
-            # For now, use individual queries but can optimize with raw SQL later
-            for source_id in source_ids:
-                result = (
+            # For now, use individual (concurrent) queries but can optimize with raw SQL later
+            results = await asyncio.gather(*(
+                execute_async(
                     self.supabase.from_("archon_code_examples")
                     .select("id", count="exact", head=True)
                     .eq("source_id", source_id)
-                    .execute()
                 )
+                for source_id in source_ids
+            ))
+            for source_id, result in zip(source_ids, results, strict=True):
                 counts[source_id] = result.count if hasattr(result, "count") else 0
             
             return counts
@@ -236,12 +240,11 @@ class KnowledgeSummaryService:
         """
         try:
             # Get all first URLs in one query
-            result = (
+            result = await execute_async(
                 self.supabase.from_("archon_crawled_pages")
                 .select("source_id, url")
                 .in_("source_id", source_ids)
                 .order("created_at", desc=False)
-                .execute()
             )
             
             # Group by source_id, keeping first URL for each
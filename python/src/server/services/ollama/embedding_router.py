@@ -73,7 +73,8 @@ class EmbeddingRouter:
         self.cache_ttl = 300  # 5 minutes cache TTL
 
     async def route_embedding(self, model_name: str, instance_url: str,
-                            text_content: str | None = None) -> RoutingDecision:
+                            text_content: str | None = None,
+                            storage_mode: str = "full") -> RoutingDecision:
         """
         Determine the optimal routing for an embedding operation.
 
@@ -81,12 +82,15 @@ class EmbeddingRouter:
             model_name: Name of the embedding model to use
             instance_url: URL of the Ollama instance
             text_content: Optional text content for dynamic optimization
+            storage_mode: Embedding storage mode (full, halfvec or binary)
 
         Returns:
             RoutingDecision with target column and routing information
         """
+        storage_mode = multi_dimensional_embedding_service.normalize_storage_mode(storage_mode)
+
         # Check cache first
-        cache_key = f"{model_name}@{instance_url}"
+        cache_key = f"{model_name}@{instance_url}:{storage_mode}"
         if cache_key in self.routing_cache:
             cached_decision = self.routing_cache[cache_key]
             logger.debug(f"Using cached routing decision for {model_name}")
@@ -101,13 +105,14 @@ class EmbeddingRouter:
             if dimensions:
                 # Step 2: Route to appropriate column based on detected dimensions
                 decision = await self._route_by_dimensions(
-                    model_name, instance_url, dimensions, strategy="auto-detect"
+                    model_name, instance_url, dimensions, strategy="auto-detect",
+                    storage_mode=storage_mode
                 )
                 logger.info(f"Auto-detected routing: {model_name} -> {decision.target_column} ({dimensions}D)")
 
             else:
                 # Step 3: Fallback to model name mapping
-                decision = await self._route_by_model_mapping(model_name, instance_url)
+                decision = await self._route_by_model_mapping(model_name, instance_url, storage_mode)
                 logger.warning(f"Fallback routing applied for {model_name} -> {decision.target_column}")
 
             # Cache the decision
@@ -120,7 +125,7 @@ class EmbeddingRouter:
 
             # Emergency fallback to largest supported dimension
             return RoutingDecision(
-                target_column="embedding_3072",
+                target_column=self._get_target_column(3072, storage_mode),
                 model_name=model_name,
                 instance_url=instance_url,
                 dimensions=3072,
@@ -167,7 +172,8 @@ class EmbeddingRouter:
             return None
 
     async def _route_by_dimensions(self, model_name: str, instance_url: str,
-                                 dimensions: int, strategy: str) -> RoutingDecision:
+                                 dimensions: int, strategy: str,
+                                 storage_mode: str = "full") -> RoutingDecision:
         """
         Route embedding based on detected dimensions.
 
@@ -176,12 +182,13 @@ class EmbeddingRouter:
             instance_url: Ollama instance URL
             dimensions: Detected embedding dimensions
             strategy: Routing strategy used
+            storage_mode: Embedding storage mode (full, halfvec or binary)
 
         Returns:
             RoutingDecision for the detected dimensions
         """
         # Get target column for dimensions
-        target_column = self._get_target_column(dimensions)
+        target_column = self._get_target_column(dimensions, storage_mode)
 
         # Calculate confidence based on exact dimension match
         confidence = 1.0 if dimensions in self.DIMENSION_COLUMNS else 0.7
@@ -203,20 +210,24 @@ class EmbeddingRouter:
             routing_strategy=strategy
         )
 
-    async def _route_by_model_mapping(self, model_name: str, instance_url: str) -> RoutingDecision:
+    async def _route_by_model_mapping(self, model_name: str, instance_url: str,
+                                      storage_mode: str = "full") -> RoutingDecision:
         """
         Route embedding based on model name mapping when auto-detection fails.
 
         Args:
             model_name: Name of the model
             instance_url: Ollama instance URL
+            storage_mode: Embedding storage mode (full, halfvec or binary)
 
         Returns:
             RoutingDecision based on model name mapping
         """
         # Use the existing multi-dimensional service for model mapping
         dimensions = multi_dimensional_embedding_service.get_dimension_for_model(model_name)
-        target_column = multi_dimensional_embedding_service.get_embedding_column_name(dimensions)
+        target_column = multi_dimensional_embedding_service.get_quantized_column_name(
+            multi_dimensional_embedding_service.get_embedding_column_name(dimensions), storage_mode
+        )
 
         logger.info(f"Model mapping: {model_name} -> {dimensions}D -> {target_column}")
 
@@ -230,16 +241,27 @@ class EmbeddingRouter:
             routing_strategy="model-mapping"
         )
 
-    def _get_target_column(self, dimensions: int) -> str:
+    def _get_target_column(self, dimensions: int, storage_mode: str = "full") -> str:
         """
         Get the appropriate database column for the given dimensions.
 
+        With a halfvec or binary storage mode this is the compact column that
+        carries the ANN index (e.g. embedding_1536_half); the full-precision
+        column is still written for re-scoring.
+
         Args:
             dimensions: Embedding dimensions
+            storage_mode: Embedding storage mode (full, halfvec or binary)
 
         Returns:
             Target column name for storage
         """
+        return multi_dimensional_embedding_service.get_quantized_column_name(
+            self._get_full_precision_column(dimensions), storage_mode
+        )
+
+    def _get_full_precision_column(self, dimensions: int) -> str:
+        """Get the full-precision column for the given dimensions."""
         # Direct mapping if supported
         if dimensions in self.DIMENSION_COLUMNS:
             return self.DIMENSION_COLUMNS[dimensions]
@@ -11,6 +11,7 @@ from typing import Any
 from src.server.utils import get_supabase_client
 
 from ...config.logfire_config import get_logger
+from ..client_manager import execute_async
 
 logger = get_logger(__name__)
 
@@ -58,6 +59,19 @@ class SourceLinkingService:
                 "business_sources": [],
             }
 
+    async def get_project_source_ids(self, project_id: str) -> list[str]:
+        """
+        Get the IDs of every source linked to a project (technical and business).
+
+        Used to scope knowledge base searches to a project; raises on database errors.
+        """
+        response = await execute_async(
+            self.supabase_client.table("archon_project_sources")
+            .select("source_id")
+            .eq("project_id", project_id)
+        )
+        return list(dict.fromkeys(link["source_id"] for link in response.data or []))
+
     def update_project_sources(
         self,
         project_id: str,
@@ -10,8 +10,12 @@ from .agentic_rag_strategy import AgenticRAGStrategy
 # Strategy implementations
 from .base_search_strategy import BaseSearchStrategy
 from .hybrid_search_strategy import HybridSearchStrategy
+from .page_metadata_cache import PageMetadataCache, get_page_metadata_cache, invalidate_page_metadata
+from .query_cache import RAGQueryCache, get_query_cache, invalidate_source_queries
 from .rag_service import RAGService
+from .reranking_service import RerankingService, get_reranking_service
 from .reranking_strategy import RerankingStrategy
+from .vector_index import LocalVectorIndex, VectorIndexManager, get_vector_index_manager
 
 __all__ = [
     # Main service classes
@@ -21,4 +25,19 @@ __all__ = [
     "HybridSearchStrategy",
     "RerankingStrategy",
     "AgenticRAGStrategy",
+    # Shared cross-encoder inference
+    "RerankingService",
+    "get_reranking_service",
+    # Query result cache
+    "RAGQueryCache",
+    "get_query_cache",
+    "invalidate_source_queries",
+    # Page metadata cache
+    "PageMetadataCache",
+    "get_page_metadata_cache",
+    "invalidate_page_metadata",
+    # Local ANN index mirror
+    "LocalVectorIndex",
+    "VectorIndexManager",
+    "get_vector_index_manager",
 ]
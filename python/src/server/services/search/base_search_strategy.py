@@ -3,6 +3,15 @@ Base Search Strategy
 
 Implements the foundational vector similarity search that all other strategies build upon.
 This is the core semantic search functionality.
+
+When a local vector index is configured, searches without metadata filters are
+answered from it and fall back to the pgvector RPC otherwise.
+
+With a halfvec or binary embedding storage mode the <rpc>_quantized functions
+are called instead: they scan the compact column's index for
+match_count * rescore_factor candidates and re-score them over the
+full-precision vectors. Rows that have no compact copy yet are ranked by
+their full-precision vectors, so switching modes never hides a chunk.
 """
 
 from typing import Any
@@ -10,19 +19,56 @@ from typing import Any
 from supabase import Client
 
 from ...config.logfire_config import get_logger, safe_span
+from ..client_manager import execute_async
 
 logger = get_logger(__name__)
 
 # Fixed similarity threshold for vector results
 SIMILARITY_THRESHOLD = 0.05
 
+# Candidates fetched from a compact column per requested result before re-scoring
+DEFAULT_RESCORE_FACTOR = 4
+
 
 class BaseSearchStrategy:
     """Base strategy implementing fundamental vector similarity search"""
 
-    def __init__(self, supabase_client: Client):
-        """Initialize with database client"""
+    def __init__(
+        self,
+        supabase_client: Client,
+        vector_index=None,
+        storage_mode: str = "full",
+        rescore_factor: int = DEFAULT_RESCORE_FACTOR,
+    ):
+        """Initialize with database client, optional local vector index manager and storage mode"""
         self.supabase_client = supabase_client
+        self.vector_index = vector_index
+        self.storage_mode = storage_mode
+        self.rescore_factor = max(1, rescore_factor)
+
+    async def _local_search(
+        self,
+        query_embedding: list[float],
+        match_count: int,
+        filter_metadata: dict | None,
+        table_rpc: str,
+    ) -> list[dict[str, Any]] | None:
+        """Search the local vector index; None means use the RPC."""
+        if self.vector_index is None:
+            return None
+        source_filter = None
+        if filter_metadata:
+            # Metadata filters other than source are only evaluated by the RPC
+            if "source" not in filter_metadata:
+                return None
+            source_filter = filter_metadata["source"]
+        try:
+            return await self.vector_index.search(
+                self.supabase_client, table_rpc, query_embedding, match_count, source_filter
+            )
+        except Exception as e:
+            logger.warning(f"Local vector index search failed, using RPC: {e}")
+            return None
 
     async def vector_search(
         self,
@@ -47,6 +93,17 @@ class BaseSearchStrategy:
         """
         with safe_span("base_vector_search", table=table_rpc, match_count=match_count) as span:
             try:
+                rows = await self._local_search(
+                    query_embedding, match_count, filter_metadata, table_rpc
+                )
+                span.set_attribute("local_index", rows is not None)
+                if rows is not None:
+                    results = [
+                        row for row in rows if float(row.get("similarity", 0.0)) >= SIMILARITY_THRESHOLD
+                    ]
+                    span.set_attribute("results_found", len(results))
+                    return results
+
                 # Build RPC parameters
                 rpc_params = {"query_embedding": query_embedding, "match_count": match_count}
 
@@ -60,8 +117,16 @@ class BaseSearchStrategy:
                 else:
                     rpc_params["filter"] = {}
 
+                # Compact columns are searched by the quantized variant, re-scored in full precision
+                if self.storage_mode != "full":
+                    table_rpc = f"{table_rpc}_quantized"
+                    rpc_params["embedding_dimension"] = len(query_embedding)
+                    rpc_params["storage_mode"] = self.storage_mode
+                    rpc_params["rescore_factor"] = self.rescore_factor
+                span.set_attribute("storage_mode", self.storage_mode)
+
                 # Execute search
-                response = self.supabase_client.rpc(table_rpc, rpc_params).execute()
+                response = await execute_async(self.supabase_client.rpc(table_rpc, rpc_params))
 
                 # Filter by similarity threshold
                 filtered_results = []
@@ -2,31 +2,170 @@
 Hybrid Search Strategy
 
 Implements hybrid search combining vector similarity search with full-text search
-using PostgreSQL's ts_vector for improved recall and precision in document and 
+using PostgreSQL's ts_vector for improved recall and precision in document and
 code example retrieval.
 
 Strategy combines:
 1. Vector/semantic search for conceptual matches
 2. Full-text search using ts_vector for efficient keyword matching
-3. Returns union of both result sets for maximum coverage
+3. Rank fusion of both result lists (RRF or weighted scores)
+
+The two legs run concurrently as separate RPCs and are fused in Python, so the
+weighting is tunable and each leg's latency is visible on the span. Databases
+without the text_search_* functions fall back to the combined hybrid_search_*
+RPC, which returns the plain union of both legs.
 """
 
+import asyncio
+import time
+from collections.abc import Callable
 from typing import Any
 
 from supabase import Client
 
 from ...config.logfire_config import get_logger, safe_span
+from ..client_manager import execute_async
 from ..embeddings.embedding_service import create_embedding
+from .rank_fusion import (
+    DEFAULT_RRF_K,
+    FUSION_METHODS,
+    KEYWORD_LEG,
+    VECTOR_LEG,
+    reciprocal_rank_fusion,
+    weighted_score_fusion,
+)
 
 logger = get_logger(__name__)
 
+DEFAULT_VECTOR_WEIGHT = 0.5
+
+# PostgREST "function not in schema cache" / Postgres undefined_function
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+
+def _is_missing_function(error: BaseException) -> bool:
+    """Whether an RPC error means the function does not exist (as opposed to a transient failure)."""
+    code = getattr(error, "code", None)
+    if code in MISSING_FUNCTION_CODES:
+        return True
+    message = str(error)
+    return any(missing_code in message for missing_code in MISSING_FUNCTION_CODES)
+
 
 class HybridSearchStrategy:
     """Strategy class implementing hybrid search combining vector and full-text search"""
 
-    def __init__(self, supabase_client: Client, base_strategy):
+    def __init__(
+        self,
+        supabase_client: Client,
+        base_strategy,
+        get_setting: Callable[[str, str], str] | None = None,
+    ):
         self.supabase_client = supabase_client
         self.base_strategy = base_strategy
+        self.get_setting = get_setting
+        # Cleared when the text_search_* functions are missing (migration 013 not applied)
+        self._text_rpc_available = True
+
+    def _fusion_settings(self) -> tuple[str, int, dict[str, float]]:
+        """Read fusion method, RRF k and leg weights from settings."""
+        method, k, vector_weight = "rrf", DEFAULT_RRF_K, DEFAULT_VECTOR_WEIGHT
+        if self.get_setting:
+            try:
+                method = self.get_setting("HYBRID_FUSION_METHOD", "rrf").lower()
+                k = max(1, int(self.get_setting("HYBRID_RRF_K", str(DEFAULT_RRF_K))))
+                vector_weight = float(self.get_setting("HYBRID_VECTOR_WEIGHT", str(DEFAULT_VECTOR_WEIGHT)))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Invalid hybrid fusion settings, using defaults: {e}")
+        if method not in FUSION_METHODS:
+            method = "rrf"
+        vector_weight = min(1.0, max(0.0, vector_weight))
+        return method, k, {VECTOR_LEG: vector_weight, KEYWORD_LEG: 1.0 - vector_weight}
+
+    async def _fused_search(
+        self,
+        span,
+        query: str,
+        query_embedding: list[float],
+        match_count: int,
+        filter_json: dict,
+        source_filter: str | None,
+        vector_rpc: str,
+        text_rpc: str,
+    ) -> list[dict[str, Any]] | None:
+        """
+        Run the vector and text legs concurrently and fuse their rankings.
+
+        Returns:
+            Fused results, or None when the text leg RPC is unavailable
+        """
+        vector_filter = {**filter_json, "source": source_filter} if source_filter else filter_json
+
+        async def timed(leg: str, coro):
+            start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                span.set_attribute(f"{leg}_ms", round((time.perf_counter() - start) * 1000, 2))
+
+        vector_results, text_response = await asyncio.gather(
+            timed(
+                VECTOR_LEG,
+                self.base_strategy.vector_search(
+                    query_embedding=query_embedding,
+                    match_count=match_count,
+                    filter_metadata=vector_filter,
+                    table_rpc=vector_rpc,
+                ),
+            ),
+            timed(
+                KEYWORD_LEG,
+                execute_async(
+                    self.supabase_client.rpc(
+                        text_rpc,
+                        {
+                            "query_text": query,
+                            "match_count": match_count,
+                            "filter": filter_json,
+                            "source_filter": source_filter,
+                        },
+                    )
+                ),
+            ),
+            return_exceptions=True,
+        )
+
+        if isinstance(text_response, BaseException):
+            if _is_missing_function(text_response):
+                self._text_rpc_available = False
+                logger.warning(
+                    f"{text_rpc} unavailable, using the combined hybrid RPC instead "
+                    f"(apply migration 013_add_text_search_functions): {text_response}"
+                )
+            else:
+                # Transient failure: fall back for this query only
+                logger.warning(f"{text_rpc} failed, using the combined hybrid RPC for this query: {text_response}")
+            return None
+        if isinstance(vector_results, BaseException):
+            raise vector_results
+
+        text_results = text_response.data or []
+        method, k, weights = self._fusion_settings()
+        legs = {VECTOR_LEG: vector_results, KEYWORD_LEG: text_results}
+
+        fusion_start = time.perf_counter()
+        if method == "weighted":
+            fused = weighted_score_fusion(
+                legs, score_keys={VECTOR_LEG: "similarity", KEYWORD_LEG: "rank"}, weights=weights
+            )
+        else:
+            fused = reciprocal_rank_fusion(legs, k=k, weights=weights)
+        span.set_attribute("fusion_ms", round((time.perf_counter() - fusion_start) * 1000, 2))
+
+        span.set_attribute("fusion_method", method)
+        span.set_attribute("vector_results", len(vector_results))
+        span.set_attribute("keyword_results", len(text_results))
+        return fused[:match_count]
 
     async def search_documents_hybrid(
         self,
@@ -36,8 +175,8 @@ class HybridSearchStrategy:
         filter_metadata: dict | None = None,
     ) -> list[dict[str, Any]]:
         """
-        Perform hybrid search on archon_crawled_pages table using the PostgreSQL 
-        hybrid search function that combines vector and full-text search.
+        Perform hybrid search on archon_crawled_pages by fusing concurrent vector
+        and full-text searches.
 
         Args:
             query: Original search query text
@@ -51,28 +190,45 @@ class HybridSearchStrategy:
         with safe_span("hybrid_search_documents") as span:
             try:
                 # Prepare filter and source parameters
-                filter_json = filter_metadata or {}
-                source_filter = filter_json.pop("source", None) if "source" in filter_json else None
-
-                # Call the hybrid search PostgreSQL function
-                response = self.supabase_client.rpc(
-                    "hybrid_search_archon_crawled_pages",
-                    {
-                        "query_embedding": query_embedding,
-                        "query_text": query,
-                        "match_count": match_count,
-                        "filter": filter_json,
-                        "source_filter": source_filter,
-                    },
-                ).execute()
-
-                if not response.data:
+                filter_json = dict(filter_metadata or {})
+                source_filter = filter_json.pop("source", None)
+
+                rows = None
+                if self._text_rpc_available:
+                    rows = await self._fused_search(
+                        span,
+                        query,
+                        query_embedding,
+                        match_count,
+                        filter_json,
+                        source_filter,
+                        vector_rpc="match_archon_crawled_pages",
+                        text_rpc="text_search_archon_crawled_pages",
+                    )
+
+                if rows is None:
+                    # Call the combined hybrid search PostgreSQL function
+                    response = await execute_async(
+                        self.supabase_client.rpc(
+                            "hybrid_search_archon_crawled_pages",
+                            {
+                                "query_embedding": query_embedding,
+                                "query_text": query,
+                                "match_count": match_count,
+                                "filter": filter_json,
+                                "source_filter": source_filter,
+                            },
+                        )
+                    )
+                    rows = response.data or []
+
+                if not rows:
                     logger.debug("No results from hybrid search")
                     return []
 
                 # Format results to match expected structure
                 results = []
-                for row in response.data:
+                for row in rows:
                     result = {
                         "id": row["id"],
                         "url": row["url"],
@@ -80,9 +236,11 @@ class HybridSearchStrategy:
                         "content": row["content"],
                         "metadata": row["metadata"],
                         "source_id": row["source_id"],
-                        "similarity": row["similarity"],
+                        "similarity": row.get("similarity", row.get("rank", 0.0)),
                         "match_type": row["match_type"],
                     }
+                    if "fusion_score" in row:
+                        result["fusion_score"] = row["fusion_score"]
                     results.append(result)
 
                 span.set_attribute("results_count", len(results))
@@ -113,8 +271,8 @@ class HybridSearchStrategy:
         source_id: str | None = None,
     ) -> list[dict[str, Any]]:
         """
-        Perform hybrid search on archon_code_examples table using the PostgreSQL 
-        hybrid search function that combines vector and full-text search.
+        Perform hybrid search on archon_code_examples by fusing concurrent vector
+        and full-text searches.
 
         Args:
             query: Search query text
@@ -135,31 +293,48 @@ class HybridSearchStrategy:
                     return []
 
                 # Prepare filter and source parameters
-                filter_json = filter_metadata or {}
+                filter_json = dict(filter_metadata or {})
                 # Use source_id parameter if provided, otherwise check filter_metadata
-                final_source_filter = source_id
-                if not final_source_filter and "source" in filter_json:
-                    final_source_filter = filter_json.pop("source")
-
-                # Call the hybrid search PostgreSQL function
-                response = self.supabase_client.rpc(
-                    "hybrid_search_archon_code_examples",
-                    {
-                        "query_embedding": query_embedding,
-                        "query_text": query,
-                        "match_count": match_count,
-                        "filter": filter_json,
-                        "source_filter": final_source_filter,
-                    },
-                ).execute()
-
-                if not response.data:
+                final_source_filter = filter_json.pop("source", None)
+                if source_id:
+                    final_source_filter = source_id
+
+                rows = None
+                if self._text_rpc_available:
+                    rows = await self._fused_search(
+                        span,
+                        query,
+                        query_embedding,
+                        match_count,
+                        filter_json,
+                        final_source_filter,
+                        vector_rpc="match_archon_code_examples",
+                        text_rpc="text_search_archon_code_examples",
+                    )
+
+                if rows is None:
+                    # Call the combined hybrid search PostgreSQL function
+                    response = await execute_async(
+                        self.supabase_client.rpc(
+                            "hybrid_search_archon_code_examples",
+                            {
+                                "query_embedding": query_embedding,
+                                "query_text": query,
+                                "match_count": match_count,
+                                "filter": filter_json,
+                                "source_filter": final_source_filter,
+                            },
+                        )
+                    )
+                    rows = response.data or []
+
+                if not rows:
                     logger.debug("No results from hybrid code search")
                     return []
 
                 # Format results to match expected structure
                 results = []
-                for row in response.data:
+                for row in rows:
                     result = {
                         "id": row["id"],
                         "url": row["url"],
@@ -168,9 +343,11 @@ class HybridSearchStrategy:
                         "summary": row["summary"],
                         "metadata": row["metadata"],
                         "source_id": row["source_id"],
-                        "similarity": row["similarity"],
+                        "similarity": row.get("similarity", row.get("rank", 0.0)),
                         "match_type": row["match_type"],
                     }
+                    if "fusion_score" in row:
+                        result["fusion_score"] = row["fusion_score"]
                     results.append(result)
 
                 span.set_attribute("results_count", len(results))
@@ -191,4 +368,4 @@ class HybridSearchStrategy:
             except Exception as e:
                 logger.error(f"Hybrid code example search failed: {e}")
                 span.set_attribute("error", str(e))
-                return []
\ No newline at end of file
+                return []
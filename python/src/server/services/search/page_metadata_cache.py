@@ -0,0 +1,94 @@
+"""
+Page Metadata Cache
+
+In-process LRU of archon_page_metadata rows used by RAG page grouping. Rows are
+reachable by page id and by URL (chunks without a page_id are grouped by URL).
+Page writes invalidate the affected rows, so only pages that were never looked
+up, or changed since, cost a database round trip.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from ...config.logfire_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 5000
+
+# Columns RAG page grouping needs
+PAGE_METADATA_COLUMNS = "id, url, section_title, word_count"
+
+
+class PageMetadataCache:
+    """LRU of page metadata rows keyed by page id and by URL."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._by_id: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._id_by_url: dict[str, str] = {}
+
+    def get_by_id(self, page_id: str) -> dict[str, Any] | None:
+        row = self._by_id.get(str(page_id))
+        if row is not None:
+            self._by_id.move_to_end(str(page_id))
+        return row
+
+    def get_by_url(self, url: str) -> dict[str, Any] | None:
+        page_id = self._id_by_url.get(url)
+        return self.get_by_id(page_id) if page_id is not None else None
+
+    def put_many(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Remember page rows (each must carry id and url)."""
+        for row in rows:
+            page_id = str(row["id"])
+            self._by_id[page_id] = row
+            self._by_id.move_to_end(page_id)
+            self._id_by_url[row["url"]] = page_id
+        while len(self._by_id) > self.max_entries:
+            _, evicted = self._by_id.popitem(last=False)
+            self._id_by_url.pop(evicted["url"], None)
+
+    def invalidate(
+        self, page_ids: Iterable[str] | None = None, urls: Iterable[str] | None = None
+    ) -> None:
+        """Drop rows for written pages, by id or by URL."""
+        for url in urls or ():
+            page_id = self._id_by_url.pop(url, None)
+            if page_id is not None:
+                self._by_id.pop(page_id, None)
+        for page_id in page_ids or ():
+            row = self._by_id.pop(str(page_id), None)
+            if row is not None:
+                self._id_by_url.pop(row["url"], None)
+
+    def clear(self) -> None:
+        """Drop all cached rows."""
+        self._by_id.clear()
+        self._id_by_url.clear()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+
+# Global instance
+_page_metadata_cache: PageMetadataCache | None = None
+
+
+def get_page_metadata_cache() -> PageMetadataCache:
+    """Get the global page metadata cache instance."""
+    global _page_metadata_cache
+    if _page_metadata_cache is None:
+        _page_metadata_cache = PageMetadataCache()
+    return _page_metadata_cache
+
+
+def invalidate_page_metadata(
+    page_ids: Iterable[str] | None = None, urls: Iterable[str] | None = None
+) -> None:
+    """Invalidate cached page metadata after pages were written."""
+    try:
+        get_page_metadata_cache().invalidate(page_ids=page_ids, urls=urls)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate page metadata cache: {e}")
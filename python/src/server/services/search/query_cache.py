@@ -0,0 +1,196 @@
+"""
+RAG Query Cache
+
+In-process cache of RAGService.perform_rag_query results. Agents tend to repeat
+the same lookups within a session; a hit skips the query embedding, the search
+RPC, reranking and page grouping.
+
+Entries are keyed on the normalized query, the source filter (one source or a
+set of sources searched together), match_count, return_mode, the search
+settings that shape the result (hybrid, reranking), the per-source cap and the
+embedding and reranking models, so switching models never serves stale hits.
+They expire after a TTL, the least recently used entries are evicted past
+max_entries, and writes to a source invalidate every entry that could contain
+its chunks: entries filtered to (or fanned out over) that source and all
+unfiltered entries.
+"""
+
+import copy
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from ...config.logfire_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 300.0
+
+QueryCacheKey = tuple[str, str | tuple[str, ...] | None, int, str, bool, bool, int | None, tuple[str, ...]]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so casing and whitespace differences share an entry."""
+    return " ".join(unicodedata.normalize("NFC", query).lower().split())
+
+
+def make_query_key(
+    query: str,
+    source: str | list[str] | None,
+    match_count: int,
+    return_mode: str,
+    use_hybrid_search: bool,
+    use_reranking: bool,
+    per_source_limit: int | None = None,
+    models: tuple[str, ...] = (),
+) -> QueryCacheKey:
+    """
+    Build the cache key for a RAG query (source may be a list of fanned-out sources).
+
+    models identifies the embedding provider/model and, when reranking, the
+    reranking model that produced the response.
+    """
+    if isinstance(source, list | tuple):
+        source = tuple(sorted(set(source)))
+    return (
+        normalize_query(query),
+        source or None,
+        match_count,
+        return_mode,
+        use_hybrid_search,
+        use_reranking,
+        per_source_limit,
+        tuple(models),
+    )
+
+
+@dataclass
+class QueryCacheStats:
+    """Hit/miss counters for the query cache."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class RAGQueryCache:
+    """TTL + LRU cache of RAG query responses with per-source invalidation."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.stats = QueryCacheStats()
+        self._entries: OrderedDict[QueryCacheKey, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def configure(self, max_entries: int | None = None, ttl_seconds: float | None = None) -> None:
+        """Apply settings loaded at call time without dropping cached entries."""
+        if max_entries is not None:
+            self.max_entries = max(1, max_entries)
+            self._evict()
+        if ttl_seconds is not None:
+            self.ttl_seconds = ttl_seconds
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: QueryCacheKey) -> dict[str, Any] | None:
+        """Return a copy of the cached response, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        # Callers may mutate the response (e.g. add fields before returning it)
+        return copy.deepcopy(response)
+
+    def put(self, key: QueryCacheKey, response: dict[str, Any]) -> None:
+        """Store a successful response."""
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def invalidate_source(self, source_id: str | None) -> int:
+        """
+        Drop entries that may contain chunks of a source.
+
+        Entries filtered to other sources are kept; unfiltered entries span every
+        source and are always dropped.
+
+        Returns:
+            Number of entries removed
+        """
+        stale = [
+            key
+            for key in self._entries
+            if key[1] is None or key[1] == source_id or (isinstance(key[1], tuple) and source_id in key[1])
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.stats.invalidations += len(stale)
+            logger.debug(f"Invalidated {len(stale)} cached RAG queries for source {source_id}")
+        return len(stale)
+
+    def invalidate_sources(self, source_ids) -> int:
+        """Invalidate several sources at once (see invalidate_source)."""
+        return sum(self.invalidate_source(source_id) for source_id in set(source_ids) if source_id)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current cache size."""
+        return {
+            **self.stats.to_dict(),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# Global instance
+_query_cache: RAGQueryCache | None = None
+
+
+def get_query_cache() -> RAGQueryCache:
+    """Get the global RAG query cache instance."""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = RAGQueryCache()
+    return _query_cache
+
+
+def invalidate_source_queries(*source_ids: str | None) -> None:
+    """Invalidate cached RAG queries after a source's chunks were written or deleted."""
+    try:
+        get_query_cache().invalidate_sources(source_ids)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate RAG query cache: {e}")
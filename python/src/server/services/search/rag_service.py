@@ -12,21 +12,50 @@ It combines multiple RAG strategies in a pipeline fashion:
 Multiple strategies can be enabled simultaneously and work together.
 """
 
+import asyncio
 import os
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
+from postgrest.utils import sanitize_param
+
 from ...config.logfire_config import get_logger, safe_span
 from ...utils import get_supabase_client
-from ..embeddings.embedding_service import create_embedding
+from ..client_manager import execute_async
+from ..embeddings.embedding_service import create_embedding, create_embeddings_batch
+from ..embeddings.multi_dimensional_embedding_service import multi_dimensional_embedding_service
 from .agentic_rag_strategy import AgenticRAGStrategy
 
 # Import all strategies
-from .base_search_strategy import BaseSearchStrategy
+from .base_search_strategy import DEFAULT_RESCORE_FACTOR, BaseSearchStrategy
 from .hybrid_search_strategy import HybridSearchStrategy
+from .page_metadata_cache import PAGE_METADATA_COLUMNS, get_page_metadata_cache
+from .query_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS, get_query_cache, make_query_key
+from .reranking_service import (
+    DEFAULT_RERANK_BATCH_WINDOW_MS,
+    DEFAULT_RERANK_CACHE_ENTRIES,
+    DEFAULT_RERANK_WORKERS,
+    get_reranking_service,
+)
 from .reranking_strategy import RerankingStrategy
+from .vector_index import get_vector_index_manager
 
 logger = get_logger(__name__)
 
+DEFAULT_BATCH_QUERY_CONCURRENCY = 4
+DEFAULT_SOURCE_FANOUT_CONCURRENCY = 8
+
+# Upper bound on sources searched together by one query
+MAX_QUERY_SOURCES = 50
+
+
+def _merge_score(result: dict[str, Any], use_hybrid_search: bool) -> float:
+    """Score used to merge hits from several sources: fusion score for hybrid hits, else similarity."""
+    if use_hybrid_search and result.get("fusion_score") is not None:
+        return float(result["fusion_score"])
+    return float(result.get("similarity", 0.0))
+
 
 class RAGService:
     """
@@ -40,11 +69,28 @@ class RAGService:
         """Initialize RAG service as a coordinator for search strategies"""
         self.supabase_client = supabase_client or get_supabase_client()
 
-        # Initialize base strategy (always needed)
-        self.base_strategy = BaseSearchStrategy(self.supabase_client)
+        # Initialize base strategy (always needed), optionally backed by the local vector index
+        vector_index = None
+        if self.get_bool_setting("USE_LOCAL_VECTOR_INDEX", False):
+            vector_index = get_vector_index_manager()
+            vector_index.configure(backend=self.get_setting("LOCAL_VECTOR_INDEX_BACKEND", "auto").lower())
+        try:
+            rescore_factor = int(self.get_setting("EMBEDDING_RESCORE_FACTOR", str(DEFAULT_RESCORE_FACTOR)))
+        except ValueError:
+            rescore_factor = DEFAULT_RESCORE_FACTOR
+        self.base_strategy = BaseSearchStrategy(
+            self.supabase_client,
+            vector_index=vector_index,
+            storage_mode=multi_dimensional_embedding_service.normalize_storage_mode(
+                self.get_setting("EMBEDDING_STORAGE_MODE", "full")
+            ),
+            rescore_factor=rescore_factor,
+        )
 
         # Initialize optional strategies
-        self.hybrid_strategy = HybridSearchStrategy(self.supabase_client, self.base_strategy)
+        self.hybrid_strategy = HybridSearchStrategy(
+            self.supabase_client, self.base_strategy, get_setting=self.get_setting
+        )
         self.agentic_strategy = AgenticRAGStrategy(self.supabase_client, self.base_strategy)
 
         # Initialize reranking strategy based on settings
@@ -52,7 +98,19 @@ class RAGService:
         use_reranking = self.get_bool_setting("USE_RERANKING", False)
         if use_reranking:
             try:
-                self.reranking_strategy = RerankingStrategy()
+                get_reranking_service().configure(
+                    max_workers=int(self.get_setting("RERANKING_WORKERS", str(DEFAULT_RERANK_WORKERS))),
+                    batch_window_ms=float(
+                        self.get_setting("RERANKING_BATCH_WINDOW_MS", str(DEFAULT_RERANK_BATCH_WINDOW_MS))
+                    ),
+                    cache_max_entries=int(
+                        self.get_setting("RERANKING_CACHE_MAX_ENTRIES", str(DEFAULT_RERANK_CACHE_ENTRIES))
+                    ),
+                )
+                self.reranking_strategy = RerankingStrategy(
+                    backend=self.get_setting("RERANKING_BACKEND", "torch").lower(),
+                    onnx_file=self.get_setting("RERANKING_ONNX_FILE", "") or None,
+                )
                 logger.info("Reranking strategy loaded successfully")
             except Exception as e:
                 logger.warning(f"Failed to load reranking strategy: {e}")
@@ -91,6 +149,7 @@ class RAGService:
         filter_metadata: dict | None = None,
         use_hybrid_search: bool = False,
         cached_api_key: str | None = None,
+        query_embedding: list[float] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Document search with hybrid search capability.
@@ -101,6 +160,7 @@ class RAGService:
             filter_metadata: Optional metadata filter dict
             use_hybrid_search: Whether to use hybrid search
             cached_api_key: Deprecated parameter for compatibility
+            query_embedding: Pre-computed query embedding (skips the embedding call)
 
         Returns:
             List of matching documents
@@ -113,7 +173,8 @@ class RAGService:
         ) as span:
             try:
                 # Create embedding for the query
-                query_embedding = await create_embedding(query)
+                if query_embedding is None:
+                    query_embedding = await create_embedding(query)
 
                 if not query_embedding:
                     logger.error("Failed to create embedding for query")
@@ -145,6 +206,110 @@ class RAGService:
                 span.set_attribute("error", str(e))
                 return []
 
+    async def search_documents_multi_source(
+        self,
+        query: str,
+        source_ids: list[str],
+        match_count: int = 5,
+        per_source_limit: int | None = None,
+        use_hybrid_search: bool = False,
+        query_embedding: list[float] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search several sources concurrently and merge the hits by score.
+
+        The query is embedded once; each source gets its own top-k search
+        (k = match_count, capped at per_source_limit) so one large source cannot
+        crowd out the others, and the merged list keeps the best match_count hits.
+        Hybrid hits are merged by their fusion score, vector hits by similarity.
+
+        Args:
+            query: Search query string
+            source_ids: Sources to search
+            match_count: Number of results to return
+            per_source_limit: Optional maximum number of results from one source
+            use_hybrid_search: Whether to use hybrid search
+            query_embedding: Pre-computed query embedding (skips the embedding call)
+
+        Returns:
+            Merged list of matching documents, best first
+        """
+        source_ids = list(dict.fromkeys(source_ids))
+        if not source_ids:
+            return []
+        with safe_span(
+            "rag_search_documents_multi_source", source_count=len(source_ids), match_count=match_count
+        ) as span:
+            if query_embedding is None:
+                query_embedding = await create_embedding(query)
+            if not query_embedding:
+                logger.error("Failed to create embedding for query")
+                return []
+
+            per_source_count = min(match_count, per_source_limit) if per_source_limit else match_count
+            semaphore = asyncio.Semaphore(
+                max(1, int(self.get_setting("RAG_SOURCE_FANOUT_CONCURRENCY", str(DEFAULT_SOURCE_FANOUT_CONCURRENCY))))
+            )
+
+            async def search(source_id: str) -> list[dict[str, Any]]:
+                async with semaphore:
+                    return await self.search_documents(
+                        query=query,
+                        match_count=per_source_count,
+                        filter_metadata={"source": source_id},
+                        use_hybrid_search=use_hybrid_search,
+                        query_embedding=query_embedding,
+                    )
+
+            per_source_results = await asyncio.gather(*(search(source_id) for source_id in source_ids))
+            merged = [result for results in per_source_results for result in results]
+            merged.sort(key=lambda result: _merge_score(result, use_hybrid_search), reverse=True)
+
+            span.set_attribute("candidates", len(merged))
+            span.set_attribute("sources_with_results", sum(1 for results in per_source_results if results))
+            return merged[:match_count]
+
+    async def _resolve_sources(
+        self, source: str | None, source_ids: list[str] | None, project_id: str | None
+    ) -> list[str]:
+        """Combine a query's source filter, source list and project's linked sources."""
+        sources = ([source] if source else []) + list(source_ids or [])
+        if project_id:
+            # Imported here: the projects package pulls in the project services
+            from ..projects.source_linking_service import SourceLinkingService
+
+            sources += await SourceLinkingService(self.supabase_client).get_project_source_ids(project_id)
+        sources = list(dict.fromkeys(sources))
+        if len(sources) > MAX_QUERY_SOURCES:
+            logger.warning(f"Query resolved to {len(sources)} sources, searching the first {MAX_QUERY_SOURCES}")
+            sources = sources[:MAX_QUERY_SOURCES]
+        return sources
+
+    async def _search_for_query(
+        self,
+        query: str,
+        match_count: int,
+        source: str | None,
+        sources: list[str] | None,
+        per_source_limit: int | None,
+        use_hybrid_search: bool,
+    ) -> list[dict[str, Any]]:
+        """Search one source (or all sources), or fan out over a list of sources."""
+        if sources is not None:
+            return await self.search_documents_multi_source(
+                query=query,
+                source_ids=sources,
+                match_count=match_count,
+                per_source_limit=per_source_limit,
+                use_hybrid_search=use_hybrid_search,
+            )
+        return await self.search_documents(
+            query=query,
+            match_count=match_count,
+            filter_metadata={"source": source} if source else None,
+            use_hybrid_search=use_hybrid_search,
+        )
+
     async def search_code_examples(
         self,
         query: str,
@@ -172,6 +337,62 @@ class RAGService:
             use_enhancement=True,
         )
 
+    async def _fetch_page_metadata(
+        self, page_ids: list[str], urls: list[str]
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        Look up page metadata for many pages in one query.
+
+        Rows are served from the page metadata cache where possible; the rest are
+        fetched with a single id-or-url query and cached.
+
+        Returns:
+            {"ids": {page_id: row}, "urls": {url: row}}
+        """
+        cache = get_page_metadata_cache()
+        found: dict[str, dict[str, dict[str, Any]]] = {"ids": {}, "urls": {}}
+        missing_ids: list[str] = []
+        missing_urls: list[str] = []
+
+        for page_id in dict.fromkeys(str(page_id) for page_id in page_ids):
+            row = cache.get_by_id(page_id)
+            if row is not None:
+                found["ids"][page_id] = row
+            else:
+                missing_ids.append(page_id)
+        for url in dict.fromkeys(urls):
+            row = cache.get_by_url(url)
+            if row is not None:
+                found["urls"][url] = row
+            else:
+                missing_urls.append(url)
+
+        if not missing_ids and not missing_urls:
+            return found
+
+        filters = []
+        if missing_ids:
+            filters.append(f"id.in.({','.join(sanitize_param(v) for v in missing_ids)})")
+        if missing_urls:
+            filters.append(f"url.in.({','.join(sanitize_param(v) for v in missing_urls)})")
+
+        response = await execute_async(
+            self.supabase_client.table("archon_page_metadata")
+            .select(PAGE_METADATA_COLUMNS)
+            .or_(",".join(filters))
+        )
+        rows = (response.data if response else None) or []
+        cache.put_many(rows)
+
+        wanted_ids = set(missing_ids)
+        wanted_urls = set(missing_urls)
+        for row in rows:
+            if str(row["id"]) in wanted_ids:
+                found["ids"][str(row["id"])] = row
+            if row["url"] in wanted_urls:
+                found["urls"][row["url"]] = row
+        return found
+
     async def _group_chunks_by_pages(
         self, chunk_results: list[dict[str, Any]], match_count: int
     ) -> list[dict[str, Any]]:
@@ -201,37 +422,29 @@ class RAGService:
             page_groups[group_key]["chunk_matches"] += 1
             page_groups[group_key]["total_similarity"] += result.get("similarity_score", 0.0)
 
+        page_rows = await self._fetch_page_metadata(
+            page_ids=[data["page_id"] for data in page_groups.values() if data["page_id"]],
+            urls=[data["url"] for data in page_groups.values() if not data["page_id"]],
+        )
+
         page_results = []
         for group_key, data in page_groups.items():
             avg_similarity = data["total_similarity"] / data["chunk_matches"]
             match_boost = min(0.2, data["chunk_matches"] * 0.02)
             aggregate_score = avg_similarity * (1 + match_boost)
 
-            # Query page by page_id if available, otherwise by URL
+            # Page by page_id if available, otherwise by URL
             if data["page_id"]:
-                page_info = (
-                    self.supabase_client.table("archon_page_metadata")
-                    .select("id, url, section_title, word_count")
-                    .eq("id", data["page_id"])
-                    .maybe_single()
-                    .execute()
-                )
+                page = page_rows["ids"].get(str(data["page_id"]))
             else:
-                # Regular pages - exact URL match
-                page_info = (
-                    self.supabase_client.table("archon_page_metadata")
-                    .select("id, url, section_title, word_count")
-                    .eq("url", data["url"])
-                    .maybe_single()
-                    .execute()
-                )
+                page = page_rows["urls"].get(data["url"])
 
-            if page_info and page_info.data is not None:
+            if page is not None:
                 page_results.append({
-                    "page_id": page_info.data["id"],
-                    "url": page_info.data["url"],
-                    "section_title": page_info.data.get("section_title"),
-                    "word_count": page_info.data.get("word_count", 0),
+                    "page_id": page["id"],
+                    "url": page["url"],
+                    "section_title": page.get("section_title"),
+                    "word_count": page.get("word_count", 0),
                     "chunk_matches": data["chunk_matches"],
                     "aggregate_similarity": aggregate_score,
                     "average_similarity": avg_similarity,
@@ -241,14 +454,203 @@ class RAGService:
         page_results.sort(key=lambda x: x["aggregate_similarity"], reverse=True)
         return page_results[:match_count]
 
+    def _get_query_cache(self):
+        """Return the configured query cache, or None when USE_RAG_QUERY_CACHE is off."""
+        if not self.get_bool_setting("USE_RAG_QUERY_CACHE", True):
+            return None
+        query_cache = get_query_cache()
+        query_cache.configure(
+            max_entries=int(self.get_setting("RAG_QUERY_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+            ttl_seconds=float(self.get_setting("RAG_QUERY_CACHE_TTL", str(DEFAULT_TTL_SECONDS))),
+        )
+        return query_cache
+
+    def _query_cache_models(self, use_reranking: bool) -> tuple[str, ...]:
+        """Embedding provider/model and (when reranking) reranking model that shape a cached response."""
+        models = (
+            self.get_setting("EMBEDDING_PROVIDER", "openai").lower(),
+            self.get_setting("EMBEDDING_MODEL", ""),
+        )
+        if use_reranking and self.reranking_strategy:
+            models += (self.reranking_strategy.cache_key,)
+        return models
+
+    def _lookup_cached_query(
+        self,
+        query: str,
+        source: str | list[str] | None,
+        match_count: int,
+        return_mode: str,
+        use_hybrid_search: bool,
+        use_reranking: bool,
+        per_source_limit: int | None = None,
+    ) -> tuple[Any, tuple | None, dict[str, Any] | None]:
+        """Look a query up in the query cache; returns (cache or None, cache key, cached response)."""
+        try:
+            query_cache = self._get_query_cache()
+            if query_cache is None:
+                return None, None, None
+            cache_key = make_query_key(
+                query,
+                source,
+                match_count,
+                return_mode,
+                use_hybrid_search,
+                use_reranking,
+                per_source_limit,
+                self._query_cache_models(use_reranking),
+            )
+            return query_cache, cache_key, query_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"RAG query cache lookup failed: {e}")
+            return None, None, None
+
+    def _format_results(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Format raw search results for the RAG response."""
+        formatted_results = []
+        for i, result in enumerate(results):
+            try:
+                formatted_result = {
+                    "id": result.get("id", f"result_{i}"),
+                    "content": result.get("content", "")[:1000],  # Limit content
+                    "metadata": result.get("metadata", {}),
+                    "similarity_score": result.get("similarity", 0.0),
+                }
+                formatted_results.append(formatted_result)
+            except Exception as format_error:
+                logger.warning(f"Failed to format result {i}: {format_error}")
+                continue
+        return formatted_results
+
+    async def _rerank_formatted(
+        self, query: str, formatted_results: list[dict[str, Any]], match_count: int
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Rerank formatted results down to match_count; returns (results, reranking_applied)."""
+        if not (self.reranking_strategy and formatted_results):
+            return formatted_results, False
+        try:
+            candidate_count = len(formatted_results)
+            # Pass top_k to limit results to the originally requested count
+            reranked = await self.reranking_strategy.rerank_results(
+                query, formatted_results, content_key="content", top_k=match_count
+            )
+            logger.debug(f"Reranking applied: {candidate_count} candidates -> {len(reranked)} final results")
+            return reranked, True
+        except Exception as e:
+            logger.warning(f"Reranking failed: {e}")
+            # If reranking fails but we fetched extra results, trim to requested count
+            return formatted_results[:match_count], False
+
+    async def _group_if_pages(
+        self, formatted_results: list[dict[str, Any]], match_count: int, return_mode: str
+    ) -> tuple[list[dict[str, Any]], str]:
+        """Group chunks by page for return_mode="pages"; returns (results, actual return mode)."""
+        if return_mode != "pages":
+            return formatted_results, return_mode
+
+        # Check if any chunks have page_id set
+        has_page_ids = any(
+            result.get("metadata", {}).get("page_id") is not None
+            for result in formatted_results
+        )
+        if not has_page_ids:
+            # Fall back to chunks when no page_ids (pre-migration data)
+            logger.info("No page_ids found in results, returning chunks instead of pages")
+            return formatted_results, "chunks"
+
+        # Group by pages when page_ids exist
+        return await self._group_chunks_by_pages(formatted_results, match_count), "pages"
+
+    def _build_rag_response(
+        self,
+        query: str,
+        source: str | None,
+        match_count: int,
+        results: list[dict[str, Any]],
+        use_hybrid_search: bool,
+        reranking_applied: bool,
+        return_mode: str,
+    ) -> dict[str, Any]:
+        return {
+            "results": results,
+            "query": query,
+            "source": source,
+            "match_count": match_count,
+            "total_found": len(results),
+            "execution_path": "rag_service_pipeline",
+            "search_mode": "hybrid" if use_hybrid_search else "vector",
+            "reranking_applied": reranking_applied,
+            "return_mode": return_mode,
+        }
+
+    @staticmethod
+    def _scope_response(
+        response_data: dict[str, Any], sources: list[str] | None, project_id: str | None
+    ) -> dict[str, Any]:
+        """Record the fanned-out sources (and project) a response was searched over."""
+        if sources is not None:
+            response_data["source_ids"] = sources
+        if project_id:
+            response_data["project_id"] = project_id
+        return response_data
+
+    @staticmethod
+    def _scale_per_source_limit(
+        per_source_limit: int | None, search_match_count: int, match_count: int
+    ) -> int | None:
+        """Scale the per-source cap like match_count when extra rerank candidates are fetched."""
+        if not per_source_limit:
+            return None
+        return per_source_limit * max(1, search_match_count // max(1, match_count))
+
+    async def _complete_rag_query(
+        self,
+        query: str,
+        source: str | None,
+        match_count: int,
+        return_mode: str,
+        results: list[dict[str, Any]],
+        use_hybrid_search: bool,
+    ) -> dict[str, Any]:
+        """
+        Format, rerank and (optionally) page-group search results into a RAG response.
+
+        Args:
+            query: The search query
+            source: Source filter the results were searched with
+            match_count: Maximum number of results to return
+            return_mode: "chunks" or "pages"
+            results: Raw search results (match_count * 5 candidates when reranking)
+            use_hybrid_search: Whether the results came from hybrid search
+
+        Returns:
+            The RAG response dict
+        """
+        formatted_results = self._format_results(results)
+        formatted_results, reranking_applied = await self._rerank_formatted(query, formatted_results, match_count)
+        formatted_results, actual_return_mode = await self._group_if_pages(
+            formatted_results, match_count, return_mode
+        )
+        return self._build_rag_response(
+            query, source, match_count, formatted_results, use_hybrid_search, reranking_applied, actual_return_mode
+        )
+
     async def perform_rag_query(
-        self, query: str, source: str = None, match_count: int = 5, return_mode: str = "chunks"
+        self,
+        query: str,
+        source: str = None,
+        match_count: int = 5,
+        return_mode: str = "chunks",
+        source_ids: list[str] | None = None,
+        project_id: str | None = None,
+        per_source_limit: int | None = None,
     ) -> tuple[bool, dict[str, Any]]:
         """
         Unified RAG query with all strategies.
 
         Pipeline:
-        1. Vector/Hybrid Search (based on settings)
+        1. Vector/Hybrid Search (based on settings), fanned out per source when
+           source_ids or project_id is given
         2. Reranking (if enabled)
         3. Page Grouping (if return_mode="pages")
 
@@ -257,6 +659,10 @@ class RAGService:
             source: Optional source domain to filter results
             match_count: Maximum number of results to return
             return_mode: "chunks" (default) or "pages"
+            source_ids: Optional sources to search together (merged by score)
+            project_id: Optional project whose linked sources are searched together
+            per_source_limit: Optional maximum number of candidates from one source
+                when searching several sources
 
         Returns:
             Tuple of (success, result_dict)
@@ -267,8 +673,18 @@ class RAGService:
             try:
                 logger.info(f"RAG query started: {query[:100]}{'...' if len(query) > 100 else ''}")
 
-                # Build filter metadata
-                filter_metadata = {"source": source} if source else None
+                # Sources searched together (None: a single source filter or no filter)
+                sources = None
+                if source_ids or project_id:
+                    sources = await self._resolve_sources(source, source_ids, project_id)
+                    span.set_attribute("source_count", len(sources))
+                    if not sources:
+                        logger.info("RAG query has no sources to search")
+                        return True, self._scope_response(
+                            self._build_rag_response(query, source, match_count, [], False, False, return_mode),
+                            sources,
+                            project_id,
+                        )
 
                 # Check which strategies are enabled
                 use_hybrid_search = self.get_bool_setting("USE_HYBRID_SEARCH", False)
@@ -283,85 +699,45 @@ class RAGService:
                     search_match_count = match_count * 5
                     logger.debug(f"Reranking enabled - fetching {search_match_count} candidates for {match_count} final results")
 
+                # Serve repeated queries from the query cache
+                query_cache, cache_key, cached_response = self._lookup_cached_query(
+                    query, sources if sources is not None else source, match_count, return_mode,
+                    use_hybrid_search, bool(use_reranking and self.reranking_strategy), per_source_limit,
+                )
+                if query_cache is not None:
+                    span.set_attribute("cache_hit", cached_response is not None)
+                if cached_response is not None:
+                    logger.info(f"RAG query served from cache - {cached_response['total_found']} results")
+                    return True, cached_response
+
                 # Step 1 & 2: Get results (with hybrid search if enabled)
-                results = await self.search_documents(
-                    query=query,
-                    match_count=search_match_count,
-                    filter_metadata=filter_metadata,
-                    use_hybrid_search=use_hybrid_search,
+                results = await self._search_for_query(
+                    query, search_match_count, source, sources,
+                    self._scale_per_source_limit(per_source_limit, search_match_count, match_count),
+                    use_hybrid_search,
                 )
 
                 span.set_attribute("raw_results_count", len(results))
                 span.set_attribute("hybrid_search_enabled", use_hybrid_search)
 
-                # Format results for processing
-                formatted_results = []
-                for i, result in enumerate(results):
-                    try:
-                        formatted_result = {
-                            "id": result.get("id", f"result_{i}"),
-                            "content": result.get("content", "")[:1000],  # Limit content
-                            "metadata": result.get("metadata", {}),
-                            "similarity_score": result.get("similarity", 0.0),
-                        }
-                        formatted_results.append(formatted_result)
-                    except Exception as format_error:
-                        logger.warning(f"Failed to format result {i}: {format_error}")
-                        continue
-
-                # Step 3: Apply reranking if we have a strategy or if enabled
-                reranking_applied = False
-                if self.reranking_strategy and formatted_results:
-                    try:
-                        # Pass top_k to limit results to the originally requested count
-                        formatted_results = await self.reranking_strategy.rerank_results(
-                            query, formatted_results, content_key="content", top_k=match_count
-                        )
-                        reranking_applied = True
-                        logger.debug(f"Reranking applied: {search_match_count} candidates -> {len(formatted_results)} final results")
-                    except Exception as e:
-                        logger.warning(f"Reranking failed: {e}")
-                        reranking_applied = False
-                        # If reranking fails but we fetched extra results, trim to requested count
-                        if len(formatted_results) > match_count:
-                            formatted_results = formatted_results[:match_count]
-
-                # Step 4: Group by pages if return_mode="pages" AND pages exist
-                actual_return_mode = return_mode
-                if return_mode == "pages":
-                    # Check if any chunks have page_id set
-                    has_page_ids = any(
-                        result.get("metadata", {}).get("page_id") is not None
-                        for result in formatted_results
-                    )
-
-                    if has_page_ids:
-                        # Group by pages when page_ids exist
-                        formatted_results = await self._group_chunks_by_pages(formatted_results, match_count)
-                    else:
-                        # Fall back to chunks when no page_ids (pre-migration data)
-                        actual_return_mode = "chunks"
-                        logger.info("No page_ids found in results, returning chunks instead of pages")
+                # Step 3 & 4: Reranking and page grouping
+                response_data = self._scope_response(
+                    await self._complete_rag_query(
+                        query, source, match_count, return_mode, results, use_hybrid_search
+                    ),
+                    sources,
+                    project_id,
+                )
 
-                # Build response
-                response_data = {
-                    "results": formatted_results,
-                    "query": query,
-                    "source": source,
-                    "match_count": match_count,
-                    "total_found": len(formatted_results),
-                    "execution_path": "rag_service_pipeline",
-                    "search_mode": "hybrid" if use_hybrid_search else "vector",
-                    "reranking_applied": reranking_applied,
-                    "return_mode": actual_return_mode,
-                }
+                if query_cache is not None:
+                    query_cache.put(cache_key, response_data)
 
-                span.set_attribute("final_results_count", len(formatted_results))
-                span.set_attribute("reranking_applied", reranking_applied)
+                span.set_attribute("final_results_count", response_data["total_found"])
+                span.set_attribute("reranking_applied", response_data["reranking_applied"])
                 span.set_attribute("return_mode", return_mode)
                 span.set_attribute("success", True)
 
-                logger.info(f"RAG query completed - {len(formatted_results)} {return_mode} found")
+                logger.info(f"RAG query completed - {response_data['total_found']} {return_mode} found")
                 return True, response_data
 
             except Exception as e:
@@ -377,6 +753,257 @@ class RAGService:
                     "execution_path": "rag_service_pipeline",
                 }
 
+    async def stream_rag_query(
+        self,
+        query: str,
+        source: str | None = None,
+        match_count: int = 5,
+        return_mode: str = "chunks",
+        source_ids: list[str] | None = None,
+        project_id: str | None = None,
+        per_source_limit: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Streaming variant of perform_rag_query that yields each stage as it completes.
+
+        Events:
+        - {"type": "results", "stage": "search"}: the top search hits, before reranking
+        - {"type": "results", "stage": "reranked"}: the reranked order (only when reranking runs)
+        - {"type": "complete", ...}: the final response, shaped like perform_rag_query's
+          (page-grouped when return_mode="pages")
+        - {"type": "error", ...}: the pipeline failed
+
+        A cached query yields only the "complete" event.
+
+        Args:
+            query: The search query
+            source: Optional source domain to filter results
+            match_count: Maximum number of results to return
+            return_mode: "chunks" (default) or "pages"
+            source_ids: Optional sources to search together (see perform_rag_query)
+            project_id: Optional project whose linked sources are searched together
+            per_source_limit: Optional maximum number of candidates from one source
+        """
+        with safe_span(
+            "rag_query_stream", query_length=len(query), source=source, match_count=match_count
+        ) as span:
+            try:
+                sources = None
+                if source_ids or project_id:
+                    sources = await self._resolve_sources(source, source_ids, project_id)
+                    if not sources:
+                        yield {
+                            "type": "complete",
+                            **self._scope_response(
+                                self._build_rag_response(query, source, match_count, [], False, False, return_mode),
+                                sources,
+                                project_id,
+                            ),
+                        }
+                        return
+                use_hybrid_search = self.get_bool_setting("USE_HYBRID_SEARCH", False)
+                use_reranking = bool(self.get_bool_setting("USE_RERANKING", False) and self.reranking_strategy)
+                search_match_count = match_count * 5 if use_reranking else match_count
+                search_mode = "hybrid" if use_hybrid_search else "vector"
+
+                query_cache, cache_key, cached_response = self._lookup_cached_query(
+                    query, sources if sources is not None else source, match_count, return_mode,
+                    use_hybrid_search, use_reranking, per_source_limit,
+                )
+                if cached_response is not None:
+                    span.set_attribute("cache_hit", True)
+                    yield {"type": "complete", **cached_response}
+                    return
+
+                start = time.perf_counter()
+                results = await self._search_for_query(
+                    query, search_match_count, source, sources,
+                    self._scale_per_source_limit(per_source_limit, search_match_count, match_count),
+                    use_hybrid_search,
+                )
+                formatted_results = self._format_results(results)
+                span.set_attribute("search_ms", round((time.perf_counter() - start) * 1000, 2))
+                yield {
+                    "type": "results",
+                    "stage": "search",
+                    "search_mode": search_mode,
+                    "results": formatted_results[:match_count],
+                }
+
+                formatted_results, reranking_applied = await self._rerank_formatted(
+                    query, formatted_results, match_count
+                )
+                if reranking_applied:
+                    yield {"type": "results", "stage": "reranked", "results": formatted_results}
+
+                formatted_results, actual_return_mode = await self._group_if_pages(
+                    formatted_results, match_count, return_mode
+                )
+                response_data = self._scope_response(
+                    self._build_rag_response(
+                        query, source, match_count, formatted_results, use_hybrid_search,
+                        reranking_applied, actual_return_mode,
+                    ),
+                    sources,
+                    project_id,
+                )
+                if query_cache is not None:
+                    query_cache.put(cache_key, response_data)
+
+                span.set_attribute("total_ms", round((time.perf_counter() - start) * 1000, 2))
+                yield {"type": "complete", **response_data}
+
+            except Exception as e:
+                logger.error(f"Streaming RAG query failed: {e}")
+                span.set_attribute("error", str(e))
+                yield {
+                    "type": "error",
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "query": query,
+                    "source": source,
+                }
+
+    async def perform_batch_rag_query(
+        self,
+        queries: list[str],
+        source: str | None = None,
+        match_count: int = 5,
+        return_mode: str = "chunks",
+        max_concurrency: int | None = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        """
+        Run several RAG queries with one embedding call.
+
+        Pipeline:
+        1. Query cache lookups
+        2. One create_embeddings_batch call for all uncached queries
+        3. Vector/Hybrid searches run concurrently (at most max_concurrency at once)
+        4. Reranking for all queries is submitted together, so the reranking
+           service scores every query's candidates in one batched predict call
+        5. Page grouping (if return_mode="pages")
+
+        Args:
+            queries: Search queries (duplicates are searched once)
+            source: Optional source domain to filter results
+            match_count: Maximum number of results per query
+            return_mode: "chunks" (default) or "pages"
+            max_concurrency: Concurrent searches (defaults to RAG_BATCH_QUERY_CONCURRENCY)
+
+        Returns:
+            Tuple of (success, result_dict) where result_dict["results"] holds one
+            perform_rag_query-shaped response per query, in input order, each with
+            its own "success" flag
+        """
+        with safe_span(
+            "rag_batch_query_pipeline", query_count=len(queries), source=source, match_count=match_count
+        ) as span:
+            try:
+                unique_queries = list(dict.fromkeys(queries))
+                filter_metadata = {"source": source} if source else None
+                use_hybrid_search = self.get_bool_setting("USE_HYBRID_SEARCH", False)
+                use_reranking = bool(self.get_bool_setting("USE_RERANKING", False) and self.reranking_strategy)
+                search_match_count = match_count * 5 if use_reranking else match_count
+                if max_concurrency is None:
+                    max_concurrency = int(
+                        self.get_setting("RAG_BATCH_QUERY_CONCURRENCY", str(DEFAULT_BATCH_QUERY_CONCURRENCY))
+                    )
+
+                responses: dict[str, dict[str, Any]] = {}
+
+                # Step 1: Query cache
+                query_cache = None
+                cache_keys: dict[str, tuple] = {}
+                try:
+                    query_cache = self._get_query_cache()
+                except Exception as e:
+                    logger.warning(f"RAG query cache lookup failed: {e}")
+                if query_cache is not None:
+                    models = self._query_cache_models(use_reranking)
+                    for query in unique_queries:
+                        cache_keys[query] = make_query_key(
+                            query, source, match_count, return_mode, use_hybrid_search, use_reranking, None, models
+                        )
+                        cached_response = query_cache.get(cache_keys[query])
+                        if cached_response is not None:
+                            responses[query] = cached_response
+                pending = [query for query in unique_queries if query not in responses]
+                span.set_attribute("cache_hits", len(unique_queries) - len(pending))
+
+                # Step 2: One embedding round trip for every uncached query
+                embeddings: dict[str, list[float]] = {}
+                if pending:
+                    embedding_result = await create_embeddings_batch(pending)
+                    embeddings = dict(
+                        zip(embedding_result.texts_processed, embedding_result.embeddings, strict=True)
+                    )
+                for query in pending:
+                    if query not in embeddings:
+                        responses[query] = {
+                            "success": False,
+                            "error": "Failed to create embedding for query",
+                            "query": query,
+                            "source": source,
+                            "execution_path": "rag_service_pipeline",
+                        }
+                searchable = [query for query in pending if query in embeddings]
+
+                # Step 3: Concurrent searches
+                semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+                async def search(query: str) -> list[dict[str, Any]]:
+                    async with semaphore:
+                        return await self.search_documents(
+                            query=query,
+                            match_count=search_match_count,
+                            filter_metadata=filter_metadata,
+                            use_hybrid_search=use_hybrid_search,
+                            query_embedding=embeddings[query],
+                        )
+
+                search_results = await asyncio.gather(*(search(query) for query in searchable))
+
+                # Step 4 & 5: Reranking (batched across queries) and page grouping
+                completed = await asyncio.gather(
+                    *(
+                        self._complete_rag_query(query, source, match_count, return_mode, results, use_hybrid_search)
+                        for query, results in zip(searchable, search_results, strict=True)
+                    )
+                )
+                for query, response_data in zip(searchable, completed, strict=True):
+                    responses[query] = response_data
+                    if query_cache is not None:
+                        query_cache.put(cache_keys[query], response_data)
+
+                results = [{"success": True, **responses[query]} for query in queries]
+                span.set_attribute("searched_queries", len(searchable))
+                span.set_attribute("success", True)
+                logger.info(
+                    f"Batch RAG query completed - {len(queries)} queries, {len(searchable)} searched, "
+                    f"{len(unique_queries) - len(pending)} from cache"
+                )
+                return True, {
+                    "results": results,
+                    "query_count": len(queries),
+                    "source": source,
+                    "match_count": match_count,
+                    "search_mode": "hybrid" if use_hybrid_search else "vector",
+                    "execution_path": "rag_service_batch_pipeline",
+                }
+
+            except Exception as e:
+                logger.error(f"Batch RAG query failed: {e}")
+                span.set_attribute("error", str(e))
+                span.set_attribute("success", False)
+
+                return False, {
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "queries": queries,
+                    "source": source,
+                    "execution_path": "rag_service_batch_pipeline",
+                }
+
     async def search_code_examples_service(
         self, query: str, source_id: str | None = None, match_count: int = 5
     ) -> tuple[bool, dict[str, Any]]:
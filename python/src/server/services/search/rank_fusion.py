@@ -0,0 +1,99 @@
+"""
+Rank Fusion
+
+Merges the ranked result lists of hybrid search legs (vector similarity and
+full-text) into one ranking.
+
+- Reciprocal rank fusion (RRF): score = sum(weight / (k + rank)). Only ranks are
+  used, so the legs' incomparable score scales do not matter.
+- Weighted score fusion: each leg's scores are min-max normalized to [0, 1] and
+  combined with the leg weights.
+
+Both return results ordered by fused score with a "fusion_score" field and a
+"match_type" of "vector", "keyword" or "hybrid" (found by both legs).
+"""
+
+from typing import Any
+
+DEFAULT_RRF_K = 60
+FUSION_METHODS = ("rrf", "weighted")
+
+# Leg names double as the match_type of results found by only that leg
+VECTOR_LEG = "vector"
+KEYWORD_LEG = "keyword"
+
+
+def _result_key(result: dict[str, Any]) -> Any:
+    return result.get("id") or (result.get("url"), result.get("chunk_number"))
+
+
+def _merge(
+    legs: dict[str, list[dict[str, Any]]],
+    leg_scores: dict[str, list[float]],
+) -> list[dict[str, Any]]:
+    """Sum per-leg scores per result and order by the fused score."""
+    merged: dict[Any, dict[str, Any]] = {}
+    for leg, results in legs.items():
+        for result, score in zip(results, leg_scores[leg], strict=True):
+            key = _result_key(result)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {**result, "fusion_score": score, "match_type": leg}
+            else:
+                # Keep the first leg's fields (vector similarity wins over text rank)
+                entry["fusion_score"] += score
+                entry["match_type"] = "hybrid"
+
+    return sorted(merged.values(), key=lambda r: r["fusion_score"], reverse=True)
+
+
+def reciprocal_rank_fusion(
+    legs: dict[str, list[dict[str, Any]]],
+    k: int = DEFAULT_RRF_K,
+    weights: dict[str, float] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Fuse ranked lists with weighted reciprocal rank fusion.
+
+    Args:
+        legs: Leg name -> results in rank order
+        k: Rank offset; larger values flatten the advantage of top ranks
+        weights: Leg name -> weight (default 1.0 per leg)
+
+    Returns:
+        Deduplicated results ordered by fused score
+    """
+    weights = weights or {}
+    leg_scores = {
+        leg: [weights.get(leg, 1.0) / (k + rank) for rank in range(1, len(results) + 1)]
+        for leg, results in legs.items()
+    }
+    return _merge(legs, leg_scores)
+
+
+def weighted_score_fusion(
+    legs: dict[str, list[dict[str, Any]]],
+    score_keys: dict[str, str],
+    weights: dict[str, float] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Fuse ranked lists by min-max normalized, weighted scores.
+
+    Args:
+        legs: Leg name -> results in rank order
+        score_keys: Leg name -> result field holding that leg's score
+        weights: Leg name -> weight (default 1.0 per leg)
+
+    Returns:
+        Deduplicated results ordered by fused score
+    """
+    weights = weights or {}
+    leg_scores: dict[str, list[float]] = {}
+    for leg, results in legs.items():
+        raw = [float(result.get(score_keys[leg]) or 0.0) for result in results]
+        low, high = (min(raw), max(raw)) if raw else (0.0, 0.0)
+        span = high - low
+        weight = weights.get(leg, 1.0)
+        # A leg whose scores are all equal contributes its full weight to each result
+        leg_scores[leg] = [weight * ((score - low) / span if span else 1.0) for score in raw]
+    return _merge(legs, leg_scores)
@@ -0,0 +1,275 @@
+"""
+Reranking Service
+
+Process-wide cross-encoder inference for RerankingStrategy.
+
+- Models are loaded once per (model, backend) and shared by every RAGService.
+- predict() runs on a dedicated thread pool, so scoring never blocks the event
+  loop and concurrent queries use several cores (torch and ONNX Runtime release
+  the GIL during inference).
+- Concurrent requests for the same model are coalesced into one predict call:
+  the first request opens a short batching window, and every request arriving
+  within it joins the batch (up to max_batch_pairs).
+- Scores are cached per (loaded model, query hash, content hash), so re-asked
+  queries only score chunks they have not seen. The model part names the model,
+  backend and file actually loaded, so a torch fallback never shares ONNX scores.
+- The ONNX backend (optionally a quantized model file) can replace torch for
+  cheaper CPU inference.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ...config.logfire_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_RERANK_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_RERANK_BATCH_WINDOW_MS = 2.0
+DEFAULT_RERANK_MAX_BATCH_PAIRS = 256
+DEFAULT_RERANK_CACHE_ENTRIES = 20_000
+RERANKING_BACKENDS = ("torch", "onnx", "openvino")
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class _PendingBatch:
+    """Pairs waiting to be scored together in one predict call."""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.pairs: list[list[str]] = []
+        self.waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class RerankingService:
+    """Shared cross-encoder models, inference pool, micro-batcher and score cache."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_RERANK_WORKERS,
+        batch_window_ms: float = DEFAULT_RERANK_BATCH_WINDOW_MS,
+        max_batch_pairs: int = DEFAULT_RERANK_MAX_BATCH_PAIRS,
+        cache_max_entries: int = DEFAULT_RERANK_CACHE_ENTRIES,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.batch_window_ms = max(0.0, batch_window_ms)
+        self.max_batch_pairs = max(1, max_batch_pairs)
+        self.cache_max_entries = max(0, cache_max_entries)
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._models: dict[tuple[str, str, str | None], Any] = {}
+        self._models_lock = threading.Lock()
+        # id(model) -> "name:backend[:file]" of what was actually loaded
+        self._model_keys: dict[int, str] = {}
+        self._pending: dict[tuple[int, int], _PendingBatch] = {}
+        self._scores: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.predict_calls = 0
+
+    def configure(
+        self,
+        max_workers: int | None = None,
+        batch_window_ms: float | None = None,
+        max_batch_pairs: int | None = None,
+        cache_max_entries: int | None = None,
+    ) -> None:
+        """Apply settings; the worker count only takes effect before the pool starts."""
+        if max_workers is not None and self._executor is None:
+            self.max_workers = max(1, max_workers)
+        if batch_window_ms is not None:
+            self.batch_window_ms = max(0.0, batch_window_ms)
+        if max_batch_pairs is not None:
+            self.max_batch_pairs = max(1, max_batch_pairs)
+        if cache_max_entries is not None:
+            self.cache_max_entries = max(0, cache_max_entries)
+            self._evict()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="rerank"
+            )
+        return self._executor
+
+    def load_model(self, model_name: str, backend: str = "torch", onnx_file: str | None = None) -> Any:
+        """
+        Load a CrossEncoder once per (model, backend, file) and share it.
+
+        Falls back to the torch backend if the requested backend cannot be loaded
+        (e.g. optimum/onnxruntime not installed).
+
+        Returns:
+            The model, or None if sentence-transformers is unavailable or loading failed
+        """
+        from .reranking_strategy import CROSSENCODER_AVAILABLE, CrossEncoder
+
+        if not CROSSENCODER_AVAILABLE:
+            logger.warning("sentence-transformers not available - reranking disabled")
+            return None
+
+        backend = backend if backend in RERANKING_BACKENDS else "torch"
+        key = (model_name, backend, onnx_file if backend != "torch" else None)
+        with self._models_lock:
+            if key in self._models:
+                return self._models[key]
+
+            model = None
+            loaded_as = key
+            try:
+                logger.info(f"Loading reranking model: {model_name} (backend={backend})")
+                if backend == "torch":
+                    model = CrossEncoder(model_name)
+                else:
+                    model_kwargs = {"file_name": onnx_file} if onnx_file else None
+                    model = CrossEncoder(model_name, backend=backend, model_kwargs=model_kwargs)
+            except Exception as e:
+                logger.error(f"Failed to load reranking model {model_name} with backend {backend}: {e}")
+                if backend != "torch":
+                    loaded_as = (model_name, "torch", None)
+                    with_torch = self._models.get(loaded_as)
+                    try:
+                        model = with_torch or CrossEncoder(model_name)
+                    except Exception as torch_error:
+                        logger.error(f"Failed to load reranking model {model_name}: {torch_error}")
+
+            if model is not None:
+                self._models[key] = model
+                self._models.setdefault(loaded_as, model)
+                self._model_keys.setdefault(id(model), ":".join(part for part in loaded_as if part))
+            return model
+
+    def model_key(self, model: Any, default: str) -> str:
+        """Score-cache key for a model: what load_model actually loaded, else default."""
+        return self._model_keys.get(id(model), default)
+
+    def _evict(self) -> None:
+        while len(self._scores) > self.cache_max_entries:
+            self._scores.popitem(last=False)
+
+    async def score(self, model: Any, model_name: str, query: str, texts: list[str]) -> list[float]:
+        """
+        Score (query, text) pairs, serving cached scores and batching the rest.
+
+        Args:
+            model: Object with a predict(pairs) method
+            model_name: Name used to key the score cache
+            query: The search query
+            texts: Document texts to score against the query
+
+        Returns:
+            One score per text, in input order
+        """
+        query_hash = _hash(query)
+        keys = [(model_name, query_hash, _hash(text)) for text in texts]
+        scores: list[float | None] = [None] * len(texts)
+
+        missing: dict[tuple[str, str, str], list[int]] = {}
+        for i, key in enumerate(keys):
+            cached = self._scores.get(key)
+            if cached is not None:
+                self._scores.move_to_end(key)
+                scores[i] = cached
+                self.cache_hits += 1
+            else:
+                missing.setdefault(key, []).append(i)
+        self.cache_misses += len(missing)
+
+        if missing:
+            miss_keys = list(missing)
+            pairs = [[query, texts[missing[key][0]]] for key in miss_keys]
+            predicted = await self._submit(model, pairs)
+            for key, value in zip(miss_keys, predicted, strict=True):
+                for i in missing[key]:
+                    scores[i] = value
+                if self.cache_max_entries:
+                    self._scores[key] = value
+            self._evict()
+
+        return scores
+
+    async def _submit(self, model: Any, pairs: list[list[str]]) -> list[float]:
+        """Queue pairs for the next batched predict call on this model."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch_key = (id(model), id(loop))
+
+        batch = self._pending.get(batch_key)
+        if batch is None:
+            batch = self._pending[batch_key] = _PendingBatch(model)
+        batch.waiters.append((len(batch.pairs), len(pairs), future))
+        batch.pairs.extend(pairs)
+
+        if len(batch.pairs) >= self.max_batch_pairs:
+            self._flush(batch_key, loop)
+        elif batch.timer is None:
+            batch.timer = loop.call_later(self.batch_window_ms / 1000, self._flush, batch_key, loop)
+
+        return await future
+
+    def _flush(self, batch_key: tuple[int, int], loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._pending.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        self.predict_calls += 1
+        task = loop.run_in_executor(self._get_executor(), batch.model.predict, batch.pairs)
+
+        def resolve(done: asyncio.Future) -> None:
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            values = None if error else [float(score) for score in done.result()]
+            for start, count, future in batch.waiters:
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(values[start : start + count])
+
+        task.add_done_callback(resolve)
+
+    def clear_cache(self) -> None:
+        """Drop cached scores."""
+        self._scores.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return cache and batching counters."""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / total, 4) if total else 0.0,
+            "cache_entries": len(self._scores),
+            "predict_calls": self.predict_calls,
+            "max_workers": self.max_workers,
+            "loaded_models": [f"{name} ({backend})" for name, backend, _ in self._models],
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the inference pool (called on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+_reranking_service: RerankingService | None = None
+
+
+def get_reranking_service() -> RerankingService:
+    """Get the global reranking service instance."""
+    global _reranking_service
+    if _reranking_service is None:
+        _reranking_service = RerankingService()
+    return _reranking_service
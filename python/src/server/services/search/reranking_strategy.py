@@ -6,6 +6,8 @@ The reranking process re-scores search results based on query-document relevance
 a trained neural model, typically improving precision over initial retrieval scores.
 
 Uses the cross-encoder/ms-marco-MiniLM-L-6-v2 model for reranking by default.
+Inference runs through the shared RerankingService (thread pool, micro-batching
+and score cache) instead of on the event loop.
 """
 
 import os
@@ -20,6 +22,7 @@ except ImportError:
     CROSSENCODER_AVAILABLE = False
 
 from ...config.logfire_config import get_logger, safe_span
+from .reranking_service import RerankingService, get_reranking_service
 
 logger = get_logger(__name__)
 
@@ -31,7 +34,12 @@ class RerankingStrategy:
     """Strategy class implementing result reranking using CrossEncoder models"""
 
     def __init__(
-        self, model_name: str = DEFAULT_RERANKING_MODEL, model_instance: Any | None = None
+        self,
+        model_name: str = DEFAULT_RERANKING_MODEL,
+        model_instance: Any | None = None,
+        backend: str = "torch",
+        onnx_file: str | None = None,
+        service: RerankingService | None = None,
     ):
         """
         Initialize reranking strategy.
@@ -39,9 +47,18 @@ class RerankingStrategy:
         Args:
             model_name: Name/path of the CrossEncoder model to use
             model_instance: Pre-loaded CrossEncoder instance or any object with a predict method (optional)
+            backend: Inference backend - "torch", "onnx" or "openvino"
+            onnx_file: Model file for the onnx/openvino backends, e.g. a quantized
+                "onnx/model_qint8_avx512_vnni.onnx" (optional)
+            service: Reranking service to run inference on (defaults to the shared one)
         """
         self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.service = service or get_reranking_service()
         self.model = model_instance or self._load_model()
+        # Model, backend and file actually loaded (load_model may fall back to torch)
+        self.cache_key = self.service.model_key(self.model, f"{model_name}:{backend}")
 
     @classmethod
     def from_model(cls, model: Any, model_name: str = "custom_model") -> "RerankingStrategy":
@@ -60,17 +77,8 @@ class RerankingStrategy:
         return cls(model_name=model_name, model_instance=model)
 
     def _load_model(self) -> CrossEncoder:
-        """Load the CrossEncoder model for reranking."""
-        if not CROSSENCODER_AVAILABLE:
-            logger.warning("sentence-transformers not available - reranking disabled")
-            return None
-
-        try:
-            logger.info(f"Loading reranking model: {self.model_name}")
-            return CrossEncoder(self.model_name)
-        except Exception as e:
-            logger.error(f"Failed to load reranking model {self.model_name}: {e}")
-            return None
+        """Load (or reuse) the shared CrossEncoder model for reranking."""
+        return self.service.load_model(self.model_name, backend=self.backend, onnx_file=self.onnx_file)
 
     def is_available(self) -> bool:
         """Check if reranking is available (model loaded successfully)."""
@@ -172,9 +180,14 @@ class RerankingStrategy:
                     logger.warning("No valid texts found for reranking")
                     return results
 
-                # Get reranking scores from the model
+                # Get reranking scores from the model (cached, batched, off the event loop)
                 with safe_span("crossencoder_predict"):
-                    scores = self.model.predict(query_doc_pairs)
+                    scores = await self.service.score(
+                        self.model,
+                        self.cache_key,
+                        query,
+                        [text for _, text in query_doc_pairs],
+                    )
 
                 # Apply scores and sort results
                 reranked_results = self.apply_rerank_scores(results, scores, valid_indices, top_k)
@@ -200,6 +213,8 @@ class RerankingStrategy:
             "available": self.is_available(),
             "crossencoder_available": CROSSENCODER_AVAILABLE,
             "model_loaded": self.model is not None,
+            "backend": self.backend,
+            "service": self.service.get_stats(),
         }
 
 
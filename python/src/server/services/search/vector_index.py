@@ -0,0 +1,480 @@
+"""
+Local Vector Index
+
+Optional in-process mirror of the chunk embeddings in archon_crawled_pages and
+archon_code_examples, one index per table and embedding column. Vector search
+queries the mirror first and only falls back to the pgvector RPC when the mirror
+is not ready or the filter cannot be answered locally.
+
+Backends:
+- hnswlib HNSW graph (when hnswlib is installed) for large corpora
+- NumPy brute force over a normalized matrix for small corpora or no hnswlib
+
+The mirror is kept current incrementally:
+- inserts: writers mark the table stale, and the next search starts a background
+  sync that pulls rows with an id above the mirror's watermark
+- deletes: ids that no longer resolve when results are hydrated are dropped from
+  the mirror (that query is answered by the RPC), and deleting a source drops all
+  of its vectors
+
+Indexes are persisted under VECTOR_INDEX_DIR (NumPy arrays are reopened as
+memory-mapped files) so a restart only syncs rows added since the last save.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+    import hnswlib
+
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+from ...config.logfire_config import get_logger
+from ..client_manager import execute_async
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "data/vector_index")
+
+# Vector search RPC -> mirrored table
+RPC_TABLES = {
+    "match_archon_crawled_pages": "archon_crawled_pages",
+    "match_archon_code_examples": "archon_code_examples",
+}
+
+# Columns the vector search RPCs return (besides similarity)
+RESULT_COLUMNS = {
+    "archon_crawled_pages": "id, url, chunk_number, content, metadata, source_id",
+    "archon_code_examples": "id, url, chunk_number, content, summary, metadata, source_id",
+}
+
+SYNC_PAGE_SIZE = 500
+# Extra candidates fetched when filtering by source after the ANN search
+SOURCE_OVERSAMPLE = 4
+# Brute-force searches above this many vectors run on a worker thread
+INLINE_SEARCH_LIMIT = 50_000
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_MIN_EF = 64
+
+
+def parse_vector(value: Any) -> np.ndarray | None:
+    """Parse a pgvector value as returned by PostgREST (text "[...]" or a list)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _NumpyBackend:
+    """Brute-force cosine search over a normalized matrix."""
+
+    name = "numpy"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.sources = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self._row_of: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray, sources: np.ndarray) -> None:
+        fresh = np.array([int(i) not in self._row_of for i in ids], dtype=bool)
+        self.remove(ids[~fresh])
+        start = len(self.ids)
+        # Concatenation also turns memory-mapped arrays into writable copies
+        self.vectors = np.concatenate([self.vectors, _normalize(vectors)])
+        self.ids = np.concatenate([self.ids, ids.astype(np.int64)])
+        self.sources = np.concatenate([self.sources, sources.astype(np.int32)])
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        for offset, chunk_id in enumerate(ids):
+            self._row_of[int(chunk_id)] = start + offset
+
+    def remove(self, ids) -> None:
+        rows = [self._row_of.pop(int(i)) for i in ids if int(i) in self._row_of]
+        if rows:
+            if not self.alive.flags.writeable:
+                self.alive = np.array(self.alive)
+            self.alive[rows] = False
+
+    def remove_source(self, source: int) -> None:
+        self.remove(self.ids[(self.sources == source) & self.alive])
+
+    def search(self, query: np.ndarray, k: int, source: int | None) -> list[tuple[int, float]]:
+        mask = self.alive if source is None else self.alive & (self.sources == source)
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        sims = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(int(self.ids[candidates[i]]), float(sims[i])) for i in top]
+
+    def save(self, path: Path) -> None:
+        for name in ("vectors", "ids", "sources", "alive"):
+            tmp = path / f"{name}.tmp.npy"
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, path / f"{name}.npy")
+
+    def load(self, path: Path) -> None:
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(path / "ids.npy")
+        self.sources = np.load(path / "sources.npy")
+        self.alive = np.load(path / "alive.npy")
+        self._row_of = {int(i): row for row, i in enumerate(self.ids) if self.alive[row]}
+
+
+class _HnswBackend:
+    """HNSW graph search via hnswlib (labels are chunk ids)."""
+
+    name = "hnsw"
+
+    def __init__(self, dim: int, capacity: int = 10_000):
+        self.dim = dim
+        self.index = hnswlib.Index(space="cosine", dim=dim)
+        self.index.init_index(
+            max_elements=capacity, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M, allow_replace_deleted=True
+        )
+        self.source_of: dict[int, int] = {}
+        self.source_counts: Counter[int] = Counter()
+
+    def __len__(self) -> int:
+        return len(self.source_of)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray, sources: np.ndarray) -> None:
+        self.remove(ids)
+        needed = self.index.get_current_count() + len(ids)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+        self.index.add_items(vectors, ids.astype(np.int64), replace_deleted=True)
+        for chunk_id, source in zip(ids, sources, strict=True):
+            self.source_of[int(chunk_id)] = int(source)
+            self.source_counts[int(source)] += 1
+
+    def remove(self, ids) -> None:
+        for chunk_id in ids:
+            source = self.source_of.pop(int(chunk_id), None)
+            if source is not None:
+                self.index.mark_deleted(int(chunk_id))
+                self.source_counts[source] -= 1
+
+    def remove_source(self, source: int) -> None:
+        self.remove([chunk_id for chunk_id, code in self.source_of.items() if code == source])
+
+    def search(self, query: np.ndarray, k: int, source: int | None) -> list[tuple[int, float]] | None:
+        source_of = self.source_of
+        query_filter = None if source is None else (lambda label: source_of.get(label) == source)
+        # knn_query fails unless k vectors pass the filter
+        k = min(k, len(source_of) if source is None else self.source_counts[source])
+        if k <= 0:
+            return []
+        self.index.set_ef(max(HNSW_MIN_EF, k * 2))
+        try:
+            labels, distances = self.index.knn_query(query, k=k, filter=query_filter)
+        except RuntimeError:
+            # The graph walk did not reach k matching vectors; let the RPC answer
+            return None
+        return [(int(label), 1.0 - float(dist)) for label, dist in zip(labels[0], distances[0], strict=True)]
+
+    def save(self, path: Path) -> None:
+        tmp = path / "index.tmp.bin"
+        self.index.save_index(str(tmp))
+        os.replace(tmp, path / "index.bin")
+        ids = np.fromiter(self.source_of.keys(), dtype=np.int64, count=len(self.source_of))
+        sources = np.fromiter(self.source_of.values(), dtype=np.int32, count=len(self.source_of))
+        np.save(path / "labels.npy", np.stack([ids, sources.astype(np.int64)]))
+
+    def load(self, path: Path) -> None:
+        self.index.load_index(str(path / "index.bin"), allow_replace_deleted=True)
+        ids, sources = np.load(path / "labels.npy")
+        self.source_of = dict(zip(ids.tolist(), sources.tolist(), strict=True))
+        self.source_counts = Counter(self.source_of.values())
+
+
+class LocalVectorIndex:
+    """Mirror of one table's embedding column."""
+
+    def __init__(self, table: str, column: str, dim: int, backend: str = "auto", index_dir: str | None = None):
+        self.table = table
+        self.column = column
+        self.dim = dim
+        use_hnsw = backend == "hnsw" or (backend == "auto" and HNSWLIB_AVAILABLE)
+        if use_hnsw and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not installed - local vector index uses NumPy brute force")
+            use_hnsw = False
+        self.backend = _HnswBackend(dim) if use_hnsw else _NumpyBackend(dim)
+        self.path = Path(index_dir or DEFAULT_INDEX_DIR) / f"{table}.{column}.{self.backend.name}"
+
+        self.watermark = 0
+        self.source_codes: dict[str, int] = {}
+        self.ready = False
+        self.stale = True
+        self.last_sync: float | None = None
+        self._lock = threading.Lock()
+        self._sync_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def _source_code(self, source_id: str | None) -> int:
+        if source_id not in self.source_codes:
+            self.source_codes[source_id] = len(self.source_codes)
+        return self.source_codes[source_id]
+
+    def add_rows(self, rows: list[dict[str, Any]]) -> int:
+        """Add rows carrying id, source_id and the embedding column; returns rows added."""
+        ids, vectors, sources = [], [], []
+        for row in rows:
+            vector = parse_vector(row.get(self.column))
+            if vector is None or len(vector) != self.dim:
+                continue
+            ids.append(int(row["id"]))
+            vectors.append(vector)
+            sources.append(self._source_code(row.get("source_id")))
+        if rows:
+            self.watermark = max(self.watermark, max(int(row["id"]) for row in rows))
+        if ids:
+            with self._lock:
+                self.backend.add(np.array(ids), np.stack(vectors), np.array(sources))
+        return len(ids)
+
+    def remove_ids(self, ids) -> None:
+        with self._lock:
+            self.backend.remove(ids)
+
+    def remove_source(self, source_id: str) -> None:
+        code = self.source_codes.get(source_id)
+        if code is not None:
+            with self._lock:
+                self.backend.remove_source(code)
+
+    def search(
+        self, query_embedding: list[float], k: int, source_id: str | None = None
+    ) -> list[tuple[int, float]] | None:
+        """Return (chunk id, cosine similarity) pairs, best first, or None if the index cannot answer."""
+        source = None
+        if source_id is not None:
+            source = self.source_codes.get(source_id)
+            if source is None:
+                return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        with self._lock:
+            return self.backend.search(query, k, source)
+
+    async def sync(self, client) -> int:
+        """Pull rows added since the watermark; returns how many were added."""
+        async with self._sync_lock:
+            self.stale = False
+            added = 0
+            while True:
+                response = await execute_async(
+                    client.table(self.table)
+                    .select(f"id, source_id, {self.column}")
+                    .gt("id", self.watermark)
+                    .not_.is_(self.column, "null")
+                    .order("id")
+                    .limit(SYNC_PAGE_SIZE)
+                )
+                rows = response.data or []
+                if rows:
+                    added += await asyncio.to_thread(self.add_rows, rows)
+                if len(rows) < SYNC_PAGE_SIZE:
+                    break
+            self.ready = True
+            self.last_sync = time.time()
+            if added:
+                await asyncio.to_thread(self.save)
+            return added
+
+    def save(self) -> None:
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self.backend.save(self.path)
+                meta = {"dim": self.dim, "watermark": self.watermark, "source_codes": self.source_codes}
+            (self.path / "meta.json").write_text(json.dumps(meta))
+        except Exception as e:
+            logger.warning(f"Failed to persist local vector index {self.path}: {e}")
+
+    def load(self) -> bool:
+        """Load a persisted index; returns True if one was found."""
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return False
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("dim") != self.dim:
+                return False
+            self.backend.load(self.path)
+            self.watermark = meta["watermark"]
+            self.source_codes = meta["source_codes"]
+            self.ready = True
+            self.stale = True
+            logger.info(f"Loaded local vector index {self.path.name} ({len(self)} vectors)")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load local vector index {self.path}: {e}")
+            return False
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "column": self.column,
+            "backend": self.backend.name,
+            "vectors": len(self),
+            "watermark": self.watermark,
+            "ready": self.ready,
+            "stale": self.stale,
+            "last_sync": self.last_sync,
+        }
+
+
+class VectorIndexManager:
+    """Owns the local indexes and answers vector searches from them."""
+
+    def __init__(self, backend: str = "auto", index_dir: str | None = None):
+        self.backend = backend
+        self.index_dir = index_dir
+        self._indexes: dict[tuple[str, str], LocalVectorIndex] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def configure(self, backend: str | None = None) -> None:
+        """Choose the backend for indexes created from now on."""
+        if backend:
+            self.backend = backend
+
+    def get_index(self, table: str, dim: int) -> LocalVectorIndex:
+        column = f"embedding_{dim}"
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = LocalVectorIndex(table, column, dim, backend=self.backend, index_dir=self.index_dir)
+            index.load()
+            self._indexes[(table, column)] = index
+        return index
+
+    def _schedule_sync(self, index: LocalVectorIndex, client) -> None:
+        if index._sync_lock.locked():
+            return
+
+        async def run():
+            try:
+                added = await index.sync(client)
+                if added:
+                    logger.info(f"Local vector index {index.table}.{index.column}: +{added} vectors")
+            except Exception as e:
+                index.stale = True
+                logger.warning(f"Local vector index sync failed for {index.table}.{index.column}: {e}")
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def search(
+        self,
+        client,
+        table_rpc: str,
+        query_embedding: list[float],
+        match_count: int,
+        source_filter: str | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """
+        Answer a vector search from the local index.
+
+        Returns:
+            Rows shaped like the RPC results, or None when the caller should use the RPC
+        """
+        table = RPC_TABLES.get(table_rpc)
+        if table is None:
+            return None
+
+        index = self.get_index(table, len(query_embedding))
+        if index.stale or not index.ready:
+            self._schedule_sync(index, client)
+        if not index.ready:
+            return None
+
+        k = match_count * SOURCE_OVERSAMPLE if source_filter else match_count
+        if len(index) > INLINE_SEARCH_LIMIT and index.backend.name == "numpy":
+            hits = await asyncio.to_thread(index.search, query_embedding, k, source_filter)
+        else:
+            hits = index.search(query_embedding, k, source_filter)
+        if hits is None:
+            return None
+        hits = hits[:match_count]
+        if not hits:
+            return []
+
+        # Fetch the result rows by primary key
+        response = await execute_async(
+            client.table(table).select(RESULT_COLUMNS[table]).in_("id", [chunk_id for chunk_id, _ in hits])
+        )
+        rows_by_id = {int(row["id"]): row for row in response.data or []}
+
+        # Ids that no longer exist were deleted since the last sync; drop them and
+        # let the RPC answer this query so it still gets match_count results
+        deleted = [chunk_id for chunk_id, _ in hits if chunk_id not in rows_by_id]
+        if deleted:
+            index.remove_ids(deleted)
+            return None
+
+        return [
+            {**rows_by_id[chunk_id], "similarity": similarity}
+            for chunk_id, similarity in hits
+            if chunk_id in rows_by_id
+        ]
+
+    def mark_stale(self, table: str) -> None:
+        """Note that rows were written to a table; the next search syncs them."""
+        for (index_table, _), index in self._indexes.items():
+            if index_table == table:
+                index.stale = True
+
+    def remove_source(self, source_id: str) -> None:
+        """Drop every vector of a deleted source."""
+        for index in self._indexes.values():
+            index.remove_source(source_id)
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        return [index.get_stats() for index in self._indexes.values()]
+
+
+# Global instance
+_vector_index_manager: VectorIndexManager | None = None
+
+
+def get_vector_index_manager() -> VectorIndexManager:
+    """Get the global local vector index manager."""
+    global _vector_index_manager
+    if _vector_index_manager is None:
+        _vector_index_manager = VectorIndexManager()
+    return _vector_index_manager
+
+
+def mark_vector_index_stale(*tables: str) -> None:
+    """Tell the local vector index that rows were written to these tables."""
+    if _vector_index_manager is not None:
+        for table in tables:
+            _vector_index_manager.mark_stale(table)
@@ -10,7 +10,7 @@ from typing import Any
 from supabase import Client
 
 from ..config.logfire_config import get_logger, search_logger
-from .client_manager import get_supabase_client
+from .client_manager import execute_async, get_supabase_client
 from .llm_provider_service import extract_message_text, get_llm_client
 
 logger = get_logger(__name__)
@@ -241,8 +241,8 @@ async def update_source_info(
     search_logger.info(f"Updating source {source_id} with knowledge_type={knowledge_type}")
     try:
         # First, check if source already exists to preserve title
-        existing_source = (
-            client.table("archon_sources").select("title").eq("source_id", source_id).execute()
+        existing_source = await execute_async(
+            client.table("archon_sources").select("title").eq("source_id", source_id)
         )
 
         if existing_source.data:
@@ -288,7 +288,7 @@ async def update_source_info(
             if source_display_name:
                 upsert_data["source_display_name"] = source_display_name
 
-            client.table("archon_sources").upsert(upsert_data).execute()
+            await execute_async(client.table("archon_sources").upsert(upsert_data), write=True)
 
             search_logger.info(
                 f"Updated source {source_id} while preserving title: {existing_title}"
@@ -351,7 +351,7 @@ async def update_source_info(
             if source_display_name:
                 upsert_data["source_display_name"] = source_display_name
 
-            client.table("archon_sources").upsert(upsert_data).execute()
+            await execute_async(client.table("archon_sources").upsert(upsert_data), write=True)
             search_logger.info(f"Created/updated source {source_id} with title: {title}")
 
     except Exception as e:
@@ -425,6 +425,14 @@ class SourceManagementService:
 
             if source_deleted > 0:
                 logger.info(f"Successfully deleted source {source_id} and all related data via CASCADE")
+                from .search.page_metadata_cache import get_page_metadata_cache
+                from .search.query_cache import invalidate_source_queries
+                from .search.vector_index import get_vector_index_manager
+
+                invalidate_source_queries(source_id)
+                get_vector_index_manager().remove_source(source_id)
+                # CASCADE removed the source's pages too
+                get_page_metadata_cache().clear()
                 return True, {
                     "source_id": source_id,
                     "message": "Source and all related data deleted successfully via CASCADE DELETE"
@@ -5,8 +5,10 @@ Handles document and code storage operations.
 """
 
 from .base_storage_service import BaseStorageService
+from .bulk_ingest import BulkIngestService, get_bulk_ingest_service
 from .code_storage_service import (
     add_code_examples_to_supabase,
+    deduplicate_code_blocks,
     extract_code_blocks,
     generate_code_example_summary,
 )
@@ -18,10 +20,13 @@ __all__ = [
     "BaseStorageService",
     # Service classes
     "DocumentStorageService",
+    "BulkIngestService",
+    "get_bulk_ingest_service",
     # Document storage utilities
     "add_documents_to_supabase",
     # Code storage utilities
     "extract_code_blocks",
+    "deduplicate_code_blocks",
     "generate_code_example_summary",
     "add_code_examples_to_supabase",
 ]
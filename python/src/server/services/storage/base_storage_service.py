@@ -15,6 +15,7 @@ from typing import Any
 from urllib.parse import urlparse
 
 from ...config.logfire_config import get_logger, safe_span
+from .text_chunker import ChunkerConfig, ChunkTokenizer, TextChunker, chunk_texts_async, get_chunker_config
 
 logger = get_logger(__name__)
 
@@ -36,7 +37,13 @@ class BaseStorageService(ABC):
 
         self.threading_service = get_utils_threading_service()
 
-    def smart_chunk_text(self, text: str, chunk_size: int = 600) -> list[str]:
+    def smart_chunk_text(
+        self,
+        text: str,
+        chunk_size: int = 600,
+        overlap: int = 0,
+        tokenizer: ChunkTokenizer | None = None,
+    ) -> list[str]:
         """
         Split text into chunks intelligently, preserving context.
 
@@ -48,7 +55,9 @@ class BaseStorageService(ABC):
 
         Args:
             text: Text to chunk
-            chunk_size: Maximum chunk size (default: 600, optimized for Qwen3-Embedding 256-token limit)
+            chunk_size: Maximum chunk size in tokens of the tokenizer (default: 600 characters)
+            overlap: Tokens repeated from the end of a chunk at the start of the next
+            tokenizer: Token counter (default: every character is a token)
 
         Returns:
             List of text chunks
@@ -57,67 +66,7 @@ class BaseStorageService(ABC):
             logger.warning("Invalid text provided for chunking")
             return []
 
-        chunks = []
-        start = 0
-        text_length = len(text)
-
-        while start < text_length:
-            # Determine the end of this chunk
-            end = start + chunk_size
-
-            # If we're at the end of the text, take what's left
-            if end >= text_length:
-                chunk = text[start:].strip()
-                if chunk:
-                    chunks.append(chunk)
-                break
-
-            # Try to find a good break point
-            chunk = text[start:end]
-
-            # First, try to break at a code block boundary
-            code_block_pos = chunk.rfind("```")
-            if code_block_pos != -1 and code_block_pos > chunk_size * 0.3:
-                end = start + code_block_pos
-
-            # If no code block, try paragraph break
-            elif "\n\n" in chunk:
-                last_break = chunk.rfind("\n\n")
-                if last_break > chunk_size * 0.3:
-                    end = start + last_break
-
-            # If no paragraph break, try sentence break
-            elif ". " in chunk:
-                last_period = chunk.rfind(". ")
-                if last_period > chunk_size * 0.3:
-                    end = start + last_period + 1
-
-            # Extract chunk and clean it up
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-
-            # Move start position for next chunk
-            start = end
-
-        # Combine consecutive small chunks (<200 chars) together
-        if chunks:
-            combined_chunks: list[str] = []
-            i = 0
-            while i < len(chunks):
-                current = chunks[i]
-
-                # Keep combining while current is small and there are more chunks
-                while len(current) < 200 and i + 1 < len(chunks):
-                    i += 1
-                    current = current + "\n\n" + chunks[i]
-
-                combined_chunks.append(current)
-                i += 1
-
-            chunks = combined_chunks
-
-        return chunks
+        return TextChunker(tokenizer, max_tokens=chunk_size, overlap=overlap).chunk(text)
 
     async def smart_chunk_text_async(
         self, text: str, chunk_size: int = 600, progress_callback: Callable | None = None
@@ -125,9 +74,12 @@ class BaseStorageService(ABC):
         """
         Async version of smart_chunk_text with optional progress reporting.
 
+        Uses the CHUNK_TOKENIZER / CHUNK_MAX_TOKENS / CHUNK_OVERLAP settings;
+        chunk_size applies when chunks are measured in characters.
+
         Args:
             text: Text to chunk
-            chunk_size: Maximum chunk size (default: 600, optimized for Qwen3-Embedding 256-token limit)
+            chunk_size: Maximum chunk size in characters (default: 600)
             progress_callback: Optional callback for progress updates
 
         Returns:
@@ -137,8 +89,12 @@ class BaseStorageService(ABC):
             "smart_chunk_text_async", text_length=len(text), chunk_size=chunk_size
         ) as span:
             try:
+                config = await get_chunker_config(chunk_size)
+                if config != ChunkerConfig(max_tokens=chunk_size):
+                    # Token budgets / overlap from the settings
+                    chunks = (await chunk_texts_async([text], config))[0] if text and isinstance(text, str) else []
                 # For large texts, run chunking in thread pool
-                if len(text) > 50000:  # 50KB threshold
+                elif len(text) > 50000:  # 50KB threshold
                     chunks = await self.threading_service.run_cpu_intensive(
                         self.smart_chunk_text, text, chunk_size
                     )
@@ -163,6 +119,23 @@ class BaseStorageService(ABC):
                 logger.error(f"Error chunking text: {e}")
                 raise
 
+    async def smart_chunk_texts_async(self, texts: list[str], chunk_size: int = 600) -> list[list[str]]:
+        """
+        Chunk many documents at once; large batches run on the chunking process pool.
+
+        Args:
+            texts: Texts to chunk
+            chunk_size: Maximum chunk size in characters (default: 600)
+
+        Returns:
+            Chunks per text, in input order
+        """
+        with safe_span("smart_chunk_texts_async", text_count=len(texts), chunk_size=chunk_size) as span:
+            config = await get_chunker_config(chunk_size)
+            chunks = await chunk_texts_async([text if isinstance(text, str) else "" for text in texts], config)
+            span.set_attribute("chunks_created", sum(len(text_chunks) for text_chunks in chunks))
+            return chunks
+
     def extract_metadata(
         self, chunk: str, base_metadata: dict[str, Any] | None = None
     ) -> dict[str, Any]:
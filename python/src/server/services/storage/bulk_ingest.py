@@ -0,0 +1,271 @@
+"""
+Bulk Ingest Service
+
+Optional direct-Postgres write path for large ingests. Instead of posting JSON
+batches through PostgREST (every embedding serialized as ~1536 decimal
+strings), rows are streamed with asyncpg's binary COPY into a temporary
+staging table, vectors in pgvector's binary format, and then merged into the
+target table with a single INSERT ... SELECT ... ON CONFLICT.
+
+Enabled with the USE_POSTGRES_COPY_INGEST setting; needs DATABASE_URI (the
+direct Postgres connection string). Callers fall back to PostgREST whenever
+this path is unavailable or fails.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+from ...config.logfire_config import safe_span, search_logger
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - asyncpg is a declared server dependency
+    asyncpg = None
+
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 4
+
+# Conflict targets for the set-based merge (the tables' unique constraints)
+CONFLICT_COLUMNS = {
+    "archon_crawled_pages": ("url", "chunk_number"),
+    "archon_code_examples": ("url", "chunk_number"),
+}
+
+
+def encode_vector(value: Sequence[float]) -> bytes:
+    """
+    Encode a vector in pgvector's binary wire format.
+
+    Layout: uint16 dimension, uint16 unused, then big-endian float4 values.
+    """
+    floats = array("f", value)
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return struct.pack(">HH", len(floats), 0) + floats.tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    """Decode pgvector's binary wire format (used when reading vectors back)."""
+    dim, _ = struct.unpack_from(">HH", data)
+    floats = array("f")
+    floats.frombytes(data[4 : 4 + 4 * dim])
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return floats.tolist()
+
+
+def encode_halfvec(value: Sequence[float]) -> bytes:
+    """Encode a halfvec in pgvector's binary wire format (big-endian float2 values)."""
+    return struct.pack(f">HH{len(value)}e", len(value), 0, *value)
+
+
+def decode_halfvec(data: bytes) -> list[float]:
+    """Decode pgvector's halfvec binary wire format."""
+    dim, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dim}e", data, 4))
+
+
+# Version byte of Postgres' binary jsonb format
+JSONB_FORMAT_VERSION = b"\x01"
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a value in Postgres' binary jsonb format (version byte, then JSON text)."""
+    return JSONB_FORMAT_VERSION + json.dumps(value).encode("utf-8")
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode Postgres' binary jsonb format."""
+    return json.loads(data[1:].decode("utf-8"))
+
+
+def encode_bits(value: str) -> bytes:
+    """Encode a '0'/'1' string (binary-quantized embedding) in Postgres' binary bit format."""
+    byte_count = (len(value) + 7) // 8
+    packed = int(value.ljust(byte_count * 8, "0") or "0", 2).to_bytes(byte_count, "big")
+    return struct.pack(">i", len(value)) + packed
+
+
+def decode_bits(data: bytes) -> str:
+    """Decode Postgres' binary bit format into a '0'/'1' string."""
+    (length,) = struct.unpack_from(">i", data)
+    return "".join(f"{byte:08b}" for byte in data[4:])[:length]
+
+
+async def _init_connection(connection) -> None:
+    """Register codecs on each pooled connection (binary: copy_records_to_table has no text codecs)."""
+    await connection.set_type_codec(
+        "jsonb", encoder=encode_jsonb, decoder=decode_jsonb, schema="pg_catalog", format="binary"
+    )
+    # Quantized embedding columns are written as '0'/'1' strings
+    await connection.set_type_codec(
+        "bit", encoder=encode_bits, decoder=decode_bits, schema="pg_catalog", format="binary"
+    )
+    # pgvector may live in "public" or Supabase's "extensions" schema
+    rows = await connection.fetch(
+        "SELECT t.typname, n.nspname FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace "
+        "WHERE t.typname IN ('vector', 'halfvec')"
+    )
+    codecs = {"vector": (encode_vector, decode_vector), "halfvec": (encode_halfvec, decode_halfvec)}
+    for row in rows:
+        encoder, decoder = codecs[row["typname"]]
+        await connection.set_type_codec(
+            row["typname"],
+            encoder=encoder,
+            decoder=decoder,
+            schema=row["nspname"],
+            format="binary",
+        )
+
+
+class BulkIngestService:
+    """Writes row batches through asyncpg COPY into staging tables plus a set-based merge."""
+
+    def __init__(self, dsn: str | None = None):
+        """
+        Initialize the bulk ingest service.
+
+        Args:
+            dsn: Postgres connection string (defaults to the DATABASE_URI environment variable)
+        """
+        self.dsn = dsn or os.getenv("DATABASE_URI")
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether a direct Postgres connection can be attempted."""
+        return asyncpg is not None and bool(self.dsn)
+
+    async def _get_pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=POOL_MIN_SIZE,
+                        max_size=POOL_MAX_SIZE,
+                        init=_init_connection,
+                    )
+        return self._pool
+
+    async def insert_rows(self, table: str, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert rows with COPY into a staging table, then merge into the target table.
+
+        Rows may use different column sets (e.g. different embedding columns); each
+        set is copied separately within one transaction. Rows that collide on the
+        table's unique key replace the stored row.
+
+        Args:
+            table: Target table (archon_crawled_pages or archon_code_examples)
+            rows: Row dicts shaped like the PostgREST insert payload
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            RuntimeError: If asyncpg or DATABASE_URI is not available
+            ValueError: If the table has no known conflict target
+        """
+        if not rows:
+            return 0
+        if not self.available:
+            raise RuntimeError("Direct Postgres ingest requires asyncpg and DATABASE_URI")
+        conflict_columns = CONFLICT_COLUMNS.get(table)
+        if conflict_columns is None:
+            raise ValueError(f"Bulk ingest not supported for table {table}")
+
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(row)
+
+        with safe_span("bulk_ingest_copy", table=table, rows=len(rows), column_sets=len(groups)):
+            pool = await self._get_pool()
+            written = 0
+            async with pool.acquire() as connection, connection.transaction():
+                for columns, group in groups.items():
+                    written += await self._copy_and_merge(
+                        connection, table, columns, group, conflict_columns
+                    )
+            return written
+
+    async def _copy_and_merge(
+        self,
+        connection,
+        table: str,
+        columns: tuple[str, ...],
+        rows: list[dict[str, Any]],
+        conflict_columns: tuple[str, ...],
+    ) -> int:
+        staging = f"_stage_{table}"
+        column_list = ", ".join(f'"{column}"' for column in columns)
+
+        # Same column types as the target, without constraints, defaults or generated columns
+        await connection.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        await connection.execute(
+            f'CREATE TEMP TABLE "{staging}" ON COMMIT DROP AS '
+            f'SELECT {column_list} FROM "{table}" WITH NO DATA'
+        )
+        await connection.copy_records_to_table(
+            staging,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=list(columns),
+        )
+
+        updates = ", ".join(
+            f'"{column}" = EXCLUDED."{column}"' for column in columns if column not in conflict_columns
+        )
+        conflict = ", ".join(f'"{column}"' for column in conflict_columns)
+        # DISTINCT ON keeps the last row per key - ON CONFLICT cannot touch a row twice
+        status = await connection.execute(
+            f'INSERT INTO "{table}" ({column_list}) '
+            f'SELECT DISTINCT ON ({conflict}) {column_list} FROM "{staging}" '
+            f'ORDER BY {conflict} '
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+        )
+        # Status is "INSERT 0 <count>"
+        return int(status.rsplit(" ", 1)[-1])
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+_bulk_ingest_service: BulkIngestService | None = None
+
+
+def get_bulk_ingest_service() -> BulkIngestService:
+    """Get the shared bulk ingest service (one connection pool per process)."""
+    global _bulk_ingest_service
+    if _bulk_ingest_service is None:
+        _bulk_ingest_service = BulkIngestService()
+    return _bulk_ingest_service
+
+
+async def is_copy_ingest_enabled(rag_settings: dict[str, Any] | None = None) -> bool:
+    """
+    Whether USE_POSTGRES_COPY_INGEST is on and a direct connection is configured.
+
+    Args:
+        rag_settings: Already loaded rag_strategy settings, to avoid another lookup
+    """
+    if not get_bulk_ingest_service().available:
+        return False
+    try:
+        if rag_settings is None:
+            from ..credential_service import credential_service
+
+            rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+        return str(rag_settings.get("USE_POSTGRES_COPY_INGEST", "false")).lower() == "true"
+    except Exception as e:
+        search_logger.warning(f"Failed to read USE_POSTGRES_COPY_INGEST, using PostgREST: {e}")
+        return False
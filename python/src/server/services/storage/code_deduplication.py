@@ -0,0 +1,132 @@
+"""
+Code Block Deduplication
+
+Groups near-duplicate code blocks without comparing every pair. Each
+(normalized) block is shingled into character n-grams and summarized by a
+MinHash signature; locality-sensitive hashing over bands of the signature
+yields candidate pairs, and only those pairs get the exact SequenceMatcher
+similarity check. Work grows roughly linearly with the number of blocks
+instead of quadratically.
+
+The banding is deliberately permissive (a pair with shingle Jaccard ~0.4 is
+already likely to collide) so that pairs above the SequenceMatcher threshold
+are almost never missed; the exact check filters the extra candidates.
+"""
+
+import zlib
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_SHINGLE_SIZE = 4
+
+# Prime just above 2**32: a * x + b stays below 2**64 for 32-bit a, b and x
+_HASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2**32 - 1)
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    """32-bit hashes of the distinct character shingles of a string."""
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+    )
+
+
+class CodeBlockDeduplicator:
+    """MinHash/LSH candidate generation plus an exact similarity check on the candidates."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: SequenceMatcher ratio at which two blocks count as duplicates
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            shingle_size: Character n-gram length
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a string's shingle set."""
+        hashes = _shingle_hashes(text, self.shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) % _HASH_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def candidate_pairs(self, texts: list[str]) -> dict[int, set[int]]:
+        """Map each index to the later indices sharing at least one LSH bucket with it."""
+        buckets: dict[tuple[int, bytes], list[int]] = defaultdict(list)
+        for index, text in enumerate(texts):
+            signature = self.signature(text)
+            for band in range(self.bands):
+                band_slice = signature[band * self.rows : (band + 1) * self.rows]
+                buckets[(band, band_slice.tobytes())].append(index)
+
+        candidates: dict[int, set[int]] = defaultdict(set)
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                candidates[first].update(members[position + 1 :])
+        return candidates
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Exact SequenceMatcher ratio, skipped when its cheap upper bounds fall short."""
+        matcher = SequenceMatcher(None, text1, text2)
+        if matcher.real_quick_ratio() < self.threshold or matcher.quick_ratio() < self.threshold:
+            return 0.0
+        return matcher.ratio()
+
+    def group(self, texts: list[str]) -> list[list[int]]:
+        """
+        Group near-duplicate strings.
+
+        Groups are formed greedily in input order: each ungrouped string starts a
+        group and takes every later ungrouped string similar to it, matching the
+        all-pairs scan this replaces (restricted to the LSH candidates).
+
+        Args:
+            texts: Already normalized strings
+
+        Returns:
+            Groups of indices, each starting with the index of the string that opened it
+        """
+        candidates = self.candidate_pairs(texts)
+        grouped: set[int] = set()
+        groups = []
+        for index in range(len(texts)):
+            if index in grouped:
+                continue
+            group = [index]
+            grouped.add(index)
+            for other in sorted(candidates.get(index, ())):
+                if other in grouped:
+                    continue
+                if self.similarity(texts[index], texts[other]) >= self.threshold:
+                    group.append(other)
+                    grouped.add(other)
+            groups.append(group)
+        return groups
@@ -18,9 +18,11 @@ from urllib.parse import urlparse
 from supabase import Client
 
 from ...config.logfire_config import search_logger
+from ..client_manager import execute_async
 from ..credential_service import credential_service
 from ..embeddings.contextual_embedding_service import generate_contextual_embeddings_batch
 from ..embeddings.embedding_service import create_embeddings_batch
+from ..embeddings.multi_dimensional_embedding_service import multi_dimensional_embedding_service
 from ..llm_provider_service import (
     extract_json_from_reasoning,
     extract_message_text,
@@ -28,6 +30,8 @@ from ..llm_provider_service import (
     prepare_chat_completion_params,
     synthesize_json_from_reasoning,
 )
+from .bulk_ingest import get_bulk_ingest_service, is_copy_ingest_enabled
+from .code_deduplication import DEFAULT_SIMILARITY_THRESHOLD, CodeBlockDeduplicator
 
 
 def _extract_json_payload(raw_response: str, context_code: str = "", language: str = "") -> str:
@@ -248,8 +252,8 @@ def _select_best_code_variant(similar_blocks: list[dict[str, Any]]) -> dict[str,
     # Sort by score and return the best one
     best_block = max(similar_blocks, key=score_block)
 
-    # Add metadata about consolidated variants
-    variant_count = len(similar_blocks)
+    # Add metadata about consolidated variants (blocks may already stand for several)
+    variant_count = sum(block.get("consolidated_variants", 1) for block in similar_blocks)
     if variant_count > 1:
         languages = [block.get("language", "") for block in similar_blocks if block.get("language")]
         unique_languages = list(set(filter(None, languages)))
@@ -262,14 +266,50 @@ def _select_best_code_variant(similar_blocks: list[dict[str, Any]]) -> dict[str,
     return best_block
 
 
+def deduplicate_code_blocks(
+    items: list[dict[str, Any]],
+    block_key: str | None = None,
+    similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """
+    Collapse near-duplicate code blocks into their best variant.
+
+    Each block is normalized once; MinHash/LSH picks the candidate pairs that
+    get the exact similarity check (see CodeBlockDeduplicator).
+
+    Args:
+        items: Code block dicts, or wrappers holding one under block_key
+        block_key: Key of the code block inside each item (None: items are blocks)
+        similarity_threshold: Similarity at which blocks count as duplicates
 
-def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[dict[str, Any]]:
+    Returns:
+        One item per group of similar blocks, in first-seen order
+    """
+    if len(items) < 2:
+        return items
+
+    blocks = [item[block_key] if block_key else item for item in items]
+    normalized = [_normalize_code_for_comparison(block["code"]) for block in blocks]
+    groups = CodeBlockDeduplicator(threshold=similarity_threshold).group(normalized)
+
+    deduplicated = []
+    for group in groups:
+        best_block = _select_best_code_variant([blocks[index] for index in group])
+        deduplicated.append(next(items[index] for index in group if blocks[index] is best_block))
+    return deduplicated
+
+
+def extract_code_blocks(
+    markdown_content: str, min_length: int = None, settings: dict[str, Any] | None = None
+) -> list[dict[str, Any]]:
     """
     Extract code blocks from markdown content along with context.
 
     Args:
         markdown_content: The markdown content to extract code blocks from
         min_length: Minimum length of code blocks to extract (default: from settings or 250)
+        settings: Optional settings snapshot (key -> value) that takes precedence over the
+            credential cache, e.g. in code extraction worker processes
 
     Returns:
         List of dictionaries containing code blocks and their context
@@ -277,6 +317,8 @@ def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[d
     # Load all code extraction settings with direct fallback
     try:
         def _get_setting_fallback(key: str, default: str) -> str:
+            if settings is not None and key in settings:
+                return str(settings[key])
             if credential_service._cache_initialized and key in credential_service._cache:
                 return credential_service._cache[key]
             return os.getenv(key, default)
@@ -334,7 +376,7 @@ def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[d
             search_logger.info(
                 f"Attempting to extract from inner content (length: {len(inner_content)})"
             )
-            return extract_code_blocks(inner_content, min_length)
+            return extract_code_blocks(inner_content, min_length, settings)
         # For normal language identifiers (e.g., ```python, ```javascript), process normally
         # No need to skip anything - the extraction logic will handle it correctly
         start_offset = 0
@@ -558,34 +600,8 @@ def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[d
 
     search_logger.debug(f"Starting deduplication process for {len(code_blocks)} code blocks")
 
-    # Group similar code blocks together
-    similarity_threshold = 0.85  # 85% similarity threshold
-    grouped_blocks = []
-    processed_indices = set()
-
-    for i, block1 in enumerate(code_blocks):
-        if i in processed_indices:
-            continue
-
-        # Start a new group with this block
-        similar_group = [block1]
-        processed_indices.add(i)
-
-        # Find all similar blocks
-        for j, block2 in enumerate(code_blocks):
-            if j <= i or j in processed_indices:
-                continue
-
-            similarity = _calculate_code_similarity(block1["code"], block2["code"])
-
-            if similarity >= similarity_threshold:
-                similar_group.append(block2)
-                processed_indices.add(j)
-                search_logger.debug(f"Found similar code blocks with {similarity:.2f} similarity")
-
-        # Select the best variant from the similar group
-        best_variant = _select_best_code_variant(similar_group)
-        grouped_blocks.append(best_variant)
+    # Group similar code blocks (85% similarity) and keep the best variant of each
+    grouped_blocks = deduplicate_code_blocks(code_blocks)
 
     deduplicated_count = len(code_blocks) - len(grouped_blocks)
     if deduplicated_count > 0:
@@ -1187,10 +1203,13 @@ async def add_code_examples_to_supabase(
     unique_urls = list(set(urls))
     for url in unique_urls:
         try:
-            client.table("archon_code_examples").delete().eq("url", url).execute()
+            await execute_async(client.table("archon_code_examples").delete().eq("url", url), write=True)
         except Exception as e:
             search_logger.error(f"Error deleting existing code examples for {url}: {e}")
 
+    # Imported here: the search package pulls in the RAG stack
+    from ..search.vector_index import mark_vector_index_stale
+
     # Check if contextual embeddings are enabled (use proper async method like document storage)
     try:
         raw_value = await credential_service.get_credential(
@@ -1211,6 +1230,18 @@ async def add_code_examples_to_supabase(
         f"Using contextual embeddings for code examples: {use_contextual_embeddings}"
     )
 
+    # Binary COPY over a direct Postgres connection instead of PostgREST JSON inserts
+    use_copy_ingest = await is_copy_ingest_enabled()
+
+    # Compact ANN column (halfvec or binary) written next to the full-precision embedding
+    try:
+        storage_mode = multi_dimensional_embedding_service.normalize_storage_mode(
+            await credential_service.get_credential("EMBEDDING_STORAGE_MODE", "full")
+        )
+    except Exception as e:
+        search_logger.warning(f"Failed to load embedding storage mode: {e}, using full precision")
+        storage_mode = "full"
+
     # Process in batches
     total_items = len(urls)
     for i in range(0, total_items, batch_size):
@@ -1356,6 +1387,9 @@ async def add_code_examples_to_supabase(
                 "llm_chat_model": llm_chat_model,  # Add LLM model tracking
                 "embedding_model": embedding_model_name,  # Add embedding model tracking
                 "embedding_dimension": embedding_dim,  # Add dimension tracking
+                **multi_dimensional_embedding_service.get_quantized_columns(
+                    embedding_column, embedding, storage_mode
+                ),
             })
 
         if not batch_data:
@@ -1368,7 +1402,17 @@ async def add_code_examples_to_supabase(
 
         for retry in range(max_retries):
             try:
-                client.table("archon_code_examples").insert(batch_data).execute()
+                if use_copy_ingest:
+                    try:
+                        await get_bulk_ingest_service().insert_rows("archon_code_examples", batch_data)
+                    except Exception as copy_error:
+                        # Stay on PostgREST for the rest of this call
+                        search_logger.warning(
+                            f"COPY ingest failed, falling back to PostgREST inserts: {copy_error}"
+                        )
+                        use_copy_ingest = False
+                if not use_copy_ingest:
+                    await execute_async(client.table("archon_code_examples").insert(batch_data), write=True)
                 # Success - break out of retry loop
                 break
             except Exception as e:
@@ -1387,7 +1431,7 @@ async def add_code_examples_to_supabase(
                     successful_inserts = 0
                     for record in batch_data:
                         try:
-                            client.table("archon_code_examples").insert(record).execute()
+                            await execute_async(client.table("archon_code_examples").insert(record), write=True)
                             successful_inserts += 1
                         except Exception as individual_error:
                             search_logger.error(
@@ -1402,6 +1446,7 @@ async def add_code_examples_to_supabase(
         search_logger.info(
             f"Inserted batch {i // batch_size + 1} of {(total_items + batch_size - 1) // batch_size} code examples"
         )
+        mark_vector_index_stale("archon_code_examples")
 
         # Report progress if callback provided
         if progress_callback:
@@ -9,8 +9,11 @@ import os
 from typing import Any
 
 from ...config.logfire_config import safe_span, search_logger
+from ..client_manager import execute_async
 from ..embeddings.contextual_embedding_service import generate_contextual_embeddings_batch
 from ..embeddings.embedding_service import create_embeddings_batch
+from ..embeddings.multi_dimensional_embedding_service import multi_dimensional_embedding_service
+from .bulk_ingest import get_bulk_ingest_service, is_copy_ingest_enabled
 
 
 async def add_documents_to_supabase(
@@ -26,6 +29,7 @@ async def add_documents_to_supabase(
     provider: str | None = None,
     cancellation_check: Any | None = None,
     url_to_page_id: dict[str, str] | None = None,
+    delete_existing: bool = True,
 ) -> dict[str, int]:
     """
     Add documents to Supabase with threading optimizations.
@@ -42,6 +46,8 @@ async def add_documents_to_supabase(
         batch_size: Size of each batch for insertion
         progress_callback: Optional async callback function for progress reporting
         provider: Optional provider override for embeddings
+        delete_existing: Delete all existing chunks for the given URLs before inserting.
+            Incremental refreshes pass False after removing only the stale chunks themselves.
     """
     with safe_span(
         "add_documents_to_supabase", total_documents=len(contents), batch_size=batch_size
@@ -67,6 +73,12 @@ async def add_documents_to_supabase(
             # Clamp batch sizes to sane minimums to prevent crashes
             batch_size = max(1, int(batch_size))
             delete_batch_size = max(1, int(rag_settings.get("DELETE_BATCH_SIZE", "50")))
+            # Binary COPY over a direct Postgres connection instead of PostgREST JSON inserts
+            use_copy_ingest = await is_copy_ingest_enabled(rag_settings)
+            # Compact ANN column (halfvec or binary) written next to the full-precision embedding
+            storage_mode = multi_dimensional_embedding_service.normalize_storage_mode(
+                rag_settings.get("EMBEDDING_STORAGE_MODE", "full")
+            )
             # enable_parallel = rag_settings.get("ENABLE_PARALLEL_BATCHES", "true").lower() == "true"
         except Exception as e:
             search_logger.warning(f"Failed to load storage settings: {e}, using defaults")
@@ -75,10 +87,12 @@ async def add_documents_to_supabase(
             # Ensure defaults are also clamped
             batch_size = max(1, int(batch_size))
             delete_batch_size = max(1, 50)
+            use_copy_ingest = False
+            storage_mode = "full"
             # enable_parallel = True
 
-        # Get unique URLs to delete existing records
-        unique_urls = list(set(urls))
+        # Get unique URLs to delete existing records (none when the caller already pruned stale rows)
+        unique_urls = list(set(urls)) if delete_existing else []
 
         # Delete existing records for these URLs in batches
         try:
@@ -101,7 +115,7 @@ async def add_documents_to_supabase(
                             raise
 
                     batch_urls = unique_urls[i : i + delete_batch_size]
-                    client.table("archon_crawled_pages").delete().in_("url", batch_urls).execute()
+                    await execute_async(client.table("archon_crawled_pages").delete().in_("url", batch_urls), write=True)
                     # Yield control to allow other async operations
                     if i + delete_batch_size < len(unique_urls):
                         await asyncio.sleep(0.05)  # Reduced pause between delete batches
@@ -131,7 +145,7 @@ async def add_documents_to_supabase(
 
                 batch_urls = unique_urls[i : i + fallback_batch_size]
                 try:
-                    client.table("archon_crawled_pages").delete().in_("url", batch_urls).execute()
+                    await execute_async(client.table("archon_crawled_pages").delete().in_("url", batch_urls), write=True)
                     await asyncio.sleep(0.05)  # Rate limit to prevent overwhelming
                 except Exception as inner_e:
                     search_logger.error(
@@ -142,6 +156,14 @@ async def add_documents_to_supabase(
             if failed_urls:
                 search_logger.error(f"Failed to delete {len(failed_urls)} URLs")
 
+        # Imported here: the search package pulls in the RAG stack
+        from ..search.query_cache import invalidate_source_queries
+        from ..search.vector_index import mark_vector_index_stale
+
+        if unique_urls:
+            # Cached RAG results may still reference the deleted chunks
+            invalidate_source_queries(*{metadata.get("source_id") for metadata in metadatas})
+
         # Check if contextual embeddings are enabled (use credential_service)
 
         try:
@@ -414,6 +436,9 @@ async def add_documents_to_supabase(
                     "embedding_model": embedding_model_name,  # Add embedding model tracking
                     "embedding_dimension": embedding_dim,  # Add dimension tracking
                     "page_id": page_id,  # Link chunk to page
+                    **multi_dimensional_embedding_service.get_quantized_columns(
+                        embedding_column, embedding, storage_mode
+                    ),
                 }
                 batch_data.append(data)
 
@@ -439,7 +464,17 @@ async def add_documents_to_supabase(
                         raise
 
                 try:
-                    client.table("archon_crawled_pages").insert(batch_data).execute()
+                    if use_copy_ingest:
+                        try:
+                            await get_bulk_ingest_service().insert_rows("archon_crawled_pages", batch_data)
+                        except Exception as copy_error:
+                            # Stay on PostgREST for the rest of this call
+                            search_logger.warning(
+                                f"COPY ingest failed, falling back to PostgREST inserts: {copy_error}"
+                            )
+                            use_copy_ingest = False
+                    if not use_copy_ingest:
+                        await execute_async(client.table("archon_crawled_pages").insert(batch_data), write=True)
                     total_chunks_stored += len(batch_data)
 
                     # Increment completed batches and report simple progress
@@ -497,7 +532,7 @@ async def add_documents_to_supabase(
                                     raise
 
                             try:
-                                client.table("archon_crawled_pages").insert(record).execute()
+                                await execute_async(client.table("archon_crawled_pages").insert(record), write=True)
                                 successful_inserts += 1
                                 total_chunks_stored += 1
                             except Exception as individual_error:
@@ -509,6 +544,9 @@ async def add_documents_to_supabase(
                             f"Individual inserts: {successful_inserts}/{len(batch_data)} successful"
                         )
 
+            invalidate_source_queries(*{record["source_id"] for record in batch_data})
+            mark_vector_index_stale("archon_crawled_pages")
+
             # Minimal delay between batches to prevent overwhelming
             if i + batch_size < len(contents):
                 # Only yield control briefly to keep system responsive
@@ -0,0 +1,416 @@
+"""
+Text Chunker
+
+Token-aware chunking for embedding. Token start offsets come from a pluggable
+tokenizer and are computed once per text, so the end of a chunk's token
+budget is a lookup; the chunk then ends at the last preferred boundary (code
+fence, paragraph break, sentence end) inside that window and is taken as a
+single slice of the original text.
+
+Tokenizers are selected with the CHUNK_TOKENIZER setting:
+- characters: every character counts as a token (the historical behaviour)
+- embedding_model: the tokenizer of EMBEDDING_MODEL when one is available
+- tiktoken:<encoding> or an OpenAI model name: tiktoken
+- hf:<repo id>: a Hugging Face tokenizers tokenizer
+Unavailable tokenizers fall back to characters with a warning.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from ...config.logfire_config import get_logger
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional, pulled in by the OpenAI tooling
+    tiktoken = None
+
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+except ImportError:  # pragma: no cover - optional (server-reranking group)
+    HFTokenizer = None
+
+logger = get_logger(__name__)
+
+# A break point must leave at least this fraction of the window in the chunk
+MIN_BREAK_FRACTION = 0.3
+# Consecutive chunks shorter than this (characters) are merged while they fit the budget
+MIN_CHUNK_CHARS = 200
+
+# Worker processes for batch chunking (override via environment; 0 chunks in-process)
+CHUNKING_PROCESSES = int(os.getenv("CHUNKING_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+# Batches smaller than these (characters) are chunked on the event loop / in a thread
+THREAD_CHUNKING_MIN_CHARS = 50_000
+PROCESS_CHUNKING_MIN_CHARS = 1_000_000
+# Characters per work unit sent to a worker
+CHUNKING_UNIT_CHARS = 4_000_000
+
+# Break markers by preference and the offset of the break within the marker:
+# before a fence, before a blank line, after a sentence
+BREAK_MARKERS = (("```", 0), ("\n\n", 0), (". ", 1))
+
+
+class ChunkTokenizer:
+    """Character tokenizer: every character counts as one token."""
+
+    name = "characters"
+
+    def token_starts(self, text: str) -> np.ndarray | None:
+        """
+        Character offsets at which the tokens of a text start.
+
+        Returns:
+            Sorted offsets, or None when every character is a token
+        """
+        return None
+
+
+class TiktokenTokenizer(ChunkTokenizer):
+    """Byte-pair encodings used by OpenAI embedding models."""
+
+    def __init__(self, encoding: Any):
+        self.encoding = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def token_starts(self, text: str) -> np.ndarray:
+        tokens = self.encoding.encode_ordinary(text)
+        lengths = np.fromiter(
+            (len(token) for token in self.encoding.decode_tokens_bytes(tokens)), dtype=np.int64, count=len(tokens)
+        )
+        byte_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(tokens) else lengths
+        return _bytes_to_char_offsets(text, byte_starts)
+
+
+class HuggingFaceTokenizer(ChunkTokenizer):
+    """Tokenizers from the Hugging Face hub (sentence-transformers / local embedding models)."""
+
+    def __init__(self, tokenizer: Any, name: str):
+        self.tokenizer = tokenizer
+        self.tokenizer.no_truncation()
+        self.name = f"hf:{name}"
+
+    def token_starts(self, text: str) -> np.ndarray:
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        return np.fromiter((start for start, _ in encoding.offsets), dtype=np.int64, count=len(encoding.offsets))
+
+
+def _bytes_to_char_offsets(text: str, byte_offsets: np.ndarray) -> np.ndarray:
+    """Convert UTF-8 byte offsets of a text into character offsets."""
+    if text.isascii():
+        return byte_offsets
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    # Each continuation byte before an offset shifts it one character left
+    continuation = np.flatnonzero((data & 0xC0) == 0x80)
+    return byte_offsets - np.searchsorted(continuation, byte_offsets)
+
+
+def load_chunk_tokenizer(spec: str | None) -> ChunkTokenizer:
+    """
+    Resolve a CHUNK_TOKENIZER value (or a model name) to a tokenizer.
+
+    Args:
+        spec: characters, tiktoken:<encoding>, hf:<repo id> or an OpenAI model name
+
+    Returns:
+        The tokenizer, or the character tokenizer if it cannot be loaded
+    """
+    spec = (spec or "").strip()
+    if not spec or spec == "characters":
+        return ChunkTokenizer()
+    try:
+        if spec.startswith("hf:"):
+            if HFTokenizer is None:
+                raise ImportError("tokenizers is not installed")
+            return HuggingFaceTokenizer(HFTokenizer.from_pretrained(spec[3:]), spec[3:])
+        if tiktoken is None:
+            raise ImportError("tiktoken is not installed")
+        if spec.startswith("tiktoken:"):
+            return TiktokenTokenizer(tiktoken.get_encoding(spec[9:]))
+        return TiktokenTokenizer(tiktoken.encoding_for_model(spec))
+    except Exception as e:
+        logger.warning(f"Chunk tokenizer '{spec}' unavailable, counting characters instead: {e}")
+        return ChunkTokenizer()
+
+
+@dataclass(frozen=True)
+class ChunkerConfig:
+    """Picklable chunker settings (sent to worker processes)."""
+
+    tokenizer: str = "characters"
+    max_tokens: int = 600
+    overlap: int = 0
+
+
+class TextChunker:
+    """Split text into token-bounded chunks at code fences, paragraphs or sentences."""
+
+    def __init__(
+        self,
+        tokenizer: ChunkTokenizer | None = None,
+        max_tokens: int = 600,
+        overlap: int = 0,
+        min_chunk_chars: int = MIN_CHUNK_CHARS,
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            tokenizer: Token counter (default: characters)
+            max_tokens: Maximum tokens per chunk
+            overlap: Tokens repeated from the end of a chunk at the start of the next
+            min_chunk_chars: Chunks shorter than this are merged with their successors
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+        if not 0 <= overlap < max_tokens:
+            raise ValueError("overlap must be between 0 and max_tokens")
+        self.tokenizer = tokenizer or ChunkTokenizer()
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.min_chunk_chars = min_chunk_chars
+
+    def chunk(self, text: str) -> list[str]:
+        """Chunk one text."""
+        return [piece for _, _, piece in self._chunk(text)]
+
+    def chunk_many(self, texts: list[str]) -> list[list[str]]:
+        """Chunk several texts, in order."""
+        return [self.chunk(text) for text in texts]
+
+    def chunk_spans(self, text: str) -> list[tuple[int, int]]:
+        """
+        Chunk one text into (start, end) character offsets.
+
+        Returns:
+            Whitespace-trimmed, non-empty spans in text order
+        """
+        spans = []
+        for start, end, piece in self._chunk(text):
+            # Everything before the first occurrence of the first kept character is whitespace
+            start = text.index(piece[0], start, end)
+            spans.append((start, start + len(piece)))
+        return spans
+
+    def _chunk(self, text: str) -> list[tuple[int, int, str]]:
+        """Chunks of a text as (start, end, stripped slice); the offsets include the stripped whitespace."""
+        if not text:
+            return []
+
+        length = len(text)
+        token_starts = self.tokenizer.token_starts(text)
+
+        max_tokens, overlap, rfind = self.max_tokens, self.overlap, text.rfind
+        pieces = []
+        start = 0
+        while start < length:
+            limit = start + max_tokens if token_starts is None else self._budget_end(token_starts, start, length)
+            if limit >= length:
+                end = length
+            else:
+                end = limit
+                # Bounded searches of the window only; the marker must lie past the floor
+                floor = start + int((limit - start) * MIN_BREAK_FRACTION) + 1
+                for marker, offset in BREAK_MARKERS:
+                    position = rfind(marker, floor, limit + offset)
+                    if position != -1:
+                        end = position + offset
+                        break
+
+            piece = text[start:end].strip()
+            if piece:
+                pieces.append((start, end, piece))
+            if end >= length:
+                break
+            start = self._next_start(text, token_starts, start, end) if overlap else end
+
+        return self._merge_small(text, pieces, token_starts)
+
+    def _budget_end(self, token_starts: np.ndarray, start: int, length: int) -> int:
+        """Furthest end offset whose slice from start holds max_tokens tokens."""
+        index = np.searchsorted(token_starts, start) + self.max_tokens
+        return int(token_starts[index]) if index < len(token_starts) else length
+
+    def _token_count(self, token_starts: np.ndarray | None, start: int, end: int) -> int:
+        if token_starts is None:
+            return end - start
+        return int(np.searchsorted(token_starts, end) - np.searchsorted(token_starts, start))
+
+    def _next_start(self, text: str, token_starts: np.ndarray | None, start: int, end: int) -> int:
+        if token_starts is None:
+            # Start the overlap on a word boundary when there is one
+            overlap_start = end - self.overlap
+            space = text.find(" ", overlap_start, end)
+            overlap_start = space + 1 if space != -1 else overlap_start
+        else:
+            index = max(0, np.searchsorted(token_starts, end) - self.overlap)
+            overlap_start = int(token_starts[index])
+        return overlap_start if start < overlap_start < end else end
+
+    def _merge_small(
+        self, text: str, pieces: list[tuple[int, int, str]], token_starts: np.ndarray | None
+    ) -> list[tuple[int, int, str]]:
+        """Merge runs of short chunks into one slice while it fits the token budget."""
+        merged = []
+        index = 0
+        count = len(pieces)
+        while index < count:
+            start, end, piece = pieces[index]
+            if len(piece) < self.min_chunk_chars and index + 1 < count:
+                first = index
+                size = len(piece)
+                while size < self.min_chunk_chars and index + 1 < count:
+                    _, next_end, next_piece = pieces[index + 1]
+                    if self._token_count(token_starts, start, next_end) > self.max_tokens:
+                        break
+                    index += 1
+                    end = next_end
+                    size = end - start
+                if index > first:
+                    piece = text[start:end].strip()
+            merged.append((start, end, piece))
+            index += 1
+        return merged
+
+
+_tokenizers: dict[str, ChunkTokenizer] = {}
+
+
+def get_chunk_tokenizer(spec: str) -> ChunkTokenizer:
+    """
+    Tokenizer for a CHUNK_TOKENIZER value, loaded once per process.
+
+    A tokenizer that fell back to characters is not kept, so a load that failed
+    (e.g. the encoding download timed out) is retried on the next call.
+    """
+    tokenizer = _tokenizers.get(spec)
+    if tokenizer is None:
+        tokenizer = load_chunk_tokenizer(spec)
+        if tokenizer.name != "characters":
+            _tokenizers[spec] = tokenizer
+    return tokenizer
+
+
+def get_text_chunker(config: ChunkerConfig) -> TextChunker:
+    """Chunker for a configuration."""
+    tokenizer = get_chunk_tokenizer(config.tokenizer)
+    overlap = min(max(0, config.overlap), config.max_tokens - 1)
+    return TextChunker(tokenizer, max_tokens=config.max_tokens, overlap=overlap)
+
+
+async def get_chunker_config(chunk_size: int = 600) -> ChunkerConfig:
+    """
+    Chunker configuration from the rag_strategy settings.
+
+    Args:
+        chunk_size: Maximum chunk size in characters, used with the character tokenizer
+
+    Returns:
+        CHUNK_TOKENIZER / CHUNK_MAX_TOKENS / CHUNK_OVERLAP as a ChunkerConfig
+    """
+    try:
+        from ..credential_service import credential_service
+
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+    except Exception as e:
+        logger.warning(f"Failed to load chunking settings, using character chunks: {e}")
+        return ChunkerConfig(max_tokens=chunk_size)
+
+    tokenizer = str(rag_settings.get("CHUNK_TOKENIZER") or "characters").strip()
+    if tokenizer == "embedding_model":
+        tokenizer = str(rag_settings.get("EMBEDDING_MODEL") or "text-embedding-3-small")
+    try:
+        overlap = int(rag_settings.get("CHUNK_OVERLAP") or 0)
+        max_tokens = int(rag_settings.get("CHUNK_MAX_TOKENS") or 256)
+    except (TypeError, ValueError):
+        overlap, max_tokens = 0, 256
+
+    # Loading may read or download encoding files; keep it off the event loop.
+    # A token budget is meaningless for character counting (unset or unavailable tokenizer)
+    if (await asyncio.to_thread(get_chunk_tokenizer, tokenizer)).name == "characters":
+        return ChunkerConfig(max_tokens=chunk_size, overlap=overlap)
+    return ChunkerConfig(tokenizer=tokenizer, max_tokens=max_tokens, overlap=overlap)
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_chunking_executor() -> ProcessPoolExecutor | None:
+    """
+    Get the shared batch chunking process pool.
+
+    Returns:
+        The lazily created executor, or None when process chunking is disabled
+    """
+    global _executor
+    if CHUNKING_PROCESSES <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: the server process runs threads (DB pools, asyncio) that fork would copy mid-flight
+                _executor = ProcessPoolExecutor(
+                    max_workers=CHUNKING_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+def shutdown_chunking_executor() -> None:
+    """Shut down the shared pool (application shutdown, or after a crashed worker broke it)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def chunk_texts(config: ChunkerConfig, texts: list[str]) -> list[list[str]]:
+    """Chunk a work unit of texts (runs in a worker process)."""
+    return get_text_chunker(config).chunk_many(texts)
+
+
+async def chunk_texts_async(texts: list[str], config: ChunkerConfig) -> list[list[str]]:
+    """
+    Chunk many texts, fanning large batches out to the chunking process pool.
+
+    Args:
+        texts: Documents to chunk
+        config: Chunker configuration
+
+    Returns:
+        Chunks per text, in input order
+    """
+    total_chars = sum(len(text) for text in texts)
+    executor = get_chunking_executor() if total_chars >= PROCESS_CHUNKING_MIN_CHARS else None
+    if executor is None:
+        if total_chars > THREAD_CHUNKING_MIN_CHARS:
+            return await asyncio.to_thread(chunk_texts, config, texts)
+        return chunk_texts(config, texts)
+
+    # Work units of roughly CHUNKING_UNIT_CHARS characters, in order
+    units: list[list[str]] = [[]]
+    unit_chars = 0
+    for text in texts:
+        if units[-1] and unit_chars + len(text) > CHUNKING_UNIT_CHARS:
+            units.append([])
+            unit_chars = 0
+        units[-1].append(text)
+        unit_chars += len(text)
+
+    loop = asyncio.get_running_loop()
+    try:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, chunk_texts, config, unit) for unit in units)
+        )
+    except Exception as e:
+        logger.warning(f"Chunking workers failed, chunking in-process: {e}")
+        shutdown_chunking_executor()
+        return await asyncio.to_thread(chunk_texts, config, texts)
+    return [chunks for unit_chunks in results for chunks in unit_chunks]
@@ -0,0 +1,527 @@
+"""
+Vector Index Management Service
+
+Inspects and maintains the pgvector ANN indexes on archon_crawled_pages and
+archon_code_examples over a direct Postgres connection (DATABASE_URI).
+
+- Status: rows per embedding column, existing ivfflat/hnsw indexes with their
+  parameters and size, builds in progress, and a recommended index per column.
+- Rebuilds: CREATE INDEX CONCURRENTLY under a temporary name, then the old
+  index is dropped and the new one renamed, so searches never lose their index.
+  ivfflat lists scale with the row count; large tables get HNSW. Columns above
+  2000 dimensions (embedding_3072) are indexed as halfvec expressions.
+- Search parameters: ivfflat.probes and hnsw.ef_search are attached to the
+  vector search functions (ALTER FUNCTION ... SET), so every RPC call runs with
+  the configured values.
+- Benchmark: recall@k and latency of the ANN index against exact search for
+  sampled stored embeddings, over a range of probes / ef_search values.
+"""
+
+import asyncio
+import math
+import os
+import re
+import statistics
+import time
+from datetime import datetime
+from typing import Any
+
+from ...config.logfire_config import safe_span, search_logger
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - asyncpg is a declared server dependency
+    asyncpg = None
+
+VECTOR_TABLES = ("archon_crawled_pages", "archon_code_examples")
+EMBEDDING_DIMENSIONS = (384, 768, 1024, 1536, 3072)
+INDEX_METHODS = ("ivfflat", "hnsw")
+
+# pgvector indexes the vector type up to 2000 dimensions; wider columns use halfvec
+MAX_VECTOR_INDEX_DIMENSIONS = 2000
+# From this many rows HNSW's recall/latency trade-off is worth its build cost
+HNSW_MIN_ROWS = 100_000
+LARGE_TABLE_ROWS = 1_000_000
+MIN_IVFFLAT_LISTS = 10
+
+DEFAULT_IVFFLAT_PROBES = 10
+DEFAULT_HNSW_EF_SEARCH = 40
+MAX_IVFFLAT_PROBES = 32768
+MAX_HNSW_EF_SEARCH = 1000
+DEFAULT_BENCHMARK_PROBES = (1, 5, 10, 20, 40)
+DEFAULT_BENCHMARK_EF_SEARCH = (20, 40, 80, 160, 320)
+TARGET_RECALL = 0.95
+
+# Functions that run the ANN queries (the legacy 1536-only RPCs delegate to these)
+SEARCH_FUNCTIONS = (
+    "match_archon_crawled_pages_multi",
+    "match_archon_code_examples_multi",
+    "hybrid_search_archon_crawled_pages_multi",
+    "hybrid_search_archon_code_examples_multi",
+    "match_archon_crawled_pages_quantized",
+    "match_archon_code_examples_quantized",
+)
+
+# Key list of a pg_get_indexdef() definition and the embedding column inside it
+INDEX_KEYS_PATTERN = re.compile(r"\bUSING\s+\w+\s+\((.*)\)")
+INDEXED_COLUMN_PATTERN = re.compile(r"\b(embedding_\d+(?:_half|_bin)?)\b")
+
+
+def embedding_column(dimension: int) -> str:
+    """Name of the embedding column for a dimension."""
+    if dimension not in EMBEDDING_DIMENSIONS:
+        raise ValueError(f"Unsupported embedding dimension: {dimension}")
+    return f"embedding_{dimension}"
+
+
+def _indexed_column(definition: str) -> str | None:
+    """
+    Column an index definition (pg_get_indexdef) is built on.
+
+    Only the key list after USING <method> is searched, and the whole
+    identifier is returned, so the compact embedding_<dim>_half/_bin indexes
+    are never mistaken for the full-precision column's index.
+    """
+    keys = INDEX_KEYS_PATTERN.search(definition)
+    match = INDEXED_COLUMN_PATTERN.search(keys.group(1)) if keys else None
+    return match.group(1) if match else None
+
+
+def _index_target(dimension: int) -> tuple[str, str]:
+    """Indexed expression and operator class for an embedding column."""
+    column = embedding_column(dimension)
+    if dimension > MAX_VECTOR_INDEX_DIMENSIONS:
+        return f"({column}::halfvec({dimension}))", "halfvec_cosine_ops"
+    return column, "vector_cosine_ops"
+
+
+def _ivfflat_params(rows: int) -> dict[str, Any]:
+    lists = rows // 1000 if rows <= LARGE_TABLE_ROWS else int(math.sqrt(rows))
+    lists = max(MIN_IVFFLAT_LISTS, lists)
+    return {"method": "ivfflat", "lists": lists, "probes": max(1, round(math.sqrt(lists)))}
+
+
+def _hnsw_params(rows: int) -> dict[str, Any]:
+    large = rows >= LARGE_TABLE_ROWS
+    return {
+        "method": "hnsw",
+        "m": 24 if large else 16,
+        "ef_construction": 128 if large else 64,
+        "ef_search": 100 if large else DEFAULT_HNSW_EF_SEARCH,
+    }
+
+
+def recommend_index(rows: int, dimension: int) -> dict[str, Any]:
+    """
+    Recommend an index and search parameters for a column.
+
+    ivfflat lists follow the pgvector guidance (rows / 1000 up to 1M rows,
+    sqrt(rows) beyond) with probes = sqrt(lists). HNSW is recommended for large
+    or empty tables (it needs no training data) and for halfvec columns.
+
+    Args:
+        rows: Rows with a non-null embedding in the column
+        dimension: Embedding dimension
+
+    Returns:
+        Dict with method, index parameters and a recommended search parameter
+    """
+    if rows == 0 or rows >= HNSW_MIN_ROWS or dimension > MAX_VECTOR_INDEX_DIMENSIONS:
+        return _hnsw_params(rows)
+    return _ivfflat_params(rows)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _latency_stats(latencies_ms: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(statistics.median(latencies_ms), 3),
+        "p95_ms": round(_percentile(latencies_ms, 0.95), 3),
+        "mean_ms": round(statistics.fmean(latencies_ms), 3),
+    }
+
+
+class VectorIndexManagementService:
+    """Reports on, rebuilds, tunes and benchmarks the pgvector indexes."""
+
+    def __init__(self, dsn: str | None = None):
+        """
+        Initialize the index management service.
+
+        Args:
+            dsn: Postgres connection string (defaults to the DATABASE_URI environment variable)
+        """
+        self.dsn = dsn or os.getenv("DATABASE_URI")
+        self._builds: dict[str, dict[str, Any]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def available(self) -> bool:
+        """Whether a direct Postgres connection can be attempted."""
+        return asyncpg is not None and bool(self.dsn)
+
+    async def _connect(self):
+        if not self.available:
+            raise RuntimeError("Vector index management requires asyncpg and DATABASE_URI")
+        connection = await asyncpg.connect(self.dsn)
+        # Index builds and exact-search baselines outlive the default timeout
+        await connection.execute("SET statement_timeout = 0")
+        return connection
+
+    @staticmethod
+    def _validate(table: str, dimension: int) -> str:
+        if table not in VECTOR_TABLES:
+            raise ValueError(f"Unsupported table: {table}")
+        return embedding_column(dimension)
+
+    async def _fetch_indexes(self, connection) -> list[dict[str, Any]]:
+        rows = await connection.fetch(
+            """
+            SELECT ic.oid::regclass::text AS name, c.relname AS table_name, am.amname AS method,
+                   pg_get_indexdef(i.indexrelid) AS definition, ic.reloptions AS options,
+                   pg_relation_size(i.indexrelid) AS size_bytes, i.indisvalid AS valid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indrelid
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            JOIN pg_am am ON am.oid = ic.relam
+            WHERE c.relname = ANY($1::text[]) AND am.amname = ANY($2::text[])
+            """,
+            list(VECTOR_TABLES),
+            list(INDEX_METHODS),
+        )
+        indexes = []
+        for row in rows:
+            options = dict(option.split("=", 1) for option in row["options"] or [])
+            indexes.append({
+                "name": row["name"],
+                "table": row["table_name"],
+                "column": _indexed_column(row["definition"]),
+                "method": row["method"],
+                "options": {key: int(value) if value.isdigit() else value for key, value in options.items()},
+                "size_bytes": row["size_bytes"],
+                "valid": row["valid"],
+            })
+        return indexes
+
+    async def get_status(self) -> dict[str, Any]:
+        """
+        Report rows, indexes and recommendations for every embedding column.
+
+        Returns:
+            Dict with "columns", "builds" (tracked by this process), "progress"
+            (pg_stat_progress_create_index) and current "search_params"
+        """
+        connection = await self._connect()
+        try:
+            indexes = await self._fetch_indexes(connection)
+            columns = []
+            for table in VECTOR_TABLES:
+                counts = await connection.fetchrow(
+                    "SELECT "
+                    + ", ".join(f"count({embedding_column(d)}) AS {embedding_column(d)}" for d in EMBEDDING_DIMENSIONS)
+                    + f' FROM "{table}"'
+                )
+                for dimension in EMBEDDING_DIMENSIONS:
+                    column = embedding_column(dimension)
+                    columns.append({
+                        "table": table,
+                        "column": column,
+                        "dimension": dimension,
+                        "rows": counts[column],
+                        "indexes": [i for i in indexes if i["table"] == table and i["column"] == column],
+                        "recommended": recommend_index(counts[column], dimension),
+                    })
+
+            progress = await connection.fetch(
+                "SELECT relid::regclass::text AS table_name, index_relid::regclass::text AS index_name, "
+                "phase, blocks_done, blocks_total, tuples_done, tuples_total "
+                "FROM pg_stat_progress_create_index"
+            )
+            return {
+                "columns": columns,
+                "builds": list(self._builds.values()),
+                "progress": [dict(row) for row in progress],
+                "search_params": await self._fetch_search_params(connection),
+            }
+        finally:
+            await connection.close()
+
+    async def start_rebuild(
+        self,
+        table: str,
+        dimension: int,
+        method: str | None = None,
+        lists: int | None = None,
+        m: int | None = None,
+        ef_construction: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Start a background rebuild of a column's ANN index.
+
+        Parameters left as None come from recommend_index() for the column's
+        current row count.
+
+        Returns:
+            The build record (status "running")
+
+        Raises:
+            ValueError: On an unknown table, dimension or method, or if a build
+                for the column is already running
+        """
+        column = self._validate(table, dimension)
+        if method is not None and method not in INDEX_METHODS:
+            raise ValueError(f"Unsupported index method: {method}")
+        if method == "ivfflat" and dimension > MAX_VECTOR_INDEX_DIMENSIONS:
+            raise ValueError(f"{column} can only be indexed with hnsw")
+        key = f"{table}.{column}"
+        if self._builds.get(key, {}).get("status") == "running":
+            raise ValueError(f"An index build for {key} is already running")
+
+        connection = await self._connect()
+        try:
+            rows = await connection.fetchval(f'SELECT count({column}) FROM "{table}"')
+        finally:
+            await connection.close()
+
+        if method == "ivfflat":
+            plan = _ivfflat_params(rows)
+        elif method == "hnsw":
+            plan = _hnsw_params(rows)
+        else:
+            plan = recommend_index(rows, dimension)
+        if plan["method"] == "ivfflat":
+            plan["lists"] = lists or plan["lists"]
+        else:
+            plan["m"] = m or plan["m"]
+            plan["ef_construction"] = ef_construction or plan["ef_construction"]
+
+        build = {
+            "table": table,
+            "column": column,
+            "rows": rows,
+            "plan": plan,
+            "status": "running",
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+        self._builds[key] = build
+        task = asyncio.create_task(self._rebuild(build, dimension))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return build
+
+    async def _rebuild(self, build: dict[str, Any], dimension: int) -> None:
+        table, column, plan = build["table"], build["column"], build["plan"]
+        name = f"idx_{table}_{column}"
+        staging = f"{name}_rebuild"
+        expression, opclass = _index_target(dimension)
+        options = ", ".join(
+            f"{key} = {int(plan[key])}" for key in ("lists", "m", "ef_construction") if key in plan
+        )
+
+        with safe_span("vector_index_rebuild", table=table, column=column, method=plan["method"]):
+            try:
+                connection = await self._connect()
+                try:
+                    # Leftover from an interrupted build (CONCURRENTLY leaves invalid indexes)
+                    await connection.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{staging}"')
+                    await connection.execute(
+                        f'CREATE INDEX CONCURRENTLY "{staging}" ON "{table}" '
+                        f"USING {plan['method']} ({expression} {opclass}) WITH ({options})"
+                    )
+                    for index in await self._fetch_indexes(connection):
+                        if index["table"] == table and index["column"] == column and index["name"] != staging:
+                            await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index['name']}")
+                    await connection.execute(f'ALTER INDEX "{staging}" RENAME TO "{name}"')
+                finally:
+                    await connection.close()
+                build["status"] = "completed"
+                search_logger.info(f"Rebuilt vector index {name}: {plan}")
+            except Exception as e:
+                build["status"] = "failed"
+                build["error"] = str(e)
+                search_logger.error(f"Vector index rebuild failed for {table}.{column}: {e}")
+            finally:
+                build["finished_at"] = datetime.now().isoformat()
+
+    async def _fetch_search_params(self, connection) -> dict[str, dict[str, str]]:
+        rows = await connection.fetch(
+            "SELECT proname, proconfig FROM pg_proc WHERE proname = ANY($1::text[])", list(SEARCH_FUNCTIONS)
+        )
+        return {
+            row["proname"]: dict(setting.split("=", 1) for setting in row["proconfig"] or [])
+            for row in rows
+        }
+
+    async def apply_search_params(self, probes: int | None = None, ef_search: int | None = None) -> dict[str, Any]:
+        """
+        Attach ivfflat.probes and hnsw.ef_search to the vector search functions.
+
+        Values left as None are read from the VECTOR_IVFFLAT_PROBES and
+        VECTOR_HNSW_EF_SEARCH settings.
+
+        Returns:
+            The applied values and the functions they were attached to
+
+        Raises:
+            ValueError: If a value is outside pgvector's range
+        """
+        if probes is None or ef_search is None:
+            from ..credential_service import credential_service
+
+            settings = await credential_service.get_credentials_by_category("rag_strategy")
+            if probes is None:
+                probes = int(settings.get("VECTOR_IVFFLAT_PROBES", DEFAULT_IVFFLAT_PROBES))
+            if ef_search is None:
+                ef_search = int(settings.get("VECTOR_HNSW_EF_SEARCH", DEFAULT_HNSW_EF_SEARCH))
+        if not 1 <= probes <= MAX_IVFFLAT_PROBES:
+            raise ValueError(f"ivfflat.probes must be between 1 and {MAX_IVFFLAT_PROBES}")
+        if not 1 <= ef_search <= MAX_HNSW_EF_SEARCH:
+            raise ValueError(f"hnsw.ef_search must be between 1 and {MAX_HNSW_EF_SEARCH}")
+
+        connection = await self._connect()
+        try:
+            signatures = await connection.fetch(
+                "SELECT oid::regprocedure::text AS signature FROM pg_proc WHERE proname = ANY($1::text[])",
+                list(SEARCH_FUNCTIONS),
+            )
+            async with connection.transaction():
+                for row in signatures:
+                    await connection.execute(
+                        f"ALTER FUNCTION {row['signature']} "
+                        f"SET ivfflat.probes = {int(probes)} SET hnsw.ef_search = {int(ef_search)}"
+                    )
+        finally:
+            await connection.close()
+
+        search_logger.info(f"Vector search params applied: probes={probes}, ef_search={ef_search}")
+        return {
+            "probes": probes,
+            "ef_search": ef_search,
+            "functions": [row["signature"] for row in signatures],
+        }
+
+    async def benchmark(
+        self,
+        table: str,
+        dimension: int,
+        sample_size: int = 20,
+        k: int = 10,
+        values: list[int] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Measure recall@k and latency of the column's ANN index against exact search.
+
+        Query vectors are embeddings sampled from the column itself. The exact
+        baseline runs with index scans disabled; each ANN run sets the index's
+        search parameter (ivfflat.probes or hnsw.ef_search) for its transaction.
+
+        Args:
+            table: Table to benchmark
+            dimension: Embedding dimension (selects the column)
+            sample_size: Number of query vectors
+            k: Results per query
+            values: Search parameter values to try (defaults depend on the index method)
+
+        Returns:
+            Dict with exact-search latency, per-value recall and latency, and the
+            smallest value reaching TARGET_RECALL
+
+        Raises:
+            ValueError: On an unknown table or dimension, or if the column has no ANN index
+        """
+        column = self._validate(table, dimension)
+        expression, _ = _index_target(dimension)
+        query_type = f"halfvec({dimension})" if dimension > MAX_VECTOR_INDEX_DIMENSIONS else "vector"
+        query_sql = (
+            f'SELECT id FROM "{table}" WHERE {column} IS NOT NULL '
+            f"ORDER BY {expression} <=> $1::text::{query_type} LIMIT $2"
+        )
+
+        with safe_span("vector_index_benchmark", table=table, column=column) as span:
+            connection = await self._connect()
+            try:
+                index = next(
+                    (
+                        i
+                        for i in await self._fetch_indexes(connection)
+                        if i["table"] == table and i["column"] == column and i["valid"]
+                    ),
+                    None,
+                )
+                if index is None:
+                    raise ValueError(f"No ivfflat or hnsw index on {table}.{column}")
+                parameter = "ivfflat.probes" if index["method"] == "ivfflat" else "hnsw.ef_search"
+                if not values:
+                    values = list(
+                        DEFAULT_BENCHMARK_PROBES if index["method"] == "ivfflat" else DEFAULT_BENCHMARK_EF_SEARCH
+                    )
+
+                samples = await connection.fetch(
+                    f'SELECT {column}::text AS embedding FROM "{table}" '
+                    f"WHERE {column} IS NOT NULL ORDER BY random() LIMIT $1",
+                    sample_size,
+                )
+                queries = [row["embedding"] for row in samples]
+                if not queries:
+                    raise ValueError(f"{table}.{column} has no embeddings to sample")
+
+                async def run(settings: dict[str, str], query: str) -> tuple[set[int], float]:
+                    async with connection.transaction():
+                        for name, value in settings.items():
+                            await connection.execute(f"SET LOCAL {name} = {value}")
+                        start = time.perf_counter()
+                        rows = await connection.fetch(query_sql, query, k)
+                        return {row["id"] for row in rows}, (time.perf_counter() - start) * 1000
+
+                exact_settings = {"enable_indexscan": "off", "enable_bitmapscan": "off"}
+                exact_ids, exact_latencies = [], []
+                for query in queries:
+                    ids, latency = await run(exact_settings, query)
+                    exact_ids.append(ids)
+                    exact_latencies.append(latency)
+
+                results = []
+                for value in values:
+                    recalls, latencies = [], []
+                    for query, expected in zip(queries, exact_ids, strict=True):
+                        ids, latency = await run({parameter: str(int(value))}, query)
+                        recalls.append(len(ids & expected) / len(expected) if expected else 1.0)
+                        latencies.append(latency)
+                    results.append({
+                        "value": value,
+                        "recall": round(statistics.fmean(recalls), 4),
+                        **_latency_stats(latencies),
+                    })
+            finally:
+                await connection.close()
+
+            recommended = next((r["value"] for r in results if r["recall"] >= TARGET_RECALL), None)
+            span.set_attribute("queries", len(queries))
+            return {
+                "table": table,
+                "column": column,
+                "index": index,
+                "parameter": parameter,
+                "k": k,
+                "sample_size": len(queries),
+                "exact": _latency_stats(exact_latencies),
+                "results": results,
+                "target_recall": TARGET_RECALL,
+                "recommended_value": recommended,
+            }
+
+
+_vector_index_management_service: VectorIndexManagementService | None = None
+
+
+def get_vector_index_management_service() -> VectorIndexManagementService:
+    """Get the shared vector index management service."""
+    global _vector_index_management_service
+    if _vector_index_management_service is None:
+        _vector_index_management_service = VectorIndexManagementService()
+    return _vector_index_management_service
@@ -14,7 +14,7 @@ import time
 from collections import deque
 from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from dataclasses import dataclass, field
 
 # Removed direct logging import - using unified config
@@ -72,6 +72,54 @@ class ThreadingConfig:
     health_check_interval: float = 30  # System health check frequency
 
 
+class ConcurrencyLimiter:
+    """Async semaphore whose limit can be changed in place while permits are held"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_use = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # A permit handed over just before the cancellation goes to the next waiter
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._wake()
+
+    def resize(self, limit: int) -> None:
+        """Change the limit; holders keep their permits and waiters are admitted as room frees up."""
+        self.limit = max(1, limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the permit over directly so a newcomer cannot take it first
+                self.in_use += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+        return False
+
+
 class RateLimiter:
     """Thread-safe rate limiter with token bucket algorithm"""
 
@@ -79,9 +127,20 @@ class RateLimiter:
         self.config = config
         self.request_times = deque()
         self.token_usage = deque()
-        self.semaphore = asyncio.Semaphore(config.max_concurrent)
+        self.semaphore = ConcurrencyLimiter(config.max_concurrent)
+        self._reserved_concurrency: dict[str, int] = {}
         self._lock = asyncio.Lock()
 
+    def reserve_concurrency(self, owner: str, limit: int) -> None:
+        """Size the concurrent-request limit to fit an owner's own in-flight budget
+
+        The limit is the configured max_concurrent or the largest reserved
+        budget, whichever is higher, so a caller bounding its own requests
+        (e.g. EMBEDDING_CONCURRENCY) is not capped by the default.
+        """
+        self._reserved_concurrency[owner] = limit
+        self.semaphore.resize(max(self.config.max_concurrent, *self._reserved_concurrency.values()))
+
     async def acquire(self, estimated_tokens: int = 8000, progress_callback: Callable | None = None) -> bool:
         """Acquire permission to make API call with token awareness
         
@@ -456,14 +515,22 @@ class ThreadingService:
         logfire_logger.info("Threading service stopped")
 
     @asynccontextmanager
-    async def rate_limited_operation(self, estimated_tokens: int = 8000, progress_callback: Callable | None = None):
+    async def rate_limited_operation(
+        self,
+        estimated_tokens: int = 8000,
+        progress_callback: Callable | None = None,
+        concurrency_limiter: asyncio.Semaphore | None = None,
+    ):
         """Context manager for rate-limited operations
         
         Args:
             estimated_tokens: Estimated number of tokens for the operation
             progress_callback: Optional async callback for progress updates during wait
+            concurrency_limiter: Optional semaphore acquired before the global
+                concurrent-request limit, for callers that also bound their own in-flight work
+                (reserve room for it with rate_limiter.reserve_concurrency)
         """
-        async with self.rate_limiter.semaphore:
+        async with concurrency_limiter or nullcontext(), self.rate_limiter.semaphore:
             can_proceed = await self.rate_limiter.acquire(estimated_tokens, progress_callback)
             if not can_proceed:
                 raise Exception("Rate limit exceeded")
@@ -3,9 +3,22 @@ Document Processing Utilities
 
 This module provides utilities for extracting text from various document formats
 including PDF, Word documents, and plain text files.
+
+Large PDFs are split into page ranges that are extracted in worker processes;
+pages come back in order as their ranges finish, and pages pdfplumber cannot
+read are retried with PyPDF2 one at a time.
 """
 
+import asyncio
 import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Removed direct logging import - using unified config
 
@@ -35,6 +48,18 @@ from ..config.logfire_config import get_logger, logfire
 
 logger = get_logger(__name__)
 
+# Worker processes for PDF page extraction (override via environment; 0 extracts in a thread)
+PDF_EXTRACTION_PROCESSES = int(os.getenv("PDF_EXTRACTION_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+# Pages per work unit sent to a worker
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "20"))
+# PDFs with fewer pages are extracted in a thread
+PDF_PARALLEL_MIN_PAGES = 40
+# Pages whose pdfplumber text is shorter than this (characters) are re-read with PyPDF2
+MIN_PAGE_TEXT_CHARS = 20
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
 
 def _preserve_code_blocks_across_pages(text: str) -> str:
     """
@@ -173,7 +198,7 @@ def extract_text_from_document(file_content: bytes, filename: str, content_type:
     """
     try:
         # PDF files
-        if content_type == "application/pdf" or filename.lower().endswith(".pdf"):
+        if _is_pdf(filename, content_type):
             return extract_text_from_pdf(file_content)
 
         # Word documents
@@ -221,87 +246,286 @@ def extract_text_from_document(file_content: bytes, filename: str, content_type:
         raise Exception(f"Failed to extract text from {filename}") from e
 
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+def _is_pdf(filename: str, content_type: str) -> bool:
+    return content_type == "application/pdf" or filename.lower().endswith(".pdf")
+
+
+async def extract_text_from_document_async(
+    file_content: bytes,
+    filename: str,
+    content_type: str,
+    progress_callback: Callable[[int, int], Awaitable[None]] | None = None,
+) -> str:
     """
-    Extract text from PDF using both PyPDF2 and pdfplumber for best results.
+    Extract text from a document without blocking the event loop.
+
+    PDFs go through the page-range pipeline; other formats are parsed in a thread.
 
     Args:
-        file_content: Raw PDF bytes
+        file_content: Raw file bytes
+        filename: Name of the file
+        content_type: MIME type of the file
+        progress_callback: Optional async callback(pages_done, page_count) for PDFs
 
     Returns:
         Extracted text content
+
+    Raises:
+        ValueError: If the file format is not supported or holds no text
+        Exception: If extraction fails
+    """
+    if not _is_pdf(filename, content_type):
+        return await asyncio.to_thread(extract_text_from_document, file_content, filename, content_type)
+
+    try:
+        return await extract_text_from_pdf_async(file_content, progress_callback)
+    except ValueError:
+        raise
+    except Exception as e:
+        logfire.error(
+            "Document text extraction failed",
+            filename=filename,
+            content_type=content_type,
+            error=str(e),
+        )
+        raise Exception(f"Failed to extract text from {filename}") from e
+
+
+def get_pdf_extraction_executor() -> ProcessPoolExecutor | None:
+    """
+    Get the shared PDF page extraction process pool.
+
+    Returns:
+        The lazily created executor, or None when process extraction is disabled
     """
+    global _executor
+    if PDF_EXTRACTION_PROCESSES <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: the server process runs threads (DB pools, asyncio) that fork would copy mid-flight
+                _executor = ProcessPoolExecutor(
+                    max_workers=PDF_EXTRACTION_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+def shutdown_pdf_extraction_executor() -> None:
+    """Shut down the shared pool (application shutdown, or after a crashed worker broke it)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _require_pdf_libraries() -> None:
     if not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
         raise Exception(
             "No PDF processing libraries available. Please install pdfplumber and PyPDF2."
         )
 
-    text_content = []
 
-    # First try with pdfplumber (better for complex layouts)
+def _pdf_stream(source: bytes | str) -> io.BytesIO | str:
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def count_pdf_pages(source: bytes | str) -> int:
+    """Number of pages in a PDF (PyPDF2 only reads the page tree, so it is tried first)."""
+    if PYPDF2_AVAILABLE:
+        try:
+            return len(PyPDF2.PdfReader(_pdf_stream(source)).pages)
+        except Exception as e:
+            if not PDFPLUMBER_AVAILABLE:
+                raise
+            logfire.warning(f"PyPDF2 could not read the page tree: {e}, trying pdfplumber")
+    with pdfplumber.open(_pdf_stream(source)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_pages(source: bytes | str, first_page: int, last_page: int) -> list[str]:
+    """
+    Extract the text of a page range (runs in a worker process for large PDFs).
+
+    Each page is read with pdfplumber (better for complex layouts); pages it
+    fails on or finds almost no text on are read again with PyPDF2.
+
+    Args:
+        source: PDF bytes or the path of a PDF file
+        first_page: Index of the first page (0-based)
+        last_page: Index after the last page
+
+    Returns:
+        Text per page of the range, "" for pages without text
+    """
+    texts = [""] * (last_page - first_page)
+
     if PDFPLUMBER_AVAILABLE:
         try:
-            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                for page_num, page in enumerate(pdf.pages):
+            with pdfplumber.open(_pdf_stream(source), pages=list(range(first_page + 1, last_page + 1))) as pdf:
+                for offset, page in enumerate(pdf.pages):
                     try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_content.append(f"--- Page {page_num + 1} ---\n{page_text}")
+                        texts[offset] = page.extract_text() or ""
                     except Exception as e:
-                        logfire.warning(f"pdfplumber failed on page {page_num + 1}: {e}")
-                        continue
-
-            # If pdfplumber got good results, use them
-            if text_content and len("\n".join(text_content).strip()) > 100:
-                combined_text = "\n\n".join(text_content)
-                logger.info(f"🔍 PDF DEBUG: Extracted {len(text_content)} pages, total length: {len(combined_text)}")
-                logger.info(f"🔍 PDF DEBUG: First 500 chars: {repr(combined_text[:500])}")
-                
-                # Check for backticks before and after processing
-                backtick_count_before = combined_text.count("```")
-                logger.info(f"🔍 PDF DEBUG: Backticks found before processing: {backtick_count_before}")
-                
-                processed_text = _preserve_code_blocks_across_pages(combined_text)
-                backtick_count_after = processed_text.count("```")
-                logger.info(f"🔍 PDF DEBUG: Backticks found after processing: {backtick_count_after}")
-                
-                if backtick_count_after > 0:
-                    logger.info(f"🔍 PDF DEBUG: Sample after processing: {repr(processed_text[:1000])}")
-                
-                return processed_text
-
+                        logfire.warning(f"pdfplumber failed on page {first_page + offset + 1}: {e}")
+                    finally:
+                        # Release the page's parsed layout objects before the next one
+                        page.close()
         except Exception as e:
-            logfire.warning(f"pdfplumber extraction failed: {e}, trying PyPDF2")
+            logfire.warning(f"pdfplumber extraction failed for pages {first_page + 1}-{last_page}: {e}")
 
-    # Fallback to PyPDF2
-    if PYPDF2_AVAILABLE:
+    weak_pages = [offset for offset, text in enumerate(texts) if len(text.strip()) < MIN_PAGE_TEXT_CHARS]
+    if weak_pages and PYPDF2_AVAILABLE:
         try:
-            text_content = []
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-
-            for page_num, page in enumerate(pdf_reader.pages):
+            reader = PyPDF2.PdfReader(_pdf_stream(source))
+            for offset in weak_pages:
                 try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(f"--- Page {page_num + 1} ---\n{page_text}")
+                    text = reader.pages[first_page + offset].extract_text() or ""
                 except Exception as e:
-                    logfire.warning(f"PyPDF2 failed on page {page_num + 1}: {e}")
+                    logfire.warning(f"PyPDF2 failed on page {first_page + offset + 1}: {e}")
                     continue
+                if len(text.strip()) > len(texts[offset].strip()):
+                    texts[offset] = text
+        except Exception as e:
+            logfire.warning(f"PyPDF2 extraction failed for pages {first_page + 1}-{last_page}: {e}")
+
+    return texts
 
-            if text_content:
-                combined_text = "\n\n".join(text_content)
-                return _preserve_code_blocks_across_pages(combined_text)
+
+def _write_temp_pdf(file_content: bytes) -> str:
+    """Write PDF bytes to a temporary file for the workers; returns its path."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as handle:
+        handle.write(file_content)
+    return handle.name
+
+
+def _page_ranges(page_count: int) -> list[tuple[int, int]]:
+    size = max(1, PDF_PAGES_PER_TASK)
+    return [(first, min(first + size, page_count)) for first in range(0, page_count, size)]
+
+
+async def iter_pdf_pages(file_content: bytes, page_count: int) -> AsyncIterator[tuple[int, str]]:
+    """
+    Stream the text of a PDF's pages in page order.
+
+    Large PDFs are extracted a page range per worker process, with a bounded
+    number of ranges in flight; each page is yielded as soon as its range and
+    all earlier ones are done.
+
+    Args:
+        file_content: Raw PDF bytes
+        page_count: Number of pages (see count_pdf_pages)
+
+    Yields:
+        (page index, page text) tuples
+    """
+    ranges = _page_ranges(page_count)
+    executor = get_pdf_extraction_executor() if page_count >= PDF_PARALLEL_MIN_PAGES else None
+    if executor is None:
+        for first, last in ranges:
+            texts = await asyncio.to_thread(extract_pdf_pages, file_content, first, last)
+            for offset, text in enumerate(texts):
+                yield first + offset, text
+        return
+
+    # Workers open the file themselves rather than each receiving a pickled copy of it
+    path = await asyncio.to_thread(_write_temp_pdf, file_content)
+
+    loop = asyncio.get_running_loop()
+    in_flight: deque[tuple[int, int, asyncio.Future]] = deque()
+    next_range = 0
+    try:
+        while in_flight or next_range < len(ranges):
+            while executor is not None and next_range < len(ranges) and len(in_flight) < 2 * PDF_EXTRACTION_PROCESSES:
+                first, last = ranges[next_range]
+                in_flight.append((first, last, loop.run_in_executor(executor, extract_pdf_pages, path, first, last)))
+                next_range += 1
+
+            if in_flight:
+                first, last, future = in_flight.popleft()
+                try:
+                    texts = await future
+                except BrokenProcessPool as e:
+                    logfire.warning(f"PDF extraction pool broken ({e}), extracting the remaining pages in-process")
+                    shutdown_pdf_extraction_executor()
+                    executor = None
+                    texts = await asyncio.to_thread(extract_pdf_pages, path, first, last)
+                except Exception as e:
+                    logfire.warning(f"PDF extraction failed on pages {first + 1}-{last}, retrying in-process: {e}")
+                    texts = await asyncio.to_thread(extract_pdf_pages, path, first, last)
             else:
-                raise ValueError(
-                    "No text extracted from PDF: file may be empty, images-only, "
-                    "or scanned document without OCR"
-                )
+                first, last = ranges[next_range]
+                next_range += 1
+                texts = await asyncio.to_thread(extract_pdf_pages, path, first, last)
+
+            for offset, text in enumerate(texts):
+                yield first + offset, text
+    finally:
+        for _, _, future in in_flight:
+            future.cancel()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
 
-        except Exception as e:
-            raise Exception("PyPDF2 failed to extract text") from e
 
-    # If we get here, no libraries worked
-    raise Exception("Failed to extract text from PDF - no working PDF libraries available")
+def _join_pdf_pages(pages: list[tuple[int, str]]) -> str:
+    text_content = [f"--- Page {page_index + 1} ---\n{text}" for page_index, text in pages if text]
+    if not text_content:
+        raise ValueError(
+            "No text extracted from PDF: file may be empty, images-only, "
+            "or scanned document without OCR"
+        )
+
+    combined_text = "\n\n".join(text_content)
+    processed_text = _preserve_code_blocks_across_pages(combined_text)
+    logger.debug(
+        f"Extracted {len(text_content)} PDF pages | length={len(processed_text)} | "
+        f"code_fences={processed_text.count('```')}"
+    )
+    return processed_text
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    """
+    Extract text from PDF using pdfplumber, with PyPDF2 for pages it cannot read.
+
+    Args:
+        file_content: Raw PDF bytes
+
+    Returns:
+        Extracted text content
+    """
+    _require_pdf_libraries()
+    texts = extract_pdf_pages(file_content, 0, count_pdf_pages(file_content))
+    return _join_pdf_pages(list(enumerate(texts)))
+
+
+async def extract_text_from_pdf_async(
+    file_content: bytes, progress_callback: Callable[[int, int], Awaitable[None]] | None = None
+) -> str:
+    """
+    Extract text from a PDF, page ranges in parallel for large files.
+
+    Args:
+        file_content: Raw PDF bytes
+        progress_callback: Optional async callback(pages_done, page_count)
+
+    Returns:
+        Extracted text content
+    """
+    _require_pdf_libraries()
+    page_count = await asyncio.to_thread(count_pdf_pages, file_content)
+
+    pages = []
+    async for page_index, text in iter_pdf_pages(file_content, page_count):
+        pages.append((page_index, text))
+        pages_done = page_index + 1
+        if progress_callback and (pages_done % max(1, PDF_PAGES_PER_TASK) == 0 or pages_done == page_count):
+            await progress_callback(pages_done, page_count)
+
+    return _join_pdf_pages(pages)
 
 
 def extract_text_from_docx(file_content: bytes) -> str:
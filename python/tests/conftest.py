@@ -86,6 +86,22 @@ def prevent_real_db_calls():
                 yield
 
 
+@pytest.fixture(autouse=True)
+def clear_search_caches():
+    """Keep cached RAG query results, page metadata and rerank scores from leaking between tests."""
+    from src.server.services.search.page_metadata_cache import get_page_metadata_cache
+    from src.server.services.search.query_cache import get_query_cache
+    from src.server.services.search.reranking_service import get_reranking_service
+
+    get_query_cache().clear()
+    get_page_metadata_cache().clear()
+    get_reranking_service().clear_cache()
+    yield
+    get_query_cache().clear()
+    get_page_metadata_cache().clear()
+    get_reranking_service().clear_cache()
+
+
 @pytest.fixture
 def mock_supabase_client():
     """Mock Supabase client for testing."""
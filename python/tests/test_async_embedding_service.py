@@ -5,6 +5,7 @@ Tests all aspects of the async embedding service after sync function removal.
 Covers both success and error scenarios with thorough edge case testing.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import openai
@@ -18,6 +19,7 @@ from src.server.services.embeddings.embedding_service import (
     create_embedding,
     create_embeddings_batch,
 )
+from src.server.services.threading_service import ConcurrencyLimiter, RateLimitConfig, ThreadingService
 
 
 class AsyncContextManager:
@@ -422,3 +424,188 @@ class TestAsyncEmbeddingService:
                         assert result.success_count == 5
                         assert len(result.embeddings) == 5
                         assert result.texts_processed == texts
+
+    @pytest.mark.asyncio
+    async def test_create_embeddings_batch_concurrent_preserves_order(self):
+        """Test that concurrent sub-batches run in parallel but results keep input order"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_create(model, input, dimensions=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Later batches finish first to exercise re-ordering
+            await asyncio.sleep(0.01 * (10 - int(input[0][4:])))
+            in_flight -= 1
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[float(text[4:])] * 3) for text in input]
+            return response
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+        with patch(
+            "src.server.services.embeddings.embedding_service.get_threading_service",
+            return_value=ThreadingService(rate_limit_config=RateLimitConfig(max_concurrent=10)),
+        ):
+            with patch(
+                "src.server.services.embeddings.embedding_service.get_llm_client"
+            ) as mock_get_client:
+                with patch(
+                    "src.server.services.embeddings.embedding_service.get_embedding_model",
+                    return_value="text-embedding-3-small",
+                ):
+                    with patch(
+                        "src.server.services.embeddings.embedding_service.credential_service"
+                    ) as mock_cred:
+                        mock_cred.get_credentials_by_category = AsyncMock(
+                            return_value={
+                                "EMBEDDING_BATCH_SIZE": "1",
+                                "OPENAI_EMBEDDING_CONCURRENCY": "3",
+                            }
+                        )
+                        mock_cred.get_active_provider = AsyncMock(
+                            return_value={"provider": "openai"}
+                        )
+                        mock_get_client.return_value = AsyncContextManager(mock_client)
+
+                        texts = [f"text{i}" for i in range(6)]
+                        result = await create_embeddings_batch(texts)
+
+                        assert result.success_count == 6
+                        assert result.texts_processed == texts
+                        assert [vector[0] for vector in result.embeddings] == [
+                            0.0, 1.0, 2.0, 3.0, 4.0, 5.0
+                        ]
+                        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_create_embeddings_batch_concurrency_is_shared_per_provider(self):
+        """Test that concurrent calls share one in-flight budget per provider under the global limit"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_create(model, input, dimensions=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[0.5] * 3) for _ in input]
+            return response
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+        async def run_batches(max_concurrent):
+            with patch(
+                "src.server.services.embeddings.embedding_service.get_threading_service",
+                return_value=ThreadingService(rate_limit_config=RateLimitConfig(max_concurrent=max_concurrent)),
+            ), patch(
+                "src.server.services.embeddings.embedding_service.get_llm_client",
+                side_effect=lambda **kwargs: AsyncContextManager(mock_client),
+            ), patch(
+                "src.server.services.embeddings.embedding_service.get_embedding_model",
+                return_value="text-embedding-3-small",
+            ), patch(
+                "src.server.services.embeddings.embedding_service.credential_service"
+            ) as mock_cred:
+                mock_cred.get_credentials_by_category = AsyncMock(
+                    return_value={"EMBEDDING_BATCH_SIZE": "1", "OPENAI_EMBEDDING_CONCURRENCY": "3"}
+                )
+                mock_cred.get_active_provider = AsyncMock(return_value={"provider": "openai"})
+                return await asyncio.gather(
+                    *(create_embeddings_batch([f"batch{b}-text{i}" for i in range(6)]) for b in range(3))
+                )
+
+        results = await run_batches(max_concurrent=10)
+        assert [result.success_count for result in results] == [6, 6, 6]
+        # Three concurrent calls still keep at most three requests in flight for the provider
+        assert max_in_flight == 3
+
+        max_in_flight = 0
+        await run_batches(max_concurrent=2)
+        # ...and a lower default global concurrent-request limit is raised to fit the budget
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limiter_resizes_in_place(self):
+        """Test that resizing the limiter keeps held permits and admits waiters as room frees up"""
+        limiter = ConcurrencyLimiter(2)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.resize(3)
+        await asyncio.sleep(0)
+        assert waiter.done() and limiter.in_use == 3
+
+        # Shrinking below the held permits only holds back new acquirers
+        limiter.resize(1)
+        blocked = asyncio.create_task(limiter.acquire())
+        limiter.release()
+        limiter.release()
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        limiter.release()
+        await asyncio.sleep(0)
+        assert blocked.done() and limiter.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_create_embeddings_batch_concurrent_quota_short_circuit(self):
+        """Test that quota exhaustion stops dispatching queued concurrent sub-batches"""
+        quota_error = openai.RateLimitError(
+            "insufficient_quota",
+            response=MagicMock(),
+            body={"error": {"message": "insufficient_quota"}},
+        )
+
+        async def fake_create(model, input, dimensions=None):
+            if input[0] == "text1":
+                raise quota_error
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[0.5] * 3) for _ in input]
+            return response
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+        with patch(
+            "src.server.services.embeddings.embedding_service.get_threading_service",
+            return_value=ThreadingService(),
+        ):
+            with patch(
+                "src.server.services.embeddings.embedding_service.get_llm_client"
+            ) as mock_get_client:
+                with patch(
+                    "src.server.services.embeddings.embedding_service.get_embedding_model",
+                    return_value="text-embedding-3-small",
+                ):
+                    with patch(
+                        "src.server.services.embeddings.embedding_service.credential_service"
+                    ) as mock_cred:
+                        mock_cred.get_credentials_by_category = AsyncMock(
+                            return_value={"EMBEDDING_BATCH_SIZE": "1", "EMBEDDING_CONCURRENCY": "2"}
+                        )
+                        mock_cred.get_active_provider = AsyncMock(
+                            return_value={"provider": "openai"}
+                        )
+                        mock_get_client.return_value = AsyncContextManager(mock_client)
+
+                        texts = [f"text{i}" for i in range(10)]
+                        result = await create_embeddings_batch(texts)
+
+                        # Batches already in flight keep their embeddings, queued ones are skipped
+                        assert result.success_count + result.failure_count == 10
+                        assert result.texts_processed[0] == "text0"
+                        assert "text1" not in result.texts_processed
+                        assert mock_client.embeddings.create.call_count < 10
+                        assert all(
+                            item["error_type"] == "EmbeddingQuotaExhaustedError"
+                            for item in result.failed_items
+                        )
@@ -0,0 +1,164 @@
+"""
+Tests for the asyncpg COPY bulk-ingest path.
+"""
+
+import struct
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.services.storage import bulk_ingest
+from src.server.services.storage.bulk_ingest import (
+    BulkIngestService,
+    decode_bits,
+    decode_halfvec,
+    decode_jsonb,
+    decode_vector,
+    encode_bits,
+    encode_halfvec,
+    encode_jsonb,
+    encode_vector,
+    is_copy_ingest_enabled,
+)
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeAcquire:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_service():
+    connection = MagicMock()
+    connection.execute = AsyncMock(return_value="INSERT 0 2")
+    connection.copy_records_to_table = AsyncMock()
+    connection.transaction = MagicMock(return_value=FakeTransaction())
+    pool = MagicMock()
+    pool.acquire = MagicMock(return_value=FakeAcquire(connection))
+
+    service = BulkIngestService(dsn="postgresql://test")
+    service._pool = pool
+    return service, connection
+
+
+def test_vector_binary_roundtrip():
+    data = encode_vector([0.5, -1.0, 2.25])
+
+    assert struct.unpack_from(">HH", data) == (3, 0)
+    assert struct.unpack(">3f", data[4:]) == (0.5, -1.0, 2.25)
+    assert decode_vector(data) == [0.5, -1.0, 2.25]
+
+
+def test_quantized_binary_roundtrip():
+    half = encode_halfvec([0.5, -1.0, 2.25])
+    assert struct.unpack_from(">HH", half) == (3, 0)
+    assert decode_halfvec(half) == [0.5, -1.0, 2.25]
+
+    bits = encode_bits("1011000011")
+    assert bits == struct.pack(">i", 10) + bytes([0b10110000, 0b11000000])
+    assert decode_bits(bits) == "1011000011"
+
+
+def test_jsonb_binary_roundtrip():
+    data = encode_jsonb({"url": "https://docs/a", "tags": ["é"]})
+
+    assert data[:1] == b"\x01"
+    assert decode_jsonb(data) == {"url": "https://docs/a", "tags": ["é"]}
+
+
+@pytest.mark.asyncio
+async def test_connection_codecs_are_binary_for_copy():
+    connection = MagicMock()
+    connection.set_type_codec = AsyncMock()
+    connection.fetch = AsyncMock(
+        return_value=[{"typname": "vector", "nspname": "extensions"}, {"typname": "halfvec", "nspname": "public"}]
+    )
+
+    await bulk_ingest._init_connection(connection)
+
+    # copy_records_to_table only accepts binary codecs
+    registered = {call.args[0]: call.kwargs for call in connection.set_type_codec.await_args_list}
+    assert set(registered) == {"jsonb", "bit", "vector", "halfvec"}
+    assert all(kwargs["format"] == "binary" for kwargs in registered.values())
+    assert registered["jsonb"]["encoder"] is encode_jsonb
+
+
+@pytest.mark.asyncio
+async def test_insert_rows_copies_into_staging_then_merges():
+    service, connection = make_service()
+    rows = [
+        {"url": "https://a", "chunk_number": 0, "content": "x", "embedding_1536": [0.1]},
+        {"url": "https://a", "chunk_number": 1, "content": "y", "embedding_1536": [0.2]},
+    ]
+
+    written = await service.insert_rows("archon_crawled_pages", rows)
+
+    assert written == 2
+    connection.copy_records_to_table.assert_awaited_once()
+    args, kwargs = connection.copy_records_to_table.call_args
+    assert args[0] == "_stage_archon_crawled_pages"
+    assert kwargs["columns"] == ["url", "chunk_number", "content", "embedding_1536"]
+    assert kwargs["records"][1] == ("https://a", 1, "y", [0.2])
+
+    merge_sql = connection.execute.call_args_list[-1].args[0]
+    assert 'INSERT INTO "archon_crawled_pages"' in merge_sql
+    assert 'ON CONFLICT ("url", "chunk_number") DO UPDATE' in merge_sql
+    assert '"content" = EXCLUDED."content"' in merge_sql
+    assert '"url" = EXCLUDED' not in merge_sql
+
+
+@pytest.mark.asyncio
+async def test_insert_rows_groups_rows_by_column_set():
+    service, connection = make_service()
+    rows = [
+        {"url": "https://a", "chunk_number": 0, "embedding_768": [0.1]},
+        {"url": "https://b", "chunk_number": 0, "embedding_1536": [0.2]},
+    ]
+
+    await service.insert_rows("archon_code_examples", rows)
+
+    assert connection.copy_records_to_table.await_count == 2
+    connection.transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_insert_rows_rejects_unknown_table():
+    service, _ = make_service()
+
+    with pytest.raises(ValueError):
+        await service.insert_rows("archon_sources", [{"source_id": "s"}])
+
+
+@pytest.mark.asyncio
+async def test_insert_rows_requires_dsn(monkeypatch):
+    monkeypatch.delenv("DATABASE_URI", raising=False)
+    service = BulkIngestService()
+
+    assert not service.available
+    with pytest.raises(RuntimeError):
+        await service.insert_rows("archon_crawled_pages", [{"url": "u"}])
+
+
+@pytest.mark.asyncio
+async def test_copy_ingest_enabled_needs_setting_and_dsn(monkeypatch):
+    monkeypatch.setattr(bulk_ingest, "_bulk_ingest_service", BulkIngestService(dsn="postgresql://test"))
+
+    assert await is_copy_ingest_enabled({"USE_POSTGRES_COPY_INGEST": "true"})
+    assert not await is_copy_ingest_enabled({"USE_POSTGRES_COPY_INGEST": "false"})
+
+    monkeypatch.delenv("DATABASE_URI", raising=False)
+    monkeypatch.setattr(bulk_ingest, "_bulk_ingest_service", BulkIngestService())
+    assert not await is_copy_ingest_enabled({"USE_POSTGRES_COPY_INGEST": "true"})
@@ -0,0 +1,81 @@
+"""
+Tests for MinHash/LSH code block deduplication.
+"""
+
+import random
+
+from src.server.services.storage.code_deduplication import CodeBlockDeduplicator
+from src.server.services.storage.code_storage_service import (
+    _calculate_code_similarity,
+    _normalize_code_for_comparison,
+    deduplicate_code_blocks,
+)
+
+
+def make_block(code, language="python"):
+    return {"code": code, "language": language, "context_before": "", "context_after": ""}
+
+
+def snippet(seed, lines=12):
+    rng = random.Random(seed)
+    names = ["client", "result", "items", "value", "config", "session", "payload", "index"]
+    return "\n".join(
+        f"{rng.choice(names)}_{rng.randint(0, 99)} = {rng.choice(names)}.get('{rng.randint(0, 999)}')"
+        for _ in range(lines)
+    )
+
+
+def pairwise_groups(codes, threshold=0.85):
+    """The all-pairs scan the deduplicator replaces."""
+    groups, grouped = [], set()
+    for i in range(len(codes)):
+        if i in grouped:
+            continue
+        group = [i]
+        grouped.add(i)
+        for j in range(i + 1, len(codes)):
+            if j not in grouped and _calculate_code_similarity(codes[i], codes[j]) >= threshold:
+                group.append(j)
+                grouped.add(j)
+        groups.append(group)
+    return groups
+
+
+def test_groups_match_pairwise_scan():
+    codes = []
+    for seed in range(15):
+        base = snippet(seed)
+        codes.append(base)
+        codes.append(base.replace("get(", "fetch(", 1))
+        codes.append(base + "\nprint('done')")
+    random.Random(0).shuffle(codes)
+
+    normalized = [_normalize_code_for_comparison(code) for code in codes]
+
+    assert CodeBlockDeduplicator().group(normalized) == pairwise_groups(codes)
+
+
+def test_deduplicate_keeps_best_variant_and_counts_variants():
+    base = snippet(1)
+    blocks = [make_block(base, "text"), make_block(snippet(2)), make_block(base + "\nprint('done')", "python")]
+
+    deduplicated = deduplicate_code_blocks(blocks)
+
+    assert len(deduplicated) == 2
+    best = next(block for block in deduplicated if block["code"].startswith(base))
+    assert best["language"] == "python"
+    assert best["consolidated_variants"] == 2
+
+
+def test_deduplicate_across_documents_keeps_wrapper_items():
+    base = snippet(3)
+    items = [
+        {"block": make_block(base), "source_url": "https://docs/a", "source_id": "src"},
+        {"block": make_block(base), "source_url": "https://docs/b", "source_id": "src"},
+        {"block": make_block(snippet(4)), "source_url": "https://docs/b", "source_id": "src"},
+    ]
+
+    deduplicated = deduplicate_code_blocks(items, block_key="block")
+
+    assert [item["source_url"] for item in deduplicated] == ["https://docs/a", "https://docs/b"]
+    assert deduplicated[0]["block"]["consolidated_variants"] == 2
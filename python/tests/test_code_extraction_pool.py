@@ -0,0 +1,100 @@
+"""
+Tests for process-pool code extraction: settings snapshot, work units and in-order results.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling import code_extraction_service as extraction_module
+from src.server.services.crawling.code_extraction_pool import chunk_documents, extract_documents
+from src.server.services.crawling.code_extraction_service import CodeExtractionService
+
+CODE = "\n".join(f"def func_{i}(x):\n    value = x * {i}\n    return value + {i}  # compute" for i in range(12))
+
+
+def make_docs(count):
+    return [
+        {
+            "url": f"https://docs.example.com/{i}",
+            "html": f"<p>Intro</p><pre><code class='language-python'>{CODE.replace('func', f'doc{i}_func')}</code></pre>",
+            "markdown": "",
+            "title": "ignored by extraction",
+        }
+        for i in range(count)
+    ]
+
+
+def test_chunk_documents_keeps_order_and_only_extraction_fields():
+    units = chunk_documents(make_docs(5), docs_per_task=2)
+
+    assert [[doc["url"] for doc in unit] for unit in units] == [
+        ["https://docs.example.com/0", "https://docs.example.com/1"],
+        ["https://docs.example.com/2", "https://docs.example.com/3"],
+        ["https://docs.example.com/4"],
+    ]
+    assert "title" not in units[0][0]
+
+
+def test_worker_uses_settings_snapshot_without_credential_service():
+    settings = dict(CodeExtractionService.EXTRACTION_SETTING_DEFAULTS)
+    getter = AsyncMock()
+
+    with patch.object(extraction_module.credential_service, "get_credential", getter):
+        per_doc = extract_documents(settings, chunk_documents(make_docs(2))[0])
+
+    assert [len(blocks) for blocks in per_doc] == [1, 1]
+    assert "doc1_func_0" in per_doc[1][0]["code"]
+    getter.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pool_results_match_inline_extraction_in_order():
+    docs = make_docs(7)
+    getter = AsyncMock(side_effect=lambda key, default: default)
+    progress = AsyncMock()
+
+    with patch.object(extraction_module.credential_service, "get_credential", getter), patch.object(
+        extraction_module, "get_extraction_executor", return_value=None
+    ):
+        inline = await CodeExtractionService(MagicMock())._extract_code_blocks_from_documents(docs, "src")
+
+    with ThreadPoolExecutor(max_workers=3) as executor, patch.object(
+        extraction_module.credential_service, "get_credential", getter
+    ), patch.object(extraction_module, "get_extraction_executor", return_value=executor):
+        pooled = await CodeExtractionService(MagicMock())._extract_code_blocks_from_documents(
+            docs, "src", progress_callback=progress
+        )
+
+    assert pooled == inline
+    assert [item["source_url"] for item in pooled] == [doc["url"] for doc in docs]
+    assert progress.await_args_list[-1].args[0]["completed_documents"] == 7
+    # Each setting is resolved once per service, not per block
+    assert getter.await_count == 2 * len(CodeExtractionService.EXTRACTION_SETTING_DEFAULTS)
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_falls_back_to_in_process_extraction():
+    service = CodeExtractionService(MagicMock())
+    service._settings_cache = dict(CodeExtractionService.EXTRACTION_SETTING_DEFAULTS)
+    docs = chunk_documents(make_docs(2))[0]
+    future = AsyncMock(side_effect=BrokenProcessPool("worker killed"))()
+
+    with patch.object(extraction_module, "shutdown_extraction_executor") as shutdown:
+        per_doc = await service._extract_work_unit(docs, future)
+
+    shutdown.assert_called_once()
+    assert [len(blocks) for blocks in per_doc] == [1, 1]
+
+
+def test_markdown_fallback_reads_the_settings_snapshot():
+    from src.server.services.storage.code_storage_service import extract_code_blocks
+
+    markdown = f"Intro text.\n\n```python\n{CODE}\n```\n\nOutro text."
+    settings = dict(CodeExtractionService.EXTRACTION_SETTING_DEFAULTS)
+
+    assert len(extract_code_blocks(markdown, settings=settings)) == 1
+    # A snapshot value wins over the credential cache and environment
+    assert extract_code_blocks(markdown, settings={**settings, "MAX_CODE_BLOCK_LENGTH": 100}) == []
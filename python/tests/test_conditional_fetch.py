@@ -0,0 +1,150 @@
+"""
+Tests for conditional fetch support on incremental refreshes.
+
+Covers validator extraction, 304 / sitemap lastmod skipping, sitemap lastmod
+parsing and how not-modified placeholders flow through document storage.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.server.services.crawling.conditional_fetch_service import (
+    ConditionalFetchService,
+    extract_http_validators,
+)
+from src.server.services.crawling.document_storage_operations import DocumentStorageOperations
+from src.server.services.crawling.strategies.sitemap import SitemapCrawlStrategy
+
+
+def make_supabase(rows):
+    """Supabase mock whose select(...).in_(...) returns rows matching the URLs."""
+    client = MagicMock()
+
+    def in_(column, values):
+        result = MagicMock()
+        result.execute.return_value = MagicMock(data=[row for row in rows if row[column] in values])
+        return result
+
+    client.table.return_value.select.return_value.in_.side_effect = in_
+    return client
+
+
+def test_extract_http_validators_is_case_insensitive():
+    headers = {"ETag": '"abc"', "last-modified": "Wed, 01 Oct 2025 10:00:00 GMT", "Server": "x"}
+    assert extract_http_validators(headers) == {
+        "etag": '"abc"',
+        "last_modified": "Wed, 01 Oct 2025 10:00:00 GMT",
+    }
+    assert extract_http_validators(None) == {}
+    assert extract_http_validators({"content-type": "text/html"}) == {}
+
+
+@pytest.mark.asyncio
+async def test_partition_unmodified_uses_304_and_sitemap_lastmod():
+    rows = [
+        {"url": "https://example.com/a", "etag": '"a1"', "last_modified": None, "lastmod": None},
+        {"url": "https://example.com/b", "etag": '"b1"', "last_modified": None, "lastmod": None},
+        {"url": "https://example.com/c", "etag": None, "last_modified": None, "lastmod": "2025-01-01"},
+        {"url": "https://example.com/d", "etag": None, "last_modified": None, "lastmod": "2025-01-01"},
+    ]
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if request.headers.get("if-none-match") == '"a1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="changed")
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = ConditionalFetchService(make_supabase(rows), http_client=http_client)
+
+    urls = [
+        "https://example.com/a",  # 304 -> skip
+        "https://example.com/b",  # 200 -> crawl
+        "https://example.com/c",  # same lastmod -> skip without a request
+        "https://example.com/d",  # lastmod moved -> crawl
+        "https://example.com/new",  # never crawled -> crawl
+    ]
+    to_crawl, unmodified = await service.partition_unmodified(
+        urls,
+        sitemap_lastmods={
+            "https://example.com/c": "2025-01-01",
+            "https://example.com/d": "2025-02-01",
+        },
+    )
+    await http_client.aclose()
+
+    assert to_crawl == ["https://example.com/b", "https://example.com/d", "https://example.com/new"]
+    assert unmodified == ["https://example.com/a", "https://example.com/c"]
+    assert sorted(requested) == ["https://example.com/a", "https://example.com/b"]
+
+
+@pytest.mark.asyncio
+async def test_partition_unmodified_crawls_everything_when_lookup_fails():
+    client = MagicMock()
+    client.table.side_effect = Exception("database unavailable")
+    service = ConditionalFetchService(client)
+
+    to_crawl, unmodified = await service.partition_unmodified(["https://example.com/a"])
+
+    assert to_crawl == ["https://example.com/a"]
+    assert unmodified == []
+
+
+@pytest.mark.asyncio
+async def test_parse_sitemap_entries_returns_lastmod():
+    xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>https://example.com/a</loc><lastmod>2025-01-01</lastmod></url>
+      <url><loc>https://example.com/b</loc></url>
+    </urlset>"""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=xml)))
+
+    strategy = SitemapCrawlStrategy(http_client=http_client)
+    entries = await strategy.parse_sitemap_entries("https://example.com/sitemap.xml")
+    urls = await strategy.parse_sitemap("https://example.com/sitemap.xml")
+    await http_client.aclose()
+
+    assert entries == [("https://example.com/a", "2025-01-01"), ("https://example.com/b", None)]
+    assert urls == ["https://example.com/a", "https://example.com/b"]
+
+
+@pytest.mark.asyncio
+async def test_not_modified_placeholders_keep_stored_pages():
+    ops = DocumentStorageOperations(MagicMock())
+    ops.doc_storage_service.smart_chunk_text_async = AsyncMock(return_value=["fresh chunk"])
+    ops._create_source_records = AsyncMock()
+    ops._fetch_existing_pages = AsyncMock(
+        return_value={"https://example.com/a": {"id": "page-a", "url": "https://example.com/a", "word_count": 7}}
+    )
+    ops._fetch_existing_chunks = AsyncMock(return_value={})
+
+    crawl_results = [
+        {"url": "https://example.com/a", "markdown": "", "not_modified": True},
+        {"url": "https://example.com/b", "markdown": "fresh chunk", "etag": '"b2"', "lastmod": "2025-02-01"},
+    ]
+
+    with patch(
+        "src.server.services.crawling.page_storage_operations.PageStorageOperations.store_pages",
+        new=AsyncMock(return_value={"https://example.com/b": "page-b"}),
+    ) as store_pages, patch(
+        "src.server.services.crawling.document_storage_operations.add_documents_to_supabase",
+        new=AsyncMock(return_value={"chunks_stored": 1}),
+    ) as add_documents:
+        result = await ops.process_and_store_documents(
+            crawl_results=crawl_results,
+            request={"url": "https://example.com", "incremental": True},
+            crawl_type="sitemap",
+            original_source_id="src-1",
+        )
+
+    # Validators travel with the page so the next refresh can send conditional requests
+    stored_pages = store_pages.call_args.args[0]
+    assert stored_pages == [
+        {"url": "https://example.com/b", "markdown": "fresh chunk", "etag": '"b2"', "lastmod": "2025-02-01"}
+    ]
+    assert add_documents.call_args.kwargs["urls"] == ["https://example.com/b"]
+    assert result["unchanged_urls"] == ["https://example.com/a"]
+    assert ops._create_source_records.call_args.kwargs["extra_word_counts"] == {"src-1": 7}
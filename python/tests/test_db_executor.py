@@ -0,0 +1,75 @@
+"""
+Tests for running blocking supabase-py queries off the event loop.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.server.services import client_manager
+from src.server.services.client_manager import execute_async
+
+
+class SlowQuery:
+    """Query builder stand-in whose execute() blocks like a network round trip."""
+
+    def __init__(self, seconds, data=None, gate: threading.Event | None = None):
+        self.seconds = seconds
+        self.data = data
+        self.gate = gate
+
+    def execute(self):
+        if self.gate:
+            self.gate.wait(5)
+        time.sleep(self.seconds)
+        return MagicMock(data=self.data)
+
+
+@pytest.mark.asyncio
+async def test_execute_async_does_not_block_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    result = await execute_async(SlowQuery(0.2, data=[{"id": 1}]))
+    task.cancel()
+
+    assert result.data == [{"id": 1}]
+    assert ticks >= 5  # The loop kept running while the query was in flight
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_queue_behind_saturated_writes(monkeypatch):
+    monkeypatch.setattr(client_manager, "DB_WRITE_WORKERS", 1)
+    monkeypatch.setattr(client_manager, "_executors", {})
+    gate = threading.Event()
+
+    write = asyncio.create_task(execute_async(SlowQuery(0, gate=gate), write=True))
+    queued_write = asyncio.create_task(execute_async(SlowQuery(0), write=True))
+    await asyncio.sleep(0.05)
+
+    start = time.monotonic()
+    await execute_async(SlowQuery(0, data=[]))
+    assert time.monotonic() - start < 1
+    assert not queued_write.done()
+
+    gate.set()
+    await asyncio.gather(write, queued_write)
+    client_manager.shutdown_db_executors()
+
+
+@pytest.mark.asyncio
+async def test_execute_async_propagates_errors():
+    query = MagicMock()
+    query.execute.side_effect = RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError, match="connection reset"):
+        await execute_async(query)
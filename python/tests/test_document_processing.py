@@ -0,0 +1,128 @@
+"""
+Tests for PDF extraction: per-page fallback, page-range workers and in-order streaming.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pdfplumber = pytest.importorskip("pdfplumber")
+PyPDF2 = pytest.importorskip("PyPDF2")
+
+from src.server.utils import document_processing  # noqa: E402
+from src.server.utils.document_processing import (  # noqa: E402
+    extract_text_from_document_async,
+    extract_text_from_pdf,
+    extract_text_from_pdf_async,
+)
+
+
+def make_pdf(pages):
+    """Build a PDF with one Helvetica text page per entry (a list of lines, or None for a blank page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "\n".join(["BT /F1 11 Tf 14 TL 72 760 Td", *(f"({line}) Tj T*" for line in lines or []), "ET"]).encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def page_lines(page):
+    return [f"Page {page} line {line} covers request retries." for line in range(3)]
+
+
+PDF = make_pdf([page_lines(1), page_lines(2), None, page_lines(4), page_lines(5), page_lines(6), page_lines(7)])
+
+
+def test_pages_are_labelled_in_order_and_blank_pages_skipped():
+    text = extract_text_from_pdf(PDF)
+
+    assert text.startswith("--- Page 1 ---\nPage 1 line 0")
+    assert "--- Page 3 ---" not in text
+    assert text.index("--- Page 4 ---") < text.index("--- Page 7 ---")
+    assert "Page 7 line 2 covers request retries." in text
+
+
+def test_pypdf2_only_rereads_pages_pdfplumber_fails_on():
+    original_plumber = pdfplumber.page.Page.extract_text
+    original_pypdf = PyPDF2.PageObject.extract_text
+    reread = []
+
+    def flaky_plumber(page, *args, **kwargs):
+        if page.page_number == 5:
+            raise RuntimeError("broken content stream")
+        return original_plumber(page, *args, **kwargs)
+
+    def tracking_pypdf(page, *args, **kwargs):
+        text = original_pypdf(page, *args, **kwargs)
+        reread.append(text.split(" line")[0])
+        return text
+
+    with patch.object(pdfplumber.page.Page, "extract_text", flaky_plumber), patch.object(
+        PyPDF2.PageObject, "extract_text", tracking_pypdf
+    ):
+        text = extract_text_from_pdf(PDF)
+
+    # The blank page is retried too; every other page keeps its pdfplumber text
+    assert reread == ["", "Page 5"]
+    assert "Page 5 line 1 covers request retries." in text
+
+
+@pytest.mark.asyncio
+async def test_page_ranges_stream_back_in_order(monkeypatch):
+    monkeypatch.setattr(document_processing, "PDF_PARALLEL_MIN_PAGES", 0)
+    monkeypatch.setattr(document_processing, "PDF_PAGES_PER_TASK", 2)
+    progress = AsyncMock()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        monkeypatch.setattr(document_processing, "get_pdf_extraction_executor", lambda: executor)
+        text = await extract_text_from_pdf_async(PDF, progress_callback=progress)
+
+    assert text == extract_text_from_pdf(PDF)
+    assert [call.args for call in progress.await_args_list] == [(2, 7), (4, 7), (6, 7), (7, 7)]
+
+
+class BrokenExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker killed"))
+        return future
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_extracts_remaining_pages_in_process(monkeypatch):
+    monkeypatch.setattr(document_processing, "PDF_PARALLEL_MIN_PAGES", 0)
+    monkeypatch.setattr(document_processing, "PDF_PAGES_PER_TASK", 3)
+
+    with BrokenExecutor() as executor, patch.object(
+        document_processing, "shutdown_pdf_extraction_executor"
+    ) as shutdown:
+        monkeypatch.setattr(document_processing, "get_pdf_extraction_executor", lambda: executor)
+        text = await extract_text_from_pdf_async(PDF)
+
+    shutdown.assert_called()
+    assert text == extract_text_from_pdf(PDF)
+
+
+@pytest.mark.asyncio
+async def test_pdf_without_text_is_a_validation_error():
+    with pytest.raises(ValueError, match="No text extracted"):
+        await extract_text_from_document_async(make_pdf([None, None]), "scan.pdf", "application/pdf")
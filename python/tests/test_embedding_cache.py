@@ -0,0 +1,181 @@
+"""
+Tests for the content-addressed embedding cache and its use in create_embeddings_batch.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.embeddings.embedding_cache import EmbeddingCache, make_cache_key
+from src.server.services.embeddings.embedding_service import create_embeddings_batch
+
+
+class AsyncContextManager:
+    """Helper class for properly mocking async context managers"""
+
+    def __init__(self, return_value):
+        self.return_value = return_value
+
+    async def __aenter__(self):
+        return self.return_value
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class TestEmbeddingCacheKey:
+    """Cache keys must separate models/dimensions but ignore trivial whitespace."""
+
+    def test_key_ignores_surrounding_whitespace(self):
+        assert make_cache_key("openai", "m", 1536, "hello") == make_cache_key(
+            "OpenAI", "m", 1536, "  hello\n"
+        )
+
+    def test_key_depends_on_model_and_dimensions(self):
+        base = make_cache_key("openai", "small", 1536, "hello")
+        assert base != make_cache_key("openai", "large", 1536, "hello")
+        assert base != make_cache_key("openai", "small", 768, "hello")
+        assert base != make_cache_key("ollama", "small", 1536, "hello")
+
+
+class TestEmbeddingCache:
+    """In-process tier behaviour (database tier disabled)."""
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_counted(self):
+        cache = EmbeddingCache(persistent=False)
+        await cache.put_many("openai", "m", 3, ["a"], [[1.0, 2.0, 3.0]])
+
+        found = await cache.get_many("openai", "m", 3, ["a", "b", "a"])
+
+        assert found == {0: [1.0, 2.0, 3.0], 2: [1.0, 2.0, 3.0]}
+        stats = cache.get_stats()
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recently_used(self):
+        cache = EmbeddingCache(max_entries=2, persistent=False)
+        await cache.put_many("openai", "m", 1, ["a", "b"], [[1.0], [2.0]])
+        await cache.get_many("openai", "m", 1, ["a"])  # touch "a"
+        await cache.put_many("openai", "m", 1, ["c"], [[3.0]])
+
+        found = await cache.get_many("openai", "m", 1, ["a", "b", "c"])
+
+        assert set(found) == {0, 2}
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded_by_bytes(self):
+        # float32 vectors: 1024 dimensions take 4 KB, so a 10 KB budget holds two
+        cache = EmbeddingCache(persistent=False, max_mb=10 / 1024)
+        await cache.put_many("openai", "m", 1024, ["a", "b", "c"], [[0.5] * 1024, [1.5] * 1024, [2.5] * 1024])
+
+        found = await cache.get_many("openai", "m", 1024, ["a", "b", "c"])
+
+        assert set(found) == {1, 2}
+        assert found[2] == [2.5] * 1024
+        assert cache.get_stats()["memory_bytes"] == 2 * 4096
+
+    @pytest.mark.asyncio
+    async def test_expired_database_rows_are_pruned_once_per_interval(self):
+        client = MagicMock()
+        cache = EmbeddingCache(supabase_client=client, retention_days=7)
+
+        await cache.put_many("openai", "m", 1, ["a"], [[1.0]])
+        await cache.put_many("openai", "m", 1, ["b"], [[2.0]])
+
+        delete = client.table.return_value.delete.return_value
+        assert delete.lt.call_count == 1
+        assert delete.lt.call_args.args[0] == "created_at"
+
+    @pytest.mark.asyncio
+    async def test_database_tier_is_consulted_for_memory_misses(self):
+        client = MagicMock()
+        key = make_cache_key("openai", "m", 2, "stored")
+        select = client.table.return_value.select.return_value
+        select.in_.return_value.execute.return_value.data = [
+            {"cache_key": key, "embedding": [0.5, 0.5]}
+        ]
+        cache = EmbeddingCache(supabase_client=client)
+
+        found = await cache.get_many("openai", "m", 2, ["stored", "new"])
+
+        assert found == {0: [0.5, 0.5]}
+        assert cache.stats.persistent_hits == 1
+        assert cache.stats.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_database_failure_falls_back_to_memory(self):
+        client = MagicMock()
+        client.table.side_effect = Exception("relation does not exist")
+        cache = EmbeddingCache(supabase_client=client)
+
+        await cache.put_many("openai", "m", 1, ["a"], [[1.0]])
+        found = await cache.get_many("openai", "m", 1, ["a", "b"])
+
+        assert found == {0: [1.0]}
+
+
+class TestCreateEmbeddingsBatchWithCache:
+    """create_embeddings_batch should only send cache misses to the provider."""
+
+    @pytest.mark.asyncio
+    async def test_only_misses_are_embedded_and_order_is_kept(self):
+        cache = EmbeddingCache(persistent=False)
+        await cache.put_many(
+            "openai", "text-embedding-3-small", 3, ["text1", "text3"], [[1.0] * 3, [3.0] * 3]
+        )
+
+        async def fake_create(model, input, dimensions=None):
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[float(text[4:])] * 3) for text in input]
+            return response
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(side_effect=fake_create)
+        mock_threading_service = MagicMock()
+        mock_threading_service.rate_limited_operation.return_value = AsyncContextManager(None)
+
+        with patch(
+            "src.server.services.embeddings.embedding_service.get_threading_service",
+            return_value=mock_threading_service,
+        ), patch(
+            "src.server.services.embeddings.embedding_service.get_llm_client",
+            return_value=AsyncContextManager(mock_client),
+        ), patch(
+            "src.server.services.embeddings.embedding_service.get_embedding_model",
+            return_value="text-embedding-3-small",
+        ), patch(
+            "src.server.services.embeddings.embedding_service.get_embedding_cache",
+            return_value=cache,
+        ), patch(
+            "src.server.services.embeddings.embedding_service.credential_service"
+        ) as mock_cred:
+            mock_cred.get_active_provider = AsyncMock(return_value={"provider": "openai"})
+            mock_cred.get_credentials_by_category = AsyncMock(
+                return_value={
+                    "EMBEDDING_BATCH_SIZE": "10",
+                    "EMBEDDING_DIMENSIONS": "3",
+                    "USE_EMBEDDING_CACHE": "true",
+                    "EMBEDDING_CACHE_PERSISTENT": "false",
+                }
+            )
+
+            texts = ["text0", "text1", "text2", "text3", "text4"]
+            result = await create_embeddings_batch(texts)
+
+            # Only the three misses reach the provider, in a single sub-batch
+            mock_client.embeddings.create.assert_called_once()
+            assert mock_client.embeddings.create.call_args.kwargs["input"] == [
+                "text0",
+                "text2",
+                "text4",
+            ]
+            assert result.texts_processed == texts
+            assert [vector[0] for vector in result.embeddings] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+            # Second call is served entirely from the cache
+            mock_client.embeddings.create.reset_mock()
+            again = await create_embeddings_batch(texts)
+            mock_client.embeddings.create.assert_not_called()
+            assert again.texts_processed == texts
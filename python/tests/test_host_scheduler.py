@@ -0,0 +1,90 @@
+"""
+Tests for per-host politeness scheduling.
+"""
+
+import time
+
+import pytest
+
+from src.server.services.crawling.discovery_service import DiscoveryService
+from src.server.services.crawling.host_scheduler import HostPolitenessScheduler, interleave_by_host
+
+
+def test_parse_crawl_delay_prefers_matching_agent_group():
+    robots = """
+User-agent: Googlebot
+Crawl-delay: 1
+
+User-agent: Archon
+User-agent: OtherBot
+Crawl-delay: 5
+
+User-agent: *
+Request-rate: 1/4
+Disallow: /admin/
+"""
+    assert DiscoveryService.parse_crawl_delay(robots, "archon") == 5.0
+    assert DiscoveryService.parse_crawl_delay(robots, "somebot") == 4.0
+    assert DiscoveryService.parse_crawl_delay("User-agent: *\nDisallow: /", "archon") is None
+
+
+@pytest.mark.asyncio
+async def test_robots_crawl_delay_paces_requests_to_one_host():
+    loads = []
+
+    def crawl_delay_loader(base_url):
+        loads.append(base_url)
+        return 0.05 if "slow.example.com" in base_url else None
+
+    scheduler = HostPolitenessScheduler(default_rate=1000, max_rate=1000, burst=5, crawl_delay_loader=crawl_delay_loader)
+
+    start = time.monotonic()
+    for i in range(4):
+        await scheduler.wait_if_needed(f"https://fast.example.com/{i}")
+    fast_elapsed = time.monotonic() - start
+
+    start = time.monotonic()
+    for i in range(4):
+        await scheduler.wait_if_needed(f"https://slow.example.com/{i}")
+    slow_elapsed = time.monotonic() - start
+
+    assert fast_elapsed < 0.05
+    assert slow_elapsed >= 0.14  # Three waits of ~0.05s after the first request
+    # robots.txt is fetched once per host
+    assert sorted(loads) == ["https://fast.example.com/", "https://slow.example.com/"]
+
+
+@pytest.mark.asyncio
+async def test_aimd_halves_rate_on_429_and_recovers_additively():
+    scheduler = HostPolitenessScheduler(default_rate=8, max_rate=10, max_retries=2)
+    url = "https://example.com/page"
+    await scheduler.wait_if_needed(url)
+    state = scheduler.hosts["example.com"]
+
+    assert scheduler.update_delay(url, 429) is True
+    assert state.rate == 4
+    assert state.tokens <= 0
+    assert scheduler.update_delay(url, 503) is True
+    assert state.rate == 2
+    assert scheduler.update_delay(url, 429) is False  # Past max_retries
+    assert state.rate == 1
+
+    scheduler.update_delay(url, 200)
+    scheduler.update_delay(url, 200)
+    assert state.fail_count == 0
+    assert state.rate == pytest.approx(2.5)  # +1, then +1/2
+
+    for _ in range(200):
+        scheduler.update_delay(url, 200)
+    assert state.rate == 10  # Capped at max_rate
+
+
+def test_interleave_by_host_round_robins():
+    urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://c.com/1"]
+    assert interleave_by_host(urls) == [
+        "https://a.com/1",
+        "https://b.com/1",
+        "https://c.com/1",
+        "https://a.com/2",
+        "https://a.com/3",
+    ]
@@ -0,0 +1,163 @@
+"""
+Tests for the single-pass HTML code block scanner, plus a micro-benchmark against
+the previous one-regex-pass-per-highlighter extraction.
+"""
+
+import re
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.server.services.crawling.code_extraction_service import CodeExtractionService
+from src.server.services.crawling.html_code_scanner import scan_html_code_blocks
+
+LINES = "\n".join(
+    f'<span class="token keyword">const</span> value{i} <span class="token operator">=</span> '
+    f"compute({i}) =&gt; {{ return x; }};"
+    for i in range(15)
+)
+
+
+def test_highlighter_containers_get_language_and_source_type():
+    html = (
+        f'<div class="language-ts codeBlockContainer"><pre class="prism-code language-ts"><code>{LINES}</code></pre></div>'
+        f'<pre class="shiki github-dark" data-language="python"><code>{LINES}</code></pre>'
+        f'<pre><code class="hljs language-go">{LINES}</code></pre>'
+        f'<div class="vp-code language-rust"><pre><code>{LINES}</code></pre></div>'
+    )
+
+    blocks, inline = scan_html_code_blocks(html)
+
+    assert [(b.source_type, b.language) for b in blocks] == [
+        ("docusaurus", "ts"),
+        ("shiki", "python"),
+        ("hljs", "go"),
+        ("vitepress-vp", "rust"),
+    ]
+    assert inline == []
+    # Offsets cover the <pre> element and the inner <code> wrapper is dropped
+    first = blocks[0]
+    assert html[first.start :].startswith("<pre")
+    assert html[: first.end].endswith("</pre>")
+    assert first.code.startswith('<span class="token keyword">const</span>')
+
+
+def test_editor_containers_join_their_lines():
+    html = (
+        '<div class="cm-editor"><div class="cm-content" role="textbox">'
+        '<div class="cm-line"><span>def</span> run():</div><div class="cm-line">    return 1</div>'
+        "</div></div>"
+        '<div class="monaco-editor"><div class="view-lines">'
+        '<div class="view-line"><span>let x = 1;</span></div><div class="view-line"><span>x++;</span></div>'
+        "</div></div>"
+    )
+
+    blocks, _ = scan_html_code_blocks(html)
+
+    assert [b.source_type for b in blocks] == ["codemirror", "monaco"]
+    assert blocks[0].code == "def run():\n    return 1"
+    assert blocks[1].code.split("\n") == ["let x = 1;", "x++;"]
+
+
+def test_generic_codeblock_only_without_pre_and_inline_code_outside_pre():
+    html = (
+        '<div class="codeblock">plain text code</div>'
+        f'<div class="codeblock"><pre>{LINES}</pre></div>'
+        "<p>Use <code>pip install</code> first.</p>"
+        "<pre><code>in pre</code></pre>"
+    )
+
+    blocks, inline = scan_html_code_blocks(html)
+
+    assert [(b.source_type, b.code[:10]) for b in blocks] == [
+        ("generic-codeblock", "plain text"),
+        ("standard", LINES[:10]),
+        ("standard", "in pre"),
+    ]
+    assert [c.code for c in inline] == ["pip install"]
+
+
+@pytest.mark.asyncio
+async def test_extract_html_code_blocks_uses_scanner_offsets_for_context():
+    service = CodeExtractionService(MagicMock())
+    service._settings_cache = dict(CodeExtractionService.EXTRACTION_SETTING_DEFAULTS)
+    html = f"<p>Before the example</p><pre class=\"language-javascript\"><code>{LINES}</code></pre><p>After it</p>"
+
+    blocks = await service._extract_html_code_blocks(html)
+
+    assert len(blocks) == 1
+    assert blocks[0]["language"] == "javascript"
+    assert blocks[0]["source_type"] == "prism"
+    assert blocks[0]["code"].startswith("const value0 = compute(0) => { return x; };")
+    assert blocks[0]["context_before"] == "<p>Before the example</p>"
+    assert blocks[0]["context_after"] == "<p>After it</p>"
+
+
+# Patterns of the previous extractor, run one full pass each
+LEGACY_PATTERNS = [
+    r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*(?:language-)?(\w+)[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<div[^>]*class=["\'][^"\']*snippet-clipboard-content[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<div[^>]*class=["\'][^"\']*codeBlockContainer[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*["\'][^>]*>(.*?)</pre>',
+    r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
+    r'<div[^>]*class=["\'][^"\']*code-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*code-block-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<div[^>]*class=["\'][^"\']*milkdown-code-block[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<pre[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+    r"<div[^>]*data-code-block[^>]*>.*?<pre[^>]*>(.*?)</pre>",
+    r'<div[^>]*class=["\'][^"\']*milkdown[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<div[^>]*class=["\'][^"\']*monaco-editor[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*view-lines[^"\']*[^>]*>(.*?)</div>(?=.*?</div>.*?</div>)',
+    r'<div[^>]*class=["\'][^"\']*cm-content[^"\']*["\'][^>]*>((?:<div[^>]*class=["\'][^"\']*cm-line[^"\']*["\'][^>]*>.*?</div>\s*)+)</div>',
+    r'<div[^>]*class=["\'][^"\']*CodeMirror[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*CodeMirror-code[^"\']*["\'][^>]*>(.*?)</div>',
+    r'<pre[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
+    r'<pre[^>]*>\s*<code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code>\s*</pre>',
+    r'<pre[^>]*><code[^>]*class=["\'][^"\']*hljs(?:\s+language-(\w+))?[^"\']*["\'][^>]*>(.*?)</code></pre>',
+    r'<pre[^>]*class=["\'][^"\']*hljs[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<pre[^>]*class=["\'][^"\']*shiki[^"\']*["\'][^>]*(?:.*?style=["\'][^"\']*background-color[^"\']*["\'])?[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
+    r'<pre[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*vp-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+    r"<div[^>]*data-nextra-code[^>]*>.*?<pre[^>]*>(.*?)</pre>",
+    r'<pre[^>]*class=["\'][^"\']*nx-[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+    r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
+    r"<pre[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>",
+    r'<div[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+    r'<div[^>]*class=["\'][^"\']*codeblock[^"\']*["\'][^>]*>(.*?)</div>',
+    r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+]
+
+
+def documentation_page(sections: int) -> str:
+    nav = '<div class="menu__item"><a href="/docs">Docs</a></div>' * 300
+    prose = "<p>" + "Lorem ipsum dolor sit amet, <code>inline</code> consectetur adipiscing. " * 40 + "</p>"
+    cards = '<div class="card"><div class="row"><span>Card</span></div></div>' * 10
+    containers = [
+        '<div class="language-js codeBlockContainer"><pre class="prism-code language-js"><code>{}</code></pre></div>',
+        '<div class="highlight highlight-source-js"><pre class="language-javascript"><code>{}</code></pre></div>',
+        '<pre class="shiki github-dark"><code>{}</code></pre>',
+        '<pre><code class="hljs language-javascript">{}</code></pre>',
+    ]
+    body = "".join(prose + cards + containers[i % 4].format(LINES) for i in range(sections))
+    return f"<html><body><nav>{nav}</nav><main>{body}</main></body></html>"
+
+
+@pytest.mark.slow
+def test_benchmark_single_pass_scan_against_pattern_cascade():
+    html = documentation_page(sections=400)  # ~2 MB
+    compiled = [re.compile(pattern, re.DOTALL | re.IGNORECASE) for pattern in LEGACY_PATTERNS]
+
+    start = time.perf_counter()
+    for pattern in compiled:
+        for _ in pattern.finditer(html):
+            pass
+    cascade_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocks, _ = scan_html_code_blocks(html)
+    scan_seconds = time.perf_counter() - start
+
+    print(f"\n{len(html) / 1e6:.1f} MB: pattern cascade {cascade_seconds:.3f}s, single pass {scan_seconds:.3f}s")
+    assert len(blocks) == 400
+    assert scan_seconds * 3 < cascade_seconds
@@ -0,0 +1,206 @@
+"""
+Tests for incremental refresh content diffing in DocumentStorageOperations.
+
+Unchanged pages should be skipped, unchanged chunks kept, and only changed,
+added or removed chunks should touch the database.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling.document_storage_operations import DocumentStorageOperations
+from src.server.services.crawling.page_storage_operations import compute_content_hash
+
+
+def make_supabase(page_rows, chunk_rows, deleted_ids):
+    """Build a Supabase mock that serves stored hashes and records deletes by id."""
+
+    def table(name):
+        builder = MagicMock()
+        rows = page_rows if name == "archon_page_metadata" else chunk_rows
+
+        def select(*args, **kwargs):
+            query = MagicMock()
+
+            def in_(column, values):
+                result = MagicMock()
+                result.execute.return_value = MagicMock(
+                    data=[row for row in rows if row[column] in values]
+                )
+                return result
+
+            query.in_.side_effect = in_
+            return query
+
+        def delete():
+            query = MagicMock()
+
+            def in_(column, values):
+                assert column == "id"
+                deleted_ids.extend(values)
+                return MagicMock()
+
+            query.in_.side_effect = in_
+            return query
+
+        builder.select.side_effect = select
+        builder.delete.side_effect = delete
+        return builder
+
+    client = MagicMock()
+    client.table.side_effect = table
+    return client
+
+
+def chunk_row(row_id, url, chunk_number, text):
+    return {
+        "id": row_id,
+        "url": url,
+        "chunk_number": chunk_number,
+        "content_hash": compute_content_hash(text),
+    }
+
+
+async def split_paragraphs(text, chunk_size=600):
+    return text.split("\n\n")
+
+
+@pytest.fixture
+def stored_site():
+    """Two stored pages: page1 is unchanged, page2 will change."""
+    page_rows = [
+        {
+            "id": "page-1",
+            "url": "https://example.com/page1",
+            "word_count": 4,
+            "content_hash": compute_content_hash("alpha one\n\nbeta two"),
+        },
+        {
+            "id": "page-2",
+            "url": "https://example.com/page2",
+            "word_count": 6,
+            "content_hash": compute_content_hash("gamma\n\ndelta\n\nepsilon"),
+        },
+    ]
+    chunk_rows = [
+        chunk_row(1, "https://example.com/page1", 0, "alpha one"),
+        chunk_row(2, "https://example.com/page1", 1, "beta two"),
+        chunk_row(3, "https://example.com/page2", 0, "gamma"),
+        chunk_row(4, "https://example.com/page2", 1, "delta"),
+        chunk_row(5, "https://example.com/page2", 2, "epsilon"),
+    ]
+    return page_rows, chunk_rows
+
+
+async def run_refresh(client, crawl_results, incremental=True):
+    ops = DocumentStorageOperations(client)
+    ops.doc_storage_service.smart_chunk_text_async = AsyncMock(side_effect=split_paragraphs)
+    ops._create_source_records = AsyncMock()
+
+    with patch(
+        "src.server.services.crawling.page_storage_operations.PageStorageOperations.store_pages",
+        new=AsyncMock(return_value={"https://example.com/page2": "page-2"}),
+    ) as store_pages, patch(
+        "src.server.services.crawling.document_storage_operations.add_documents_to_supabase",
+        new=AsyncMock(side_effect=lambda **kwargs: {"chunks_stored": len(kwargs["contents"])}),
+    ) as add_documents:
+        result = await ops.process_and_store_documents(
+            crawl_results=crawl_results,
+            request={"url": "https://example.com", "incremental": incremental},
+            crawl_type="normal",
+            original_source_id="src-1",
+        )
+
+    return result, ops, store_pages, add_documents
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_only_stores_changed_chunks(stored_site):
+    page_rows, chunk_rows = stored_site
+    deleted_ids = []
+    client = make_supabase(page_rows, chunk_rows, deleted_ids)
+
+    crawl_results = [
+        {"url": "https://example.com/page1", "markdown": "alpha one\n\nbeta two"},
+        {"url": "https://example.com/page2", "markdown": "gamma\n\nDELTA changed"},
+    ]
+    result, ops, store_pages, add_documents = await run_refresh(client, crawl_results)
+
+    # page1 is skipped entirely, only page2 is re-stored
+    stored_pages = store_pages.call_args.args[0]
+    assert [page["url"] for page in stored_pages] == ["https://example.com/page2"]
+
+    # Only the changed chunk is embedded, without a blanket delete by URL
+    kwargs = add_documents.call_args.kwargs
+    assert kwargs["contents"] == ["DELTA changed"]
+    assert kwargs["chunk_numbers"] == [1]
+    assert kwargs["delete_existing"] is False
+    assert kwargs["metadatas"][0]["content_hash"] == compute_content_hash("DELTA changed")
+
+    # The changed chunk and the trailing removed chunk are deleted by id
+    assert sorted(deleted_ids) == [4, 5]
+
+    assert result["pages_unchanged"] == 1
+    assert result["chunks_unchanged"] == 1
+    assert result["chunks_removed"] == 2
+    assert result["chunk_count"] == 1
+    assert result["unchanged_urls"] == ["https://example.com/page1"]
+
+    # Source word count includes the skipped page
+    assert ops._create_source_records.call_args.kwargs["extra_word_counts"] == {"src-1": 4}
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_with_nothing_changed_stores_nothing(stored_site):
+    page_rows, chunk_rows = stored_site
+    deleted_ids = []
+    client = make_supabase(page_rows, chunk_rows, deleted_ids)
+
+    crawl_results = [
+        {"url": "https://example.com/page1", "markdown": "alpha one\n\nbeta two"},
+        {"url": "https://example.com/page2", "markdown": "gamma\n\ndelta\n\nepsilon"},
+    ]
+    result, ops, store_pages, add_documents = await run_refresh(client, crawl_results)
+
+    store_pages.assert_not_called()
+    ops._create_source_records.assert_not_called()
+    assert add_documents.call_args.kwargs["contents"] == []
+    assert deleted_ids == []
+    assert result["pages_unchanged"] == 2
+    assert result["chunk_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_still_replaces_everything(stored_site):
+    page_rows, chunk_rows = stored_site
+    deleted_ids = []
+    client = make_supabase(page_rows, chunk_rows, deleted_ids)
+
+    crawl_results = [
+        {"url": "https://example.com/page1", "markdown": "alpha one\n\nbeta two"},
+    ]
+    result, ops, store_pages, add_documents = await run_refresh(
+        client, crawl_results, incremental=False
+    )
+
+    kwargs = add_documents.call_args.kwargs
+    assert kwargs["contents"] == ["alpha one", "beta two"]
+    assert kwargs["delete_existing"] is True
+    assert deleted_ids == []
+    assert result["pages_unchanged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_falls_back_when_hash_lookup_fails():
+    client = MagicMock()
+    client.table.return_value.select.side_effect = Exception("column does not exist")
+
+    crawl_results = [
+        {"url": "https://example.com/page1", "markdown": "alpha one\n\nbeta two"},
+    ]
+    result, ops, store_pages, add_documents = await run_refresh(client, crawl_results)
+
+    kwargs = add_documents.call_args.kwargs
+    assert kwargs["contents"] == ["alpha one", "beta two"]
+    assert kwargs["delete_existing"] is True
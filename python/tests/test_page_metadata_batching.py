@@ -0,0 +1,89 @@
+"""
+Tests for batched, cached page metadata lookups in RAG page grouping.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.server.services.search.page_metadata_cache import (
+    PageMetadataCache,
+    get_page_metadata_cache,
+    invalidate_page_metadata,
+)
+from src.server.services.search.rag_service import RAGService
+
+
+def make_service(rows):
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.or_.return_value
+    query.execute.return_value = MagicMock(data=rows)
+    service = RAGService(supabase_client=client)
+    return service, client
+
+
+def chunk(page_id=None, url=None, similarity=0.8):
+    return {
+        "content": "text",
+        "similarity_score": similarity,
+        "metadata": {"page_id": page_id, "url": url, "source_id": "src"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_groups_fetch_metadata_in_one_query():
+    rows = [
+        {"id": "p1", "url": "https://a/1", "section_title": "One", "word_count": 10},
+        {"id": "p2", "url": "https://a/2", "section_title": None, "word_count": 20},
+        {"id": "p3", "url": "https://a/(3),x", "section_title": None, "word_count": 30},
+    ]
+    service, client = make_service(rows)
+    chunks = [
+        chunk("p1", "https://a/1", 0.9),
+        chunk("p1", "https://a/1", 0.7),
+        chunk("p2", "https://a/2", 0.6),
+        chunk(None, "https://a/(3),x", 0.5),
+    ]
+
+    pages = await service._group_chunks_by_pages(chunks, match_count=5)
+
+    assert [page["page_id"] for page in pages] == ["p1", "p2", "p3"]
+    assert pages[0]["chunk_matches"] == 2
+    client.table.return_value.select.return_value.or_.assert_called_once_with(
+        'id.in.(p1,p2),url.in.("https://a/(3),x")'
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_pages_skip_the_database():
+    rows = [{"id": "p1", "url": "https://a/1", "section_title": None, "word_count": 10}]
+    service, client = make_service(rows)
+
+    await service._group_chunks_by_pages([chunk("p1", "https://a/1")], match_count=5)
+    await service._group_chunks_by_pages([chunk(None, "https://a/1")], match_count=5)
+
+    assert client.table.return_value.select.return_value.or_.call_count == 1
+
+    invalidate_page_metadata(urls=["https://a/1"])
+    await service._group_chunks_by_pages([chunk("p1", "https://a/1")], match_count=5)
+    assert client.table.return_value.select.return_value.or_.call_count == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PageMetadataCache(max_entries=2)
+    cache.put_many([{"id": "a", "url": "u/a"}, {"id": "b", "url": "u/b"}])
+    cache.get_by_id("a")
+    cache.put_many([{"id": "c", "url": "u/c"}])
+
+    assert cache.get_by_url("u/b") is None
+    assert cache.get_by_id("a") is not None
+    assert len(cache) == 2
+
+
+def test_invalidate_by_id_drops_url_mapping():
+    cache = get_page_metadata_cache()
+    cache.put_many([{"id": "a", "url": "u/a"}])
+
+    invalidate_page_metadata(page_ids=["a"])
+
+    assert cache.get_by_url("u/a") is None
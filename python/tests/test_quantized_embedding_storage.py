@@ -0,0 +1,67 @@
+"""
+Tests for Matryoshka truncation and halfvec / binary embedding storage modes.
+"""
+
+import math
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.server.services.embeddings.embedding_service import _fit_dimensions
+from src.server.services.embeddings.multi_dimensional_embedding_service import (
+    multi_dimensional_embedding_service as service,
+)
+from src.server.services.ollama.embedding_router import EmbeddingRouter
+from src.server.services.search.base_search_strategy import BaseSearchStrategy
+
+
+def test_quantized_columns_per_storage_mode():
+    embedding = [0.5, -0.25, 0.0, 1.0]
+
+    assert service.get_quantized_columns("embedding_768", embedding, "full") == {}
+    assert service.get_quantized_columns("embedding_768", embedding, "halfvec") == {"embedding_768_half": embedding}
+    # One bit per dimension, set for positive components (pgvector's binary_quantize)
+    assert service.get_quantized_columns("embedding_768", embedding, "binary") == {"embedding_768_bin": "1001"}
+
+
+def test_unknown_storage_mode_falls_back_to_full():
+    assert service.normalize_storage_mode(" Binary ") == "binary"
+    assert service.normalize_storage_mode("int4") == "full"
+    assert service.normalize_storage_mode(None) == "full"
+
+
+def test_router_targets_compact_column():
+    router = EmbeddingRouter()
+
+    assert router._get_target_column(1536) == "embedding_1536"
+    assert router._get_target_column(1536, "halfvec") == "embedding_1536_half"
+    assert router._get_target_column(900, "binary") == "embedding_1024_bin"
+
+
+def test_matryoshka_truncation_renormalizes_known_models_only():
+    full = [[3.0, 4.0, 12.0], [0.6, 0.8]]
+
+    truncated = _fit_dimensions(full, "text-embedding-3-large", 2)
+    assert truncated == [[0.6, 0.8], [0.6, 0.8]]
+    assert math.isclose(sum(v * v for v in truncated[0]), 1.0)
+
+    # Models without Matryoshka training are left untouched
+    assert _fit_dimensions(full, "all-minilm", 2) is full
+    assert _fit_dimensions(full, "nomic-embed-text", None) is full
+
+
+@pytest.mark.asyncio
+async def test_base_strategy_calls_quantized_rpc():
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value = MagicMock(data=[{"id": 1, "similarity": 0.8}])
+    strategy = BaseSearchStrategy(client, storage_mode="binary", rescore_factor=8)
+
+    results = await strategy.vector_search([0.1] * 768, 5, filter_metadata={"source": "src-a"})
+
+    assert [r["id"] for r in results] == [1]
+    name, params = client.rpc.call_args.args
+    assert name == "match_archon_crawled_pages_quantized"
+    assert params["embedding_dimension"] == 768
+    assert params["storage_mode"] == "binary"
+    assert params["rescore_factor"] == 8
+    assert params["source_filter"] == "src-a"
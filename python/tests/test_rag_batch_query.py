@@ -0,0 +1,114 @@
+"""
+Tests for batch RAG queries: one embedding call, concurrent searches, batched reranking.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.embeddings.embedding_service import EmbeddingBatchResult
+from src.server.services.search import rag_service as rag_service_module
+from src.server.services.search.rag_service import RAGService
+from src.server.services.search.reranking_service import RerankingService
+from src.server.services.search.reranking_strategy import RerankingStrategy
+
+
+def embedding_result(texts, skip=()):
+    result = EmbeddingBatchResult()
+    for i, text in enumerate(texts):
+        if text not in skip:
+            result.add_success([float(i)], text)
+    return result
+
+
+def make_service():
+    service = RAGService(supabase_client=MagicMock())
+    service.reranking_strategy = None
+    service.base_strategy.vector_search = AsyncMock(
+        side_effect=lambda query_embedding, **kwargs: [
+            {"id": f"{query_embedding[0]}", "content": "text", "metadata": {}, "similarity": 0.9}
+        ]
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_once_and_keeps_input_order():
+    service = make_service()
+    embed = AsyncMock(side_effect=lambda texts: embedding_result(texts))
+
+    with patch.object(rag_service_module, "create_embeddings_batch", embed), patch.object(
+        rag_service_module, "create_embedding", AsyncMock()
+    ) as single:
+        success, result = await service.perform_batch_rag_query(["alpha", "beta", "alpha"])
+
+    assert success
+    embed.assert_awaited_once()
+    assert embed.call_args.args[0] == ["alpha", "beta"]
+    single.assert_not_called()
+    assert [r["query"] for r in result["results"]] == ["alpha", "beta", "alpha"]
+    assert [r["results"][0]["id"] for r in result["results"]] == ["0.0", "1.0", "0.0"]
+    assert all(r["success"] for r in result["results"])
+
+
+@pytest.mark.asyncio
+async def test_batch_serves_cached_queries_and_reports_embedding_failures():
+    service = make_service()
+    embed = AsyncMock(side_effect=lambda texts: embedding_result(texts, skip={"broken"}))
+
+    with patch.object(rag_service_module, "create_embeddings_batch", embed):
+        await service.perform_batch_rag_query(["alpha"])
+        success, result = await service.perform_batch_rag_query(["alpha", "broken"])
+
+    assert success
+    # Second call only embeds the uncached query
+    assert embed.call_args.args[0] == ["broken"]
+    assert result["results"][0]["success"] is True
+    assert result["results"][1]["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds_search_concurrency():
+    service = make_service()
+    active = 0
+    peak = 0
+
+    async def slow_search(query_embedding, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return []
+
+    service.base_strategy.vector_search = slow_search
+    embed = AsyncMock(side_effect=lambda texts: embedding_result(texts))
+
+    with patch.object(rag_service_module, "create_embeddings_batch", embed):
+        await service.perform_batch_rag_query([f"q{i}" for i in range(6)], max_concurrency=2)
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_reranks_all_queries_in_one_predict():
+    service = make_service()
+    model = MagicMock()
+    model.predict = MagicMock(side_effect=lambda pairs: [0.5] * len(pairs))
+    reranking_service = RerankingService(batch_window_ms=5)
+    service.reranking_strategy = RerankingStrategy(
+        model_name="test-model", model_instance=model, service=reranking_service
+    )
+    embed = AsyncMock(side_effect=lambda texts: embedding_result(texts))
+
+    with patch.object(rag_service_module, "create_embeddings_batch", embed), patch.object(
+        service, "get_bool_setting", side_effect=lambda key, default=False: key == "USE_RERANKING" or default
+    ):
+        success, result = await service.perform_batch_rag_query(["alpha", "beta", "gamma"])
+
+    assert success
+    assert model.predict.call_count == 1
+    assert len(model.predict.call_args.args[0]) == 3
+    assert all(r["reranking_applied"] for r in result["results"])
+    reranking_service.shutdown()
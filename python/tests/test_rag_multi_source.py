@@ -0,0 +1,128 @@
+"""
+Tests for multi-source fan-out search: per-source top-k, merge by score and project scoping.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.search import rag_service as rag_service_module
+from src.server.services.search.query_cache import RAGQueryCache, make_query_key
+from src.server.services.search.rag_service import RAGService
+
+# Per-source hits, best first
+HITS = {
+    "big": [{"id": f"big-{i}", "content": "text", "metadata": {}, "similarity": 0.9 - i / 100} for i in range(10)],
+    "small": [{"id": "small-0", "content": "text", "metadata": {}, "similarity": 0.885}],
+}
+
+
+def make_service():
+    service = RAGService(supabase_client=MagicMock())
+    service.reranking_strategy = None
+    service.search_documents = AsyncMock(
+        side_effect=lambda query, match_count, filter_metadata, use_hybrid_search, query_embedding: HITS.get(
+            filter_metadata["source"], []
+        )[:match_count]
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_fan_out_embeds_once_and_merges_by_score():
+    service = make_service()
+    embed = AsyncMock(return_value=[0.1, 0.2])
+
+    with patch.object(rag_service_module, "create_embedding", embed):
+        results = await service.search_documents_multi_source("q", ["big", "small", "big"], match_count=3)
+
+    embed.assert_awaited_once()
+    assert [r["id"] for r in results] == ["big-0", "big-1", "small-0"]
+    # Duplicate source ids are searched once
+    assert service.search_documents.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_per_source_limit_keeps_other_sources_visible():
+    service = make_service()
+
+    with patch.object(rag_service_module, "create_embedding", AsyncMock(return_value=[0.1])):
+        results = await service.search_documents_multi_source(
+            "q", ["big", "small"], match_count=3, per_source_limit=1
+        )
+
+    assert [r["id"] for r in results] == ["big-0", "small-0"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_fan_out_merges_by_fusion_score():
+    service = make_service()
+    hybrid_hits = {
+        "a": [{"id": "a-0", "similarity": 0.9, "fusion_score": 0.010}],
+        "b": [{"id": "b-0", "similarity": 0.2, "fusion_score": 0.030}],
+    }
+    service.search_documents.side_effect = lambda query, match_count, filter_metadata, **kwargs: hybrid_hits[
+        filter_metadata["source"]
+    ]
+
+    with patch.object(rag_service_module, "create_embedding", AsyncMock(return_value=[0.1])):
+        results = await service.search_documents_multi_source("q", ["a", "b"], match_count=2, use_hybrid_search=True)
+
+    assert [r["id"] for r in results] == ["b-0", "a-0"]
+
+
+@pytest.mark.asyncio
+async def test_project_expansion_is_capped_at_max_query_sources():
+    service = make_service()
+    linked = [f"src-{i}" for i in range(rag_service_module.MAX_QUERY_SOURCES + 10)]
+    linking = MagicMock()
+    linking.return_value.get_project_source_ids = AsyncMock(return_value=linked)
+
+    with patch("src.server.services.projects.source_linking_service.SourceLinkingService", linking):
+        sources = await service._resolve_sources("explicit", None, "proj-1")
+
+    assert len(sources) == rag_service_module.MAX_QUERY_SOURCES
+    assert sources[:2] == ["explicit", "src-0"]
+
+
+@pytest.mark.asyncio
+async def test_project_query_searches_linked_sources():
+    service = make_service()
+    service.supabase_client.table.return_value.select.return_value.eq.return_value.execute.return_value = MagicMock(
+        data=[{"source_id": "big"}, {"source_id": "small"}]
+    )
+
+    with patch.object(rag_service_module, "create_embedding", AsyncMock(return_value=[0.1])), patch.object(
+        service, "_get_query_cache", return_value=None
+    ):
+        success, result = await service.perform_rag_query("q", match_count=2, project_id="proj-1")
+
+    assert success
+    assert result["source_ids"] == ["big", "small"]
+    assert result["project_id"] == "proj-1"
+    assert [r["id"] for r in result["results"]] == ["big-0", "big-1"]
+    service.supabase_client.table.assert_called_with("archon_project_sources")
+
+
+@pytest.mark.asyncio
+async def test_project_without_sources_returns_no_results():
+    service = make_service()
+    service._resolve_sources = AsyncMock(return_value=[])
+
+    success, result = await service.perform_rag_query("q", project_id="empty")
+
+    assert success
+    assert result["results"] == []
+    service.search_documents.assert_not_called()
+
+
+def test_cache_entries_for_source_sets_are_invalidated_by_member_source():
+    cache = RAGQueryCache()
+    fan_out = make_query_key("q", ["small", "big"], 5, "chunks", False, False)
+    other = make_query_key("q", ["other"], 5, "chunks", False, False)
+    cache.put(fan_out, {"results": []})
+    cache.put(other, {"results": []})
+
+    assert fan_out == make_query_key("q", ["big", "small"], 5, "chunks", False, False)
+    assert cache.invalidate_source("big") == 1
+    assert cache.get(other) is not None
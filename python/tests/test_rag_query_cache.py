@@ -0,0 +1,110 @@
+"""
+Tests for the RAG query-result cache and its source-scoped invalidation.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.search import query_cache as query_cache_module
+from src.server.services.search.query_cache import RAGQueryCache, make_query_key
+
+
+def key(query="how to install", source=None, match_count=5, return_mode="chunks"):
+    return make_query_key(query, source, match_count, return_mode, False, False)
+
+
+def test_key_normalizes_case_and_whitespace():
+    assert key("  How   to\nInstall ") == key("how to install")
+    assert key(source="a") != key(source="b")
+    assert key(return_mode="pages") != key()
+    assert make_query_key("q", None, 5, "chunks", True, False) != make_query_key(
+        "q", None, 5, "chunks", False, False
+    )
+
+
+def test_get_returns_copy_of_stored_response():
+    cache = RAGQueryCache()
+    cache.put(key(), {"results": [{"id": "1"}], "total_found": 1})
+
+    first = cache.get(key())
+    first["results"].append({"id": "2"})
+
+    assert cache.get(key())["results"] == [{"id": "1"}]
+    assert cache.stats.hits == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = RAGQueryCache(ttl_seconds=10)
+    with patch.object(query_cache_module.time, "monotonic", return_value=100.0):
+        cache.put(key(), {"results": []})
+    with patch.object(query_cache_module.time, "monotonic", return_value=109.0):
+        assert cache.get(key()) is not None
+    with patch.object(query_cache_module.time, "monotonic", return_value=111.0):
+        assert cache.get(key()) is None
+
+
+def test_lru_eviction():
+    cache = RAGQueryCache(max_entries=2)
+    cache.put(key("a"), {"results": []})
+    cache.put(key("b"), {"results": []})
+    cache.get(key("a"))
+    cache.put(key("c"), {"results": []})
+
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) is not None
+    assert cache.get(key("c")) is not None
+
+
+def test_invalidate_source_keeps_other_sources():
+    cache = RAGQueryCache()
+    cache.put(key(source="docs"), {"results": []})
+    cache.put(key(source="blog"), {"results": []})
+    cache.put(key(source=None), {"results": []})
+
+    removed = cache.invalidate_source("docs")
+
+    assert removed == 2
+    assert cache.get(key(source="docs")) is None
+    assert cache.get(key(source=None)) is None
+    assert cache.get(key(source="blog")) is not None
+
+
+@pytest.mark.asyncio
+async def test_perform_rag_query_serves_repeat_from_cache():
+    from src.server.services.search.rag_service import RAGService
+
+    service = RAGService(supabase_client=MagicMock())
+    service.reranking_strategy = None
+    service.search_documents = AsyncMock(
+        return_value=[{"id": "1", "content": "text", "metadata": {}, "similarity": 0.9}]
+    )
+
+    success, first = await service.perform_rag_query("How to install", source="docs")
+    success_again, second = await service.perform_rag_query("how to  install", source="docs")
+
+    assert success and success_again
+    assert second == first
+    service.search_documents.assert_awaited_once()
+
+    query_cache_module.invalidate_source_queries("docs")
+    await service.perform_rag_query("how to install", source="docs")
+    assert service.search_documents.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_switching_embedding_model_misses_the_cache(monkeypatch):
+    from src.server.services.search.rag_service import RAGService
+
+    service = RAGService(supabase_client=MagicMock())
+    service.reranking_strategy = None
+    service.search_documents = AsyncMock(
+        return_value=[{"id": "1", "content": "text", "metadata": {}, "similarity": 0.9}]
+    )
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    await service.perform_rag_query("model switch", source="models")
+
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-large")
+    await service.perform_rag_query("model switch", source="models")
+
+    assert service.search_documents.await_count == 2
@@ -0,0 +1,75 @@
+"""
+Tests for the streaming RAG query pipeline.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.services.search.rag_service import RAGService
+
+
+def make_service(reranking=False):
+    service = RAGService(supabase_client=MagicMock())
+    service.search_documents = AsyncMock(
+        return_value=[
+            {"id": str(i), "content": f"text {i}", "metadata": {}, "similarity": 1 - i / 10}
+            for i in range(10)
+        ]
+    )
+    service.reranking_strategy = None
+    if reranking:
+        strategy = MagicMock()
+        strategy.rerank_results = AsyncMock(side_effect=lambda query, results, content_key, top_k: results[::-1][:top_k])
+        service.reranking_strategy = strategy
+    settings = {"USE_RERANKING": reranking}
+    service.get_bool_setting = lambda key, default=False: settings.get(key, default)
+    return service
+
+
+async def collect(service, **kwargs):
+    return [event async for event in service.stream_rag_query("install", match_count=2, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_search_hits_before_reranked_and_final():
+    service = make_service(reranking=True)
+
+    events = await collect(service)
+
+    assert [(e["type"], e.get("stage")) for e in events] == [
+        ("results", "search"),
+        ("results", "reranked"),
+        ("complete", None),
+    ]
+    assert [r["id"] for r in events[0]["results"]] == ["0", "1"]
+    assert [r["id"] for r in events[1]["results"]] == ["9", "8"]
+    assert events[2]["reranking_applied"] is True
+    assert events[2]["results"] == events[1]["results"]
+    # Reranking sees the wider candidate pool
+    assert service.search_documents.call_args.kwargs["match_count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_stream_without_reranking_and_cached_repeat():
+    service = make_service()
+
+    first = await collect(service)
+    second = await collect(service)
+
+    assert [e["type"] for e in first] == ["results", "complete"]
+    assert [e["type"] for e in second] == ["complete"]
+    assert second[0]["results"] == first[-1]["results"]
+    assert service.search_documents.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_errors_as_event():
+    service = make_service()
+    service.search_documents = AsyncMock(side_effect=RuntimeError("boom"))
+
+    events = await collect(service)
+
+    assert events == [
+        {"type": "error", "error": "boom", "error_type": "RuntimeError", "query": "install", "source": None}
+    ]
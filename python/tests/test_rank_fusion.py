@@ -0,0 +1,177 @@
+"""
+Tests for hybrid search rank fusion and the concurrent vector/keyword legs.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from src.server.services.search.hybrid_search_strategy import HybridSearchStrategy
+from src.server.services.search.rank_fusion import reciprocal_rank_fusion, weighted_score_fusion
+
+
+def doc(doc_id, similarity=None, rank=None):
+    row = {
+        "id": doc_id,
+        "url": f"https://example.com/{doc_id}",
+        "chunk_number": 0,
+        "content": f"content {doc_id}",
+        "metadata": {},
+        "source_id": "src",
+    }
+    if similarity is not None:
+        row["similarity"] = similarity
+    if rank is not None:
+        row["rank"] = rank
+    return row
+
+
+def test_rrf_rewards_results_found_by_both_legs():
+    fused = reciprocal_rank_fusion(
+        {
+            "vector": [doc(1), doc(2), doc(3)],
+            "keyword": [doc(3), doc(4)],
+        },
+        k=60,
+    )
+
+    # Ties keep leg order (vector first)
+    assert [r["id"] for r in fused] == [3, 1, 2, 4]
+    assert fused[0]["match_type"] == "hybrid"
+    assert fused[0]["fusion_score"] == pytest.approx(1 / 63 + 1 / 61)
+    assert {r["id"]: r["match_type"] for r in fused}[4] == "keyword"
+
+
+def test_rrf_weights_favor_a_leg():
+    legs = {"vector": [doc(1)], "keyword": [doc(2)]}
+
+    fused = reciprocal_rank_fusion(legs, weights={"vector": 0.2, "keyword": 0.8})
+
+    assert [r["id"] for r in fused] == [2, 1]
+
+
+def test_weighted_fusion_normalizes_each_leg():
+    fused = weighted_score_fusion(
+        {
+            "vector": [doc(1, similarity=0.9), doc(2, similarity=0.5)],
+            "keyword": [doc(2, rank=12.0), doc(3, rank=2.0)],
+        },
+        score_keys={"vector": "similarity", "keyword": "rank"},
+    )
+
+    scores = {r["id"]: r["fusion_score"] for r in fused}
+    assert scores == {1: 1.0, 2: 1.0, 3: 0.0}
+    # Vector fields win for results found by both legs
+    assert next(r for r in fused if r["id"] == 2)["similarity"] == 0.5
+
+
+def make_strategy(vector_rows, text_rows=None, text_error=None, settings=None):
+    client = MagicMock()
+    text_query = MagicMock()
+    if text_error:
+        text_query.execute.side_effect = text_error
+    else:
+        text_query.execute.return_value = MagicMock(data=text_rows or [])
+    hybrid_query = MagicMock()
+    hybrid_query.execute.return_value = MagicMock(
+        data=[{**doc(9, similarity=0.4), "match_type": "vector"}]
+    )
+    client.rpc.side_effect = lambda name, params: (
+        text_query if name.startswith("text_search") else hybrid_query
+    )
+
+    base_strategy = MagicMock()
+    base_strategy.vector_search = AsyncMock(return_value=vector_rows)
+    settings = settings or {}
+    strategy = HybridSearchStrategy(
+        client, base_strategy, get_setting=lambda key, default: settings.get(key, default)
+    )
+    return strategy, client, base_strategy
+
+
+@pytest.mark.asyncio
+async def test_documents_hybrid_fuses_both_legs():
+    strategy, client, base_strategy = make_strategy(
+        vector_rows=[doc(1, similarity=0.9), doc(2, similarity=0.8)],
+        text_rows=[doc(2, rank=0.5), doc(3, rank=0.1)],
+    )
+
+    results = await strategy.search_documents_hybrid(
+        query="install", query_embedding=[0.1], match_count=2, filter_metadata={"source": "src"}
+    )
+
+    assert [r["id"] for r in results] == [2, 1]
+    assert results[0]["match_type"] == "hybrid"
+    assert base_strategy.vector_search.call_args.kwargs["filter_metadata"] == {"source": "src"}
+    text_params = client.rpc.call_args_list[0].args[1]
+    assert text_params["source_filter"] == "src"
+    assert text_params["filter"] == {}
+
+
+@pytest.mark.asyncio
+async def test_legs_run_concurrently():
+    async def slow_vector(**kwargs):
+        await asyncio.sleep(0.2)
+        return []
+
+    def slow_text():
+        time.sleep(0.2)
+        return MagicMock(data=[])
+
+    strategy, client, base_strategy = make_strategy(vector_rows=[])
+    base_strategy.vector_search = slow_vector
+    client.rpc.side_effect = lambda name, params: MagicMock(execute=slow_text)
+
+    start = time.perf_counter()
+    await strategy.search_documents_hybrid(query="q", query_embedding=[0.1], match_count=5)
+
+    assert time.perf_counter() - start < 0.35
+
+
+@pytest.mark.asyncio
+async def test_missing_text_rpc_falls_back_to_combined_rpc():
+    strategy, client, _ = make_strategy(
+        vector_rows=[doc(1, similarity=0.9)],
+        text_error=APIError({"code": "PGRST202", "message": "Could not find the function"}),
+    )
+
+    results = await strategy.search_documents_hybrid(
+        query="q", query_embedding=[0.1], match_count=5
+    )
+
+    assert [r["id"] for r in results] == [9]
+    assert client.rpc.call_args.args[0] == "hybrid_search_archon_crawled_pages"
+    assert strategy._text_rpc_available is False
+
+
+@pytest.mark.asyncio
+async def test_transient_text_rpc_error_keeps_fusion_enabled():
+    strategy, client, _ = make_strategy(
+        vector_rows=[doc(1, similarity=0.9)], text_error=TimeoutError("read timed out")
+    )
+
+    results = await strategy.search_documents_hybrid(
+        query="q", query_embedding=[0.1], match_count=5
+    )
+
+    # This query falls back, the next one tries the fused path again
+    assert [r["id"] for r in results] == [9]
+    assert strategy._text_rpc_available is True
+
+
+@pytest.mark.asyncio
+async def test_weighted_fusion_setting():
+    strategy, _, _ = make_strategy(
+        vector_rows=[doc(1, similarity=0.9), doc(2, similarity=0.1)],
+        text_rows=[doc(3, rank=1.0)],
+        settings={"HYBRID_FUSION_METHOD": "weighted", "HYBRID_VECTOR_WEIGHT": "0.9"},
+    )
+
+    results = await strategy.search_documents_hybrid(
+        query="q", query_embedding=[0.1], match_count=3
+    )
+
+    assert [r["id"] for r in results] == [1, 3, 2]
@@ -0,0 +1,157 @@
+"""
+Tests for the frontier-based recursive crawl strategy.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling.strategies.recursive import RecursiveCrawlStrategy
+
+
+def make_result(url, links):
+    result = MagicMock()
+    result.url = url
+    result.success = True
+    result.markdown.fit_markdown = f"content of {url}"
+    result.html = f"<title>{url}</title>"
+    result.links = {"internal": [{"href": link} for link in links]}
+    result.response_headers = {}
+    result.status_code = 200
+    return result
+
+
+class FakeCrawler:
+    """Serves a static link graph, optionally with per-URL latencies."""
+
+    def __init__(self, graph, latencies=None):
+        self.graph = graph
+        self.latencies = latencies or {}
+        self.calls = []
+        self.finished = []
+
+    async def arun(self, url, config):
+        self.calls.append(url)
+        await asyncio.sleep(self.latencies.get(url, 0))
+        self.finished.append(url)
+        return make_result(url, self.graph.get(url, []))
+
+
+async def crawl(crawler, start_urls, **kwargs):
+    strategy = RecursiveCrawlStrategy(crawler, MagicMock())
+    with patch(
+        "src.server.services.crawling.strategies.recursive.credential_service.get_credentials_by_category",
+        new=AsyncMock(return_value={"CRAWL_HOST_RATE": "1000", "CRAWL_HOST_MAX_RATE": "1000"}),
+    ), patch(
+        "src.server.services.crawling.strategies.recursive.DiscoveryService.get_crawl_delay",
+        return_value=None,
+    ):
+        return await strategy.crawl_recursive_with_progress(
+            start_urls,
+            transform_url_func=lambda url: url,
+            is_documentation_site_func=lambda url: False,
+            **kwargs,
+        )
+
+
+GRAPH = {
+    "https://example.com/": ["https://example.com/a", "https://example.com/b#section"],
+    "https://example.com/a": ["https://example.com/", "https://example.com/c", "https://example.com/file.pdf"],
+    "https://example.com/b": ["https://example.com/a", "https://example.com/d"],
+    "https://example.com/c": ["https://example.com/deep"],
+}
+
+
+@pytest.mark.asyncio
+async def test_frontier_respects_depth_dedupes_and_skips_binaries():
+    crawler = FakeCrawler(GRAPH)
+
+    results = await crawl(crawler, ["https://example.com/"], max_depth=3, max_concurrent=2)
+
+    assert sorted(crawler.calls) == [
+        "https://example.com/",
+        "https://example.com/a",
+        "https://example.com/b",
+        "https://example.com/c",
+        "https://example.com/d",
+    ]
+    assert sorted(r["url"] for r in results) == sorted(crawler.calls)
+
+
+@pytest.mark.asyncio
+async def test_fast_branch_is_not_held_back_by_slow_page():
+    graph = {
+        "https://example.com/": ["https://example.com/slow", "https://example.com/fast"],
+        "https://example.com/fast": ["https://example.com/fast/child"],
+    }
+    crawler = FakeCrawler(graph, latencies={"https://example.com/slow": 0.2})
+
+    await crawl(crawler, ["https://example.com/"], max_depth=3, max_concurrent=3)
+
+    # A level-synchronous crawl would wait for /slow before starting depth 2
+    assert crawler.finished.index("https://example.com/fast/child") < crawler.finished.index(
+        "https://example.com/slow"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cancellation_stops_new_pages_and_returns_partial_results():
+    crawler = FakeCrawler(GRAPH)
+    progress = AsyncMock()
+
+    def cancellation_check():
+        if len(crawler.calls) >= 2:
+            raise asyncio.CancelledError()
+
+    results = await crawl(
+        crawler,
+        ["https://example.com/"],
+        max_depth=3,
+        max_concurrent=1,
+        progress_callback=progress,
+        cancellation_check=cancellation_check,
+    )
+
+    assert len(crawler.calls) == 2
+    assert len(results) == 2
+    assert progress.call_args.args[0] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_page_sink_failure_stops_crawl():
+    crawler = FakeCrawler(GRAPH)
+    sink = AsyncMock(side_effect=RuntimeError("Streaming storage failed"))
+
+    with pytest.raises(RuntimeError, match="Streaming storage failed"):
+        await crawl(crawler, ["https://example.com/"], max_depth=3, max_concurrent=2, page_sink=sink)
+
+    assert crawler.calls == ["https://example.com/"]
+
+
+@pytest.mark.asyncio
+async def test_memory_pressure_holds_workers_back():
+    graph = {"https://example.com/": [f"https://example.com/{i}" for i in range(6)]}
+    crawler = FakeCrawler(graph, latencies={f"https://example.com/{i}": 0.01 for i in range(6)})
+    in_flight = max_in_flight = 0
+    original_arun = crawler.arun
+
+    async def tracking_arun(url, config):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            return await original_arun(url, config)
+        finally:
+            in_flight -= 1
+
+    crawler.arun = tracking_arun
+    with patch(
+        "src.server.services.crawling.strategies.recursive.psutil.virtual_memory",
+        return_value=MagicMock(percent=95.0),
+    ):
+        results = await crawl(crawler, ["https://example.com/"], max_depth=2, max_concurrent=4)
+
+    # Above MEMORY_THRESHOLD_PERCENT only one page is crawled at a time, but the crawl still finishes
+    assert len(results) == 7
+    assert max_in_flight == 1
@@ -0,0 +1,132 @@
+"""
+Tests for the shared reranking service: thread offload, micro-batching and score cache.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.server.services.search.reranking_service import RerankingService
+from src.server.services.search.reranking_strategy import RerankingStrategy
+
+
+class RecordingModel:
+    """Cross-encoder stand-in scoring a pair by its text length."""
+
+    def __init__(self):
+        self.calls: list[list[list[str]]] = []
+        self.threads: set[str] = set()
+
+    def predict(self, pairs):
+        self.calls.append(pairs)
+        self.threads.add(threading.current_thread().name)
+        return [float(len(text)) for _, text in pairs]
+
+
+@pytest.mark.asyncio
+async def test_predict_runs_off_the_event_loop():
+    model = RecordingModel()
+    service = RerankingService(batch_window_ms=0)
+
+    scores = await service.score(model, "m", "query", ["a", "bbb"])
+
+    assert scores == [1.0, 3.0]
+    assert all(name.startswith("rerank") for name in model.threads)
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_predict_call():
+    model = RecordingModel()
+    service = RerankingService(batch_window_ms=20)
+
+    results = await asyncio.gather(
+        service.score(model, "m", "first", ["a", "bb"]),
+        service.score(model, "m", "second", ["ccc"]),
+    )
+
+    assert results == [[1.0, 2.0], [3.0]]
+    assert len(model.calls) == 1
+    assert len(model.calls[0]) == 3
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_window():
+    model = RecordingModel()
+    service = RerankingService(batch_window_ms=10_000, max_batch_pairs=2)
+
+    scores = await asyncio.wait_for(service.score(model, "m", "q", ["a", "bb"]), timeout=2)
+
+    assert scores == [1.0, 2.0]
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_scores_are_cached_per_query_and_text():
+    model = RecordingModel()
+    service = RerankingService(batch_window_ms=0)
+
+    await service.score(model, "m", "q", ["a", "bb"])
+    scores = await service.score(model, "m", "q", ["bb", "ccc", "a"])
+
+    assert scores == [2.0, 3.0, 1.0]
+    assert model.calls[1] == [["q", "ccc"]]
+    assert service.cache_hits == 2
+
+    await service.score(model, "m", "other query", ["a"])
+    assert len(model.calls) == 3
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_predict_errors_reach_every_waiter():
+    class FailingModel:
+        def predict(self, pairs):
+            raise RuntimeError("model crashed")
+
+    service = RerankingService(batch_window_ms=10)
+
+    results = await asyncio.gather(
+        service.score(FailingModel(), "m", "a", ["x"]),
+        service.score(FailingModel(), "m", "b", ["y"]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_strategy_reranks_through_service():
+    model = RecordingModel()
+    service = RerankingService(batch_window_ms=0)
+    strategy = RerankingStrategy(model_name="test", model_instance=model, service=service)
+
+    results = await strategy.rerank_results(
+        "q", [{"content": "a"}, {"content": "ccc"}, {"content": "bb"}], top_k=2
+    )
+
+    assert [r["content"] for r in results] == ["ccc", "bb"]
+    assert results[0]["rerank_score"] == 3.0
+    service.shutdown()
+
+
+def test_torch_fallback_gets_its_own_score_cache_key(monkeypatch):
+    from src.server.services.search import reranking_strategy as strategy_module
+
+    def cross_encoder(model_name, backend="torch", model_kwargs=None):
+        if backend != "torch":
+            raise ImportError("onnxruntime not installed")
+        return RecordingModel()
+
+    monkeypatch.setattr(strategy_module, "CROSSENCODER_AVAILABLE", True)
+    monkeypatch.setattr(strategy_module, "CrossEncoder", cross_encoder)
+    service = RerankingService()
+
+    onnx = RerankingStrategy(model_name="m", backend="onnx", onnx_file="model_qint8.onnx", service=service)
+    torch = RerankingStrategy(model_name="m", service=service)
+
+    assert onnx.model is torch.model
+    assert onnx.cache_key == torch.cache_key == "m:torch"
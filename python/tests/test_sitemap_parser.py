@@ -0,0 +1,122 @@
+"""
+Tests for the streaming sitemap parser (sitemap indexes, gzip, limits).
+"""
+
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from src.server.services.crawling.strategies.sitemap import SitemapCrawlStrategy
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(urls):
+    entries = "".join(f"<url><loc>{url}</loc><lastmod>2025-01-01</lastmod></url>" for url in urls)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def sitemap_index(children):
+    entries = "".join(f"<sitemap><loc>{child}</loc></sitemap>" for child in children)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+
+
+def make_client(routes, requested=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if requested is not None:
+            requested.append(url)
+        if url not in routes:
+            return httpx.Response(404)
+        return httpx.Response(200, content=routes[url])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_follows_nested_indexes_and_gzip_children():
+    routes = {
+        "https://example.com/sitemap.xml": sitemap_index(
+            ["https://example.com/pages.xml.gz", "https://example.com/nested.xml", "https://example.com/missing.xml"]
+        ),
+        "https://example.com/pages.xml.gz": gzip.compress(
+            urlset([f"https://example.com/page/{i}" for i in range(3)])
+        ),
+        "https://example.com/nested.xml": sitemap_index(
+            ["https://example.com/blog.xml", "https://example.com/sitemap.xml"]  # Loop back to the root
+        ),
+        "https://example.com/blog.xml": urlset(["https://example.com/blog/1"]),
+    }
+    requested = []
+    client = make_client(routes, requested)
+
+    entries = await SitemapCrawlStrategy(http_client=client).parse_sitemap_entries(
+        "https://example.com/sitemap.xml"
+    )
+    await client.aclose()
+
+    assert sorted(url for url, _ in entries) == [
+        "https://example.com/blog/1",
+        "https://example.com/page/0",
+        "https://example.com/page/1",
+        "https://example.com/page/2",
+    ]
+    assert all(lastmod == "2025-01-01" for _, lastmod in entries)
+    # Every sitemap is fetched once, even when an index links back to its parent
+    assert requested.count("https://example.com/sitemap.xml") == 1
+
+
+@pytest.mark.asyncio
+async def test_large_sitemap_streams_without_ignoring_entries():
+    urls = [f"https://example.com/page/{i}" for i in range(20000)]
+    client = make_client({"https://example.com/sitemap.xml": urlset(urls)})
+
+    count = 0
+    async for _ in SitemapCrawlStrategy(http_client=client).iter_sitemap_entries(
+        "https://example.com/sitemap.xml"
+    ):
+        count += 1
+    await client.aclose()
+
+    assert count == len(urls)
+
+
+@pytest.mark.asyncio
+async def test_malformed_child_only_skips_that_file():
+    routes = {
+        "https://example.com/sitemap.xml": sitemap_index(
+            ["https://example.com/broken.xml", "https://example.com/good.xml"]
+        ),
+        "https://example.com/broken.xml": b"<urlset><url><loc>https://example.com/x</loc>",
+        "https://example.com/good.xml": urlset(["https://example.com/ok"]),
+    }
+    client = make_client(routes)
+
+    urls = await SitemapCrawlStrategy(http_client=client).parse_sitemap("https://example.com/sitemap.xml")
+    await client.aclose()
+
+    # A truncated child is logged and skipped; siblings are still parsed
+    assert "https://example.com/ok" in urls
+
+
+@pytest.mark.asyncio
+async def test_cancellation_stops_parsing():
+    urls = [f"https://example.com/page/{i}" for i in range(20000)]
+    client = make_client({"https://example.com/sitemap.xml": urlset(urls)})
+    seen = []
+
+    def cancellation_check():
+        if len(seen) >= 10:
+            raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        async for url, _ in SitemapCrawlStrategy(http_client=client).iter_sitemap_entries(
+            "https://example.com/sitemap.xml", cancellation_check
+        ):
+            seen.append(url)
+    await client.aclose()
+
+    # Checked once per parsed chunk, so parsing stops well before the end
+    assert 10 <= len(seen) < len(urls)
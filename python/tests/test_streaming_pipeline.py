@@ -0,0 +1,125 @@
+"""
+Tests for the streaming crawl-to-storage pipeline.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.services.crawling.streaming_pipeline import StreamingStoragePipeline
+
+
+def make_doc_storage_ops(process_side_effect=None):
+    ops = MagicMock()
+    ops.supabase_client = MagicMock()
+
+    async def process(pages, request, crawl_type, source_id, *args, **kwargs):
+        return {
+            "chunk_count": len(pages),
+            "chunks_stored": len(pages),
+            "total_word_count": 10 * len(pages),
+            "url_to_full_document": {p["url"]: p["markdown"] for p in pages},
+            "unchanged_urls": [],
+        }
+
+    ops.process_and_store_documents = AsyncMock(side_effect=process_side_effect or process)
+    ops.extract_and_store_code_examples = AsyncMock(side_effect=lambda pages, *a, **k: len(pages))
+    return ops
+
+
+def page(i):
+    return {"url": f"https://example.com/{i}", "markdown": f"page {i}"}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_batches_and_aggregates_stats():
+    ops = make_doc_storage_ops()
+    pipeline = StreamingStoragePipeline(
+        ops, {"url": "https://example.com"}, "src-1", batch_pages=2, workers=1
+    )
+
+    sink = pipeline.page_sink("normal")
+    for i in range(5):
+        await sink(page(i))
+    result = await pipeline.close()
+
+    calls = ops.process_and_store_documents.call_args_list
+    assert [len(call.args[0]) for call in calls] == [2, 2, 1]
+    # Only the first batch creates the source record
+    assert [call.kwargs["create_source_records"] for call in calls] == [True, False, False]
+    assert all(call.args[2] == "normal" for call in calls)
+
+    assert result["chunks_stored"] == 5
+    assert result["code_examples_stored"] == 5
+    assert result["source_id"] == "src-1"
+
+    # Final word count covers every batch, not just the first
+    ops.supabase_client.table.return_value.update.assert_called_once_with({"total_word_count": 50})
+
+
+@pytest.mark.asyncio
+async def test_pipeline_applies_backpressure():
+    release = asyncio.Event()
+
+    async def slow_process(pages, *args, **kwargs):
+        await release.wait()
+        return {"chunk_count": len(pages), "chunks_stored": len(pages), "total_word_count": 0}
+
+    ops = make_doc_storage_ops(slow_process)
+    pipeline = StreamingStoragePipeline(
+        ops, {"extract_code_examples": False}, "src-1", queue_size=1, batch_pages=1, workers=1,
+        extract_code_examples=False,
+    )
+
+    await pipeline.submit(page(0), "normal")  # taken by the worker, blocked in storage
+    await asyncio.sleep(0)
+    await pipeline.submit(page(1), "normal")  # fills the queue
+
+    blocked = asyncio.create_task(pipeline.submit(page(2), "normal"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done(), "crawler should wait while storage is behind"
+
+    release.set()
+    await blocked
+    result = await pipeline.close()
+    assert result["chunks_stored"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pipeline_failure_surfaces_to_crawler_and_close():
+    async def failing_process(pages, *args, **kwargs):
+        raise ValueError("database down")
+
+    ops = make_doc_storage_ops(failing_process)
+    pipeline = StreamingStoragePipeline(ops, {}, "src-1", batch_pages=1, workers=1)
+
+    await pipeline.submit(page(0), "normal")
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(RuntimeError, match="Streaming storage failed"):
+        await pipeline.submit(page(1), "normal")
+    with pytest.raises(ValueError, match="database down"):
+        await pipeline.close()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_code_extraction_for_unchanged_pages():
+    async def process(pages, *args, **kwargs):
+        return {
+            "chunk_count": 1,
+            "chunks_stored": 1,
+            "total_word_count": 0,
+            "url_to_full_document": {},
+            "unchanged_urls": ["https://example.com/0"],
+        }
+
+    ops = make_doc_storage_ops(process)
+    pipeline = StreamingStoragePipeline(ops, {}, "src-1", batch_pages=2, workers=1)
+
+    await pipeline.submit(page(0), "sitemap")
+    await pipeline.submit(page(1), "sitemap")
+    await pipeline.close()
+
+    code_pages = ops.extract_and_store_code_examples.call_args.args[0]
+    assert [p["url"] for p in code_pages] == ["https://example.com/1"]
@@ -0,0 +1,140 @@
+"""
+Tests for the token-aware text chunker: budgets, break preference, overlap and batches.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from src.server.services.storage import text_chunker as chunker_module
+from src.server.services.storage.text_chunker import (
+    ChunkerConfig,
+    ChunkTokenizer,
+    TextChunker,
+    _bytes_to_char_offsets,
+    chunk_texts_async,
+    get_chunker_config,
+)
+
+PARAGRAPH = "The server retries the request. " * 12
+
+
+class WordTokenizer(ChunkTokenizer):
+    """Every whitespace-separated word (with its leading space) is a token."""
+
+    name = "words"
+
+    def token_starts(self, text):
+        return np.array([match.start() for match in re.finditer(r"\s*\S+", text)], dtype=np.int64)
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def test_chunks_respect_character_budget():
+    text = "\n\n".join(PARAGRAPH for _ in range(20))
+
+    chunks = TextChunker(max_tokens=600).chunk(text)
+
+    assert max(len(chunk) for chunk in chunks) <= 600
+    assert "".join(chunks).replace(" ", "") == text.replace("\n", "").replace(" ", "")
+
+
+def test_prefers_code_fence_then_paragraph_then_sentence():
+    fence = "x" * 250 + "\n\n" + "y" * 100 + "```" + "z" * 400
+    paragraph = "a" * 250 + ". " + "b" * 100 + "\n\n" + "c" * 400
+    sentence = "a" * 250 + ". " + "b" * 400
+
+    assert TextChunker(max_tokens=500).chunk(fence)[0].endswith("y" * 100)
+    assert TextChunker(max_tokens=500).chunk(paragraph)[0].endswith("b" * 100)
+    assert TextChunker(max_tokens=500).chunk(sentence)[0].endswith("a.")
+
+
+def test_spans_are_trimmed_slices_of_the_text():
+    text = "  " + "\n\n".join(PARAGRAPH for _ in range(5)) + "\n"
+    chunker = TextChunker(max_tokens=300)
+
+    spans = chunker.chunk_spans(text)
+
+    assert [text[start:end] for start, end in spans] == chunker.chunk(text)
+    assert all(not text[start].isspace() and not text[end - 1].isspace() for start, end in spans)
+
+
+def test_small_chunks_merge_only_within_budget():
+    text = "\n\n".join(f"Short paragraph {i}." for i in range(40))
+
+    chunks = TextChunker(max_tokens=120, min_chunk_chars=100).chunk(text)
+
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert len(chunks) < 40
+    # Merged chunks keep the original separators
+    assert "Short paragraph 0.\n\nShort paragraph 1." in chunks[0]
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk():
+    text = " ".join(f"word{i}" for i in range(400))
+
+    chunks = TextChunker(WordTokenizer(), max_tokens=50, overlap=10, min_chunk_chars=0).chunk(text)
+
+    assert all(word_count(chunk) <= 50 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:], strict=False):
+        assert previous.split()[-10:] == current.split()[:10]
+
+
+def test_token_budget_with_non_ascii_text():
+    text = " ".join("naïve café ünïcode" for _ in range(300))
+
+    chunks = TextChunker(WordTokenizer(), max_tokens=64).chunk(text)
+
+    assert all(word_count(chunk) <= 64 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_byte_offsets_map_to_character_offsets():
+    text = "añb€c"
+    byte_starts = np.array([0, 1, 3, 4, 7])
+
+    assert _bytes_to_char_offsets(text, byte_starts).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_invalid_budgets_are_rejected():
+    with pytest.raises(ValueError):
+        TextChunker(max_tokens=0)
+    with pytest.raises(ValueError):
+        TextChunker(max_tokens=10, overlap=10)
+
+
+@pytest.mark.asyncio
+async def test_batch_chunking_keeps_input_order(monkeypatch):
+    texts = [f"Document {i}. " + PARAGRAPH * (i % 3 + 1) for i in range(6)]
+    monkeypatch.setattr(chunker_module, "PROCESS_CHUNKING_MIN_CHARS", 0)
+    monkeypatch.setattr(chunker_module, "CHUNKING_UNIT_CHARS", 1_000)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        monkeypatch.setattr(chunker_module, "get_chunking_executor", lambda: executor)
+        batched = await chunk_texts_async(texts, ChunkerConfig(max_tokens=300))
+
+    chunker = TextChunker(max_tokens=300)
+    assert batched == [chunker.chunk(text) for text in texts]
+    assert [chunks[0].split(".")[0] for chunks in batched] == [f"Document {i}" for i in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_failed_tokenizer_load_is_retried(monkeypatch):
+    loads = iter([ChunkTokenizer(), WordTokenizer()])
+    monkeypatch.setattr(chunker_module, "load_chunk_tokenizer", lambda spec: next(loads))
+    monkeypatch.setattr(chunker_module, "_tokenizers", {})
+    settings = {"CHUNK_TOKENIZER": "tiktoken:cl100k_base", "CHUNK_MAX_TOKENS": "128"}
+
+    with patch(
+        "src.server.services.credential_service.credential_service.get_credentials_by_category",
+        AsyncMock(return_value=settings),
+    ):
+        # The first load fell back to characters; the next one succeeds and is kept
+        assert await get_chunker_config(600) == ChunkerConfig(max_tokens=600)
+        assert await get_chunker_config(600) == ChunkerConfig(tokenizer="tiktoken:cl100k_base", max_tokens=128)
+        assert await get_chunker_config(600) == ChunkerConfig(tokenizer="tiktoken:cl100k_base", max_tokens=128)
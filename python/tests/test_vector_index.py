@@ -0,0 +1,143 @@
+"""
+Tests for the in-process vector index mirror.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from src.server.services.search.base_search_strategy import BaseSearchStrategy
+from src.server.services.search.vector_index import (
+    HNSWLIB_AVAILABLE,
+    LocalVectorIndex,
+    VectorIndexManager,
+)
+
+DIM = 8
+BACKENDS = ["numpy", pytest.param("hnsw", marks=pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib"))]
+
+
+def unit(i):
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[i % DIM] = 1.0
+    vector[(i + 1) % DIM] = 0.1 * (i // DIM)
+    return vector
+
+
+def row(chunk_id, source="src-a", as_text=False):
+    vector = unit(chunk_id).tolist()
+    return {
+        "id": chunk_id,
+        "source_id": source,
+        f"embedding_{DIM}": json.dumps(vector) if as_text else vector,
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_search_returns_nearest_and_filters_by_source(backend, tmp_path):
+    index = LocalVectorIndex("archon_crawled_pages", f"embedding_{DIM}", DIM, backend=backend, index_dir=tmp_path)
+    index.add_rows([row(i, "src-a" if i < 4 else "src-b", as_text=i % 2 == 0) for i in range(8)])
+
+    assert index.search(unit(3).tolist(), 1)[0][0] == 3
+    assert index.search(unit(3).tolist(), 1)[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert {chunk_id for chunk_id, _ in index.search(unit(3).tolist(), 3, "src-b")} <= {4, 5, 6, 7}
+    assert index.search(unit(3).tolist(), 3, "unknown") == []
+    assert index.watermark == 7
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_source_filter_returns_every_vector_of_a_small_source(backend, tmp_path):
+    index = LocalVectorIndex("archon_crawled_pages", f"embedding_{DIM}", DIM, backend=backend, index_dir=tmp_path)
+    index.add_rows([row(i, "src-a") for i in range(100)] + [row(i, "src-b") for i in range(100, 103)])
+
+    # k is larger than src-b but smaller than the whole index
+    hits = index.search(unit(101).tolist(), 20, "src-b")
+
+    assert sorted(chunk_id for chunk_id, _ in hits) == [100, 101, 102]
+    assert hits[0][0] == 101
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_remove_ids_and_source(backend, tmp_path):
+    index = LocalVectorIndex("archon_crawled_pages", f"embedding_{DIM}", DIM, backend=backend, index_dir=tmp_path)
+    index.add_rows([row(i, "src-a" if i < 4 else "src-b") for i in range(8)])
+
+    index.remove_ids([3])
+    assert 3 not in {chunk_id for chunk_id, _ in index.search(unit(3).tolist(), 8)}
+
+    index.remove_source("src-b")
+    assert len(index) == 3
+    assert index.search(unit(5).tolist(), 3, "src-b") == []
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_persisted_index_reloads_with_watermark(backend, tmp_path):
+    index = LocalVectorIndex("archon_crawled_pages", f"embedding_{DIM}", DIM, backend=backend, index_dir=tmp_path)
+    index.add_rows([row(i) for i in range(5)])
+    index.save()
+
+    reloaded = LocalVectorIndex("archon_crawled_pages", f"embedding_{DIM}", DIM, backend=backend, index_dir=tmp_path)
+    assert reloaded.load()
+    assert reloaded.ready and reloaded.stale
+    assert reloaded.watermark == 4
+    assert reloaded.search(unit(2).tolist(), 1)[0][0] == 2
+
+    # Adding after a memory-mapped load keeps working
+    reloaded.add_rows([row(5)])
+    assert reloaded.search(unit(5).tolist(), 1)[0][0] == 5
+
+
+def make_client(sync_rows, hydrate_rows):
+    client = MagicMock()
+    sync_query = MagicMock()
+    sync_query.execute.return_value = MagicMock(data=sync_rows)
+    hydrate_query = MagicMock()
+    hydrate_query.execute.return_value = MagicMock(data=hydrate_rows)
+
+    table = MagicMock()
+    table.select.return_value.gt.return_value.not_.is_.return_value.order.return_value.limit.return_value = sync_query
+    table.select.return_value.in_.return_value = hydrate_query
+    client.table.return_value = table
+    return client, table
+
+
+@pytest.mark.asyncio
+async def test_manager_syncs_then_serves_and_purges_deleted(tmp_path):
+    manager = VectorIndexManager(backend="numpy", index_dir=tmp_path)
+    client, table = make_client(
+        sync_rows=[row(1), row(2)],
+        hydrate_rows=[{"id": 1, "url": "u", "chunk_number": 0, "content": "c", "metadata": {}, "source_id": "src-a"}],
+    )
+
+    # Not synced yet: caller falls back to the RPC while the sync runs
+    assert await manager.search(client, "match_archon_crawled_pages", unit(1).tolist(), 2) is None
+    await next(iter(manager._tasks))
+
+    # Chunk 2 no longer exists in the database: it is purged and the RPC answers
+    assert await manager.search(client, "match_archon_crawled_pages", unit(1).tolist(), 2) is None
+    assert set(table.select.return_value.in_.call_args.args[1]) == {1, 2}
+    assert len(manager.get_index("archon_crawled_pages", DIM)) == 1
+
+    results = await manager.search(client, "match_archon_crawled_pages", unit(1).tolist(), 2)
+
+    assert [r["id"] for r in results] == [1]
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_base_strategy_uses_rpc_for_metadata_filters():
+    vector_index = MagicMock()
+    vector_index.search = AsyncMock(return_value=[{"id": 1, "similarity": 0.9}, {"id": 2, "similarity": 0.01}])
+    client = MagicMock()
+    strategy = BaseSearchStrategy(client, vector_index=vector_index)
+
+    results = await strategy.vector_search([0.1] * DIM, 5, filter_metadata={"source": "src-a"})
+    assert [r["id"] for r in results] == [1]
+    assert vector_index.search.call_args.args[4] == "src-a"
+
+    client.rpc.return_value.execute.return_value = MagicMock(data=[{"id": 3, "similarity": 0.5}])
+    results = await strategy.vector_search([0.1] * DIM, 5, filter_metadata={"knowledge_type": "technical"})
+    assert [r["id"] for r in results] == [3]
+    assert vector_index.search.await_count == 1
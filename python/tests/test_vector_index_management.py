@@ -0,0 +1,166 @@
+"""
+Tests for pgvector index management: recommendations, rebuilds, search params and benchmark.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.services.storage.vector_index_management import (
+    VectorIndexManagementService,
+    recommend_index,
+)
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def index_row(name, method="ivfflat", column="embedding_1536", options=("lists=100",), valid=True):
+    return {
+        "name": name,
+        "table_name": "archon_crawled_pages",
+        "method": method,
+        "definition": f"CREATE INDEX {name} ON public.archon_crawled_pages USING {method} ({column} vector_cosine_ops)",
+        "options": list(options),
+        "size_bytes": 1024,
+        "valid": valid,
+    }
+
+
+def make_service(fetch=None, fetchval=None):
+    connection = MagicMock()
+    connection.execute = AsyncMock()
+    connection.fetch = AsyncMock(side_effect=fetch)
+    connection.fetchval = AsyncMock(return_value=fetchval)
+    connection.close = AsyncMock()
+    connection.transaction = MagicMock(side_effect=lambda: FakeTransaction())
+
+    service = VectorIndexManagementService(dsn="postgresql://test")
+    service._connect = AsyncMock(return_value=connection)
+    return service, connection
+
+
+def executed(connection):
+    return [call.args[0] for call in connection.execute.call_args_list]
+
+
+def test_recommendation_scales_with_rows():
+    assert recommend_index(50_000, 1536) == {"method": "ivfflat", "lists": 50, "probes": 7}
+    assert recommend_index(2_000, 768)["lists"] == 10
+    assert recommend_index(500_000, 1536)["method"] == "hnsw"
+    assert recommend_index(4_000_000, 1536) == {"method": "hnsw", "m": 24, "ef_construction": 128, "ef_search": 100}
+    # Empty tables and halfvec columns always get HNSW
+    assert recommend_index(0, 1536)["method"] == "hnsw"
+    assert recommend_index(5_000, 3072)["method"] == "hnsw"
+
+
+@pytest.mark.asyncio
+async def test_rebuild_builds_concurrently_then_swaps():
+    service, connection = make_service(
+        fetch=lambda *args: [index_row("idx_archon_crawled_pages_embedding_1536")], fetchval=250_000
+    )
+
+    build = await service.start_rebuild("archon_crawled_pages", 1536)
+    await next(iter(service._tasks))
+
+    assert build["status"] == "completed"
+    assert build["plan"]["method"] == "hnsw"
+    statements = executed(connection)
+    staging = "idx_archon_crawled_pages_embedding_1536_rebuild"
+    assert statements[1] == (
+        f'CREATE INDEX CONCURRENTLY "{staging}" ON "archon_crawled_pages" '
+        "USING hnsw (embedding_1536 vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+    assert statements[2] == "DROP INDEX CONCURRENTLY IF EXISTS idx_archon_crawled_pages_embedding_1536"
+    assert statements[3] == f'ALTER INDEX "{staging}" RENAME TO "idx_archon_crawled_pages_embedding_1536"'
+
+
+@pytest.mark.asyncio
+async def test_rebuild_leaves_compact_column_indexes_alone():
+    compact = [
+        index_row(f"idx_archon_crawled_pages_embedding_1536{suffix}", method="hnsw", column=f"embedding_1536{suffix}")
+        for suffix in ("_half", "_bin")
+    ]
+    service, connection = make_service(
+        fetch=lambda *args: [index_row("idx_archon_crawled_pages_embedding_1536"), *compact], fetchval=250_000
+    )
+
+    indexes = await service._fetch_indexes(connection)
+    assert [index["column"] for index in indexes] == ["embedding_1536", "embedding_1536_half", "embedding_1536_bin"]
+
+    await service.start_rebuild("archon_crawled_pages", 1536)
+    await next(iter(service._tasks))
+
+    drops = [statement for statement in executed(connection) if statement.startswith("DROP INDEX")]
+    assert drops[1:] == ["DROP INDEX CONCURRENTLY IF EXISTS idx_archon_crawled_pages_embedding_1536"]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_3072_uses_halfvec_and_rejects_ivfflat():
+    service, connection = make_service(fetch=lambda *args: [], fetchval=10)
+
+    with pytest.raises(ValueError):
+        await service.start_rebuild("archon_crawled_pages", 3072, method="ivfflat")
+
+    await service.start_rebuild("archon_crawled_pages", 3072)
+    await next(iter(service._tasks))
+    assert "(embedding_3072::halfvec(3072)) halfvec_cosine_ops" in executed(connection)[1]
+
+
+@pytest.mark.asyncio
+async def test_search_params_are_attached_to_search_functions():
+    service, connection = make_service(
+        fetch=lambda *args: [{"signature": "match_archon_crawled_pages_multi(vector,integer,integer,jsonb,text)"}]
+    )
+
+    result = await service.apply_search_params(probes=20, ef_search=80)
+
+    assert result["probes"] == 20
+    assert executed(connection) == [
+        "ALTER FUNCTION match_archon_crawled_pages_multi(vector,integer,integer,jsonb,text) "
+        "SET ivfflat.probes = 20 SET hnsw.ef_search = 80"
+    ]
+    with pytest.raises(ValueError):
+        await service.apply_search_params(probes=0, ef_search=80)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_recall_against_exact_search():
+    settings = {}
+
+    async def record_setting(sql):
+        name, value = sql.removeprefix("SET LOCAL ").split(" = ")
+        settings[name] = value
+
+    def fetch(sql, *args):
+        if "pg_index" in sql:
+            return [index_row("idx_hnsw", method="hnsw", options=("m=16",))]
+        if "random()" in sql:
+            return [{"embedding": "[1,0]"}, {"embedding": "[0,1]"}]
+        if settings.get("enable_indexscan") == "off":
+            return [{"id": i} for i in range(4)]
+        # A low ef_search misses half of the exact neighbours
+        found = 2 if settings["hnsw.ef_search"] == "20" else 4
+        return [{"id": i} for i in range(found)]
+
+    service, connection = make_service()
+    connection.fetch = AsyncMock(side_effect=fetch)
+
+    def transaction():
+        settings.clear()
+        return FakeTransaction()
+
+    connection.transaction = MagicMock(side_effect=transaction)
+    connection.execute = AsyncMock(side_effect=record_setting)
+
+    report = await service.benchmark("archon_crawled_pages", 1536, k=4, values=[20, 40])
+
+    assert report["parameter"] == "hnsw.ef_search"
+    assert [r["recall"] for r in report["results"]] == [0.5, 1.0]
+    assert report["recommended_value"] == 40
+    assert report["sample_size"] == 2